@@ -171,7 +171,7 @@ class CommunicationServer( asyncore.dispatcher, Utils.GenericLogClass ):
 		'''
 		if len( self.handlers ) == 0:
 			return False
-		self.log.debug('sending: {}'.format(signal))
+		self.log.debug( 'sending: %s', signal )
 		self.socket.setblocking( 1 )  # send in blocking mode, so the complete signal gets send
 		for client in self.handlers:
 			client.push( signal.encode() )
@@ -18,7 +18,7 @@
 
 import gom
 
-from ..Misc import Utils, Globals
+from ..Misc import Utils, Globals, LogClass, SettingsReload
 import os, subprocess, time
 import asyncore, asynchat
 import socket
@@ -29,6 +29,7 @@ import datetime
 
 from .PLC import PLCfunctions
 from .PLC import PLCconstants as plc_const
+from . import IoTTelemetry
 
 class Signal( object ):
 	'''
@@ -138,6 +139,7 @@ SIGNAL_RESTART         = Signal( 22, 'restart' )
 SIGNAL_SINGLE_SIDE     = Signal( 23, 'single_side_eval' )
 SIGNAL_DEINIT_SENSOR   = Signal( 24, 'deinit sensor' )
 SIGNAL_OPEN_INIT       = Signal( 25, 'open and init')
+SIGNAL_SETTINGS_CHANGED = Signal( 26, 'settings changed' )
 
 SIGNAL_INLINE_PREPARE = Signal(30, 'prepare_exec')
 SIGNAL_INLINE_DRC_MOVEDECISION = Signal(31, 'move_decision')
@@ -428,7 +430,7 @@ class ChatHandler( asynchat.async_chat, Utils.GenericLogClass ):
 		got_signal = False
 		while len( self.async_todo ) > 0:
 			todo = self.async_todo.pop( 0 )
-			self.log.debug( 'got Signal {}'.format( todo ) )
+			self.log.debug( 'got Signal %s', todo )
 			got_signal = True
 			if todo == SIGNAL_EXIT:
 				pass
@@ -437,8 +439,8 @@ class ChatHandler( asynchat.async_chat, Utils.GenericLogClass ):
 			elif todo == SIGNAL_HANDSHAKE:
 				self.pid = int( todo.value )
 				ownpid = os.getpid()
-				self.log.debug( 'Sending handshake from {} to {}'.format( ownpid, self.pid ) )
-				self.log.debug( '  local pids os {} / gom {}'.format( os.getpid(), gom.getpid() ) )
+				self.log.debug( 'Sending handshake from %s to %s', ownpid, self.pid )
+				self.log.debug( '  local pids os %s / gom %s', os.getpid(), LogClass.Lazy( gom.getpid ) )
 				self.push( Signal( SIGNAL_HANDSHAKE, str( ownpid ) ).encode() )
 				self.handshaked = True
 				self.alive_ts = time.time()
@@ -475,18 +477,21 @@ class ChatHandlerClient( ChatHandler ):
 		anysignals = False
 		while len( self.async_todo ) > 0:
 			todo = self.async_todo.pop( 0 )
-			self.log.debug( 'got Signal {}'.format( todo ) )
+			self.log.debug( 'got Signal %s', todo )
 			if todo == SIGNAL_EXIT:
 				raise gom.BreakError
 			elif todo == SIGNAL_HANDSHAKE:
 				self.pid = int( todo.value )
-				self.log.debug( 'parentpid ' + str( self.pid ) )
+				self.log.debug( 'parentpid %s', self.pid )
 				self.handshaked = True
 				self.alive_ts = time.time()
 			elif todo == SIGNAL_SERVER_ALIVE:
 				self.alive_ts = time.time()
 			elif todo == SIGNAL_CLIENT_ALIVE:
 				self.push( Signal( SIGNAL_CLIENT_ALIVE ).encode() )
+			elif todo == SIGNAL_SETTINGS_CHANGED:
+				if Globals.SETTINGS_RELOAD is not None:
+					Globals.SETTINGS_RELOAD.apply_texts( json.loads( todo.get_value_as_string() ) )
 			else:
 				self.async_results.append( todo )
 			anysignals = True
@@ -534,6 +539,16 @@ class ClientRefList( Utils.GenericLogClass ):
 						Signal( SIGNAL_CONTROL_ASYNC_PID, str( self.client_list[this_client_index].pid ) ) )
 		return new_sw
 
+	def resize( self, count ):
+		'''
+		start additional clients up to count,
+		surplus clients keep running until the next restart, returns False in that case
+		'''
+		while len( self.client_list ) < count:
+			self.log.info( 'Starting additional client instance' )
+			self.append( self.start_sw() )
+		return len( self.client_list ) == count
+
 	def all_killed( self ):
 		'''
 		test if all clients got killed
@@ -679,10 +694,12 @@ class PLCVar:
 		self._type = type
 		self._handle = None
 		self._connection = None
+		self._variable = None
 		
 	def getHandle(self, adr):
 		self._handle = PLCfunctions.adsGetHandle(adr, self.name)
 		self._connection = adr
+		self._variable = PLCfunctions.AdsVariable(adr, self._handle, self._type)
 	
 	def releaseHandle(self, adr):
 		if self._handle is not None:
@@ -692,6 +709,7 @@ class PLCVar:
 				pass
 		self._handle = None
 		self._connection = None
+		self._variable = None
 		
 	def write(self, value):
 		if self._connection is None:
@@ -699,13 +717,20 @@ class PLCVar:
 		if self._handle is None:
 			raise Exception("Tried to write variable with invalid handle")
 		Globals.LOGGER.debug('write {} : {}'.format(self.name, value))
-		PLCfunctions.adsSyncWriteByHandle(self._connection, self._handle, value, self._type)
+		self._variable.write(value)
 
 
 class IoTConnection:
-	def __init__(self, ip, port):
+	'''
+	sends telemetry to the IoT solution over one UDP socket
+	batched: events are buffered and sent as json lines (see IoTTelemetry),
+	else one length prefixed json document per datagram
+	'''
+	def __init__(self, ip, port, batched=False):
 		self.ip = ip
 		self.port = port
+		self.stream = IoTTelemetry.TelemetryStream(ip, port) if batched else None
+		self._sock = None
 	
 	def _pack_serialized_json(self, json_object):
 		data = json_object.encode(encoding='utf-8')
@@ -723,10 +748,26 @@ class IoTConnection:
 			data["exposure_time_first_calibration_position"] = exposure_time_calib
 		if calib_time is not None:
 			data["calibration_timestamp"] = calib_time
+		if self.stream is not None:
+			data["timestamp"] = time.time()
+			self.stream.send(data)
+			return
 		msg = self._pack_serialized_json(json.dumps(data))
-		sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-		sock.sendto(msg, (self.ip, self.port))
-		sock.close()
+		try:
+			if self._sock is None:
+				self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+			self._sock.sendto(msg, (self.ip, self.port))
+		except OSError as e:
+			Globals.LOGGER.debug('IoT send failed: {}'.format(e))
+			self.close()
+
+	def close(self):
+		if self.stream is not None:
+			self.stream.close()
+			Globals.LOGGER.debug('IoT telemetry: {}'.format(self.stream.stats()))
+		if self._sock is not None:
+			self._sock.close()
+			self._sock = None
 		
 	def getCalibrationInformation(self):
 		try:
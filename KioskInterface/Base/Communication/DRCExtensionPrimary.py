@@ -140,7 +140,7 @@ class DRCExtensionPrimary( Utils.GenericLogClass ):
 			if last_result == Communicate.SIGNAL_INLINE_DRC_SECONDARY_INST_DATA:
 				if Globals.SETTINGS.Inline and self.single_side_secondary and not self.single_side_primary:
 					s_key, s_value = pickle.loads(last_result.value)
-					self.log.debug('Forwarding: {}: {}'.format(s_key, s_value))
+					self.log.debug('Forwarding: %s: %s', s_key, s_value)
 					Globals.CONTROL_INSTANCE.send_signal( Communicate.Signal( s_key, s_value))
 				continue
 			# Ignore failure when UNPAIRED
@@ -408,6 +408,7 @@ class DRCExtensionPrimary( Utils.GenericLogClass ):
 				self.primary_con.send_signal( signal )
 				Communicate.IOExtension.store_active_devices()
 				gom.script.sys.close_project()
+				Utils.invalidate_project_overrides()
 				return False # skip this
 			elif len(eval.Compatible_wcfgs) and not slave_compatible:
 				Globals.FEATURE_SET.DRC_SINGLE_SIDE = True
@@ -424,6 +425,7 @@ class DRCExtensionPrimary( Utils.GenericLogClass ):
 			gom.script.sys.create_project_from_template ( 
 				config_level = opened_template['config_level'],
 				template_name = opened_template['template_name'] )
+			Utils.invalidate_project_overrides()
 		self.log.debug('Current Template {}'.format(Globals.SETTINGS.CurrentTemplate))
 
 	def check_robogrammetry_workflow( self ):
@@ -777,8 +779,10 @@ class DRCExtensionPrimary( Utils.GenericLogClass ):
 		filename = os.path.join(Globals.SETTINGS.DoubleRobot_TransferPath, filename)
 		if gom.app.project.is_part_project:
 			gom.script.sys.import_project ( file = filename, import_mode='measurement_data_only' )
+			Utils.invalidate_project_overrides()
 		else:
 			gom.script.sys.import_project ( file = filename, import_mode='replace_elements' )
+			Utils.invalidate_project_overrides()
 		try:
 			os.unlink( filename )
 		except:
@@ -938,8 +942,10 @@ class DRCExtensionPrimary( Utils.GenericLogClass ):
 		filename = os.path.join(Globals.SETTINGS.DoubleRobot_TransferPath, filename)
 		if gom.app.project.is_part_project:
 			gom.script.sys.import_project ( file=filename, import_mode='measurement_data_only', import_reference_point_parameters=False )
+			Utils.invalidate_project_overrides()
 		else:
 			gom.script.sys.import_project ( file=filename, import_mode='replace_elements')
+			Utils.invalidate_project_overrides()
 		try:
 			os.unlink( filename )
 		except:
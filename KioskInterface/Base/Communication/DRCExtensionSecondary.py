@@ -209,10 +209,12 @@ class DRCExtensionSecondary( Utils.GenericLogClass ):
 				Globals.SETTINGS.CurrentTemplateCfg = template_cfg
 				if Globals.SETTINGS.CurrentTemplate.endswith('.ginspect'):
 					gom.script.sys.close_project()
+					Utils.invalidate_project_overrides()
 					i=0
 					while i<15:
 						try:
 							gom.script.sys.load_project(file=os.path.join( Globals.SETTINGS.DoubleRobot_TransferPath, Globals.SETTINGS.CurrentTemplate))
+							Utils.invalidate_project_overrides()
 							break
 						except Exception as e:
 							self.log.exception('Failed to load project {}'.format(e))
@@ -242,6 +244,7 @@ class DRCExtensionSecondary( Utils.GenericLogClass ):
 		elif signal == Communicate.SIGNAL_CLOSE_TEMPLATE:
 			del self.remote_todos.todos[0]
 			gom.script.sys.close_project()
+			Utils.invalidate_project_overrides()
 			Globals.SETTINGS.CurrentTemplate = None
 			Globals.SETTINGS.CurrentTemplateCfg = None
 			Globals.SETTINGS.AlreadyExecutionPrepared=False
@@ -303,6 +306,7 @@ class DRCExtensionSecondary( Utils.GenericLogClass ):
 				gom.script.sys.set_project_keywords (
 					keywords = {'KioskInline_PLC_INFORMATION': ''.join(value)},
 					keywords_description = {'KioskInline_PLC_INFORMATION': 'KioskInterface PLC Information'} )
+				Utils.invalidate_project_overrides()
 				gom.script.sys.set_project_keywords (
 					keywords = {'KioskInline_PLC_INFORMATION_RAW1': value[0],
 							'KioskInline_PLC_INFORMATION_RAW2': value[1],
@@ -310,6 +314,7 @@ class DRCExtensionSecondary( Utils.GenericLogClass ):
 					keywords_description = {'KioskInline_PLC_INFORMATION_RAW1': 'KioskInterface PLC Information Raw1',
 										'KioskInline_PLC_INFORMATION_RAW2': 'KioskInterface PLC Information Raw2',
 										'KioskInline_PLC_INFORMATION_RAW3': 'KioskInterface PLC Information Raw3'} )
+				Utils.invalidate_project_overrides()
 			else:
 				pass #startup.parent.eval.eval.set_project_keywords(dict())
 			self.parent.eval.eval.save_project()
@@ -326,6 +331,7 @@ class DRCExtensionSecondary( Utils.GenericLogClass ):
 				gom.script.sys.set_project_keywords (
 					keywords = {'KioskInline_PLC_RESULT_NOT_NEEDED': signal.get_value_as_string()},
 					keywords_description = {'KioskInline_PLC_RESULT_NOT_NEEDED': 'KioskInterface PLC Result Not Needed'} )
+				Utils.invalidate_project_overrides()
 			except:
 				pass
 			del self.remote_todos.todos[0]
@@ -335,6 +341,7 @@ class DRCExtensionSecondary( Utils.GenericLogClass ):
 		elif signal == Communicate.SIGNAL_OPEN_SOFTWARE_DRC:
 			self.log.debug('Got software DRC connection')
 			gom.script.sys.close_project()
+			Utils.invalidate_project_overrides()
 			Globals.SETTINGS.SoftwareDRCMode = signal.get_value_as_string()
 			del self.remote_todos.todos[0]
 			return True
@@ -796,6 +803,7 @@ class DRCExtensionSecondary( Utils.GenericLogClass ):
 		if final_run and gom.app.project.is_part_project:
 			temp_file = gom.app.project.get ( 'project_file' )
 			gom.script.sys.close_project()
+			Utils.invalidate_project_overrides()
 			file_name = os.path.basename(temp_file)
 		else:
 			file_name = '{}-{}.gelements'.format(Globals.SETTINGS.ProjectName,time.strftime( Globals.SETTINGS.TimeFormatProject ))
@@ -841,6 +849,7 @@ class DRCExtensionSecondary( Utils.GenericLogClass ):
 			try:
 				gom.script.sys.save_project()
 				gom.script.sys.close_project()
+				Utils.invalidate_project_overrides()
 			except:
 				pass
 		else:
@@ -850,6 +859,7 @@ class DRCExtensionSecondary( Utils.GenericLogClass ):
 				projectfile = None
 			if projectfile is not None:
 				gom.script.sys.close_project()
+				Utils.invalidate_project_overrides()
 				if not projectfile.endswith( '.project_template' ):
 					if ( os.path.exists( projectfile ) ):
 						os.unlink( projectfile )
@@ -915,9 +925,11 @@ class DRCExtensionSecondary( Utils.GenericLogClass ):
 				#reopen complete project
 				projectfile = gom.app.project.get ( 'project_file' )
 				gom.script.sys.close_project()
+				Utils.invalidate_project_overrides()
 				template = gom.script.sys.create_project_from_template (
 					config_level = Globals.SETTINGS.CurrentTemplateCfg,
 					template_name = Globals.SETTINGS.CurrentTemplate )
+				Utils.invalidate_project_overrides()
 				gom.script.sys.save_project_as( file_name = projectfile )
 			else:
 				pass
@@ -25,6 +25,8 @@ from ...Misc import Globals, Utils, LogClass
 from .InlineConstants import *
 from .InlineVariables import *
 from . import InlineWidgetHelper 
+from .INDITaskStore import TaskStore
+from . import INDIResultWriter
 
 
 ##############################################################################
@@ -100,6 +102,22 @@ class Task:
 		self.eval_client = None
 		self.eval_start = None
 		self.eval_result = None
+		# owning TaskStore, notified on every change relevant for its indexes
+		self._store = None
+		self._store_key = None
+
+	def attach_store(self, store, sync):
+		self._store = store
+		self._store_key = sync
+
+	def _changed(self):
+		if self._store is not None:
+			self._store.update( self, self._store_key )
+
+	def archive_record(self, completed=None):
+		return {'sync': self.data.get( 'SYNC' ), 'prodnumber': self.data.get( 'prodnumber' ),
+			'state': self.state, 'fail_reason': self.fail_reason, 'eval_result': self.eval_result,
+			'eval_start': self.eval_start, 'completed': completed, 'telegram': self.data}
 
 	def __str__(self):
 		sync = '?'
@@ -120,18 +138,22 @@ class Task:
 		# never overwrite 'error'
 		if self.state == 'unknown':
 			self.state = 'prepare'
+			self._changed()
 	def set_status_measure(self):
 		# never overwrite 'error'
 		if self.state == 'prepare':
 			self.state = 'measure'
+			self._changed()
 	def set_status_ok(self):
 		# never overwrite 'error'
 		if self.state == 'measure':
 			self.state = 'ok'
+			self._changed()
 	def set_status_finished(self):
 		# never overwrite 'error'
 		if self.state == 'ok':
 			self.state = 'finished'
+			self._changed()
 	def set_status_failed(self, *reasons):
 		self.state = 'error'
 		# append to previous reasons
@@ -139,16 +161,20 @@ class Task:
 			self.fail_reason = list( reasons )
 		else:
 			self.fail_reason += list( reasons )
+		self._changed()
 
 	def activate_task(self):
 		self.active_state = True
+		self._changed()
 		return self
 	def release_task(self):
 		self.active_state = False
+		self._changed()
 		return None
 
 	def set_status_result_done(self):
 		self.result_done = True
+		self._changed()
 
 	def finished(self, log=None):
 		if log is not None:
@@ -205,6 +231,7 @@ class Task:
 		self.eval_client = client
 		if client is not None:
 			self.eval_start = time.time()
+		self._changed()
 	def get_eval_client(self):
 		return self.eval_client
 	def get_eval_starttime(self):
@@ -215,6 +242,7 @@ class Task:
 		self.set_status_failed( signal.get_value_as_string() )
 	def set_eval_success(self, signal):
 		self.eval_result = True
+		self._changed()
 
 	def add_result(self, result):
 		# TODO result obsolete (old async Kiosk method)
@@ -427,7 +455,7 @@ class INDICommunication(Utils.GenericLogClass):
 			prod = pairs.pop(0)
 			tele = {'prodnumber': prod}
 			tele.update( {p.split(':')[0]:p.split(':')[1] for p in pairs if ':' in p} )
-			self.log.debug( 'parse_telegram {}'.format( repr( tele ) ) )
+			self.log.debug( 'parse_telegram %r', tele )
 			return tele
 			
 		def compile_data( self, sig, msg ):
@@ -488,6 +516,21 @@ class INDICommunication(Utils.GenericLogClass):
 			except Exception as e:
 				self.log.exception( 'Failed send {} / {}'.format( repr(msg), str(e) ) )
 
+		def send_message_spooled( self, msg, spooled_xml ):
+			'''
+			send message with a SpooledResult document attached,
+			the document is pushed chunkwise by an asynchat producer
+			'''
+			try:
+				msg = msg.strip()
+				producer = spooled_xml.producer()
+				self.push( msg.encode( 'utf-8' ) + b'%09d' % spooled_xml.length )
+				self.push_with_producer( producer )
+				self.push( b'\n' )
+			except Exception as e:
+				spooled_xml.close()
+				self.log.exception( 'Failed send {} / {}'.format( repr(msg), str(e) ) )
+
 		def send_signal( self, sig ):
 			msg = OUTGOING[sig]
 			self.send_message( msg, None )
@@ -557,7 +600,7 @@ class INDICommunication(Utils.GenericLogClass):
 			while len( self.async_todo ) > 0:
 				todo = self.async_todo.pop( 0 )
 				if todo[0] == SIG_IDENT:
-					self.log.debug( 'got Ident Signal {}'.format( todo ) )
+					self.log.debug( 'got Ident Signal %s', todo )
 					self.handle_ident( todo )
 					self.handshaked = True
 					# handle_packet starts Kiosk
@@ -565,10 +608,10 @@ class INDICommunication(Utils.GenericLogClass):
 				elif todo[0] == SIG_ALIVE:
 					self.handle_alive( todo )
 				elif todo[0] == SIG_NOTIMPL:
-					self.log.debug( 'got not implemented Signal {}'.format( todo ) )
+					self.log.debug( 'got not implemented Signal %s', todo )
 					self.handle_not_implemented( todo )
 				else:
-					self.log.debug( 'got Signal {}'.format( todo ) )
+					self.log.debug( 'got Signal %s', todo )
 					#self.async_results.append( todo )
 					self.parent.handle_packet( *todo )
 				anysignals = True
@@ -582,7 +625,7 @@ class INDICommunication(Utils.GenericLogClass):
 
 
 
-	def __init__(self, parent, logger, port=2049):
+	def __init__(self, parent, logger, port=2049, task_ttl=3600, task_max_completed=500, task_archive=None):
 		Utils.GenericLogClass.__init__( self, logger )
 		self.parent = parent
 		self.port = port
@@ -603,7 +646,9 @@ class INDICommunication(Utils.GenericLogClass):
 
 
 		self.telegram_data = None
-		self.tasks = {}
+		# completed tasks are evicted after task_ttl seconds or beyond task_max_completed,
+		# task_archive (optional) is a json lines file receiving the evicted tasks
+		self.tasks = TaskStore( self.baselog, task_ttl, task_max_completed, task_archive )
 
 		self.client = INDICommunication.INDI_Client( self.baselog, self, 'localhost', port, {} )
 
@@ -618,6 +663,7 @@ class INDICommunication(Utils.GenericLogClass):
 		self.parent.cycleTimeStat.updateTick()
 
 		self.client.process_signals()
+		self.tasks.evict()
 
 		if self.client.connected and self.client.handshaked:
 			self.parent.indiState.value = State.OK
@@ -628,7 +674,7 @@ class INDICommunication(Utils.GenericLogClass):
 
 
 	def handle_packet(self, sig, data):
-		self.log.debug( 'Packet {}/{} data {}'.format( sig, signame( sig ), repr( data ) ) )
+		self.log.debug( 'Packet %s/%s data %r', sig, LogClass.Lazy( signame, sig ), data )
 
 		if sig == SIG_IDENT:
 			# connection to INDI established, start Kiosk eval
@@ -638,7 +684,7 @@ class INDICommunication(Utils.GenericLogClass):
 			self.telegram_data = data
 			sync = self.telegram_data['SYNC']
 			self.tasks[sync] = Task( self.telegram_data )
-			self.log.debug( 'New task {}: telegram_data {}'.format( sync, repr( self.telegram_data ) ) )
+			self.log.debug( 'New task %s: telegram_data %r', sync, self.telegram_data )
 
 				# TODO handle duplicate task
 			# TODO anything todo about duplicate/unknown REQ ???
@@ -666,8 +712,12 @@ class INDICommunication(Utils.GenericLogClass):
 				self.log.error( 'SIG_RESULT but no task' )
 			else:
 				tele = self.client.build_telegram( SIG_MEAS_RESULT, self.telegram_data )
-				xml_res = self.build_xml_result( task )
-				self.client.send_message( tele, xml_res )
+				if INDICommunication.build_xml_result is not _build_xml_result:
+					# build_xml_result is patched (CustomPatches), send the patched document
+					self.client.send_message( tele, self.build_xml_result( task ) )
+				else:
+					xml_res = self.build_xml_result_spooled( task )
+					self.client.send_message_spooled( tele, xml_res )
 				task.set_status_result_done()
 				self.log.debug( 'Task {} result done'.format( task ) )
 
@@ -689,18 +739,18 @@ class INDICommunication(Utils.GenericLogClass):
 	def find_task(self, client_id):
 		if client_id is None:
 			return None
-		for task in self.tasks.values():
-			if task.get_eval_client() == client_id:
-				return task
-		return None
+		return self.tasks.by_eval_client( client_id )
 
 	def find_task_by_sync(self, sync):
 		if sync is None:
 			return None
-		for task in self.tasks.values():
-			if task.get_sync_timestamp() == sync:
-				return task
-		return None
+		return self.tasks.by_sync( sync )
+
+	def find_tasks_by_serial(self, serial):
+		return self.tasks.by_serial( serial )
+
+	def find_tasks_by_state(self, state):
+		return self.tasks.by_state( state )
 
 	def delete_task(self, task=None, sync=None):
 		if task is not None:
@@ -722,8 +772,10 @@ class INDICommunication(Utils.GenericLogClass):
 		telegram['SYNC'] = values[1]
 		return telegram
 
-	def build_xml_result(self, task):
-		kws = task.get_telegram_keywords()
+	def result_items(self, task):
+		'''
+		returns iterable of (name, status, reason) for the RAWDATAITEM entries of the result
+		'''
 		if task.state == 'error':
 			status = S_Mismeasurement
 			reason = R_SYSTEM
@@ -733,21 +785,35 @@ class INDICommunication(Utils.GenericLogClass):
 		else:
 			status = S_NoMeasuring
 			reason = R_UNKNOWN
+		return [( 'ResultMS', status, reason )]
 
+	def write_xml_result(self, task, sink):
+		'''
+		stream the result document of the task into the binary sink, returns length in bytes
+		'''
+		kws = task.get_telegram_keywords()
 		date_ = time.strftime( '%Y-%m-%d' )
 		time_ = time.strftime( '%H.%M.%S' )
 		prod_ = kws['prodnumber']
-		self.log.debug( 'Build XML for {} header {}/{}/{} result {}/{}'.format(
-			task, date_, time_, prod_, status, reason ) )
-		header = _template_xml_header.format( date=date_, time=time_, prod=prod_ )
-		itemlist = []
-		item = _template_xml_item.format( name='ResultMS', status=status, reason=reason )
-		itemlist.append( item )
-		items = '\n'.join( itemlist )
-		xml = _template_xml.format( header=header, items=items )
-		xml = xml.replace('\n', '')
+		self.log.debug( 'Build XML for {} header {}/{}/{}'.format( task, date_, time_, prod_ ) )
+		writer = INDIResultWriter.ResultXMLWriter( sink, _template_xml_header, _template_xml_item, _template_xml )
+		writer.header( date_, time_, prod_ )
+		for name, status, reason in self.result_items( task ):
+			writer.item( name, status, reason )
+		return writer.close()
+
+	def build_xml_result_spooled(self, task):
+		spool = INDIResultWriter.SpooledResult()
+		self.write_xml_result( task, spool )
+		return spool
 
-		return xml
+	def build_xml_result(self, task):
+		'''
+		result document as string, patch point for a custom document (used instead of the spooled one)
+		'''
+		spool = self.build_xml_result_spooled( task )
+		xml = b''.join( iter( spool.producer().more, b'' ) )
+		return xml.decode( 'utf-8' )
 
 
 	def sendMeasureAnswer(self, task):
@@ -767,4 +833,14 @@ class INDICommunication(Utils.GenericLogClass):
 
 	def onWarningInMeasureInstance(self, warning, warn_desc):
 		warnmsg = 'Warnung{}: {}'.format( warning, warn_desc ).replace( '\n', '\\n' )
-		self.client.send_message( warnmsg )
\ No newline at end of file
+		self.client.send_message( warnmsg )
+
+
+# unpatched build_xml_result, see SIG_RESULT in handle_packet
+_build_xml_result = INDICommunication.build_xml_result
+
+def benchmark_xml_result(count=10000):
+	'''
+	template approach vs. streaming writer for a result with count elements
+	'''
+	return INDIResultWriter.benchmark( _template_xml_header, _template_xml_item, _template_xml, count )
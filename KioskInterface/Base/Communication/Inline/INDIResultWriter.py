@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+#
+# PLEASE NOTE that this file is part of the GOM Software.
+# You are not allowed to distribute this file to a third party without written notice.
+#
+# Please, do not copy and/or modify this script.
+# All modifications of KioskInterface should happen in the CustomPatches script.
+# Ignoring this advice will make KioskInterface fail after Software update.
+#
+# Copyright (c) 2020, 2021 Carl Zeiss GOM Metrology GmbH
+# All rights reserved.
+
+# GOM-Script-Version: 2020
+
+
+import tempfile
+import time
+from xml.sax.saxutils import escape
+
+
+##############################################################################
+# Streaming writer for INDI XML result documents
+
+class ResultXMLWriter:
+	'''
+	Writes an INDI result document incrementally into a binary sink.
+
+	The document structure is given by the same templates used by
+	INDICommunication.build_xml_result (newlines are removed as there).
+	Text values are xml escaped. Output is buffered up to chunk_size
+	bytes before being handed to the sink.
+	'''
+	def __init__( self, sink, header_template, item_template, document_template, chunk_size=65536 ):
+		self.sink = sink
+		self.chunk_size = chunk_size
+		self._header_template = header_template.replace( '\n', '' )
+		self._item_template = item_template.replace( '\n', '' )
+		document = document_template.replace( '\n', '' )
+		self._doc_start, rest = document.split( '{header}' )
+		self._doc_middle, self._doc_end = rest.split( '{items}' )
+		self._buffer = []
+		self._buffered = 0
+		self.length = 0
+		self._state = 'start'
+
+	def _write( self, text ):
+		data = text.encode( 'utf-8' )
+		self._buffer.append( data )
+		self._buffered += len( data )
+		self.length += len( data )
+		if self._buffered >= self.chunk_size:
+			self.flush()
+
+	def flush( self ):
+		if self._buffer:
+			self.sink.write( b''.join( self._buffer ) )
+			self._buffer = []
+			self._buffered = 0
+
+	def header( self, date_, time_, prod_ ):
+		if self._state != 'start':
+			raise RuntimeError( 'XML header already written' )
+		self._write( self._doc_start )
+		self._write( self._header_template.format( date=escape( str( date_ ) ), time=escape( str( time_ ) ), prod=escape( str( prod_ ) ) ) )
+		self._write( self._doc_middle )
+		self._state = 'items'
+
+	def item( self, name, status, reason ):
+		if self._state != 'items':
+			raise RuntimeError( 'XML item written outside of RAWDATA' )
+		self._write( self._item_template.format( name=escape( str( name ) ), status=escape( str( status ) ), reason=escape( str( reason ) ) ) )
+
+	def close( self ):
+		'''
+		finish the document and flush remaining data, returns the document length in bytes
+		'''
+		if self._state != 'items':
+			raise RuntimeError( 'XML document incomplete' )
+		self._write( self._doc_end )
+		self.flush()
+		self._state = 'closed'
+		return self.length
+
+
+class SpooledResult:
+	'''
+	Result document spooled in memory up to max_size bytes, on disk beyond that.
+	Used when the length has to be known before sending (INDI length prefix).
+	'''
+	def __init__( self, max_size=1024*1024 ):
+		self.file = tempfile.SpooledTemporaryFile( max_size=max_size, mode='w+b' )
+		self.length = 0
+
+	def write( self, data ):
+		self.file.write( data )
+
+	def producer( self, chunk_size=65536 ):
+		'''
+		returns an asynchat producer reading the spooled document from the start
+		'''
+		self.length = self.file.tell()
+		self.file.seek( 0 )
+		return SpooledResult.Producer( self.file, chunk_size )
+
+	def close( self ):
+		self.file.close()
+
+	class Producer:
+		'''
+		asynchat producer, closes the spool file after the last chunk
+		'''
+		def __init__( self, file, chunk_size ):
+			self.file = file
+			self.chunk_size = chunk_size
+
+		def more( self ):
+			if self.file.closed:
+				return b''
+			data = self.file.read( self.chunk_size )
+			if not data:
+				self.file.close()
+			return data
+
+
+def benchmark( header_template, item_template, document_template, count=10000 ):
+	'''
+	compare the template/concatenation approach with the streaming writer
+	returns dict with durations in seconds and resulting document sizes
+	'''
+	items = [( 'Element{}'.format( i ), 9, 'Okay' ) for i in range( count )]
+
+	start = time.perf_counter()
+	header = header_template.format( date='2021-01-01', time='00.00.00', prod='P1' )
+	itemlist = [item_template.format( name=n, status=s, reason=r ) for n, s, r in items]
+	xml = document_template.format( header=header, items='\n'.join( itemlist ) ).replace( '\n', '' )
+	template_bytes = xml.encode( 'utf-8' )
+	template_time = time.perf_counter() - start
+
+	start = time.perf_counter()
+	spool = SpooledResult()
+	writer = ResultXMLWriter( spool, header_template, item_template, document_template )
+	writer.header( '2021-01-01', '00.00.00', 'P1' )
+	for n, s, r in items:
+		writer.item( n, s, r )
+	writer.close()
+	producer = spool.producer()
+	streamed = b''.join( iter( producer.more, b'' ) )
+	stream_time = time.perf_counter() - start
+
+	return {'count': count, 'template_s': template_time, 'stream_s': stream_time,
+		'template_bytes': len( template_bytes ), 'stream_bytes': len( streamed ),
+		'identical': template_bytes == streamed}
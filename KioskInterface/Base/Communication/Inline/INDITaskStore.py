@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+#
+# PLEASE NOTE that this file is part of the GOM Software.
+# You are not allowed to distribute this file to a third party without written notice.
+#
+# Please, do not copy and/or modify this script.
+# All modifications of KioskInterface should happen in the CustomPatches script.
+# Ignoring this advice will make KioskInterface fail after Software update.
+#
+# Copyright (c) 2020, 2021 Carl Zeiss GOM Metrology GmbH
+# All rights reserved.
+
+# GOM-Script-Version: 2020
+
+
+import json
+import os
+import time
+from collections import OrderedDict
+
+from ...Misc import Utils
+
+
+##############################################################################
+# Task store with secondary indexes and eviction of completed tasks
+
+class TaskStore( Utils.GenericLogClass ):
+	'''
+	Holds the INDI tasks of a shift keyed by SYNC timestamp.
+
+	Secondary indexes on serial (prodnumber), state and eval client make all
+	lookups O(1). Tasks report their changes via update(), completed tasks are
+	remembered in completion order and evicted by TTL and count. Evicted tasks
+	can optionally be appended to an archive file (one json document per line).
+	'''
+	def __init__( self, logger, ttl=3600, max_completed=500, archive_path=None ):
+		Utils.GenericLogClass.__init__( self, logger )
+		self.ttl = ttl
+		self.max_completed = max_completed
+		self.archive_path = archive_path
+		self._tasks = {}
+		self._by_serial = {}
+		self._by_state = {}
+		self._by_client = {}
+		# sync -> (state, eval client, serial) as currently indexed
+		self._indexed = {}
+		# sync -> insertion number, re-indexing reorders the buckets but not the tasks
+		self._order = {}
+		self._sequence = 0
+		# sync -> completion timestamp, oldest first
+		self._completed = OrderedDict()
+		self.evicted_count = 0
+
+	# dict compatible access (INDICommunication.tasks)
+	def __len__( self ):
+		return len( self._tasks )
+	def __contains__( self, sync ):
+		return sync in self._tasks
+	def __iter__( self ):
+		return iter( self._tasks )
+	def __getitem__( self, sync ):
+		return self._tasks[sync]
+	def __setitem__( self, sync, task ):
+		self.add( task, sync )
+	def __delitem__( self, sync ):
+		self.remove( sync )
+	def get( self, sync, default=None ):
+		return self._tasks.get( sync, default )
+	def keys( self ):
+		return self._tasks.keys()
+	def values( self ):
+		return self._tasks.values()
+	def items( self ):
+		return self._tasks.items()
+
+	def add( self, task, sync=None ):
+		'''
+		insert (or replace) a task, the task reports later changes via update()
+		'''
+		if sync is None:
+			sync = task.get_sync_timestamp()
+		if sync in self._tasks:
+			self.log.warning( 'Duplicate task {} replaced'.format( sync ) )
+			self.remove( sync )
+		self._tasks[sync] = task
+		self._sequence += 1
+		self._order[sync] = self._sequence
+		task.attach_store( self, sync )
+		self.update( task, sync )
+		return task
+
+	def remove( self, sync ):
+		'''
+		remove task from store and all indexes, raises KeyError for unknown sync
+		'''
+		task = self._tasks.pop( sync )
+		self._order.pop( sync, None )
+		self._unindex( sync )
+		self._completed.pop( sync, None )
+		task.attach_store( None, None )
+		return task
+
+	def update( self, task, sync=None ):
+		'''
+		re-index a task after a state change
+		'''
+		if sync is None:
+			sync = task.get_sync_timestamp()
+		if self._tasks.get( sync ) is not task:
+			return
+		key = ( task.state, task.get_eval_client(), task.data.get( 'prodnumber' ) )
+		if self._indexed.get( sync ) != key:
+			self._unindex( sync )
+			self._indexed[sync] = key
+			self._by_state.setdefault( key[0], {} )[sync] = task
+			if key[1] is not None:
+				self._by_client.setdefault( key[1], {} )[sync] = task
+			self._by_serial.setdefault( key[2], {} )[sync] = task
+
+		if task.finished():
+			if sync not in self._completed:
+				self._completed[sync] = time.time()
+		else:
+			self._completed.pop( sync, None )
+
+	def _unindex( self, sync ):
+		key = self._indexed.pop( sync, None )
+		if key is None:
+			return
+		for index, value in zip( ( self._by_state, self._by_client, self._by_serial ), key ):
+			bucket = index.get( value )
+			if bucket is None:
+				continue
+			bucket.pop( sync, None )
+			if not bucket:
+				del index[value]
+
+	def by_sync( self, sync ):
+		return self._tasks.get( sync )
+
+	def by_eval_client( self, client_id ):
+		'''
+		returns the first added task assigned to the eval client or None
+		'''
+		bucket = self._by_client.get( client_id )
+		if not bucket:
+			return None
+		return bucket[min( bucket, key=self._order.__getitem__ )]
+
+	def by_serial( self, serial ):
+		return list( self._by_serial.get( serial, {} ).values() )
+
+	def by_state( self, state ):
+		return list( self._by_state.get( state, {} ).values() )
+
+	@property
+	def CompletedCount( self ):
+		return len( self._completed )
+
+	def evict( self, now=None ):
+		'''
+		evict completed tasks older than ttl or exceeding max_completed
+		returns the number of evicted tasks
+		'''
+		if not self._completed:
+			return 0
+		if now is None:
+			now = time.time()
+		evicted = []
+		while self._completed:
+			sync, completed_ts = next( iter( self._completed.items() ) )
+			if ( ( self.ttl is None or now - completed_ts <= self.ttl )
+					and ( self.max_completed is None or len( self._completed ) <= self.max_completed ) ):
+				break
+			task = self.remove( sync )
+			evicted.append( ( sync, completed_ts, task ) )
+
+		if evicted:
+			self.evicted_count += len( evicted )
+			self.log.debug( 'Evicted {} completed tasks, {} remaining'.format( len( evicted ), len( self._tasks ) ) )
+			if self.archive_path is not None:
+				self._archive( evicted )
+		return len( evicted )
+
+	def _archive( self, evicted ):
+		try:
+			os.makedirs( os.path.dirname( os.path.abspath( self.archive_path ) ), exist_ok=True )
+			with open( self.archive_path, 'a', encoding='utf-8' ) as f:
+				for sync, completed_ts, task in evicted:
+					f.write( json.dumps( task.archive_record( completed_ts ), default=str ) + '\n' )
+		except Exception as e:
+			self.log.error( 'Failed to archive evicted tasks to {}: {}'.format( self.archive_path, e ) )
@@ -13,6 +13,7 @@ from ..PLC import PLCconstants as plc_const
 from ..PLC import PLCfunctions
 from ...Misc import Globals, Utils
 import ctypes
+import time
 
 class MeasureInstanceState (Utils.EnumStructure):
 	NOT_STARTED=0
@@ -29,34 +30,88 @@ class State ( Utils.EnumStructure ):
 
 class PLCVar:
 	_plc_vars = []
+	_image = None # PLCProcessImage serving reads, if configured
+	_service = None # PLCservice.PLCService executing the ADS calls, if started
+	known_max_age = 0.1 # seconds the shadow value is trusted without process image
 	def __init__(self, name, type, decode = False):
 		self.name = 'GOM_KIOSK.'+name
 		self._type = type
 		self._handle = None
 		self._connection = None
+		self._variable = None
 		self._decode = decode
+		self._known = (False, None) # shadow of the last value written to / read from the PLC
+		self._known_at = 0.0 # time of the shadow value, the PLC may change the variable itself
+		self._prepared = None # (last value, result of _prepareWrite)
 		PLCVar._plc_vars.append(self)
 		
 	def getHandle(self, adr):
-		self._handle = PLCfunctions.adsGetHandle(adr, self.name)
+		self.setHandle(adr, PLCVar._call('handle', PLCfunctions.adsGetHandle, adr, self.name, variable=self.name))
+
+	def setHandle(self, adr, handle):
+		self._handle = handle
 		self._connection = adr
+		self._variable = PLCfunctions.AdsVariable(adr, self._handle, self._type)
+		self.forget()
 	
 	def releaseHandle(self, adr):
 		if self._handle is not None:
 			try:
-				PLCfunctions.adsReleaseHandle(adr, self._handle)
+				PLCVar._call('release', PLCfunctions.adsReleaseHandle, adr, self._handle, variable=self.name)
 			except:
 				pass
 		self._handle = None
 		self._connection = None
+		self._variable = None
+		self.forget()
+
+	@staticmethod
+	def _call(operation, fct, *args, variable=None):
+		'''
+		ADS call in the PLC I/O thread (waits at most the service timeout), directly without service
+		'''
+		if PLCVar._service is None:
+			return fct(*args)
+		return PLCVar._service.call(operation, fct, *args, variable=variable)
+
+	def forget(self):
+		'''
+		the PLC value is unknown until the next read or write
+		'''
+		self._known = (False, None)
+
+	def _setKnown(self, value):
+		self._known = (True, value)
+		self._known_at = time.time()
+
+	def knownValue(self):
+		'''
+		returns (known, value) of the PLC variable without ADS access,
+		from the process image if fresh, else from the last read or write
+		if it is not older than max_age of the process image (known_max_age without image)
+		'''
+		max_age = PLCVar.known_max_age
+		if PLCVar._image is not None:
+			known, res = PLCVar._image.lookup(self)
+			if known:
+				return known, res
+			max_age = PLCVar._image.max_age
+		if not self._known[0] or time.time() - self._known_at > max_age:
+			return False, None
+		return self._known
 		
-	def write(self, value):
-		if self._connection is None:
-			return
+	def _prepareWrite(self, value):
+		'''
+		returns (value to write, remaining part of a string value which does not fit)
+		'''
 		if self._handle is None:
 			raise Exception("Tried to write variable with invalid handle")
 		if PLCVariable.bPulse.name not in self.name:
 			Globals.LOGGER.debug('write {} : {}'.format(self.name, value))
+		prepared = self._prepared
+		if prepared is not None and type(prepared[0]) is type(value) and prepared[0] == value:
+			return prepared[1]
+		original = value
 		if self._decode and isinstance(value,str):
 			value = str.encode(value)
 		remaining = None
@@ -76,16 +131,59 @@ class PLCVar:
 					value = value[:last_sep+1]	
 		except:
 			pass
-		PLCfunctions.adsSyncWriteByHandle(self._connection, self._handle, value, self._type)
+		self._prepared = (original, (value, remaining))
+		return value, remaining
+
+	def write(self, value):
+		if self._connection is None:
+			return
+		value, remaining = self._prepareWrite(value)
+		if PLCVar._image is not None:
+			PLCVar._image.invalidate(self)
+		self.forget()
+		PLCVar._call('write', self._variable.write, value, variable=self.name)
+		self._setKnown(value)
 		return remaining
+
+	def writeAsync(self, value):
+		'''
+		queue the write in the PLC I/O thread, returns a Future (result None)
+		'''
+		if self._connection is None or PLCVar._service is None:
+			raise Exception("Tried to write variable {} without PLC I/O service".format(self.name))
+		value, _ = self._prepareWrite(value)
+		if PLCVar._image is not None:
+			PLCVar._image.invalidate(self)
+		self.forget()
+		def done(future):
+			if not future.cancelled() and future.exception() is None:
+				self._setKnown(value)
+		future = PLCVar._service.submit('write', self._variable.write, value, variable=self.name)
+		future.add_done_callback(done)
+		return future
+
+	def readAsync(self):
+		'''
+		queue the read in the PLC I/O thread, returns a Future with the raw value
+		'''
+		if self._connection is None or PLCVar._service is None:
+			raise Exception("Tried to read variable {} without PLC I/O service".format(self.name))
+		return PLCVar._service.submit('read', self._variable.read, variable=self.name)
 		
 	def read(self, default=None):
 		if self._connection is None:
 			return default
 		if self._handle is None:
 			raise Exception("Tried to read variable with invalid handle")
-		res = PLCfunctions.adsSyncReadByHandle(self._connection, self._handle, self._type)
+		if PLCVar._image is not None:
+			known, res = PLCVar._image.lookup(self)
+			if known:
+				return self._finishRead(res, default)
+		res = PLCVar._call('read', self._variable.read, variable=self.name)
+		self._setKnown(res)
+		return self._finishRead(res, default)
 
+	def _finishRead(self, res, default):
 		if self._decode:
 			res = bytes.decode(res)
 			if res != chr(0x0) and len(res.strip()):
@@ -104,19 +202,255 @@ class PLCVar:
 			self.write(default)
 		return value
 	
+class PLCBatch:
+	'''
+	Collects writes of PLCVar values and sends them with one ADS sum command on commit.
+	Writes of a value the PLC already has (see PLCVar.knownValue, a fresh process image
+	or a read/write not older than max_age) are dropped,
+	repeated writes of a variable are coalesced to the last value.
+	Writes with last=True (handshake bits reset by the PLC) are never dropped
+	and sent with a second sum command after all other writes succeeded.
+
+	batch = PLCBatch()
+	batch.write(PLCVariable.SEND_bEvalSuccess, True)
+	remaining = batch.write(PLCVariable.SEND_sEvalErrorText_1, text)
+	batch.write(PLCVariable.SEND_bEvalFinished, True, last=True)
+	batch.commit()
+	'''
+	# statistics over all batches
+	dropped = 0
+	coalesced = 0
+	sent = 0
+
+	def __init__(self):
+		self._writes = {} # var -> value, in the order of the last write of each var
+		self._last = {}
+
+	def __len__(self):
+		return len(self._writes) + len(self._last)
+
+	def write(self, var, value, last=False):
+		if var._connection is None:
+			return None
+		value, remaining = var._prepareWrite(value)
+		if last:
+			self._writes.pop(var, None)
+			self._last[var] = value
+			return remaining
+		if var in self._writes:
+			PLCBatch.coalesced += 1
+			del self._writes[var]
+		known, current = var.knownValue()
+		if known and current == value:
+			PLCBatch.dropped += 1
+		else:
+			self._writes[var] = value
+		return remaining
+
+	def commit(self):
+		'''
+		sends all collected writes, raises ADSError for the first failed variable
+		'''
+		writes, self._writes = self._writes, {}
+		last, self._last = self._last, {}
+		self._send(writes)
+		self._send(last)
+
+	@staticmethod
+	def _send(writes):
+		if not writes:
+			return
+		writes = list(writes.items())
+		connection = writes[0][0]._connection
+		for var, _ in writes:
+			if PLCVar._image is not None:
+				PLCVar._image.invalidate(var)
+			var.forget()
+		errCodes = PLCVar._call('sumWrite', PLCfunctions.adsSumWriteByHandle, connection,
+			[(var._handle, value, var._type) for (var, value) in writes])
+		PLCBatch.sent += len(writes)
+		failed = []
+		for (var, value), errCode in zip(writes, errCodes):
+			if errCode:
+				failed.append((var, errCode))
+			else:
+				var._setKnown(value)
+		for var, errCode in failed:
+			Globals.LOGGER.error('write {} failed: {}'.format(var.name, PLCfunctions.ADSError(errCode)))
+		if failed:
+			raise PLCfunctions.ADSError(failed[0][1])
+
+	@staticmethod
+	def read(variables, default=None):
+		'''
+		reads all variables with one ADS sum command
+		returns dict var->value, failed or unconnected variables get the default
+		'''
+		connected = [var for var in variables if var._connection is not None]
+		values = {var: default for var in variables}
+		if PLCVar._image is not None:
+			fresh = []
+			for var in connected:
+				known, res = PLCVar._image.lookup(var)
+				if known:
+					values[var] = var._finishRead(res, default)
+				else:
+					fresh.append(var)
+			connected = fresh
+		if not connected:
+			return values
+		for var in connected:
+			if var._handle is None:
+				raise Exception("Tried to read variable with invalid handle")
+		results = PLCVar._call('sumRead', PLCfunctions.adsSumReadByHandle, connected[0]._connection,
+			[(var._handle, var._type) for var in connected])
+		for var, (errCode, res) in zip(connected, results):
+			if errCode:
+				Globals.LOGGER.error('read {} failed: {}'.format(var.name, PLCfunctions.ADSError(errCode)))
+				continue
+			var._setKnown(res)
+			values[var] = var._finishRead(res, default)
+		return values
+
+class PLCProcessImage:
+	'''
+	Snapshot of contiguous PLC regions (by default the whole GOM_KIOSK struct),
+	each region is read with one ADS read per refresh and decoded by a ctypes
+	structure built from the symbol info of the region and its member variables.
+
+	PLCVar.read is served from the snapshot while it is not older than max_age
+	seconds. Variables written since the last refresh are read directly.
+	'''
+	def __init__(self, regions=('GOM_KIOSK',), max_age=0.1):
+		self.regions = list(regions)
+		self.max_age = max_age
+		self.hits = 0
+		self.misses = 0
+		self.refreshes = 0
+		self.clear()
+
+	def clear(self):
+		self._layouts = []   # (group, offset, size, ctypes structure) per region
+		self._members = {}   # var -> (region index, field name)
+		self._snapshots = []
+		self._timestamp = None
+		self._dirty = set()
+
+	@property
+	def configured(self):
+		return bool(self._members)
+
+	def configure(self, adr, variables, symbols=None):
+		'''
+		derive the layout from the symbol info of regions and variables (one sum command)
+		with a validated PLCsymbols.SymbolCache the cached locations are used instead
+		returns the number of variables served by the image
+		'''
+		self.clear()
+		variables = list(variables)
+		names = self.regions + [var.name for var in variables]
+		if symbols is not None:
+			infos = PLCVar._call('symbolInfo', symbols.resolve, adr, names)
+		else:
+			infos = PLCVar._call('symbolInfo', PLCfunctions.adsSumGetSymbolInfo, adr, names)
+		regions, members = infos[:len(self.regions)], infos[len(self.regions):]
+		for name, (errCode, region) in zip(self.regions, regions):
+			if errCode:
+				Globals.LOGGER.warning('process image region {} not available: {}'.format(name, PLCfunctions.ADSError(errCode)))
+				continue
+			contained = []
+			for var, (errCode, info) in zip(variables, members):
+				if (errCode or var in self._members or info.group != region.group or info.size != ctypes.sizeof(var._type)
+						or info.offset < region.offset or info.offset + info.size > region.offset + region.size):
+					continue
+				contained.append((info.offset - region.offset, var))
+			contained.sort(key=lambda entry: entry[0])
+
+			fields = []
+			position = 0
+			for offset, var in contained:
+				if offset < position: # overlapping member, read directly
+					continue
+				if offset > position:
+					fields.append(('_pad{}'.format(len(fields)), ctypes.c_ubyte * (offset - position)))
+				field = 'm{}'.format(len(fields))
+				fields.append((field, var._type))
+				self._members[var] = (len(self._layouts), field)
+				position = offset + ctypes.sizeof(var._type)
+			if position < region.size:
+				fields.append(('_pad{}'.format(len(fields)), ctypes.c_ubyte * (region.size - position)))
+			layout = type('PLCProcessImage_{}'.format(name), (ctypes.Structure,), {'_pack_': 1, '_fields_': fields})
+			self._layouts.append((region.group, region.offset, region.size, layout))
+			self._snapshots.append(None)
+		return len(self._members)
+
+	def refresh(self, adr):
+		'''
+		read all regions, one ADS read each
+		'''
+		for index, (group, offset, size, layout) in enumerate(self._layouts):
+			self._snapshots[index] = layout.from_buffer_copy(PLCVar._call('image', PLCfunctions.adsSyncReadRawReq, adr, group, offset, size))
+		self._timestamp = time.time()
+		self._dirty = set()
+		self.refreshes += 1
+
+	def invalidate(self, var=None):
+		'''
+		var is read directly until the next refresh (all variables if None)
+		'''
+		if var is None:
+			self._timestamp = None
+		else:
+			self._dirty.add(var)
+
+	def lookup(self, var):
+		'''
+		returns (known, value as read by handle)
+		'''
+		member = self._members.get(var)
+		if (member is None or self._timestamp is None or var in self._dirty
+				or time.time() - self._timestamp > self.max_age):
+			self.misses += 1
+			return False, None
+		self.hits += 1
+		value = getattr(self._snapshots[member[0]], member[1])
+		if isinstance(value, ctypes.Array):
+			value = [i for i in value]
+		return True, value
+
 class PLCVariable:
 	@staticmethod
 	def registerHandles(adr):
-		for h in PLCVar._plc_vars:
+		'''
+		acquire all handles with one sum command, one by one if the sum command fails
+		'''
+		try:
+			results = PLCVar._call('handles', PLCfunctions.adsSumGetHandles, adr, [h.name for h in PLCVar._plc_vars])
+		except Exception as e:
+			Globals.LOGGER.warning('failed to get handles with sum command {}'.format(e))
+			results = None
+		for i, h in enumerate(PLCVar._plc_vars):
 			try:
-				h.getHandle(adr)
+				if results is None:
+					h.getHandle(adr)
+				elif results[i][0]:
+					raise PLCfunctions.ADSError(results[i][0])
+				else:
+					h.setHandle(adr, results[i][1])
 			except Exception as e:
 				Globals.LOGGER.exception("failed to get handle {} {}".format(h.name,e))
 				#raise e
 	
 	@staticmethod
 	def releaseHandles(adr):
+		handles = [h._handle for h in PLCVar._plc_vars if h._handle is not None]
+		if adr is not None and handles:
+			try:
+				PLCVar._call('release', PLCfunctions.adsSumReleaseHandles, adr, handles)
+			except:
+				pass
 		for h in PLCVar._plc_vars:
+			h._handle = None
 			h.releaseHandle(adr)
 
 	STRING_LEN = 80
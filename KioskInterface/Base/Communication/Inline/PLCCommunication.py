@@ -12,57 +12,181 @@
 
 
 import gom
+import os
 import time
 import pickle
+import queue
+import tempfile
 
 from ...Misc import Utils, LogClass
 
 from ..PLC import PLCfunctions as plc
 from ..PLC import PLCconstants as plc_const
+from ..PLC import PLCtcp
+from ..PLC import PLCservice
+from ..PLC import PLCsymbols
 
 from .InlineConstants import *
 from .InlineVariables import *
 
 
+class PLCNotifications(Utils.GenericLogClass):
+	'''
+	ADS device notifications (on change) for PLC variables.
+	The callback runs in the ADS router thread and only queues the raw sample,
+	drain() is called from the gom main thread and updates the last known values.
+	'''
+	def __init__(self, parent, logger, enabled=True):
+		Utils.GenericLogClass.__init__( self, logger )
+		self.parent = parent
+		self.enabled = enabled and plc.isADSLoaded()
+		self._queue = queue.Queue()
+		# keep a reference, the DLL calls it as long as notifications exist
+		self._callback = plc.AdsNotificationCallback(self._onNotification)
+		self._vars = {}      # notification handle -> var
+		self._handles = {}   # var -> notification handle
+		self._values = {}    # var -> last raw value
+		self._written = {}   # var -> FILETIME of the last write of the kiosk
+
+	def _onNotification(self, pAddr, pNotification, user):
+		try:
+			self._queue.put(plc.adsNotificationData(pNotification))
+		except:
+			pass
+
+	def subscribe(self, var):
+		'''
+		returns True if the variable is observed by a notification
+		'''
+		if var in self._handles:
+			return True
+		if not self.enabled or var._connection is None or var._handle is None:
+			return False
+		try:
+			self._handles[var] = PLCVar._call('notify', plc.adsAddNotificationByHandle,
+				var._connection, var._handle, var._type, self._callback, variable=var.name)
+			self._vars[self._handles[var]] = var
+			return True
+		except Exception as e:
+			self.log.warning('Notification for {} failed, falling back to polling: {}'.format(var.name, e))
+			return False
+
+	def drain(self):
+		while True:
+			try:
+				hNotification, timestamp, data = self._queue.get_nowait()
+			except queue.Empty:
+				return
+			var = self._vars.get(hNotification)
+			if var is None or timestamp < self._written.get(var, 0):
+				continue
+			self._values[var] = plc._unpackValue(data, 0, var._type)
+
+	def forget(self, var):
+		'''
+		called before the kiosk writes var: the cached value and all samples stamped
+		before the write are dropped, also those still on the way from the PLC
+		(PLC and kiosk clock are compared, they have to be synchronized)
+		'''
+		self.drain()
+		self._written[var] = plc.adsFiletime()
+		self._values.pop(var, None)
+
+	def value(self, var, default=None):
+		'''
+		returns (known, value) from the last notification of the variable
+		'''
+		if var not in self._values:
+			return False, default
+		return True, var._finishRead(self._values[var], default)
+
+	def clear(self):
+		for var, hNotification in self._handles.items():
+			try:
+				PLCVar._call('notify', plc.adsSyncDelDeviceNotificationReq, var._connection, hNotification, variable=var.name)
+			except:
+				pass
+		self._handles = {}
+		self._vars = {}
+		self._values = {}
+		self._written = {}
+		while not self._queue.empty():
+			try:
+				self._queue.get_nowait()
+			except queue.Empty:
+				break
+
 class WaitForChangeQueue(Utils.GenericLogClass):
 	class Entry:
-		def __init__(self, var, old_value, action):
+		def __init__(self, var, old_value, action, timeout=None, timeout_action=None):
 			self.var = var
 			self.old_value = old_value
 			self.action = action
+			self.deadline = time.time() + timeout if timeout is not None else None
+			self.timeout_action = timeout_action
 			
 	def __init__(self, parent, logger):
 		Utils.GenericLogClass.__init__( self, logger )
 		self.parent = parent
 		self._fifoqueue=[]
 		
-	def append(self, var, old_value, action = None):
-		self._fifoqueue.append(WaitForChangeQueue.Entry(var,old_value, action))
+	def append(self, var, old_value, action = None, timeout = None, timeout_action = None):
+		'''
+		wait until var differs from old_value, then call action
+		optional timeout in seconds: entry is dropped and timeout_action called
+		'''
+		self._fifoqueue.append(WaitForChangeQueue.Entry(var,old_value, action, timeout, timeout_action))
+		self.parent.notifications.subscribe(var)
 	
 	def clear(self):
 		self._fifoqueue = []
 		
+	def _value(self, var, old_value):
+		known, value = self.parent.notifications.value(var, old_value)
+		if not known: # polling fallback (no notification, e.g. simulator)
+			value = var.read(old_value)
+		return value
+
 	def check(self):
 		if self.parent.connection is None:
 			return False, 'no connection'
+		self.parent.notifications.drain()
 		while len(self._fifoqueue):
 			entry = self._fifoqueue[0]
-			value = entry.var.read(entry.old_value)
+			value = self._value(entry.var, entry.old_value)
 			if value != entry.old_value:
 				if entry.action is not None:
 					entry.action()
 				del self._fifoqueue[0]
+			elif entry.deadline is not None and time.time() > entry.deadline:
+				self.log.warning('timeout waiting for "{}" to change'.format(entry.var.name))
+				del self._fifoqueue[0]
+				if entry.timeout_action is not None:
+					entry.timeout_action()
 			else:
 				return False, entry.var.name
 		return True, ''
 		
 class PLCCommunication(Utils.GenericLogClass):
-	def __init__(self, parent, logger, netID='172.17.61.55.1.1', port=851):
+	def __init__(self, parent, logger, netID='172.17.61.55.1.1', port=851, use_notifications=True,
+				ads_tcp_host=None, ads_tcp_local_netid='127.0.0.1.1.1', symbol_cache=None,
+				process_image_max_age=0.1, io_timeout=2.0):
 		Utils.GenericLogClass.__init__( self, logger )
 		self.parent = parent
 		self.netID = netID
 		self.port = port
 		self.connection = None
+		if symbol_cache is None:
+			symbol_cache = os.path.join(tempfile.gettempdir(), 'KioskInterface_PLCSymbols_{}_{}.cache'.format(netID, port))
+		self.symbols = PLCsymbols.SymbolCache(symbol_cache)
+		# one read of the GOM_KIOSK struct per tick serves all variable reads (None: disabled)
+		self.processImage = PLCProcessImage(max_age=process_image_max_age) if process_image_max_age is not None else None
+		if ads_tcp_host is not None:
+			# AMS/TCP instead of TcAdsDll, e.g. PLCsimulator or a PLC with a static route
+			plc.setAdsDll(PLCtcp.AdsTcpDll(ads_tcp_host, localNetId=ads_tcp_local_netid))
+		# ADS calls run in an own thread, a hanging call fails after io_timeout seconds (None: no thread)
+		self.service = PLCservice.PLCService(io_timeout) if io_timeout is not None else None
+		self.notifications = PLCNotifications(self, self.baselog, use_notifications)
 		self.waitForChangeQueue = WaitForChangeQueue(self, self.baselog)
 		self.parent.connectedState.appendAction(self.onConnectionStateChange)
 		self.parent.aliveState.appendAction(self.onAliveStateChange)
@@ -78,8 +202,9 @@ class PLCCommunication(Utils.GenericLogClass):
 			return
 		text=''
 		try:
+			values = PLCBatch.read(PLCVar._plc_vars)
 			for var in PLCVar._plc_vars:
-				text+='{}: {}\n'.format(var.name.replace('GOM_KIOSK.',''), var.read())
+				text+='{}: {}\n'.format(var.name.replace('GOM_KIOSK.',''), values[var])
 			self.parent.dialog.logSignalOverview.text=text
 		except Exception as e:
 			self.log.exception('Connection lost {}'.format(e))
@@ -90,13 +215,18 @@ class PLCCommunication(Utils.GenericLogClass):
 			self.connection = None
 			self.parent.plcState.value = State.ERROR
 			return
+		if self.service is not None:
+			self.service.start()
+			PLCVar._service = self.service
 		try:
-			port = plc.adsPortOpen()
-			self.connection = plc.adsGetLocalAddress()
+			port = PLCVar._call('connect', plc.adsPortOpen)
+			self.connection = PLCVar._call('connect', plc.adsGetLocalAddress)
 			self.connection.setAdr(self.netID)
 			self.connection.setPort(self.port)
 			self.parent.plcState.value = State.OK
+			self.loadSymbols()
 			PLCVariable.registerHandles(self.connection)
+			self.configureProcessImage()
 			if not self.was_connected:
 				self.onInitialConnect()
 			self.was_connected = True
@@ -106,23 +236,69 @@ class PLCCommunication(Utils.GenericLogClass):
 			self.connection = None
 			self.parent.plcState.value = State.ERROR
 
+	def loadSymbols(self):
+		'''
+		validate the cached symbol table (upload only after a change of the PLC program),
+		the process image layout is built from it (configureProcessImage)
+		'''
+		try:
+			start = time.time()
+			PLCVar._call('symbols', self.symbols.load, self.connection)
+			self.log.debug('PLC symbol table from {} in {:.3f}s'.format(self.symbols.source, time.time() - start))
+			if self.symbols.find('GOM_KIOSK') is None:
+				self.log.error('GOM_KIOSK not found in PLC symbol table')
+		except Exception as e:
+			self.symbols.invalidate()
+			self.log.warning('Failed to load PLC symbol table: {}'.format(e))
+
+	def configureProcessImage(self):
+		PLCVar._image = None
+		if self.processImage is None:
+			return
+		try:
+			# layout from the cached symbol locations if the symbol table is valid (see loadSymbols)
+			symbols = self.symbols if self.symbols.fingerprint is not None else None
+			count = self.processImage.configure(self.connection, PLCVar._plc_vars, symbols)
+			self.log.debug('PLC process image serves {} of {} variables'.format(count, len(PLCVar._plc_vars)))
+			if count:
+				PLCVar._image = self.processImage
+		except Exception as e:
+			self.log.warning('Failed to configure PLC process image, reading variables one by one: {}'.format(e))
+
 	def reconnect(self):
 		if self.connection is not None:
 			self.reconnectTimer = 0
 			return
 			
+		if self.service is not None and self.service.hanging():
+			# the ADS router still blocks a request, a new connect would hang as well
+			return
 		self.reconnectTimer += 1
-		if self.reconnectTimer > 10:
+		if self.reconnectTimer > self.reconnectDelay():
 			self.reconnectTimer = 0
 			self.connect()
 			if self.connection is not None:
 				self.log.info('Reconnect successfull')
+
+	def reconnectDelay(self):
+		'''
+		ticks between reconnect attempts, doubled for each timeout in a row (network or PLC not responding)
+		'''
+		if self.service is None:
+			return 10
+		return 10 * 2 ** min(self.service.consecutiveTimeouts, 5)
 			
 	def onConnectionError(self):
+		if self.service is not None:
+			self.log.debug('PLC I/O statistics: %s', LogClass.Lazy(self.service.summary))
+		self.notifications.clear()
+		PLCVar._image = None
+		if self.processImage is not None:
+			self.processImage.clear()
 		PLCVariable.releaseHandles(self.connection)
 		try:
 			if self.connection is not None:
-				plc.adsPortClose()
+				PLCVar._call('connect', plc.adsPortClose)
 		except:
 			pass
 		self.connection = None
@@ -163,10 +339,12 @@ class PLCCommunication(Utils.GenericLogClass):
 					self.writeAndWait(PLCVariable.SEND_bExited, True)
 			else: # alive
 				# clear all warnings
-				PLCVariable.SEND_wWarningID.write(0)
-				PLCVariable.SEND_sWarningText1.write("")
-				PLCVariable.SEND_sWarningText2.write("")
-				PLCVariable.SEND_bWarning.write(True)
+				batch = PLCBatch()
+				batch.write(PLCVariable.SEND_wWarningID, 0)
+				batch.write(PLCVariable.SEND_sWarningText1, "")
+				batch.write(PLCVariable.SEND_sWarningText2, "")
+				batch.write(PLCVariable.SEND_bWarning, True, last=True)
+				batch.commit()
 		except Exception as e:
 			self.log.exception('Connection lost {}'.format(e))
 			self.onConnectionError()
@@ -177,28 +355,30 @@ class PLCCommunication(Utils.GenericLogClass):
 				if not len(new_value):
 					return
 				self.log.debug("result: {}".format(new_value))
+				# all result values in one sum write, handshake bit afterwards
+				batch = PLCBatch()
 				if new_value['result']:
-					PLCVariable.SEND_bEvalSuccess.write(True)
-					PLCVariable.SEND_bEvalFailed.write(False)
+					batch.write(PLCVariable.SEND_bEvalSuccess, True)
+					batch.write(PLCVariable.SEND_bEvalFailed, False)
 				else:
-					PLCVariable.SEND_bEvalSuccess.write(False)
-					PLCVariable.SEND_bEvalFailed.write(True)
-				PLCVariable.SEND_bEvalWarning.write(True if len(new_value.get('out_of_tol_warning','')) else False)
-				PLCVariable.SEND_bEvalQStop.write(True if len(new_value.get('out_of_tol_qstop','')) else False)
-				PLCVariable.SEND_sEvalSerial.write(new_value['serial'])
-				PLCVariable.SEND_sEvalAddInfo1.write(new_value['add_plc_info'][0])
-				PLCVariable.SEND_sEvalAddInfo2.write(new_value['add_plc_info'][1])
-				PLCVariable.SEND_sEvalAddInfo3.write(new_value['add_plc_info'][2])
-				PLCVariable.SEND_bEvalResultNotNeeded.write(new_value['result_not_needed'])
+					batch.write(PLCVariable.SEND_bEvalSuccess, False)
+					batch.write(PLCVariable.SEND_bEvalFailed, True)
+				batch.write(PLCVariable.SEND_bEvalWarning, True if len(new_value.get('out_of_tol_warning','')) else False)
+				batch.write(PLCVariable.SEND_bEvalQStop, True if len(new_value.get('out_of_tol_qstop','')) else False)
+				batch.write(PLCVariable.SEND_sEvalSerial, new_value['serial'])
+				batch.write(PLCVariable.SEND_sEvalAddInfo1, new_value['add_plc_info'][0])
+				batch.write(PLCVariable.SEND_sEvalAddInfo2, new_value['add_plc_info'][1])
+				batch.write(PLCVariable.SEND_sEvalAddInfo3, new_value['add_plc_info'][2])
+				batch.write(PLCVariable.SEND_bEvalResultNotNeeded, new_value['result_not_needed'])
 				if len(new_value.get('error','')):
-					PLCVariable.SEND_wEvalErrorID.write(PLCErrors.EVAL_FAILED_TO_EXPORT)
-					remaining = PLCVariable.SEND_sEvalErrorText_1.write(new_value.get('error',''))
-					PLCVariable.SEND_sEvalErrorText_2.write(remaining)
+					batch.write(PLCVariable.SEND_wEvalErrorID, PLCErrors.EVAL_FAILED_TO_EXPORT)
+					remaining = batch.write(PLCVariable.SEND_sEvalErrorText_1, new_value.get('error',''))
+					batch.write(PLCVariable.SEND_sEvalErrorText_2, remaining)
 				else:
-					PLCVariable.SEND_wEvalErrorID.write(PLCErrors.NO_ERROR)
-					PLCVariable.SEND_sEvalErrorText_1.write('')
-					PLCVariable.SEND_sEvalErrorText_2.write('')
-				self.writeAndWait(PLCVariable.SEND_bEvalFinished, True)
+					batch.write(PLCVariable.SEND_wEvalErrorID, PLCErrors.NO_ERROR)
+					batch.write(PLCVariable.SEND_sEvalErrorText_1, '')
+					batch.write(PLCVariable.SEND_sEvalErrorText_2, '')
+				self.writeAndWait(PLCVariable.SEND_bEvalFinished, True, batch)
 			else:
 				self.log.debug("NO dict as result {}".format(new_value))
 		except Exception as e:
@@ -214,20 +394,22 @@ class PLCCommunication(Utils.GenericLogClass):
 		
 	def onErrorInMeasureInstance(self, error, error_desc):
 		try:
-			PLCVariable.SEND_wErrorID.write(error)
-			remaining = PLCVariable.SEND_sErrorText1.write(error_desc)
-			PLCVariable.SEND_sErrorText2.write(remaining)
-			self.writeAndWait(PLCVariable.SEND_bError, True)
+			batch = PLCBatch()
+			batch.write(PLCVariable.SEND_wErrorID, error)
+			remaining = batch.write(PLCVariable.SEND_sErrorText1, error_desc)
+			batch.write(PLCVariable.SEND_sErrorText2, remaining)
+			self.writeAndWait(PLCVariable.SEND_bError, True, batch)
 		except Exception as e:
 			self.log.exception('Connection lost {}'.format(e))
 			self.onConnectionError()
 			
 	def onWarningInMeasureInstance(self, warning, warn_desc):
 		try:
-			PLCVariable.SEND_wWarningID.write(warning)
-			remaining = PLCVariable.SEND_sWarningText1.write(warn_desc)
-			PLCVariable.SEND_sWarningText2.write(remaining)
-			self.writeAndWait(PLCVariable.SEND_bWarning, True)
+			batch = PLCBatch()
+			batch.write(PLCVariable.SEND_wWarningID, warning)
+			remaining = batch.write(PLCVariable.SEND_sWarningText1, warn_desc)
+			batch.write(PLCVariable.SEND_sWarningText2, remaining)
+			self.writeAndWait(PLCVariable.SEND_bWarning, True, batch)
 		except Exception as e:
 			self.log.exception('Connection lost {}'.format(e))
 			self.onConnectionError()
@@ -264,14 +446,16 @@ class PLCCommunication(Utils.GenericLogClass):
 	def onMeasurementPositionChanged(self, mlist_total=None, mlist_curr=None, measurement_total=None, measurement_curr=None):
 		try:
 			#no wait for reset
+			batch = PLCBatch()
 			if mlist_total is not None:
-				PLCVariable.SEND_wMListTotalCount.write(mlist_total)
+				batch.write(PLCVariable.SEND_wMListTotalCount, mlist_total)
 			if mlist_curr is not None:
-				PLCVariable.SEND_wMListCurrentPos.write(mlist_curr)
+				batch.write(PLCVariable.SEND_wMListCurrentPos, mlist_curr)
 			if measurement_total is not None:
-				PLCVariable.SEND_wMeasurementTotalCount.write(measurement_total)
+				batch.write(PLCVariable.SEND_wMeasurementTotalCount, measurement_total)
 			if measurement_curr is not None:
-				PLCVariable.SEND_wMeasurementCurrentPos.write(measurement_curr)
+				batch.write(PLCVariable.SEND_wMeasurementCurrentPos, measurement_curr)
+			batch.commit()
 		except Exception as e:
 			self.log.exception('Connection lost {}'.format(e))
 			self.onConnectionError()
@@ -279,18 +463,21 @@ class PLCCommunication(Utils.GenericLogClass):
 	def checkAndSendProtocolVersion(self):
 		error=False
 		try:
-			PLCVariable.SEND_wProtocolVersion.write(PLCVariable.PROTOCOL_VERSION)
-			PLCVariable.SEND_wATOSVersion.write(
+			batch = PLCBatch()
+			batch.write(PLCVariable.SEND_wProtocolVersion, PLCVariable.PROTOCOL_VERSION)
+			batch.write(PLCVariable.SEND_wATOSVersion,
 				gom.app.get ('application_name')+' '+
 				gom.app.get ('application_build_information.version')+', Rev. '+
 				gom.app.get ('application_build_information.revision')+', Build '+
 				gom.app.get ('application_build_information.date'))
+			batch.commit()
 			plc_version = PLCVariable.RECV_wProtocolVersion.read(0)
 			if plc_version < PLCVariable.PROTOCOL_VERSION:
-				PLCVariable.SEND_wErrorID.write(PLCErrors.PROTOCOL_VERSION_ERROR)
-				remaining = PLCVariable.SEND_sErrorText1.write('Protocol version mismatch Software: {} > PLC: {}'.format(PLCVariable.PROTOCOL_VERSION, plc_version))
-				PLCVariable.SEND_sErrorText2.write(remaining)
-				PLCVariable.SEND_bError.write(True)
+				batch.write(PLCVariable.SEND_wErrorID, PLCErrors.PROTOCOL_VERSION_ERROR)
+				remaining = batch.write(PLCVariable.SEND_sErrorText1, 'Protocol version mismatch Software: {} > PLC: {}'.format(PLCVariable.PROTOCOL_VERSION, plc_version))
+				batch.write(PLCVariable.SEND_sErrorText2, remaining)
+				batch.write(PLCVariable.SEND_bError, True, last=True)
+				batch.commit()
 				error=True
 		except Exception as e:
 			self.log.exception('Connection lost {}'.format(e))
@@ -331,11 +518,12 @@ class PLCCommunication(Utils.GenericLogClass):
 				( PLCVariable.SEND_bSpecialPos5, PLCVariable.SEND_wSubPositionsPos5 ),
 				( PLCVariable.SEND_bSpecialPos6, PLCVariable.SEND_wSubPositionsPos6 ),
 				( PLCVariable.SEND_bSpecialPos7, PLCVariable.SEND_wSubPositionsPos7 ) ]
+			batch = PLCBatch()
 			for i in range(len(sigs)):
 				countsubs = value.get(i+1, -1)
-				sigs[i][0].write(countsubs != -1)
-				sigs[i][1].write(countsubs if countsubs != -1 else 0)
-			self.writeAndWait(PLCVariable.SEND_bSpecialPosValid, True)
+				batch.write(sigs[i][0], countsubs != -1)
+				batch.write(sigs[i][1], countsubs if countsubs != -1 else 0)
+			self.writeAndWait(PLCVariable.SEND_bSpecialPosValid, True, batch)
 		except Exception as e:
 			self.log.exception('Connection lost {}'.format(e))
 			self.onConnectionError()
@@ -361,8 +549,18 @@ class PLCCommunication(Utils.GenericLogClass):
 	def onCalibrationRecommended(self):
 		PLCVariable.SEND_bCalibrationRecommended.write(True)
 
-	def writeAndWait(self, variable, value):
-		variable.write(value)
+	def writeAndWait(self, variable, value, batch=None):
+		'''
+		write a handshake variable, which gets reset by the PLC
+		with batch the variable is written after all other writes of the batch
+		'''
+		# a not yet drained reset of the previous handshake must not count as acknowledge
+		self.notifications.forget(variable)
+		if batch is None:
+			variable.write(value)
+		else:
+			batch.write(variable, value, last=True)
+			batch.commit()
 		self.waitForChangeQueue.append(variable, value)
 		
 	def checkPulse(self):
@@ -383,9 +581,14 @@ class PLCCommunication(Utils.GenericLogClass):
 			return
 		
 		try:
+			if PLCVar._image is not None:
+				PLCVar._image.refresh(self.connection)
+
 			if time.time() > self._last_debug + 60:
 				self._last_debug = time.time()
-				self.log.debug('STATUS started:{} state:{}'.format(self.parent.started,self.parent.measuringInstanceState.value))
+				self.log.debug('STATUS started:%s state:%s', self.parent.started, self.parent.measuringInstanceState.value)
+				if self.service is not None:
+					self.log.debug('PLC I/O statistics: %s', LogClass.Lazy(self.service.summary))
 				self.debugSignals()
 				
 			if not self.checkPulse():
@@ -396,7 +599,7 @@ class PLCCommunication(Utils.GenericLogClass):
 			
 			queue_result, queue_varname = self.waitForChangeQueue.check()
 			if not queue_result: # dont check further if one variable "hangs"
-				self.log.debug('waiting for "{}" to change'.format(queue_varname))
+				self.log.debug_sampled('waiting for "%s" to change', queue_varname, rate=50)
 				return
 			
 			if PLCVariable.RECV_bShutdown.check(False):
@@ -525,4 +728,6 @@ class PLCCommunication(Utils.GenericLogClass):
 			self.onConnectionError()
 
 	def shutdown(self):
-		pass
\ No newline at end of file
+		if self.service is not None:
+			PLCVar._service = None
+			self.service.stop()
\ No newline at end of file
@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+# Script: batched IoT telemetry stream and local collector
+#
+# PLEASE NOTE that this file is part of the GOM Software.
+# You are not allowed to distribute this file to a third party without written notice.
+#
+# Please, do not copy and/or modify this script.
+# All modifications of KioskInterface should happen in the CustomPatches script.
+# Ignoring this advice will make KioskInterface fail after Software update.
+#
+# Copyright (c) 2021 Carl Zeiss GOM Metrology GmbH
+# All rights reserved.
+
+# Plain python, no gom module needed.
+# Wire format: UDP datagrams of compact json documents, one per line ("\n" terminated).
+#   python -m KioskInterface.Base.Communication.IoTTelemetry collect --port 10005 --directory telemetry
+#   python -m KioskInterface.Base.Communication.IoTTelemetry benchmark --count 100000
+
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+from collections import deque
+
+
+def encode(event):
+	'''
+	one event as compact json line (bytes)
+	'''
+	return json.dumps(event, separators=(',', ':'), ensure_ascii=False).encode('utf-8') + b'\n'
+
+def decode(datagram):
+	'''
+	list of events of one datagram, undecodable lines are skipped
+	'''
+	events = []
+	for line in datagram.split(b'\n'):
+		if not line:
+			continue
+		try:
+			events.append(json.loads(line.decode('utf-8')))
+		except ValueError:
+			pass
+	return events
+
+
+class TelemetryStream:
+	'''
+	Buffers telemetry events and sends them over one long-lived UDP socket.
+	The buffer is flushed when max_bytes are collected or flush_interval seconds passed
+	(by the caller or the flush thread), each datagram carries as many lines as fit into max_bytes.
+	While the collector is not reachable (send error) the events stay buffered,
+	the oldest are dropped when the buffer holds capacity events.
+	'''
+	def __init__(self, ip, port, max_bytes=1400, flush_interval=1.0, capacity=10000, retry_interval=5.0, thread=True):
+		self.address = (ip, port)
+		self.max_bytes = max_bytes
+		self.flush_interval = flush_interval
+		self.retry_interval = retry_interval
+		self.sent = 0
+		self.datagrams = 0
+		self.dropped = 0
+		self.errors = 0
+		self._buffer = deque()
+		self._capacity = capacity
+		self._pending = 0 # bytes in buffer
+		self._last_flush = time.time()
+		self._down_until = 0
+		self._lock = threading.Lock()
+		self._sock = None
+		self._closed = threading.Event()
+		self._thread = None
+		if thread and flush_interval:
+			self._thread = threading.Thread(target=self._flush_loop, name='TelemetryStream', daemon=True)
+			self._thread.start()
+
+	def __len__(self):
+		return len(self._buffer)
+
+	def _socket(self):
+		if self._sock is None:
+			self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+			self._sock.setblocking(False)
+			# connected: an unreachable collector is reported by the next send
+			self._sock.connect(self.address)
+		return self._sock
+
+	def send(self, event):
+		'''
+		queue one event (json serializable dict)
+		'''
+		line = encode(event)
+		with self._lock:
+			if len(self._buffer) >= self._capacity:
+				self._pending -= len(self._buffer.popleft())
+				self.dropped += 1
+			self._buffer.append(line)
+			self._pending += len(line)
+			if self._pending >= self.max_bytes or time.time() - self._last_flush >= self.flush_interval:
+				self._flush()
+
+	def flush(self):
+		'''
+		send all buffered events, returns False if the collector is not reachable
+		'''
+		with self._lock:
+			return self._flush()
+
+	def _flush(self):
+		self._last_flush = time.time()
+		if not self._buffer:
+			return True
+		if self._last_flush < self._down_until:
+			return False
+		try:
+			sock = self._socket()
+			while self._buffer:
+				datagram = []
+				size = 0
+				for line in self._buffer:
+					if datagram and size + len(line) > self.max_bytes:
+						break
+					datagram.append(line)
+					size += len(line)
+				sock.send(b''.join(datagram))
+				for _ in datagram:
+					self._buffer.popleft()
+				self._pending -= size
+				self.sent += len(datagram)
+				self.datagrams += 1
+		except OSError: # refused, unreachable or socket buffer full: keep the events
+			self.errors += 1
+			self._down_until = self._last_flush + self.retry_interval
+			self._close_socket()
+			return False
+		return True
+
+	def _flush_loop(self):
+		while not self._closed.wait(self.flush_interval):
+			try:
+				self.flush()
+			except Exception:
+				pass
+
+	def _close_socket(self):
+		if self._sock is not None:
+			try:
+				self._sock.close()
+			except OSError:
+				pass
+			self._sock = None
+
+	def close(self):
+		self._closed.set()
+		with self._lock:
+			self._down_until = 0
+			self._flush()
+			self._close_socket()
+
+	def stats(self):
+		return {'sent': self.sent, 'datagrams': self.datagrams, 'buffered': len(self._buffer),
+			'dropped': self.dropped, 'errors': self.errors}
+
+
+class TelemetryCollector:
+	'''
+	Receives telemetry datagrams and appends the lines to <directory>/telemetry.jsonl,
+	rotated at max_bytes to telemetry.jsonl.1 .. telemetry.jsonl.<backups>.
+	Legacy datagrams (8 byte length + one json document) are converted to lines.
+	'''
+	def __init__(self, host='127.0.0.1', port=10005, directory='.', max_bytes=10*1024*1024, backups=5):
+		self.host = host
+		self.port = port
+		self.directory = directory
+		self.max_bytes = max_bytes
+		self.backups = backups
+		self.events = 0
+		self.datagrams = 0
+		self.rotations = 0
+		self._sock = None
+		self._file = None
+		self._running = False
+		self._thread = None
+
+	@property
+	def filename(self):
+		return os.path.join(self.directory, 'telemetry.jsonl')
+
+	def bind(self):
+		'''
+		returns the bound port (port 0 selects a free port)
+		'''
+		os.makedirs(self.directory, exist_ok=True)
+		self._sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+		self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4*1024*1024)
+		self._sock.bind((self.host, self.port))
+		self._sock.settimeout(0.5)
+		self.port = self._sock.getsockname()[1]
+		self._file = open(self.filename, 'ab')
+		return self.port
+
+	def start(self):
+		if self._sock is None:
+			self.bind()
+		self._running = True
+		self._thread = threading.Thread(target=self.serve, name='TelemetryCollector', daemon=True)
+		self._thread.start()
+		return self.port
+
+	def stop(self):
+		self._running = False
+		if self._thread is not None:
+			self._thread.join()
+			self._thread = None
+		if self._sock is not None:
+			self._sock.close()
+			self._sock = None
+		if self._file is not None:
+			self._file.close()
+			self._file = None
+
+	def serve(self):
+		self._running = True
+		while self._running:
+			try:
+				datagram = self._sock.recv(65536)
+			except socket.timeout:
+				self._file.flush()
+				continue
+			except OSError:
+				continue
+			self.handle(datagram)
+		self._file.flush()
+
+	def handle(self, datagram):
+		self.datagrams += 1
+		if len(datagram) > 8 and datagram[8:9] == b'{' and int.from_bytes(datagram[:8], 'big') == len(datagram) - 8:
+			datagram = datagram[8:] + b'\n'
+		if not datagram.endswith(b'\n'):
+			datagram += b'\n'
+		self.events += datagram.count(b'\n')
+		self._file.write(datagram)
+		if self._file.tell() >= self.max_bytes:
+			self._rotate()
+
+	def _rotate(self):
+		self._file.close()
+		for i in range(self.backups - 1, 0, -1):
+			source = '{}.{}'.format(self.filename, i)
+			if os.path.exists(source):
+				os.replace(source, '{}.{}'.format(self.filename, i + 1))
+		if self.backups:
+			os.replace(self.filename, self.filename + '.1')
+		else:
+			os.remove(self.filename)
+		self._file = open(self.filename, 'ab')
+		self.rotations += 1
+
+
+def _legacy_send(address, event):
+	# IoTConnection without stream: one socket per event, 8 byte length prefix
+	data = json.dumps(event).encode('utf-8')
+	sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+	sock.sendto(len(data).to_bytes(8, byteorder='big') + data, address)
+	sock.close()
+
+def benchmark(count=100000, directory=None):
+	'''
+	events/s sent and received by a local collector, per socket vs. stream
+	'''
+	import tempfile
+	results = {}
+	event = {'current_used_template': 'Part_4711_Revision_C', 'estimated_execution_time': 123.4}
+	with tempfile.TemporaryDirectory() as temp:
+		for mode in ('legacy', 'stream'):
+			collector = TelemetryCollector(port=0, directory=os.path.join(directory or temp, mode))
+			port = collector.start()
+			n = count if mode == 'stream' else max(1, count // 10)
+			start = time.perf_counter()
+			if mode == 'legacy':
+				for i in range(n):
+					_legacy_send(('127.0.0.1', port), dict(event, seq=i))
+			else:
+				stream = TelemetryStream('127.0.0.1', port, thread=False)
+				for i in range(n):
+					stream.send(dict(event, seq=i))
+					if len(stream) >= stream._capacity // 2: # give the collector time to catch up
+						time.sleep(0.001)
+						stream.flush()
+				stream.close()
+			sent = time.perf_counter() - start
+			deadline = time.time() + 5
+			while collector.events < n and time.time() < deadline:
+				time.sleep(0.01)
+			total = time.perf_counter() - start
+			collector.stop()
+			results[mode] = {'events': n, 'received': collector.events, 'datagrams': collector.datagrams,
+				'send_events_s': n / sent, 'end_to_end_events_s': collector.events / total}
+			if mode == 'stream':
+				results[mode].update(stream.stats())
+	return results
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='IoT telemetry collector')
+	commands = parser.add_subparsers(dest='command')
+	collect = commands.add_parser('collect', help='write received telemetry to rotating files')
+	collect.add_argument('--host', default='127.0.0.1')
+	collect.add_argument('--port', type=int, default=10005)
+	collect.add_argument('--directory', default='telemetry')
+	collect.add_argument('--max-bytes', type=int, default=10*1024*1024)
+	collect.add_argument('--backups', type=int, default=5)
+	bench = commands.add_parser('benchmark', help='throughput per socket vs. stream')
+	bench.add_argument('--count', type=int, default=100000)
+	args = parser.parse_args(argv)
+
+	if args.command == 'collect':
+		collector = TelemetryCollector(args.host, args.port, args.directory, args.max_bytes, args.backups)
+		collector.bind()
+		print('collecting on {}:{} into {}'.format(args.host, collector.port, collector.filename))
+		try:
+			collector.serve()
+		except KeyboardInterrupt:
+			pass
+		print('{} events in {} datagrams'.format(collector.events, collector.datagrams))
+		collector.stop()
+	elif args.command == 'benchmark':
+		print(json.dumps(benchmark(args.count), indent=2))
+	else:
+		parser.print_help()
+		return 1
+	return 0
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -19,7 +19,7 @@ import psutil
 import asyncore, socket
 
 from . import Communicate
-from ..Misc import LogClass, Utils, Globals
+from ..Misc import LogClass, Utils, Globals, SettingsReload
 from .. import Evaluate
 from ..Measuring import Measure, Verification
 
@@ -63,8 +63,12 @@ class MultiClient( asyncore.dispatcher, Utils.GenericLogClass ):
 
 		self.globaltimer_active = False
 		Utils.GlobalTimer.registerInstance( self.baselog )
+		Utils.write_patch_log()
 		# default time slice is 1000 (= 1.0s)
 		Globals.TIMER.registerHandler( self.timer_process_signals )
+		# settings changes are sent by the kiosk (SIGNAL_SETTINGS_CHANGED)
+		Globals.SETTINGS_RELOAD = SettingsReload.SettingsReloader( self.baselog, Globals.SETTINGS )
+		Globals.SETTINGS_RELOAD.subscribe( SettingsReload.logging_level_subscriber( self.baselog.log ), ['LoggingLevel'] )
 
 		self.log.debug('MultiClient starting')
 
@@ -263,11 +267,13 @@ class MultiClient( asyncore.dispatcher, Utils.GenericLogClass ):
 #				return True
 
 			gom.script.sys.close_project()
+			Utils.invalidate_project_overrides()
 
 			self.log.info( 'Open template {}/{}'.format( template_cfg, template ) )
 			opened_template = gom.script.sys.create_project_from_template (
 				config_level = template_cfg,
 				template_name = template )
+			Utils.invalidate_project_overrides()
 			Globals.SETTINGS.CurrentTemplate = template
 			Globals.SETTINGS.CurrentTemplateCfg = template_cfg
 			return True
@@ -385,10 +391,12 @@ class MultiClient( asyncore.dispatcher, Utils.GenericLogClass ):
 		if len(key_val.keys()):
 			gom.script.sys.set_project_keywords (
 				keywords = key_val )
+			Utils.invalidate_project_overrides()
 		if len(key_val_desc.keys()):
 			gom.script.sys.set_project_keywords (
 				keywords = key_val_desc,
 				keywords_description = key_val_desc_param2 )
+			Utils.invalidate_project_overrides()
 
 		if '__parts__' in start_dialog_input:
 			# mapping info - user/fixture/date are never per part (I hope)
@@ -598,7 +606,7 @@ class MultiClient( asyncore.dispatcher, Utils.GenericLogClass ):
 		for c in self.measure_clients:
 			if len(c.tritop_series):
 				for t in c.tritop_series:
-					self.log.debug('tritop :{} {}'.format(t, gom.app.project.measurement_series[t].get('reference_points_master_series')))
+					self.log.debug('tritop :%s %s', t, LogClass.LazyToken(gom.app.project.measurement_series[t], 'reference_points_master_series'))
 					if gom.app.project.measurement_series[t].get('reference_points_master_series') is None:
 						master_series = gom.app.project.measurement_series[t]
 
@@ -1072,6 +1080,7 @@ class MultiClient( asyncore.dispatcher, Utils.GenericLogClass ):
 		except:
 			pass
 		gom.script.sys.close_project()
+		Utils.invalidate_project_overrides()
 
 		if self.multi_eval_signal is not None:
 			self.log.error( 'protocol error - multi_eval signal not reset at abort cycle' )
@@ -1082,6 +1091,7 @@ class MultiClient( asyncore.dispatcher, Utils.GenericLogClass ):
 
 	def finish_cycle( self ):
 		gom.script.sys.close_project()
+		Utils.invalidate_project_overrides()
 		if ( os.path.exists( self.tmp_project_file ) ):
 			os.unlink( self.tmp_project_file )
 
@@ -1286,6 +1296,7 @@ class MultiClient( asyncore.dispatcher, Utils.GenericLogClass ):
 				os.makedirs( Globals.SETTINGS.SavePath )
 
 		gom.script.sys.close_project ()
+		Utils.invalidate_project_overrides()
 
 		client.wait_till_connected()
 		client.send_idle( 1 )
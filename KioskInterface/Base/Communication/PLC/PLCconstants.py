@@ -84,6 +84,7 @@ ADSIGRP_SYM_INFOBYNAMEEX = 0xF009
 ADSIGRP_SYM_DOWNLOAD = 0xF00A
 ADSIGRP_SYM_UPLOAD = 0xF00B
 ADSIGRP_SYM_UPLOADINFO = 0xF00C
+ADSIGRP_SYM_UPLOADINFO2 = 0xF00F
 
 ADSIGRP_SYMNOTE = 0xF010  # notification of named handle
 ADSIGRP_IOIMAGE_RWIB = 0xF020  # read/write input byte(s)
@@ -93,6 +94,11 @@ ADSIGRP_IOIMAGE_RWOX = 0xF031  # read/write output bit
 ADSIGRP_IOIMAGE_CLEARI = 0xF040  # write inputs to null
 ADSIGRP_IOIMAGE_CLEARO = 0xF050  # write outputs to null
 
+ADSIGRP_SUMUP_READ = 0xF080  # sum command: read n variables
+ADSIGRP_SUMUP_WRITE = 0xF081  # sum command: write n variables
+ADSIGRP_SUMUP_READWRITE = 0xF082  # sum command: read/write n variables
+ADSSUM_MAX_REQUESTS = 500  # max. sub commands per sum command
+
 ADSIGRP_DEVICE_DATA = 0xF100  # state, name, etc...
 ADSIOFFS_DEVDATA_ADSSTATE = 0x0000  # ads state of device
 ADSIOFFS_DEVDATA_DEVSTATE = 0x0002  # device state
@@ -132,6 +138,20 @@ ADSSTATE_RESUME = 14
 ADSSTATE_CONFIG = 15
 ADSSTATE_RECONFIG = 16
 
+# AMS/TCP (ADS without TcAdsDll, see PLCtcp)
+AMSTCP_PORT = 48898
+ADSSRVID_READDEVICEINFO = 1
+ADSSRVID_READ = 2
+ADSSRVID_WRITE = 3
+ADSSRVID_READSTATE = 4
+ADSSRVID_WRITECTRL = 5
+ADSSRVID_ADDDEVICENOTE = 6
+ADSSRVID_DELDEVICENOTE = 7
+ADSSRVID_DEVICENOTE = 8
+ADSSRVID_READWRITE = 9
+AMS_STATEFLAG_REQUEST = 0x0004
+AMS_STATEFLAG_RESPONSE = 0x0005
+
 # ADSTransmode
 ADSTRANS_NOTRANS = 0
 ADSTRANS_CLIENTCYCLE = 1
@@ -139,6 +159,23 @@ ADSTRANS_CLIENT1REQ = 2
 ADSTRANS_SERVERCYCLE = 3
 ADSTRANS_SERVERONCHA = 4
 
+# ADS data types (dataType of symbol entries)
+ADST_VOID = 0
+ADST_INT16 = 2
+ADST_INT32 = 3
+ADST_REAL32 = 4
+ADST_REAL64 = 5
+ADST_INT8 = 16
+ADST_UINT8 = 17
+ADST_UINT16 = 18
+ADST_UINT32 = 19
+ADST_INT64 = 20
+ADST_UINT64 = 21
+ADST_STRING = 30
+ADST_WSTRING = 31
+ADST_BIT = 33
+ADST_BIGTYPE = 65
+
 # symbol flags
 ADSSYMBOLFLAG_PERSISTENT = 0x00000001
 ADSSYMBOLFLAG_BITVALUE = 0x00000002
@@ -146,4 +183,4 @@ ADSSYMBOLFLAG_REFERENCETO = 0x0004
 ADSSYMBOLFLAG_TYPEGUID = 0x0008
 ADSSYMBOLFLAG_TCCOMIFACEPTR = 0x0010
 ADSSYMBOLFLAG_READONLY = 0x0020
-ADSSYMBOLFLAG_CONTEXTMASK = 0x0F00
\ No newline at end of file
+ADSSYMBOLFLAG_CONTEXTMASK = 0x0F00
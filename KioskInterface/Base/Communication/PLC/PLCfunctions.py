@@ -17,7 +17,11 @@
 from ctypes import *
 import os
 import struct
-import winreg
+import time
+try:
+	import winreg
+except ImportError: # not on windows, see PLCtcp for a portable backend
+	winreg = None
 
 from .PLCconstants import *
 from .PLCstructs import *
@@ -35,7 +39,56 @@ def get_adsdll():
 	except:
 		return None
 
-_adsDLL = get_adsdll()  #: ADS-DLL (Beckhoff TwinCAT)
+# callback prototype for device notifications (stdcall on windows)
+try:
+	_NOTIFICATIONFUNCTYPE = WINFUNCTYPE
+except NameError:
+	_NOTIFICATIONFUNCTYPE = CFUNCTYPE
+AdsNotificationCallback = _NOTIFICATIONFUNCTYPE(None, POINTER(SAmsAddr), POINTER(SAdsNotificationHeader), c_ulong)
+
+# argtypes of the used TcAdsDll functions, restype is always c_long
+_PROTOTYPES = {
+	'AdsGetDllVersion': None,
+	'AdsPortOpen': None,
+	'AdsPortClose': None,
+	'AdsGetLocalAddress': (POINTER(SAmsAddr),),
+	'AdsSyncReadStateReq': (POINTER(SAmsAddr), POINTER(c_int), POINTER(c_int)),
+	'AdsSyncReadDeviceInfoReq': (POINTER(SAmsAddr), c_char_p, POINTER(SAdsVersion)),
+	'AdsSyncWriteControlReq': (POINTER(SAmsAddr), c_ushort, c_ushort, c_ulong, c_void_p),
+	'AdsSyncWriteReq': (POINTER(SAmsAddr), c_ulong, c_ulong, c_ulong, c_void_p),
+	'AdsSyncReadWriteReq': (POINTER(SAmsAddr), c_ulong, c_ulong, c_ulong, c_void_p, c_ulong, c_void_p),
+	'AdsSyncReadReq': (POINTER(SAmsAddr), c_ulong, c_ulong, c_ulong, c_void_p),
+	'AdsSyncAddDeviceNotificationReq': (POINTER(SAmsAddr), c_ulong, c_ulong, POINTER(SAdsNotificationAttrib),
+		AdsNotificationCallback, c_ulong, POINTER(c_ulong)),
+	'AdsSyncDelDeviceNotificationReq': (POINTER(SAmsAddr), c_ulong),
+}
+
+class _AdsFunctions:
+	"""
+	:summary: TcAdsDll functions with argtypes/restype bound once at load
+	"""
+	def __init__(self, dll):
+		for name, argtypes in _PROTOTYPES.items():
+			fct = getattr(dll, name)
+			if argtypes is not None:
+				fct.argtypes = argtypes
+			fct.restype = c_long
+			setattr(self, name, fct)
+
+def setAdsDll(dll):
+	"""
+	:summary: (re)bind all prototypes to the given library, e.g. a stub for benchmarks
+	:return: previously used library
+	"""
+	global _adsDLL, _ads
+	previous = _adsDLL
+	_adsDLL = dll
+	_ads = _AdsFunctions(dll) if dll is not None else None
+	return previous
+
+_adsDLL = None  #: ADS-DLL (Beckhoff TwinCAT)
+_ads = None     #: bound functions of _adsDLL
+setAdsDll(get_adsdll())
 
 def isADSLoaded():
 	return _adsDLL is not None
@@ -55,8 +108,7 @@ def adsGetDllVersion():
 	:rtype: structs.AdsVersion
 	:return: version, revision and build of the ads-dll
 	"""
-	adsGetDllVersionFct = _adsDLL.AdsGetDllVersion
-	adsGetDllVersionFct.restype = c_long
+	adsGetDllVersionFct = _ads.AdsGetDllVersion
 	resLong = c_long(adsGetDllVersionFct())
 	stVersion = SAdsVersion()
 	fit = min(sizeof(stVersion), sizeof(c_long))
@@ -69,8 +121,7 @@ def adsPortOpen():
 	:rtype: int
 	:return: port number
 	"""
-	adsPortOpenFct = _adsDLL.AdsPortOpen
-	adsPortOpenFct.restype = c_long
+	adsPortOpenFct = _ads.AdsPortOpen
 	portNr = adsPortOpenFct()
 	return portNr
 
@@ -80,8 +131,7 @@ def adsPortClose():
 	:rtype: int
 	:return: error state
 	"""
-	adsPortCloseFct = _adsDLL.AdsPortClose
-	adsPortCloseFct.restype = c_long
+	adsPortCloseFct = _ads.AdsPortClose
 	errCode = adsPortCloseFct()
 	return errCode
 
@@ -91,9 +141,7 @@ def adsGetLocalAddress():
 	:rtype: structs.AmsAddr
 	:return: AMS-address
 	"""
-	adsGetLocalAddressFct = _adsDLL.AdsGetLocalAddress
-	adsGetLocalAddressFct.argtypes = (POINTER(SAmsAddr),)
-	adsGetLocalAddressFct.restype = c_long
+	adsGetLocalAddressFct = _ads.AdsGetLocalAddress
 	
 	stAmsAddr = SAmsAddr()
 	errCode = adsGetLocalAddressFct(pointer(stAmsAddr))
@@ -112,9 +160,7 @@ def adsSyncReadStateReq(adr):
 	:rtype: (int, int)
 	:return: adsState, deviceState
 	"""
-	adsSyncReadStateReqFct = _adsDLL.AdsSyncReadStateReq
-	adsSyncReadStateReqFct.argtypes=(POINTER(SAmsAddr), POINTER(c_int), POINTER(c_int))
-	adsSyncReadStateReqFct.restype = c_long
+	adsSyncReadStateReqFct = _ads.AdsSyncReadStateReq
 
 	pAmsAddr = pointer(adr.amsAddrStruct())
 	adsState = c_int()
@@ -134,9 +180,7 @@ def adsSyncReadDeviceInfoReq(adr):
 	:rtype: string, AdsVersion
 	:return: device name, version
 	"""
-	adsSyncReadDeviceInfoReqFct = _adsDLL.AdsSyncReadDeviceInfoReq
-	adsSyncReadDeviceInfoReqFct.argtypes=(POINTER(SAmsAddr), c_char_p, POINTER(SAdsVersion))
-	adsSyncReadDeviceInfoReqFct.restype = c_long
+	adsSyncReadDeviceInfoReqFct = _ads.AdsSyncReadDeviceInfoReq
 
 	pAmsAddr = pointer(adr.amsAddrStruct())
 	devNameStringBuffer = create_string_buffer(20)
@@ -167,9 +211,7 @@ def adsSyncWriteControlReq(adr, adsState, deviceState, data, plcDataType):
 	ADS-interface (AdsState). The possible states of an ADS-interface are
 	defined in the ADS-specification.
 	"""
-	adsSyncWriteControlReqFct = _adsDLL.AdsSyncWriteControlReq
-	adsSyncWriteControlReqFct.argtypes=(POINTER(SAmsAddr), c_ushort, c_ushort, c_ulong, c_void_p)
-	adsSyncWriteControlReqFct.restype = c_long
+	adsSyncWriteControlReqFct = _ads.AdsSyncWriteControlReq
 	pAddr = pointer(adr.amsAddrStruct())
 	nAdsState = c_ushort(adsState)
 	nDeviceState = c_ushort(deviceState)
@@ -200,9 +242,7 @@ def adsSyncWriteReq(adr, indexGroup, indexOffset, value, plcDataType):
 	:param int plcDataType: type of the data given to the PLC,
 		according to PLCTYPE constants
 	"""
-	adsSyncWriteReqFct = _adsDLL.AdsSyncWriteReq
-	adsSyncWriteReqFct.argtypes=(POINTER(SAmsAddr), c_ulong, c_ulong, c_ulong, c_void_p)
-	adsSyncWriteReqFct.restype = c_long
+	adsSyncWriteReqFct = _ads.AdsSyncWriteReq
 
 	pAmsAddr = pointer(adr.amsAddrStruct())
 	nIndexGroup = c_ulong(indexGroup)
@@ -241,9 +281,7 @@ def adsSyncReadWriteReq(adr, indexGroup, indexOffset,  plcReadDataType,
 	:rtype: PLCTYPE
 	:return: value: **value**
 	"""
-	adsSyncReadWriteReqFct = _adsDLL.AdsSyncReadWriteReq
-	adsSyncReadWriteReqFct.argtypes=(POINTER(SAmsAddr), c_ulong, c_ulong, c_ulong, c_void_p, c_ulong, c_void_p)
-	adsSyncReadWriteReqFct.restype = c_long
+	adsSyncReadWriteReqFct = _ads.AdsSyncReadWriteReq
 
 	pAmsAddr = pointer(adr.amsAddrStruct())
 	nIndexGroup = c_ulong(indexGroup)
@@ -292,9 +330,7 @@ def adsSyncReadReq(adr, indexGroup, indexOffset, plcDataType):
 	:rtype: PLCTYPE
 	:return: value: **value**
 	"""
-	adsSyncReadReqFct = _adsDLL.AdsSyncReadReq
-	adsSyncReadReqFct.argtypes=(POINTER(SAmsAddr), c_ulong, c_ulong, c_ulong, c_void_p)
-	adsSyncReadReqFct.restype = c_long
+	adsSyncReadReqFct = _ads.AdsSyncReadReq
 
 	pAmsAddr = pointer(adr.amsAddrStruct())
 	nIndexGroup = c_ulong(indexGroup)
@@ -334,9 +370,91 @@ def adsSyncReadByHandle(adr, handle, plcDataType):
 def adsSyncWriteByHandle(adr, handle, value, plcDataType):
 	adsSyncWriteReq(adr, ADSIGRP_SYM_VALBYHND, handle, value, plcDataType)
 
+class AdsVariable():
+	"""
+	:summary: PLC variable accessed via handle with preallocated ctypes buffers
+		and prebound functions, read and write do not allocate ctypes objects
+
+	:ivar handle: symbol handle
+	:ivar plcDataType: type of the data, according to PLCTYPE constants
+	"""
+	def __init__(self, adr, handle, plcDataType):
+		self.handle = handle
+		self.plcDataType = plcDataType
+		self._addr = SAmsAddr.from_buffer_copy(adr.amsAddrStruct())
+		self._pAddr = pointer(self._addr)
+		self._data = plcDataType()
+		self._address = addressof(self._data)
+		self._length = sizeof(self._data)
+		self._isArray = type(plcDataType).__name__ == 'PyCArrayType'
+		self._hasValue = hasattr(self._data, 'value')
+		self._readFct = _ads.AdsSyncReadReq
+		self._writeFct = _ads.AdsSyncWriteReq
+
+	def read(self):
+		errCode = self._readFct(self._pAddr, ADSIGRP_SYM_VALBYHND, self.handle, self._length, self._address)
+		if errCode:
+			raise ADSError(errCode)
+		if self._hasValue:
+			return self._data.value
+		if self._isArray:
+			return [i for i in self._data]
+		# structures are returned as copy, the buffer is reused
+		return self.plcDataType.from_buffer_copy(self._data)
+
+	def write(self, value):
+		if self._isArray:
+			memset(self._address, 0, self._length)
+			self._data[:len(value)] = value
+		elif self._hasValue:
+			self._data.value = value
+		else:
+			memmove(self._address, addressof(value), self._length)
+		errCode = self._writeFct(self._pAddr, ADSIGRP_SYM_VALBYHND, self.handle, self._length, self._address)
+		if errCode:
+			raise ADSError(errCode)
+
+_variables = {}  #: (ams address, name, plcDataType) -> AdsVariable with cached handle
+
+def adsGetVariable(adr, dataName, plcDataType):
+	"""
+	:summary: returns the cached AdsVariable for the data name,
+		the handle is acquired on first use
+	"""
+	key = (bytes(adr.amsAddrStruct()), dataName, plcDataType)
+	variable = _variables.get(key)
+	if variable is None:
+		variable = AdsVariable(adr, adsGetHandle(adr, dataName), plcDataType)
+		_variables[key] = variable
+	return variable
+
+def adsReleaseVariables(adr=None):
+	"""
+	:summary: release cached handles of adsGetVariable (of the given address or all)
+	"""
+	address = bytes(adr.amsAddrStruct()) if adr is not None else None
+	for key in list(_variables.keys()):
+		if address is not None and key[0] != address:
+			continue
+		variable = _variables.pop(key)
+		try:
+			adsSyncWriteReq(AmsAddr(0, variable._addr), ADSIGRP_SYM_RELEASEHND, 0, variable.handle, PLCTYPE_UDINT)
+		except ADSError:
+			pass
+
+def _byName(adr, dataName, plcDataType, access):
+	try:
+		return access(adsGetVariable(adr, dataName, plcDataType))
+	except ADSError:
+		# handle may be invalid after online change, acquire it again once
+		if _variables.pop((bytes(adr.amsAddrStruct()), dataName, plcDataType), None) is None:
+			raise
+		return access(adsGetVariable(adr, dataName, plcDataType))
+
 def adsSyncReadByName(adr, dataName, plcDataType):
 	"""
-	:summary: Read data synchronous from an ADS-device from data name
+	:summary: Read data synchronous from an ADS-device from data name,
+		the handle is cached (see adsReleaseVariables)
 	:param structs.AmsAddr adr: local or remote AmsAddr
 	:param string dataName: data name
 	:param int plcDataType: type of the data given to the PLC, according to
@@ -344,71 +462,516 @@ def adsSyncReadByName(adr, dataName, plcDataType):
 	:rtype: PLCTYPE
 	:return: value: **value**
 	"""
-	# Get the handle of the PLC-variable
-	hnl = adsGetHandle(adr, dataName)
-
-	# Read the value of a PLC-variable, via handle
-	value = adsSyncReadReq(adr, ADSIGRP_SYM_VALBYHND, hnl, plcDataType)
-
-	# Release the handle of the PLC-variable
-	adsReleaseHandle(adr, hnl)
-
-	return value
+	return _byName(adr, dataName, plcDataType, lambda variable: variable.read())
 
 def adsSyncWriteByName(adr, dataName, value, plcDataType):
 	"""
-	:summary: Send data synchronous to an ADS-device from data name
+	:summary: Send data synchronous to an ADS-device from data name,
+		the handle is cached (see adsReleaseVariables)
 	:param structs.AmsAddr adr: local or remote AmsAddr
 	:param string dataName: PLC storage address
 	:param value: value to write to the storage address of the PLC
 	:param int plcDataType: type of the data given to the PLC,
 		according to PLCTYPE constants
 	"""
-	# Get the handle of the PLC-variable
-	hnl = adsGetHandle(adr, dataName)
+	_byName(adr, dataName, plcDataType, lambda variable: variable.write(value))
 
-	# Write the value of a PLC-variable, via handle
-	adsSyncWriteReq(adr, ADSIGRP_SYM_VALBYHND, hnl, value, plcDataType)
+def _packValue(value, plcDataType):
+	"""
+	:summary: convert a value into the raw bytes of the given plc data type
+	"""
+	if plcDataType == PLCTYPE_STRING:
+		if isinstance(value, str):
+			value = value.encode()
+		return bytes(value) + b'\x00'
+	if type(plcDataType).__name__ == 'PyCArrayType':
+		nData = plcDataType(*value)
+	else:
+		nData = plcDataType(value)
+	return bytes(nData)
 
-	# Release the handle of the PLC-variable
-	adsReleaseHandle(adr, hnl)
+def _unpackValue(buffer, offset, plcDataType):
+	"""
+	:summary: convert raw bytes at offset into a value of the given plc data type
+	"""
+	data = plcDataType.from_buffer_copy(buffer, offset)
+	if hasattr(data, 'value'):
+		return data.value
+	if type(plcDataType).__name__ == 'PyCArrayType':
+		return [i for i in data]
+	return data
 
-def adsGetVariableDeclarations(adr):
+def adsSyncReadWriteRawReq(adr, indexGroup, indexOffset, readLength, writeData):
 	"""
-	:summary: returns list of description fields of all variables available on the PLC
+	:summary: Read and write raw data synchronous from/to an ADS-device
 	:param structs.AmsAddr adr: local or remote AmsAddr
-	:return: value: list of SymbolInfo entries
+	:param int indexGroup: PLC storage area, according to the INDEXGROUP
+		constants
+	:param int indexOffset: PLC storage address
+	:param int readLength: number of bytes to read
+	:param bytes writeData: data to write
+	:rtype: bytes
+	:return: readLength bytes of read data
 	"""
-	class SymbolInfo:
-		def __init__(self, entry_field, name, type, comment):
-			self.group = entry_field.iGroup
-			self.offset = entry_field.iOffs
-			self.size = entry_field.size
-			self.dataType = entry_field.dataType
-			self.flags = entry_field.flags
-			self.name = name
-			self.type = type
-			self.comment = comment
-		def __str__(self):
-			return 'Name: {}\nType: {}\nComment: {}\nGroup: {}\nOffset: {}\nSize: {}\nDataType: {}\nFlags: {}\n'.format(
-					self.name, self.type, self.comment, self.group, self.offset, self.size, self.dataType, self.flags)
+	adsSyncReadWriteReqFct = _ads.AdsSyncReadWriteReq
+
+	pAmsAddr = pointer(adr.amsAddrStruct())
+	readBuffer = create_string_buffer(readLength)
+	writeBuffer = create_string_buffer(writeData, len(writeData))
 
+	errCode = adsSyncReadWriteReqFct(
+		pAmsAddr, c_ulong(indexGroup), c_ulong(indexOffset), c_ulong(readLength), readBuffer,
+		c_ulong(len(writeData)), writeBuffer)
+	if errCode:
+		raise ADSError(errCode)
+	return readBuffer.raw
+
+def _chunks(requests):
+	for start in range(0, len(requests), ADSSUM_MAX_REQUESTS):
+		yield requests[start:start+ADSSUM_MAX_REQUESTS]
+
+def adsSumReadReq(adr, requests):
+	"""
+	:summary: Read many variables with ADS sum commands (ADSIGRP_SUMUP_READ),
+		one round trip per ADSSUM_MAX_REQUESTS variables
+	:param structs.AmsAddr adr: local or remote AmsAddr
+	:param requests: list of (indexGroup, indexOffset, plcDataType)
+	:rtype: list
+	:return: list of (errCode, value) in request order, value is None on error
+	"""
+	results = []
+	for chunk in _chunks(requests):
+		count = len(chunk)
+		sizes = [sizeof(plcDataType) for (_, _, plcDataType) in chunk]
+		writeData = b''.join(struct.pack('<III', indexGroup, indexOffset, size)
+			for (indexGroup, indexOffset, _), size in zip(chunk, sizes))
+		readData = adsSyncReadWriteRawReq(adr, ADSIGRP_SUMUP_READ, count, 4*count + sum(sizes), writeData)
+		errCodes = struct.unpack_from('<{}I'.format(count), readData)
+		offset = 4*count
+		for (_, _, plcDataType), size, errCode in zip(chunk, sizes, errCodes):
+			results.append((errCode, None if errCode else _unpackValue(readData, offset, plcDataType)))
+			offset += size
+	return results
+
+def adsSumWriteReq(adr, requests):
+	"""
+	:summary: Write many variables with ADS sum commands (ADSIGRP_SUMUP_WRITE),
+		one round trip per ADSSUM_MAX_REQUESTS variables
+	:param structs.AmsAddr adr: local or remote AmsAddr
+	:param requests: list of (indexGroup, indexOffset, value, plcDataType)
+	:rtype: list
+	:return: list of errCodes in request order
+	"""
+	results = []
+	for chunk in _chunks(requests):
+		count = len(chunk)
+		payloads = [_packValue(value, plcDataType) for (_, _, value, plcDataType) in chunk]
+		header = b''.join(struct.pack('<III', indexGroup, indexOffset, len(payload))
+			for (indexGroup, indexOffset, _, _), payload in zip(chunk, payloads))
+		readData = adsSyncReadWriteRawReq(adr, ADSIGRP_SUMUP_WRITE, count, 4*count, header + b''.join(payloads))
+		results += list(struct.unpack_from('<{}I'.format(count), readData))
+	return results
+
+def adsSumReadWriteReq(adr, requests):
+	"""
+	:summary: Combined read/write of many variables with ADS sum commands
+		(ADSIGRP_SUMUP_READWRITE), e.g. for acquiring many handles at once
+	:param structs.AmsAddr adr: local or remote AmsAddr
+	:param requests: list of (indexGroup, indexOffset, readLength, writeData bytes)
+	:rtype: list
+	:return: list of (errCode, read bytes) in request order
+	"""
+	results = []
+	for chunk in _chunks(requests):
+		count = len(chunk)
+		header = b''.join(struct.pack('<IIII', indexGroup, indexOffset, readLength, len(writeData))
+			for (indexGroup, indexOffset, readLength, writeData) in chunk)
+		readData = adsSyncReadWriteRawReq(adr, ADSIGRP_SUMUP_READWRITE, count,
+			8*count + sum(readLength for (_, _, readLength, _) in chunk),
+			header + b''.join(writeData for (_, _, _, writeData) in chunk))
+		offset = 8*count
+		for i in range(count):
+			errCode, length = struct.unpack_from('<II', readData, 8*i)
+			results.append((errCode, readData[offset:offset+length]))
+			offset += length
+	return results
+
+def adsSumReadByHandle(adr, requests):
+	"""
+	:summary: Read many variables via handle in one sum command
+	:param requests: list of (handle, plcDataType)
+	:return: list of (errCode, value)
+	"""
+	return adsSumReadReq(adr, [(ADSIGRP_SYM_VALBYHND, handle, plcDataType) for (handle, plcDataType) in requests])
+
+def adsSumWriteByHandle(adr, requests):
+	"""
+	:summary: Write many variables via handle in one sum command
+	:param requests: list of (handle, value, plcDataType)
+	:return: list of errCodes
+	"""
+	return adsSumWriteReq(adr, [(ADSIGRP_SYM_VALBYHND, handle, value, plcDataType) for (handle, value, plcDataType) in requests])
+
+def adsNotificationData(pNotification):
+	"""
+	:summary: copy handle, timestamp and sample data out of a notification header,
+		only valid inside the notification callback
+	:rtype: (int, int, bytes)
+	:return: notification handle, timestamp (FILETIME, see adsFiletime), sample data
+	"""
+	header = pNotification.contents
+	data = string_at(addressof(header) + sizeof(SAdsNotificationHeader), header.cbSampleSize)
+	return (header.hNotification, header.nTimeStamp, data)
+
+def adsFiletime(timestamp=None):
+	"""
+	:summary: windows FILETIME (100ns since 1601) as used in notification timestamps
+	:param float timestamp: seconds since the epoch, default now
+	"""
+	if timestamp is None:
+		timestamp = time.time()
+	return int((timestamp + 11644473600) * 10000000)
+
+def adsSyncAddDeviceNotificationReq(adr, indexGroup, indexOffset, length, callback, user=0,
+									transMode=ADSTRANS_SERVERONCHA, maxDelay=0, cycleTime=0):
+	"""
+	:summary: Add a device notification, the callback is called by the ADS router
+		thread on every change (transMode ADSTRANS_SERVERONCHA)
+	:param structs.AmsAddr adr: local or remote AmsAddr
+	:param int indexGroup: PLC storage area, according to the INDEXGROUP
+		constants
+	:param int indexOffset: PLC storage address
+	:param int length: size of the observed data in bytes
+	:param callback: AdsNotificationCallback instance, caller has to keep a reference
+	:param int user: user handle passed to the callback
+	:param int transMode: transmission mode, according to ADSTRANS constants
+	:param int maxDelay: max. delay in 100ns units
+	:param int cycleTime: check cycle in 100ns units
+	:rtype: int
+	:return: notification handle
+	"""
+	adsSyncAddDeviceNotificationReqFct = _ads.AdsSyncAddDeviceNotificationReq
+
+	pAmsAddr = pointer(adr.amsAddrStruct())
+	attrib = SAdsNotificationAttrib(length, transMode, maxDelay, cycleTime)
+	hNotification = c_ulong()
+
+	errCode = adsSyncAddDeviceNotificationReqFct(pAmsAddr, c_ulong(indexGroup), c_ulong(indexOffset),
+		pointer(attrib), callback, c_ulong(user), pointer(hNotification))
+	if errCode:
+		raise ADSError(errCode)
+	return hNotification.value
+
+def adsSyncDelDeviceNotificationReq(adr, hNotification):
+	"""
+	:summary: Remove a device notification
+	:param structs.AmsAddr adr: local or remote AmsAddr
+	:param int hNotification: notification handle
+	"""
+	adsSyncDelDeviceNotificationReqFct = _ads.AdsSyncDelDeviceNotificationReq
+
+	errCode = adsSyncDelDeviceNotificationReqFct(pointer(adr.amsAddrStruct()), c_ulong(hNotification))
+	if errCode:
+		raise ADSError(errCode)
+
+def adsAddNotificationByHandle(adr, handle, plcDataType, callback, user=0):
+	return adsSyncAddDeviceNotificationReq(adr, ADSIGRP_SYM_VALBYHND, handle, sizeof(plcDataType), callback, user)
+
+def adsSumGetHandles(adr, dataNames):
+	"""
+	:summary: acquire the handles of many variables with one sum command
+	:param structs.AmsAddr adr: local or remote AmsAddr
+	:param dataNames: list of data names
+	:rtype: list
+	:return: list of (errCode, handle) in request order, handle is None on error
+	"""
+	results = adsSumReadWriteReq(adr, [(ADSIGRP_SYM_HNDBYNAME, 0, sizeof(PLCTYPE_UDINT), dataName.encode() + b'\x00')
+		for dataName in dataNames])
+	return [(errCode, None if errCode else struct.unpack_from('<I', data)[0]) for errCode, data in results]
+
+def adsSumReleaseHandles(adr, handles):
+	"""
+	:summary: release many handles with one sum command
+	:rtype: list
+	:return: list of errCodes
+	"""
+	return adsSumWriteReq(adr, [(ADSIGRP_SYM_RELEASEHND, 0, handle, PLCTYPE_UDINT) for handle in handles])
+
+def adsSumGetSymbolInfo(adr, dataNames, maxEntryLength=1024):
+	"""
+	:summary: symbol info (group, offset, size, type) of many variables with one
+		sum command (ADSIGRP_SYM_INFOBYNAMEEX), also for members of structures
+	:rtype: list
+	:return: list of (errCode, SymbolInfo) in request order, SymbolInfo is None on error
+	"""
+	results = adsSumReadWriteReq(adr, [(ADSIGRP_SYM_INFOBYNAMEEX, 0, maxEntryLength, dataName.encode() + b'\x00')
+		for dataName in dataNames])
+	return [(errCode, None if errCode else SymbolDeclarations(data, 1)[0]) for errCode, data in results]
+
+def adsReadSymbolFingerprint(adr):
+	"""
+	:summary: symbol version (online change counter), size of the symbol table and
+		of the datatype table, read in one sum command. Changes whenever the symbol table
+		or a datatype changes (the version alone is reset by a full download).
+	:rtype: (int, int, int, int, int)
+	:return: symbol version, number of symbols, size of the symbol upload,
+		number of datatypes, size of the datatype upload
+	"""
+	(errVersion, version), (errInfo, info) = adsSumReadReq(adr, [
+		(ADSIGRP_SYM_VERSION, 0, PLCTYPE_USINT), (ADSIGRP_SYM_UPLOADINFO2, 0, SAdsSymbolUploadInfo2)])
+	if errVersion or errInfo:
+		raise ADSError(errVersion or errInfo)
+	return (version, info.nSymbols, info.nSymSize, info.nDatatypes, info.nDatatypeSize)
+
+class SymbolInfo:
+	"""
+	:summary: description fields of a PLC variable (symbol upload entry)
+	"""
+	def __init__(self, entry_field, name, type, comment):
+		self.group = entry_field.iGroup
+		self.offset = entry_field.iOffs
+		self.size = entry_field.size
+		self.dataType = entry_field.dataType
+		self.flags = entry_field.flags
+		self.name = name
+		self.type = type
+		self.comment = comment
+	def __str__(self):
+		return 'Name: {}\nType: {}\nComment: {}\nGroup: {}\nOffset: {}\nSize: {}\nDataType: {}\nFlags: {}\n'.format(
+				self.name, self.type, self.comment, self.group, self.offset, self.size, self.dataType, self.flags)
+
+def adsSyncReadRawReq(adr, indexGroup, indexOffset, length):
+	"""
+	:summary: Read raw data synchronous from an ADS-device
+	:rtype: bytes
+	:return: length bytes of read data
+	"""
+	data = create_string_buffer(length)
+	errCode = _ads.AdsSyncReadReq(pointer(adr.amsAddrStruct()), indexGroup, indexOffset, length, data)
+	if errCode:
+		raise ADSError(errCode)
+	return data.raw
+
+def adsReadSymbolUpload(adr):
+	"""
+	:summary: raw symbol upload of the PLC
+	:param structs.AmsAddr adr: local or remote AmsAddr
+	:rtype: (int, bytes)
+	:return: number of symbols, upload data (see SymbolDeclarations)
+	"""
 	# Read the length of the variable declaration	
 	info = adsSyncReadReq(adr, ADSIGRP_SYM_UPLOADINFO, 0x0, SAdsSymbolUploadInfo)
-	symbols = c_byte * info.nSymSize
 	#Read information about the PLC variables 
-	entries = adsSyncReadReq(adr, ADSIGRP_SYM_UPLOAD, 0x0, symbols)
-
-	current=0
-	entries = struct.pack('b'*len(entries),*entries)
-	sizeEntry=sizeof(SAdsSymbolEntry)
-	return_entries = []
-	for i in range(info.nSymbols):
-		entry = SAdsSymbolEntry.from_buffer_copy(entries, current)
-		name =    (c_char*entry.nameLength)   .from_buffer_copy(entries, current+sizeEntry).value
-		type =    (c_char*entry.typeLength)   .from_buffer_copy(entries, current+sizeEntry+entry.nameLength+1).value
-		comment = (c_char*entry.commentLength).from_buffer_copy(entries, current+sizeEntry+entry.nameLength+1+entry.typeLength+1).value
+	return info.nSymbols, adsSyncReadRawReq(adr, ADSIGRP_SYM_UPLOAD, 0x0, info.nSymSize)
+
+class SymbolDeclarations:
+	"""
+	:summary: index over a raw symbol upload. Construction only collects the entry
+		offsets, names are indexed on the first lookup and SymbolInfo objects
+		(incl. type and comment) are decoded on access only.
+	"""
+	_ENTRY = struct.Struct('<IIIIIIHHH')
+	_NAMELENGTH = struct.Struct('<H')
+	_TYPELENGTH = struct.Struct('<HH')
+
+	def __init__(self, entries, nSymbols):
+		self._view = memoryview(entries)
+		self._offsets = []
+		current = 0
+		unpack = struct.Struct('<I').unpack_from
+		for i in range(nSymbols):
+			self._offsets.append(current)
+			current += unpack(self._view, current)[0]
+		self._byName = None
+		self._byType = None
+		self._decoded = {}
+
+	def __len__(self):
+		return len(self._offsets)
+
+	def __getitem__(self, index):
+		info = self._decoded.get(index)
+		if info is None:
+			current = self._offsets[index]
+			entry = SAdsSymbolEntry.from_buffer_copy(self._view, current)
+			start = current + self._ENTRY.size
+			view = self._view
+			name = bytes(view[start:start + entry.nameLength])
+			start += entry.nameLength + 1
+			type = bytes(view[start:start + entry.typeLength])
+			start += entry.typeLength + 1
+			comment = bytes(view[start:start + entry.commentLength])
+			info = SymbolInfo(entry, name.decode('ascii'), type.decode('ascii'), comment.decode('ascii'))
+			self._decoded[index] = info
+		return info
+
+	def __iter__(self):
+		for index in range(len(self._offsets)):
+			yield self[index]
+
+	def _name(self, current):
+		nameLength = self._NAMELENGTH.unpack_from(self._view, current + 24)[0]
+		start = current + self._ENTRY.size
+		return bytes(self._view[start:start + nameLength])
+
+	def find(self, name):
+		"""
+		:summary: SymbolInfo by name (case insensitive like TwinCAT) or None
+		"""
+		if self._byName is None:
+			self._byName = {self._name(current).upper(): index for index, current in enumerate(self._offsets)}
+		index = self._byName.get(name.encode('ascii').upper())
+		return None if index is None else self[index]
+
+	def byType(self, typeName):
+		"""
+		:summary: list of SymbolInfo with the given type name (case insensitive)
+		"""
+		if self._byType is None:
+			self._byType = {}
+			for index, current in enumerate(self._offsets):
+				nameLength, typeLength = self._TYPELENGTH.unpack_from(self._view, current + 24)
+				start = current + self._ENTRY.size + nameLength + 1
+				self._byType.setdefault(bytes(self._view[start:start + typeLength]).upper(), []).append(index)
+		return [self[index] for index in self._byType.get(typeName.encode('ascii').upper(), [])]
+
+def adsParseSymbols(entries, nSymbols):
+	"""
+	:summary: parse a raw symbol upload
+	:return: value: list of SymbolInfo entries
+	"""
+	return list(SymbolDeclarations(entries, nSymbols))
+
+def adsGetSymbolDeclarations(adr):
+	"""
+	:summary: lazily decoded index of all variables available on the PLC
+	:param structs.AmsAddr adr: local or remote AmsAddr
+	:rtype: SymbolDeclarations
+	"""
+	nSymbols, entries = adsReadSymbolUpload(adr)
+	return SymbolDeclarations(entries, nSymbols)
+
+def adsGetVariableDeclarations(adr):
+	"""
+	:summary: returns list of description fields of all variables available on the PLC
+	:param structs.AmsAddr adr: local or remote AmsAddr
+	:return: value: list of SymbolInfo entries
+	"""
+	return list(adsGetSymbolDeclarations(adr))
+
+def benchmark_symbols(count=50000):
+	"""
+	:summary: parse a synthetic symbol upload with count symbols, previous parser
+		(copy per entry and field) vs. SymbolDeclarations
+	:rtype: dict
+	:return: durations in seconds
+	"""
+	entries = []
+	for i in range(count):
+		name, type, comment = 'MAIN.fbStation_{}.nValue'.format(i).encode(), b'DINT', 'comment {}'.format(i).encode()
+		strings = name + b'\x00' + type + b'\x00' + comment + b'\x00'
+		length = sizeof(SAdsSymbolEntry) + len(strings)
+		entries.append(bytes(SAdsSymbolEntry(length, INDEXGROUP_DATA, 4 * i, 4, 3, 0, len(name), len(type), len(comment))) + strings)
+	upload = b''.join(entries)
+	raw = (c_byte * len(upload)).from_buffer_copy(upload)
+	results = {'symbols': count, 'bytes': len(upload)}
+
+	start = time.perf_counter()
+	# previous parser: list of c_byte -> bytes, entries and strings by from_buffer_copy
+	data = struct.pack('b'*len(raw), *[i for i in raw])
+	current = 0
+	sizeEntry = sizeof(SAdsSymbolEntry)
+	legacy = []
+	for i in range(count):
+		entry = SAdsSymbolEntry.from_buffer_copy(data, current)
+		name =    (c_char*entry.nameLength)   .from_buffer_copy(data, current+sizeEntry).value
+		type =    (c_char*entry.typeLength)   .from_buffer_copy(data, current+sizeEntry+entry.nameLength+1).value
+		comment = (c_char*entry.commentLength).from_buffer_copy(data, current+sizeEntry+entry.nameLength+1+entry.typeLength+1).value
 		current += entry.entryLength
-		return_entries.append(SymbolInfo(entry, name.decode('ascii'), type.decode('ascii'), comment.decode('ascii')))
-		
-	return return_entries
\ No newline at end of file
+		legacy.append(SymbolInfo(entry, name.decode('ascii'), type.decode('ascii'), comment.decode('ascii')))
+	results['legacy_s'] = time.perf_counter() - start
+
+	start = time.perf_counter()
+	declarations = SymbolDeclarations(raw, count)
+	results['index_s'] = time.perf_counter() - start
+	start = time.perf_counter()
+	found = declarations.find('main.fbStation_{}.nValue'.format(count // 2))
+	results['first_lookup_s'] = time.perf_counter() - start
+	start = time.perf_counter()
+	for i in range(1000):
+		declarations.find('MAIN.fbStation_{}.nValue'.format(i * count // 1000))
+	results['lookup_1000_s'] = time.perf_counter() - start
+	start = time.perf_counter()
+	decoded = list(SymbolDeclarations(raw, count))
+	results['decode_all_s'] = time.perf_counter() - start
+	results['identical'] = (found.offset == 4 * (count // 2) and
+		[(s.name, s.type, s.comment, s.offset) for s in decoded] == [(s.name, s.type, s.comment, s.offset) for s in legacy])
+	return results
+
+
+class _StubAdsDll():
+	"""
+	:summary: in-process stand-in for TcAdsDll without router, all calls succeed,
+		handle requests return increasing handles. Only used by benchmark.
+	"""
+	def __init__(self):
+		self._nextHandle = 1
+		def readWrite(pAddr, indexGroup, indexOffset, readLength, pRead, writeLength, pWrite):
+			if indexGroup == ADSIGRP_SYM_HNDBYNAME and readLength >= 4:
+				memmove(pRead, addressof(c_uint32(self._nextHandle)), 4)
+				self._nextHandle += 1
+			return 0
+		for name, argtypes in _PROTOTYPES.items():
+			prototype = CFUNCTYPE(c_long, *(argtypes or ()))
+			impl = readWrite if name == 'AdsSyncReadWriteReq' else (lambda *args: 0)
+			setattr(self, name, prototype(impl))
+
+def benchmark(count=100000):
+	"""
+	:summary: calls per second of the different read/write paths against a stub library
+	:rtype: dict
+	:return: calls per second by path
+	"""
+	previous = setAdsDll(_StubAdsDll())
+	try:
+		adr = AmsAddr(0, SAmsAddr())
+		stub = _adsDLL
+		def legacyRead(handle):
+			# previous wrapper: prototype and buffers set up on every call
+			fct = stub.AdsSyncReadReq
+			fct.argtypes = (POINTER(SAmsAddr), c_ulong, c_ulong, c_ulong, c_void_p)
+			fct.restype = c_long
+			data = PLCTYPE_WORD()
+			errCode = fct(pointer(adr.amsAddrStruct()), c_ulong(ADSIGRP_SYM_VALBYHND), c_ulong(handle),
+				c_ulong(sizeof(data)), pointer(data))
+			if errCode:
+				raise ADSError(errCode)
+			return data.value
+		def legacyReadByName():
+			handle = adsGetHandle(adr, 'GOM_KIOSK.wBench')
+			value = legacyRead(handle)
+			adsReleaseHandle(adr, handle)
+			return value
+
+		handle = adsGetHandle(adr, 'GOM_KIOSK.wBench')
+		variable = AdsVariable(adr, handle, PLCTYPE_WORD)
+		string = AdsVariable(adr, handle, PLCTYPE_STRING * 100)
+		paths = [
+			('legacy_read_by_handle', lambda: legacyRead(handle)),
+			('legacy_read_by_name', legacyReadByName),
+			('read_by_handle', lambda: adsSyncReadByHandle(adr, handle, PLCTYPE_WORD)),
+			('read_by_name', lambda: adsSyncReadByName(adr, 'GOM_KIOSK.wBench', PLCTYPE_WORD)),
+			('variable_read', variable.read),
+			('variable_write', lambda: variable.write(1)),
+			('variable_write_string', lambda: string.write(b'serial')),
+		]
+		results = {}
+		for name, fct in paths:
+			start = time.perf_counter()
+			for _ in range(count):
+				fct()
+			results[name] = count / (time.perf_counter() - start)
+		adsReleaseVariables()
+		return results
+	finally:
+		setAdsDll(previous)
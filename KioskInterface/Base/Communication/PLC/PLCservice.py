@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+# Script: PLC I/O service thread
+#
+# PLEASE NOTE that this file is part of the GOM Software.
+# You are not allowed to distribute this file to a third party without written notice.
+#
+# Please, do not copy and/or modify this script.
+# All modifications of KioskInterface should happen in the CustomPatches script.
+# Ignoring this advice will make KioskInterface fail after Software update.
+#
+# Copyright (c) 2021 Carl Zeiss GOM Metrology GmbH
+# All rights reserved.
+
+import bisect
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+
+class PLCTimeoutError(Exception):
+	"""
+	:summary: an ADS request did not finish within the timeout of the PLCService
+	"""
+	def __init__(self, operation, variable=None, timeout=None):
+		self.operation = operation
+		self.variable = variable
+		self.timeout = timeout
+		Exception.__init__(self, 'PLC request {}{} timed out after {}s'.format(
+			operation, ' ' + variable if variable else '', timeout))
+
+
+class LatencyHistogram():
+	"""
+	:summary: latency histogram with logarithmic buckets (0.1ms .. 10s)
+
+	:ivar count: number of finished requests
+	:ivar timeouts: number of requests the caller stopped waiting for
+	:ivar errors: number of requests which raised an exception
+	"""
+	BOUNDS = [0.0001 * (10 ** (i / 4.0)) for i in range(21)]
+
+	def __init__(self):
+		self.buckets = [0] * (len(self.BOUNDS) + 1)
+		self.count = 0
+		self.total = 0.0
+		self.max = 0.0
+		self.timeouts = 0
+		self.errors = 0
+
+	def add(self, duration):
+		self.buckets[bisect.bisect_left(self.BOUNDS, duration)] += 1
+		self.count += 1
+		self.total += duration
+		self.max = max(self.max, duration)
+
+	@property
+	def mean(self):
+		return self.total / self.count if self.count else 0.0
+
+	def percentile(self, p):
+		"""
+		:summary: upper bound of the bucket containing the p-th percentile (seconds)
+		"""
+		if not self.count:
+			return 0.0
+		rank = p / 100.0 * self.count
+		seen = 0
+		for i, n in enumerate(self.buckets):
+			seen += n
+			if n and seen >= rank:
+				return min(self.BOUNDS[i], self.max) if i < len(self.BOUNDS) else self.max
+		return self.max
+
+	def summary(self):
+		return {'count': self.count, 'timeouts': self.timeouts, 'errors': self.errors,
+			'mean_ms': self.mean * 1000, 'p50_ms': self.percentile(50) * 1000,
+			'p99_ms': self.percentile(99) * 1000, 'max_ms': self.max * 1000}
+
+
+class _Request():
+	def __init__(self, operation, variable, fct, args):
+		self.operation = operation
+		self.variable = variable
+		self.fct = fct
+		self.args = args
+		self.future = Future()
+		self.started = None
+
+
+class PLCService():
+	"""
+	:summary: thread owning the ADS port, all ADS calls are queued and executed in order.
+		submit() returns a concurrent.futures.Future, call() waits for the result
+		at most timeout seconds and raises PLCTimeoutError.
+		While a request hangs longer than the timeout, further calls fail immediately,
+		so a blocked ADS router cannot freeze the caller once per variable.
+
+	:ivar operations: operation name -> LatencyHistogram
+	:ivar variables: variable name -> LatencyHistogram
+	:ivar consecutiveTimeouts: timeouts since the last request finished in time
+	"""
+	def __init__(self, timeout=2.0, name='PLCService'):
+		self.timeout = timeout
+		self.name = name
+		self.operations = {}
+		self.variables = {}
+		self.timeouts = 0
+		self.consecutiveTimeouts = 0
+		self._queue = queue.Queue()
+		self._thread = None
+		self._current = None # request executed by the thread
+		self._lock = threading.Lock()
+
+	@property
+	def running(self):
+		return self._thread is not None and self._thread.is_alive()
+
+	def start(self):
+		if self.running:
+			return
+		self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+		self._thread.start()
+
+	def stop(self, timeout=None):
+		"""
+		:summary: finish the queued requests and stop the thread
+		"""
+		if not self.running:
+			return
+		self._queue.put(None)
+		if threading.current_thread() is not self._thread:
+			self._thread.join(self.timeout if timeout is None else timeout)
+		self._thread = None
+
+	def _run(self):
+		while True:
+			request = self._queue.get()
+			if request is None:
+				return
+			if not request.future.set_running_or_notify_cancel():
+				continue
+			start = time.perf_counter()
+			with self._lock:
+				request.started = start
+				self._current = request
+			try:
+				result = request.fct(*request.args)
+			except BaseException as e:
+				self._record(request, time.perf_counter() - start, error=True)
+				request.future.set_exception(e)
+			else:
+				self._record(request, time.perf_counter() - start)
+				request.future.set_result(result)
+			finally:
+				with self._lock:
+					self._current = None
+
+	def _histograms(self, request):
+		with self._lock:
+			histograms = [self.operations.setdefault(request.operation, LatencyHistogram())]
+			if request.variable is not None:
+				histograms.append(self.variables.setdefault(request.variable, LatencyHistogram()))
+		return histograms
+
+	def _record(self, request, duration, error=False):
+		for histogram in self._histograms(request):
+			histogram.add(duration)
+			if error:
+				histogram.errors += 1
+		if self.timeout is None or duration <= self.timeout:
+			self.consecutiveTimeouts = 0
+
+	def _timedOut(self, request):
+		for histogram in self._histograms(request):
+			histogram.timeouts += 1
+		self.timeouts += 1
+		self.consecutiveTimeouts += 1
+
+	def hanging(self):
+		"""
+		:summary: seconds the current request runs longer than the timeout, 0 if none
+		"""
+		with self._lock:
+			current = self._current
+		if current is None or self.timeout is None:
+			return 0
+		return max(0, time.perf_counter() - current.started - self.timeout)
+
+	def pending(self):
+		return self._queue.qsize()
+
+	def submit(self, operation, fct, *args, variable=None):
+		"""
+		:summary: queue fct(*args), returns a Future with the result
+		"""
+		request = _Request(operation, variable, fct, args)
+		if threading.current_thread() is self._thread or not self.running:
+			# nested call from a request or no thread: execute directly
+			start = time.perf_counter()
+			request.future.set_running_or_notify_cancel()
+			try:
+				request.future.set_result(fct(*args))
+				self._record(request, time.perf_counter() - start)
+			except BaseException as e:
+				self._record(request, time.perf_counter() - start, error=True)
+				request.future.set_exception(e)
+			return request.future
+		self._queue.put(request)
+		return request.future
+
+	def call(self, operation, fct, *args, variable=None, timeout=None):
+		"""
+		:summary: execute fct(*args) in the service thread and return its result
+		"""
+		timeout = self.timeout if timeout is None else timeout
+		if self.hanging():
+			request = _Request(operation, variable, fct, args)
+			self._timedOut(request)
+			raise PLCTimeoutError(operation, variable, timeout)
+		future = self.submit(operation, fct, *args, variable=variable)
+		try:
+			return future.result(timeout)
+		except FutureTimeoutError:
+			if not future.done():
+				future.cancel()
+				self._timedOut(_Request(operation, variable, fct, args))
+				raise PLCTimeoutError(operation, variable, timeout)
+			return future.result()
+
+	def summary(self, top=5):
+		"""
+		:summary: operation statistics and the slowest variables (by p99)
+		"""
+		with self._lock:
+			operations = {name: h.summary() for name, h in self.operations.items()}
+			variables = sorted(((h.percentile(99), name, h.summary()) for name, h in self.variables.items()), reverse=True)
+		return {'timeouts': self.timeouts, 'consecutiveTimeouts': self.consecutiveTimeouts,
+			'pending': self.pending(), 'operations': operations,
+			'slowest': {name: s for (_, name, s) in variables[:top]}}
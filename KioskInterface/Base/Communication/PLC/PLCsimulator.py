@@ -0,0 +1,622 @@
+# -*- coding: utf-8 -*-
+# Script: Local ADS server simulator
+#
+# PLEASE NOTE that this file is part of the GOM Software.
+# You are not allowed to distribute this file to a third party without written notice.
+#
+# Please, do not copy and/or modify this script.
+# All modifications of KioskInterface should happen in the CustomPatches script.
+# Ignoring this advice will make KioskInterface fail after Software update.
+#
+# Copyright (c) 2021 Carl Zeiss GOM Metrology GmbH
+# All rights reserved.
+
+# Development tool (plain python, no gom module and no TwinCAT needed).
+# Serves AMS/TCP like a TwinCAT PLC runtime with the GOM_KIOSK structure
+# of Inline/InlineVariables.py, to be used with PLCtcp.AdsTcpDll:
+#   python -m KioskInterface.Base.Communication.PLC.PLCsimulator --set bStart=true
+#   python -m KioskInterface.Base.Communication.PLC.PLCsimulator --benchmark 2000 --latency 0.0005
+#
+# Supported: read/write/readwrite by index group (PLC data area, symbol handles,
+# value by name, symbol upload/info/version, sum commands), device state/info
+# and on-change device notifications.
+
+import argparse
+import ast
+import ctypes
+import json
+import math
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+
+from . import PLCconstants
+from .PLCconstants import *
+from .PLCstructs import SAdsSymbolEntry
+from . import PLCfunctions
+from . import PLCtcp
+
+
+ADSERR_DEVICE_SRVNOTSUPP = 1793
+ADSERR_DEVICE_INVALIDGRP = 1794
+ADSERR_DEVICE_INVALIDOFFSET = 1795
+ADSERR_DEVICE_INVALIDSIZE = 1797
+ADSERR_DEVICE_SYMBOLNOTFOUND = 1808
+ADSERR_DEVICE_NOTIFYHNDINVALID = 1812
+
+KIOSK_STRUCT = 'GOM_KIOSK'
+
+# PLCTYPE constant -> (iec type name, ads data type)
+_PLCTYPE_NAMES = {
+	'PLCTYPE_BOOL': ('BOOL', ADST_BIT),
+	'PLCTYPE_BYTE': ('BYTE', ADST_INT8),
+	'PLCTYPE_SINT': ('SINT', ADST_INT8),
+	'PLCTYPE_USINT': ('USINT', ADST_UINT8),
+	'PLCTYPE_INT': ('INT', ADST_INT16),
+	'PLCTYPE_UINT': ('UINT', ADST_UINT16),
+	'PLCTYPE_WORD': ('WORD', ADST_INT16),
+	'PLCTYPE_DINT': ('DINT', ADST_INT32),
+	'PLCTYPE_UDINT': ('UDINT', ADST_UINT32),
+	'PLCTYPE_DWORD': ('DWORD', ADST_INT32),
+	'PLCTYPE_TIME': ('TIME', ADST_INT32),
+	'PLCTYPE_TOD': ('TOD', ADST_INT32),
+	'PLCTYPE_DATE': ('DATE', ADST_INT32),
+	'PLCTYPE_DT': ('DT', ADST_INT32),
+	'PLCTYPE_REAL': ('REAL', ADST_REAL32),
+	'PLCTYPE_LREAL': ('LREAL', ADST_REAL64),
+}
+
+
+def percentile(values, p):
+	"""
+	:summary: nearest-rank percentile of a list of values (None for an empty list)
+	"""
+	if not values:
+		return None
+	values = sorted(values)
+	rank = max(1, int(math.ceil(p / 100.0 * len(values))))
+	return values[rank - 1]
+
+
+class Symbol():
+	"""
+	:summary: symbol of the simulated PLC, located in the PLC data area
+	"""
+	def __init__(self, name, ctype, typeName, dataType, comment=''):
+		self.name = name
+		self.ctype = ctype
+		self.typeName = typeName
+		self.dataType = dataType
+		self.comment = comment
+		self.group = INDEXGROUP_DATA
+		self.offset = 0
+		self.size = ctypes.sizeof(ctype)
+
+	def entry(self):
+		"""
+		:summary: symbol upload entry (SAdsSymbolEntry followed by name, type, comment)
+		"""
+		name, typeName, comment = self.name.encode(), self.typeName.encode(), self.comment.encode()
+		strings = name + b'\x00' + typeName + b'\x00' + comment + b'\x00'
+		length = ctypes.sizeof(SAdsSymbolEntry) + len(strings)
+		length += -length % 4
+		header = SAdsSymbolEntry(length, self.group, self.offset, self.size, self.dataType, 0,
+			len(name), len(typeName), len(comment))
+		return bytes(header) + strings.ljust(length - ctypes.sizeof(SAdsSymbolEntry), b'\x00')
+
+
+def kioskSymbols(filename=None):
+	"""
+	:summary: GOM_KIOSK members as defined by PLCVar(...) in InlineVariables.PLCVariable
+	:rtype: list
+	:return: list of Symbol (names without GOM_KIOSK prefix)
+	"""
+	if filename is None:
+		filename = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Inline', 'InlineVariables.py')
+	with open(filename, encoding='utf-8') as f:
+		tree = ast.parse(f.read())
+
+	namespace = {'plc_const': PLCconstants, 'ctypes': ctypes}
+	symbols = []
+	for node in ast.walk(tree):
+		if not isinstance(node, ast.ClassDef) or node.name != 'PLCVariable':
+			continue
+		for statement in node.body:
+			if not isinstance(statement, ast.Assign) or len(statement.targets) != 1:
+				continue
+			value = statement.value
+			if isinstance(value, ast.Constant) and isinstance(statement.targets[0], ast.Name):
+				namespace[statement.targets[0].id] = value.value
+				continue
+			if not (isinstance(value, ast.Call) and isinstance(value.func, ast.Name) and value.func.id == 'PLCVar'):
+				continue
+			name = value.args[0].value
+			ctype = eval(compile(ast.Expression(value.args[1]), filename, 'eval'), {'__builtins__': {}}, namespace)
+			if isinstance(value.args[1], ast.Attribute):
+				typeName, dataType = _PLCTYPE_NAMES.get(value.args[1].attr, (value.args[1].attr, ADST_BIGTYPE))
+			elif ctype._type_ is ctypes.c_wchar:
+				typeName, dataType = 'WSTRING({})'.format(ctype._length_ - 1), ADST_WSTRING
+			else:
+				typeName, dataType = 'STRING({})'.format(ctype._length_ - 1), ADST_STRING
+			symbols.append(Symbol(name, ctype, typeName, dataType))
+	return symbols
+
+
+class SymbolTable():
+	"""
+	:summary: symbols of the simulated PLC. Members of the GOM_KIOSK structure
+		are addressable by name, the upload lists the top level symbols only (like TwinCAT)
+	"""
+	def __init__(self, members=None, extraSymbols=0):
+		if members is None:
+			members = kioskSymbols()
+		self.version = 1
+		self.symbols = {}
+		self.topLevel = []
+
+		offset = 0
+		for member in members:
+			alignment = min(ctypes.alignment(member.ctype), 8)
+			offset += -offset % alignment
+			member.name = '{}.{}'.format(KIOSK_STRUCT, member.name)
+			member.offset = offset
+			offset += member.size
+			self.symbols[member.name.upper()] = member
+		kiosk = Symbol(KIOSK_STRUCT, ctypes.c_ubyte * max(offset, 1), 'ST_GomKiosk', ADST_BIGTYPE, 'GOM Kiosk interface')
+		self._add(kiosk, 0)
+
+		# padding for upload/parsing benchmarks
+		offset = kiosk.size
+		for i in range(extraSymbols):
+			symbol = Symbol('MAIN.aDummy_{}'.format(i), ctypes.c_int32, 'DINT', ADST_INT32, 'dummy')
+			offset += -offset % 4
+			self._add(symbol, offset)
+			offset += symbol.size
+		self.size = offset
+		self._upload = None
+		# stand-in for the datatype upload: ST_GomKiosk, its size depends on the members
+		self.datatypeSize = sum(len(member.entry()) for member in members)
+
+	def _add(self, symbol, offset):
+		symbol.offset = offset
+		self.symbols[symbol.name.upper()] = symbol
+		self.topLevel.append(symbol)
+
+	def find(self, name):
+		return self.symbols.get(name.upper())
+
+	def upload(self):
+		if self._upload is None:
+			self._upload = b''.join(symbol.entry() for symbol in self.topLevel)
+		return self._upload
+
+	def uploadInfo(self):
+		return struct.pack('<II', len(self.topLevel), len(self.upload()))
+
+	def uploadInfo2(self):
+		return self.uploadInfo() + struct.pack('<IIII', 1, self.datatypeSize, 0, 0)
+
+
+class _Connection():
+	def __init__(self, sock):
+		self.sock = sock
+		self.sendLock = threading.Lock()
+		self.peer = None  # (netId, port) of the client, known after the first request
+
+	def send(self, frame):
+		with self.sendLock:
+			self.sock.sendall(frame)
+
+
+class ADSSimulator():
+	"""
+	:summary: AMS/TCP server simulating a TwinCAT PLC runtime
+	"""
+	def __init__(self, host='127.0.0.1', port=AMSTCP_PORT, netId='127.0.0.1.1.1', adsPort=851,
+				symbols=None, latency=0.0, verbose=False):
+		self.host = host
+		self.port = port
+		self.netId = netId
+		self.adsPort = adsPort
+		self.table = symbols if symbols is not None else SymbolTable()
+		self.latency = latency
+		self.verbose = verbose
+		self.adsState = ADSSTATE_RUN
+		self.deviceState = 0
+		self.memory = bytearray(self.table.size)
+		self.requests = 0
+		self._lock = threading.RLock()
+		self._handles = {}        # handle -> Symbol
+		self._notifications = {}  # hNotification -> [connection, offset, length, last data]
+		self._nextHandle = 1
+		self._server = None
+		self._connections = []
+		self._running = False
+
+	# --- PLC side -----------------------------------------------------------
+	def set(self, name, value):
+		"""
+		:summary: change a variable from the PLC side (notifications are sent)
+		"""
+		symbol = self.table.find(name) or self.table.find('{}.{}'.format(KIOSK_STRUCT, name))
+		if symbol is None:
+			raise KeyError(name)
+		if issubclass(symbol.ctype, ctypes.Array):
+			if isinstance(value, str) and symbol.dataType != ADST_WSTRING:
+				value = value.encode()
+			data = ctypes.create_string_buffer(symbol.size).raw
+			array = symbol.ctype.from_buffer_copy(data)
+			array[:len(value)] = value
+			data = bytes(array)
+		else:
+			data = PLCfunctions._packValue(value, symbol.ctype)
+		self._write(symbol.offset, data)
+
+	def get(self, name):
+		symbol = self.table.find(name) or self.table.find('{}.{}'.format(KIOSK_STRUCT, name))
+		if symbol is None:
+			raise KeyError(name)
+		with self._lock:
+			return PLCfunctions._unpackValue(bytes(self.memory[symbol.offset:symbol.offset + symbol.size]), 0, symbol.ctype)
+
+	def onlineChange(self):
+		"""
+		:summary: simulate an online change: symbol version increases, handles become invalid
+		"""
+		with self._lock:
+			self.table.version = (self.table.version + 1) & 0xFF
+			self._handles = {}
+
+	# --- server --------------------------------------------------------------
+	def start(self):
+		"""
+		:summary: start listening (port 0 selects a free port), returns the port
+		"""
+		self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+		self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+		self._server.bind((self.host, self.port))
+		self._server.listen(5)
+		self.port = self._server.getsockname()[1]
+		self._running = True
+		threading.Thread(target=self._accept, name='ADSSimulatorAccept', daemon=True).start()
+		return self.port
+
+	def stop(self):
+		self._running = False
+		if self._server is not None:
+			self._server.close()
+			self._server = None
+		for connection in list(self._connections):
+			try:
+				connection.sock.shutdown(socket.SHUT_RDWR)
+			except OSError:
+				pass
+			connection.sock.close()
+
+	def _accept(self):
+		while self._running:
+			try:
+				sock, address = self._server.accept()
+			except OSError:
+				return
+			sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+			connection = _Connection(sock)
+			self._connections.append(connection)
+			if self.verbose:
+				print('connection from {}'.format(address))
+			threading.Thread(target=self._serve, args=(connection,), name='ADSSimulatorClient', daemon=True).start()
+
+	def _serve(self, connection):
+		netId = PLCtcp.netIdFromString(self.netId)
+		try:
+			while True:
+				header, payload = PLCtcp.recvFrame(connection.sock)
+				targetNetId, targetPort, sourceNetId, sourcePort, command, _, _, _, invokeId = header
+				connection.peer = (sourceNetId, sourcePort)
+				self.requests += 1
+				if self.latency:
+					time.sleep(self.latency)
+				if targetPort != self.adsPort:
+					errorCode, response, after = 6, b'', None  # target port not found
+				else:
+					errorCode, response, after = 0, b'', None
+					try:
+						response, after = self._dispatch(connection, command, payload)
+					except struct.error:
+						response = struct.pack('<I', ADSERR_DEVICE_INVALIDSIZE)
+				connection.send(PLCtcp.packFrame(sourceNetId, sourcePort, netId, self.adsPort,
+					command, AMS_STATEFLAG_RESPONSE, response, errorCode, invokeId))
+				if after is not None:
+					after()
+		except (OSError, ConnectionError, struct.error):
+			pass
+		with self._lock:
+			for hNotification in [h for h, n in self._notifications.items() if n[0] is connection]:
+				del self._notifications[hNotification]
+		if connection in self._connections:
+			self._connections.remove(connection)
+		connection.sock.close()
+
+	def _dispatch(self, connection, command, payload):
+		"""
+		:return: (response payload, callable to run after the response was sent or None)
+		"""
+		if self.verbose:
+			print('command {} ({} bytes)'.format(command, len(payload)))
+		if command == ADSSRVID_READDEVICEINFO:
+			return struct.pack('<IBBH16s', 0, 3, 1, 4024, b'GOM Simulator'), None
+		if command == ADSSRVID_READSTATE:
+			return struct.pack('<IHH', 0, self.adsState, self.deviceState), None
+		if command == ADSSRVID_WRITECTRL:
+			self.adsState, self.deviceState, _ = struct.unpack_from('<HHI', payload)
+			return struct.pack('<I', 0), None
+		if command == ADSSRVID_READ:
+			indexGroup, indexOffset, length = struct.unpack_from('<III', payload)
+			errorCode, data = self.read(indexGroup, indexOffset, length)
+			return struct.pack('<II', errorCode, len(data)) + data, None
+		if command == ADSSRVID_WRITE:
+			indexGroup, indexOffset, length = struct.unpack_from('<III', payload)
+			return struct.pack('<I', self.write(indexGroup, indexOffset, payload[12:12 + length])), None
+		if command == ADSSRVID_READWRITE:
+			indexGroup, indexOffset, readLength, writeLength = struct.unpack_from('<IIII', payload)
+			errorCode, data = self.readWrite(indexGroup, indexOffset, readLength, payload[16:16 + writeLength])
+			return struct.pack('<II', errorCode, len(data)) + data, None
+		if command == ADSSRVID_ADDDEVICENOTE:
+			indexGroup, indexOffset, length, transMode, _, _ = struct.unpack_from('<IIIIII', payload)
+			errorCode, hNotification = self._addNotification(connection, indexGroup, indexOffset, length)
+			after = (lambda: self._sendNotifications(force=hNotification)) if not errorCode else None
+			return struct.pack('<II', errorCode, hNotification), after
+		if command == ADSSRVID_DELDEVICENOTE:
+			(hNotification,) = struct.unpack_from('<I', payload)
+			with self._lock:
+				found = self._notifications.pop(hNotification, None) is not None
+			return struct.pack('<I', 0 if found else ADSERR_DEVICE_NOTIFYHNDINVALID), None
+		return struct.pack('<I', ADSERR_DEVICE_SRVNOTSUPP), None
+
+	# --- index groups --------------------------------------------------------
+	def _resolve(self, indexGroup, indexOffset, length):
+		"""
+		:summary: map a variable access to an offset in the data area
+		:rtype: (int, int, int)
+		:return: errCode, offset, length
+		"""
+		if indexGroup == INDEXGROUP_DATA:
+			if indexOffset + length > len(self.memory):
+				return ADSERR_DEVICE_INVALIDOFFSET, 0, 0
+			return 0, indexOffset, length
+		if indexGroup == ADSIGRP_SYM_VALBYHND:
+			symbol = self._handles.get(indexOffset)
+			if symbol is None:
+				return ADSERR_DEVICE_SYMBOLNOTFOUND, 0, 0
+			if length > symbol.size:
+				return ADSERR_DEVICE_INVALIDSIZE, 0, 0
+			return 0, symbol.offset, length
+		return ADSERR_DEVICE_INVALIDGRP, 0, 0
+
+	def read(self, indexGroup, indexOffset, length):
+		with self._lock:
+			if indexGroup == ADSIGRP_SYM_UPLOADINFO:
+				return 0, self.table.uploadInfo()[:length]
+			if indexGroup == ADSIGRP_SYM_UPLOADINFO2:
+				return 0, self.table.uploadInfo2()[:length]
+			if indexGroup == ADSIGRP_SYM_UPLOAD:
+				return 0, self.table.upload()[:length]
+			if indexGroup == ADSIGRP_SYM_VERSION:
+				return 0, bytes([self.table.version])[:length]
+			errCode, offset, length = self._resolve(indexGroup, indexOffset, length)
+			if errCode:
+				return errCode, b''
+			return 0, bytes(self.memory[offset:offset + length])
+
+	def write(self, indexGroup, indexOffset, data):
+		with self._lock:
+			if indexGroup == ADSIGRP_SYM_RELEASEHND:
+				(handle,) = struct.unpack_from('<I', data)
+				return 0 if self._handles.pop(handle, None) is not None else ADSERR_DEVICE_SYMBOLNOTFOUND
+			errCode, offset, length = self._resolve(indexGroup, indexOffset, len(data))
+			if errCode:
+				return errCode
+			self._write(offset, data)
+			return 0
+
+	def _write(self, offset, data):
+		with self._lock:
+			self.memory[offset:offset + len(data)] = data
+		self._sendNotifications()
+
+	def readWrite(self, indexGroup, indexOffset, readLength, data):
+		with self._lock:
+			if indexGroup in (ADSIGRP_SYM_HNDBYNAME, ADSIGRP_SYM_VALBYNAME, ADSIGRP_SYM_INFOBYNAMEEX):
+				symbol = self.table.find(data.rstrip(b'\x00').decode('ascii', 'replace'))
+				if symbol is None:
+					return ADSERR_DEVICE_SYMBOLNOTFOUND, b''
+				if indexGroup == ADSIGRP_SYM_HNDBYNAME:
+					handle = self._nextHandle
+					self._nextHandle += 1
+					self._handles[handle] = symbol
+					return 0, struct.pack('<I', handle)[:readLength]
+				if indexGroup == ADSIGRP_SYM_VALBYNAME:
+					return 0, bytes(self.memory[symbol.offset:symbol.offset + min(readLength, symbol.size)])
+				return 0, symbol.entry()[:readLength]
+			if indexGroup == ADSIGRP_SUMUP_READ:
+				return 0, self._sumRead(indexOffset, data)
+			if indexGroup == ADSIGRP_SUMUP_WRITE:
+				return 0, self._sumWrite(indexOffset, data)
+			if indexGroup == ADSIGRP_SUMUP_READWRITE:
+				return 0, self._sumReadWrite(indexOffset, data)
+			return ADSERR_DEVICE_INVALIDGRP, b''
+
+	def _sumRead(self, count, data):
+		errCodes, values = [], []
+		for i in range(count):
+			indexGroup, indexOffset, length = struct.unpack_from('<III', data, 12 * i)
+			errCode, value = self.read(indexGroup, indexOffset, length)
+			errCodes.append(errCode)
+			values.append(value.ljust(length, b'\x00'))
+		return struct.pack('<{}I'.format(count), *errCodes) + b''.join(values)
+
+	def _sumWrite(self, count, data):
+		errCodes = []
+		offset = 12 * count
+		for i in range(count):
+			indexGroup, indexOffset, length = struct.unpack_from('<III', data, 12 * i)
+			errCodes.append(self.write(indexGroup, indexOffset, data[offset:offset + length]))
+			offset += length
+		return struct.pack('<{}I'.format(count), *errCodes)
+
+	def _sumReadWrite(self, count, data):
+		results, values = [], []
+		offset = 16 * count
+		for i in range(count):
+			indexGroup, indexOffset, readLength, writeLength = struct.unpack_from('<IIII', data, 16 * i)
+			errCode, value = self.readWrite(indexGroup, indexOffset, readLength, data[offset:offset + writeLength])
+			offset += writeLength
+			results.append(struct.pack('<II', errCode, len(value)))
+			values.append(value)
+		return b''.join(results) + b''.join(values)
+
+	# --- notifications -------------------------------------------------------
+	def _addNotification(self, connection, indexGroup, indexOffset, length):
+		with self._lock:
+			errCode, offset, length = self._resolve(indexGroup, indexOffset, length)
+			if errCode:
+				return errCode, 0
+			hNotification = self._nextHandle
+			self._nextHandle += 1
+			self._notifications[hNotification] = [connection, offset, length, None]
+			return 0, hNotification
+
+	def _sendNotifications(self, force=None):
+		pending = {}
+		with self._lock:
+			for hNotification, notification in self._notifications.items():
+				connection, offset, length, last = notification
+				data = bytes(self.memory[offset:offset + length])
+				if data != last or hNotification == force:
+					notification[3] = data
+					pending.setdefault(connection, []).append((hNotification, data))
+		if not pending:
+			return
+		netId = PLCtcp.netIdFromString(self.netId)
+		timestamp = PLCfunctions.adsFiletime()
+		for connection, samples in pending.items():
+			if connection.peer is None:
+				continue
+			payload = PLCtcp.packNotification([(timestamp, samples)])
+			try:
+				connection.send(PLCtcp.packFrame(connection.peer[0], connection.peer[1], netId, self.adsPort,
+					ADSSRVID_DEVICENOTE, AMS_STATEFLAG_REQUEST, payload))
+			except OSError:
+				pass
+
+
+##############################################################################
+# benchmark of PLCVariable like traffic over the portable backend
+
+def benchmark(count=2000, latency=0.0):
+	"""
+	:summary: round trip latency (ms percentiles) and throughput (calls/s) of
+		handle acquisition, single reads/writes, sum reads and notifications
+		against a local simulator via PLCtcp
+	"""
+	sim = ADSSimulator(port=0, latency=latency)
+	sim.start()
+	previous = PLCfunctions.setAdsDll(PLCtcp.AdsTcpDll('127.0.0.1', sim.port))
+	try:
+		PLCfunctions.adsPortOpen()
+		adr = PLCfunctions.adsGetLocalAddress()
+		adr.setAdr(sim.netId)
+		adr.setPort(sim.adsPort)
+		members = [s for s in sim.table.symbols.values() if s.name.startswith(KIOSK_STRUCT + '.')]
+		results = {'variables': len(members)}
+
+		start = time.perf_counter()
+		variables = [PLCfunctions.AdsVariable(adr, PLCfunctions.adsGetHandle(adr, s.name), s.ctype) for s in members]
+		results['handles_s'] = time.perf_counter() - start
+
+		def measure(name, fct, n):
+			durations = []
+			for i in range(n):
+				start = time.perf_counter()
+				fct(i)
+				durations.append(time.perf_counter() - start)
+			total = sum(durations)
+			results[name] = {'calls_s': n / total if total else None,
+				'p50_ms': percentile(durations, 50) * 1000, 'p95_ms': percentile(durations, 95) * 1000,
+				'p99_ms': percentile(durations, 99) * 1000}
+
+		values = [v.read() for v in variables]
+		measure('read', lambda i: variables[i % len(variables)].read(), count)
+		measure('write', lambda i: variables[i % len(variables)].write(values[i % len(variables)]), count)
+		requests = [(v.handle, v.plcDataType) for v in variables]
+		measure('sum_read_all', lambda i: PLCfunctions.adsSumReadByHandle(adr, requests), max(1, count // 20))
+
+		received = threading.Event()
+		def onNotification(pAddr, pNotification, user):
+			received.set()
+		callback = PLCfunctions.AdsNotificationCallback(onNotification)
+		pulse, symbol = [(v, s) for v, s in zip(variables, members) if s.ctype is PLCTYPE_BOOL][0]
+		hNotification = PLCfunctions.adsAddNotificationByHandle(adr, pulse.handle, PLCTYPE_BOOL, callback)
+		received.wait(1.0)
+		def toggle(i):
+			# change on the PLC side, wait for the notification
+			received.clear()
+			sim.set(symbol.name, (i + 1) % 2)
+			received.wait(1.0)
+		measure('notification', toggle, max(1, count // 10))
+		PLCfunctions.adsSyncDelDeviceNotificationReq(adr, hNotification)
+
+		for v in variables:
+			PLCfunctions.adsReleaseHandle(adr, v.handle)
+		PLCfunctions.adsPortClose()
+		results['requests'] = sim.requests
+		return results
+	finally:
+		PLCfunctions.setAdsDll(previous)
+		sim.stop()
+
+
+def main(argv=None):
+	parser = argparse.ArgumentParser(description='Local ADS (AMS/TCP) PLC simulator with GOM_KIOSK symbols')
+	parser.add_argument('--host', default='127.0.0.1')
+	parser.add_argument('--port', type=int, default=AMSTCP_PORT)
+	parser.add_argument('--netid', default='127.0.0.1.1.1', help='AMS net id of the simulated PLC')
+	parser.add_argument('--ads-port', type=int, default=851)
+	parser.add_argument('--latency', type=float, default=0.0, help='injected latency per request (s)')
+	parser.add_argument('--extra-symbols', type=int, default=0, help='additional dummy symbols in the upload')
+	parser.add_argument('--set', action='append', default=[], metavar='NAME=VALUE', help='initial value (json)')
+	parser.add_argument('--benchmark', type=int, metavar='COUNT', help='run the round trip benchmark and exit')
+	parser.add_argument('--verbose', '-v', action='store_true')
+	args = parser.parse_args(argv)
+
+	if args.benchmark:
+		print(json.dumps(benchmark(args.benchmark, args.latency), indent=2))
+		return 0
+
+	sim = ADSSimulator(args.host, args.port, args.netid, args.ads_port,
+		SymbolTable(extraSymbols=args.extra_symbols), args.latency, args.verbose)
+	for assignment in args.set:
+		name, value = assignment.split('=', 1)
+		try:
+			value = json.loads(value)
+		except ValueError:
+			pass
+		sim.set(name, value)
+	sim.start()
+	print('ADS simulator {}:{} net id {} port {}, {} symbols'.format(
+		args.host, sim.port, args.netid, args.ads_port, len(sim.table.symbols)))
+	try:
+		while True:
+			time.sleep(1)
+	except KeyboardInterrupt:
+		pass
+	finally:
+		sim.stop()
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit(main())
@@ -116,15 +116,24 @@ class AmsAddr():
 
 class SAdsNotificationAttrib(Structure):
 	_pack_ = 1
-	_fields_ = [("cbLength", c_ulong),
-				("nTransMode", c_ulong),
-				("nMaxDelay", c_ulong),
-				("nCycleTime", c_ulong)]
+	_fields_ = [("cbLength", c_uint32),
+				("nTransMode", c_uint32),
+				("nMaxDelay", c_uint32),
+				("nCycleTime", c_uint32)]
 
 class SAdsSymbolUploadInfo(Structure):
 	_pack_ = 1
-	_fields_ = [("nSymbols", c_ulong),
-				("nSymSize", c_ulong)]
+	_fields_ = [("nSymbols", c_uint32),
+				("nSymSize", c_uint32)]
+
+class SAdsSymbolUploadInfo2(Structure):
+	_pack_ = 1
+	_fields_ = [("nSymbols", c_uint32),
+				("nSymSize", c_uint32),
+				("nDatatypes", c_uint32),
+				("nDatatypeSize", c_uint32),
+				("nMaxDynSymbols", c_uint32),
+				("nUsedDynSymbols", c_uint32)]
 
 class SAdsSymbolEntry(Structure):
 	"""
@@ -141,12 +150,22 @@ class SAdsSymbolEntry(Structure):
 	:ivar commentLength: length of comment
 	"""
 	_pack_ = 1
-	_fields_ = [("entryLength", c_ulong),
-				("iGroup", c_ulong),
-				("iOffs", c_ulong),
-				("size", c_ulong),
-				("dataType", c_ulong),
-				("flags", c_ulong),
+	_fields_ = [("entryLength", c_uint32),
+				("iGroup", c_uint32),
+				("iOffs", c_uint32),
+				("size", c_uint32),
+				("dataType", c_uint32),
+				("flags", c_uint32),
 				("nameLength", c_ushort),
 				("typeLength", c_ushort),
-				("commentLength", c_ushort)]
\ No newline at end of file
+				("commentLength", c_ushort)]
+
+class SAdsNotificationHeader(Structure):
+	"""
+	:summary: header of a device notification sample,
+		followed by cbSampleSize bytes of data
+	"""
+	_pack_ = 1
+	_fields_ = [("hNotification", c_uint32),
+				("nTimeStamp", c_uint64),
+				("cbSampleSize", c_uint32)]
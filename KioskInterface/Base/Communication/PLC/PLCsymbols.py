@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+# Script: PLC symbol table cache
+#
+# PLEASE NOTE that this file is part of the GOM Software.
+# You are not allowed to distribute this file to a third party without written notice.
+#
+# Please, do not copy and/or modify this script.
+# All modifications of KioskInterface should happen in the CustomPatches script.
+# Ignoring this advice will make KioskInterface fail after Software update.
+#
+# Copyright (c) 2021 Carl Zeiss GOM Metrology GmbH
+# All rights reserved.
+
+import collections
+import json
+import os
+
+from . import PLCfunctions
+
+
+SymbolLocation = collections.namedtuple('SymbolLocation', 'group offset size')
+
+
+class SymbolCache():
+	"""
+	:summary: symbol table of the PLC, uploaded once and kept in memory and in a local file.
+		The table is validated by its fingerprint (symbol version / online change counter,
+		size of the symbol and datatype upload, one sum read), only a changed table is uploaded again.
+
+		The upload contains the top level symbols only, locations of structure members
+		(e.g. GOM_KIOSK.bPulse) are resolved once and cached with the table (resolve).
+
+	:ivar uploads: number of symbol uploads done
+	:ivar source: where the current table came from ('memory', 'file', 'upload')
+	:ivar resolved: number of member locations requested from the PLC
+	"""
+	def __init__(self, filename=None):
+		self.filename = filename
+		self.fingerprint = None
+		self.netId = None
+		self.uploads = 0
+		self.source = None
+		self.resolved = 0
+		self._nSymbols = 0
+		self._entries = b''
+		self._symbols = None
+		self._members = {}   # upper case name -> [group, offset, size]
+
+	def load(self, adr):
+		"""
+		:summary: make sure the cached table matches the PLC, upload it if not
+		:param structs.AmsAddr adr: local or remote AmsAddr
+		:rtype: bool
+		:return: True if the table was valid without upload
+		"""
+		netId = adr.toString()
+		fingerprint = list(PLCfunctions.adsReadSymbolFingerprint(adr))
+		if self.fingerprint == fingerprint and self.netId == netId:
+			self.source = 'memory'
+			return True
+		if self._loadFile(netId, fingerprint):
+			self.source = 'file'
+			return True
+
+		nSymbols, entries = PLCfunctions.adsReadSymbolUpload(adr)
+		self.uploads += 1
+		# the table may change during the upload, use the fingerprint read before
+		self._set(netId, fingerprint, nSymbols, entries)
+		self.source = 'upload'
+		self._saveFile()
+		return False
+
+	def invalidate(self):
+		self.fingerprint = None
+
+	def _set(self, netId, fingerprint, nSymbols, entries):
+		self.netId = netId
+		self.fingerprint = fingerprint
+		self._nSymbols = nSymbols
+		self._entries = entries
+		self._symbols = None
+		self._members = {}
+
+	@property
+	def symbols(self):
+		"""
+		:summary: PLCfunctions.SymbolDeclarations of the table, created on first access
+		"""
+		if self._symbols is None:
+			self._symbols = PLCfunctions.SymbolDeclarations(self._entries, self._nSymbols)
+		return self._symbols
+
+	def find(self, name):
+		"""
+		:summary: SymbolInfo of the name or None
+		"""
+		return self.symbols.find(name)
+
+	def resolve(self, adr, names):
+		"""
+		:summary: locations of the names for the validated table (see load), from the table,
+			the cache or (not yet cached names) one INFOBYNAMEEX sum command
+		:rtype: list
+		:return: list of (errCode, SymbolLocation) in request order, SymbolLocation is None on error
+		"""
+		results = {}
+		missing = []
+		for name in names:
+			key = name.upper()
+			if key in self._members:
+				results[key] = (0, SymbolLocation(*self._members[key]))
+				continue
+			info = self.find(name) if '.' not in name else None
+			if info is not None:
+				results[key] = (0, SymbolLocation(info.group, info.offset, info.size))
+			elif key not in missing:
+				missing.append(key)
+		if missing:
+			self.resolved += len(missing)
+			for key, (errCode, info) in zip(missing, PLCfunctions.adsSumGetSymbolInfo(adr, missing)):
+				if errCode:
+					results[key] = (errCode, None)
+				else:
+					self._members[key] = [info.group, info.offset, info.size]
+					results[key] = (0, SymbolLocation(info.group, info.offset, info.size))
+			self._saveFile()
+		return [results[name.upper()] for name in names]
+
+	def _loadFile(self, netId, fingerprint):
+		if self.filename is None or not os.path.exists(self.filename):
+			return False
+		try:
+			with open(self.filename, 'rb') as f:
+				header = json.loads(f.readline().decode('utf-8'))
+				if header.get('netId') != netId or header.get('fingerprint') != fingerprint:
+					return False
+				entries = f.read()
+			if len(entries) != fingerprint[2]:
+				return False
+		except (OSError, ValueError):
+			return False
+		self._set(netId, fingerprint, header['nSymbols'], entries)
+		self._members = header.get('members', {})
+		return True
+
+	def _saveFile(self):
+		if self.filename is None:
+			return
+		header = {'netId': self.netId, 'fingerprint': self.fingerprint, 'nSymbols': self._nSymbols,
+			'members': self._members}
+		temp = self.filename + '.tmp'
+		try:
+			with open(temp, 'wb') as f:
+				f.write(json.dumps(header).encode('utf-8') + b'\n')
+				f.write(self._entries)
+			os.replace(temp, self.filename)
+		except OSError:
+			pass
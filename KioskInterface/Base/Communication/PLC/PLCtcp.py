@@ -0,0 +1,417 @@
+# -*- coding: utf-8 -*-
+# Script: PLC ADS over AMS/TCP (without TcAdsDll)
+#
+# PLEASE NOTE that this file is part of the GOM Software.
+# You are not allowed to distribute this file to a third party without written notice.
+#
+# Please, do not copy and/or modify this script.
+# All modifications of KioskInterface should happen in the CustomPatches script.
+# Ignoring this advice will make KioskInterface fail after Software update.
+#
+# Copyright (c) 2021 Carl Zeiss GOM Metrology GmbH
+# All rights reserved.
+
+# Portable ADS backend, talks AMS/TCP (port 48898) directly to a PLC or to PLCsimulator.
+# AdsTcpDll provides the TcAdsDll functions used by PLCfunctions, so the complete
+# PLCfunctions API (handles, sum commands, notifications) works on top of it:
+#
+#   PLCfunctions.setAdsDll(PLCtcp.AdsTcpDll('192.168.0.10', localNetId='192.168.0.2.1.1'))
+#
+# The PLC needs a static route for localNetId (unlike with the TwinCAT router).
+
+from ctypes import *
+import socket
+import struct
+import threading
+
+from .PLCconstants import *
+from .PLCstructs import *
+from . import PLCfunctions
+
+
+AMSTCP_HEADER = struct.Struct('<HI')
+AMS_HEADER = struct.Struct('<6sH6sHHHIII')
+
+# client errors reported like TcAdsDll does
+ADSERR_CLIENT_SYNCTIMEOUT = 1861
+ADSERR_CLIENT_PORTNOTOPEN = 1864
+ADSERR_CLIENT_INVALIDRESPONSE = 1876
+ADSERR_DEVICE_INVALIDSIZE = 1797
+
+
+def netIdFromString(netId):
+	"""
+	:summary: '5.1.2.3.1.1' -> 6 bytes
+	"""
+	parts = [int(i) for i in netId.split('.')]
+	if len(parts) != 6:
+		raise ValueError('Invalid AMS net id: {}'.format(netId))
+	return bytes(parts)
+
+def netIdToString(netId):
+	return '.'.join(str(i) for i in netId)
+
+
+def packFrame(targetNetId, targetPort, sourceNetId, sourcePort, command, stateFlags, payload, errorCode=0, invokeId=0):
+	"""
+	:summary: complete AMS/TCP frame (tcp header, ams header, ads payload)
+	"""
+	header = AMS_HEADER.pack(targetNetId, targetPort, sourceNetId, sourcePort,
+		command, stateFlags, len(payload), errorCode, invokeId)
+	return AMSTCP_HEADER.pack(0, len(header) + len(payload)) + header + payload
+
+def recvExactly(sock, length):
+	data = b''
+	while len(data) < length:
+		chunk = sock.recv(length - len(data))
+		if not chunk:
+			raise ConnectionError('connection closed')
+		data += chunk
+	return data
+
+def recvFrame(sock):
+	"""
+	:summary: read one AMS/TCP frame
+	:rtype: (tuple, bytes)
+	:return: unpacked AMS header, ads payload
+	"""
+	_, length = AMSTCP_HEADER.unpack(recvExactly(sock, AMSTCP_HEADER.size))
+	data = recvExactly(sock, length)
+	header = AMS_HEADER.unpack_from(data)
+	return header, data[AMS_HEADER.size:AMS_HEADER.size + header[6]]
+
+def packNotification(stamps):
+	"""
+	:summary: payload of a device notification
+	:param stamps: list of (timestamp, [(hNotification, data)])
+	"""
+	body = struct.pack('<I', len(stamps))
+	for timestamp, samples in stamps:
+		body += struct.pack('<QI', timestamp, len(samples))
+		for hNotification, data in samples:
+			body += struct.pack('<II', hNotification, len(data)) + data
+	return struct.pack('<I', len(body)) + body
+
+def unpackNotification(payload):
+	"""
+	:summary: inverse of packNotification
+	:rtype: list
+	:return: list of (timestamp, hNotification, data)
+	"""
+	samples = []
+	(stampCount,) = struct.unpack_from('<I', payload, 4)
+	offset = 8
+	for _ in range(stampCount):
+		timestamp, sampleCount = struct.unpack_from('<QI', payload, offset)
+		offset += 12
+		for _ in range(sampleCount):
+			hNotification, size = struct.unpack_from('<II', payload, offset)
+			offset += 8
+			samples.append((timestamp, hNotification, payload[offset:offset + size]))
+			offset += size
+	return samples
+
+
+class AdsTcpClient:
+	"""
+	:summary: AMS/TCP connection with request/response matching by invoke id.
+		A receiver thread reads responses and device notifications.
+	"""
+	def __init__(self, host, port=AMSTCP_PORT, localNetId='127.0.0.1.1.1', localPort=32905, timeout=5.0):
+		self.host = host
+		self.port = port
+		self.localNetId = netIdFromString(localNetId)
+		self.localPort = localPort
+		self.timeout = timeout
+		self.onNotification = None  # fn(sourceNetId, sourcePort, timestamp, hNotification, data)
+		self._socket = None
+		self._receiver = None
+		self._sendLock = threading.Lock()
+		self._lock = threading.Lock()
+		self._invokeId = 0
+		self._pending = {}
+
+	@property
+	def connected(self):
+		return self._socket is not None
+
+	def connect(self):
+		if self._socket is not None:
+			return
+		sock = socket.create_connection((self.host, self.port), self.timeout)
+		sock.settimeout(None)
+		sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+		self._socket = sock
+		self._receiver = threading.Thread(target=self._receive, args=(sock,), name='AdsTcpReceiver', daemon=True)
+		self._receiver.start()
+
+	def close(self):
+		sock, self._socket = self._socket, None
+		if sock is not None:
+			try:
+				sock.shutdown(socket.SHUT_RDWR)
+			except OSError:
+				pass
+			sock.close()
+		self._failPending()
+
+	def _failPending(self):
+		with self._lock:
+			pending, self._pending = self._pending, {}
+		for entry in pending.values():
+			entry[1] = None
+			entry[0].set()
+
+	def _receive(self, sock):
+		try:
+			while True:
+				header, payload = recvFrame(sock)
+				command, stateFlags, errorCode, invokeId = header[4], header[5], header[7], header[8]
+				if command == ADSSRVID_DEVICENOTE:
+					if self.onNotification is not None:
+						for timestamp, hNotification, data in unpackNotification(payload):
+							self.onNotification(header[2], header[3], timestamp, hNotification, data)
+					continue
+				with self._lock:
+					entry = self._pending.pop(invokeId, None)
+				if entry is not None:
+					entry[1] = (errorCode, payload)
+					entry[0].set()
+		except (OSError, ConnectionError, struct.error):
+			pass
+		if self._socket is sock:
+			self._socket = None
+		self._failPending()
+
+	def request(self, targetNetId, targetPort, command, payload=b''):
+		"""
+		:summary: send an ADS request and wait for the response
+		:rtype: (int, bytes)
+		:return: AMS error code (or client error), response payload
+		"""
+		if self._socket is None:
+			return ADSERR_CLIENT_PORTNOTOPEN, b''
+		event = threading.Event()
+		entry = [event, None]
+		with self._lock:
+			self._invokeId = (self._invokeId + 1) & 0xFFFFFFFF
+			invokeId = self._invokeId
+			self._pending[invokeId] = entry
+		frame = packFrame(targetNetId, targetPort, self.localNetId, self.localPort,
+			command, AMS_STATEFLAG_REQUEST, payload, 0, invokeId)
+		try:
+			with self._sendLock:
+				self._socket.sendall(frame)
+		except (OSError, AttributeError):
+			with self._lock:
+				self._pending.pop(invokeId, None)
+			self.close()
+			return ADSERR_CLIENT_PORTNOTOPEN, b''
+		if not event.wait(self.timeout):
+			with self._lock:
+				self._pending.pop(invokeId, None)
+			return ADSERR_CLIENT_SYNCTIMEOUT, b''
+		if entry[1] is None:
+			return ADSERR_CLIENT_PORTNOTOPEN, b''
+		return entry[1]
+
+
+def _adsFunction(*argtypes):
+	"""
+	:summary: wrap a method as ctypes function pointer, exceptions become ADS error codes
+	"""
+	prototype = CFUNCTYPE(c_long, *argtypes)
+	def decorator(method):
+		def bind(self):
+			def call(*args):
+				try:
+					return method(self, *args)
+				except struct.error:
+					return ADSERR_CLIENT_INVALIDRESPONSE
+				except Exception:
+					return ADSERR_CLIENT_PORTNOTOPEN
+			return prototype(call)
+		bind.adsFunction = True
+		return bind
+	return decorator
+
+
+class AdsTcpDll:
+	"""
+	:summary: stand-in for TcAdsDll (see PLCfunctions.setAdsDll) based on AdsTcpClient.
+		Pointers are received as plain addresses, results are copied into the caller buffers.
+	"""
+	EARLY_SAMPLES = 16  # max. samples kept per notification until its add request returned
+
+	def __init__(self, host, port=AMSTCP_PORT, localNetId='127.0.0.1.1.1', localPort=32905, timeout=5.0):
+		self.client = AdsTcpClient(host, port, localNetId, localPort, timeout)
+		self.client.onNotification = self._onNotification
+		self._notifications = {}  # (netId, port, hNotification) -> (callback address, user)
+		self._early = {}          # samples received before the add request returned
+		self._adding = {}         # (netId, port) -> number of pending add requests
+		self._notificationLock = threading.Lock()
+		for name in dir(type(self)):
+			member = getattr(type(self), name)
+			if getattr(member, 'adsFunction', False):
+				setattr(self, name, member(self))
+
+	@staticmethod
+	def _target(pAddr):
+		addr = SAmsAddr.from_address(pAddr)
+		return bytes(addr.netId), addr.port
+
+	@staticmethod
+	def _result(payload):
+		(result,) = struct.unpack_from('<I', payload)
+		return result
+
+	def _request(self, pAddr, command, payload=b''):
+		netId, port = self._target(pAddr)
+		errorCode, response = self.client.request(netId, port, command, payload)
+		if not errorCode:
+			errorCode = self._result(response)
+		return errorCode, response
+
+	@_adsFunction()
+	def AdsGetDllVersion(self):
+		return 0
+
+	@_adsFunction()
+	def AdsPortOpen(self):
+		try:
+			self.client.connect()
+		except OSError:
+			return 0
+		return self.client.localPort
+
+	@_adsFunction()
+	def AdsPortClose(self):
+		self.client.close()
+		with self._notificationLock:
+			self._notifications = {}
+			self._early = {}
+			self._adding = {}
+		return 0
+
+	@_adsFunction(c_void_p)
+	def AdsGetLocalAddress(self, pAddr):
+		addr = SAmsAddr.from_address(pAddr)
+		memmove(addressof(addr.netId), self.client.localNetId, 6)
+		addr.port = self.client.localPort
+		return 0
+
+	@_adsFunction(c_void_p, c_void_p, c_void_p)
+	def AdsSyncReadStateReq(self, pAddr, pAdsState, pDeviceState):
+		errorCode, response = self._request(pAddr, ADSSRVID_READSTATE)
+		if errorCode:
+			return errorCode
+		adsState, deviceState = struct.unpack_from('<HH', response, 4)
+		c_int.from_address(pAdsState).value = adsState
+		c_int.from_address(pDeviceState).value = deviceState
+		return 0
+
+	@_adsFunction(c_void_p, c_void_p, c_void_p)
+	def AdsSyncReadDeviceInfoReq(self, pAddr, pName, pVersion):
+		errorCode, response = self._request(pAddr, ADSSRVID_READDEVICEINFO)
+		if errorCode:
+			return errorCode
+		memmove(pVersion, response[4:8], sizeof(SAdsVersion))
+		memmove(pName, response[8:24], 16)
+		return 0
+
+	@_adsFunction(c_void_p, c_ushort, c_ushort, c_ulong, c_void_p)
+	def AdsSyncWriteControlReq(self, pAddr, adsState, deviceState, length, pData):
+		payload = struct.pack('<HHI', adsState, deviceState, length) + string_at(pData, length)
+		return self._request(pAddr, ADSSRVID_WRITECTRL, payload)[0]
+
+	@_adsFunction(c_void_p, c_ulong, c_ulong, c_ulong, c_void_p)
+	def AdsSyncWriteReq(self, pAddr, indexGroup, indexOffset, length, pData):
+		payload = struct.pack('<III', indexGroup, indexOffset, length) + string_at(pData, length)
+		return self._request(pAddr, ADSSRVID_WRITE, payload)[0]
+
+	@_adsFunction(c_void_p, c_ulong, c_ulong, c_ulong, c_void_p)
+	def AdsSyncReadReq(self, pAddr, indexGroup, indexOffset, length, pData):
+		errorCode, response = self._request(pAddr, ADSSRVID_READ, struct.pack('<III', indexGroup, indexOffset, length))
+		if errorCode:
+			return errorCode
+		(size,) = struct.unpack_from('<I', response, 4)
+		if size > length:
+			return ADSERR_DEVICE_INVALIDSIZE
+		memmove(pData, response[8:8 + size], size)
+		return 0
+
+	@_adsFunction(c_void_p, c_ulong, c_ulong, c_ulong, c_void_p, c_ulong, c_void_p)
+	def AdsSyncReadWriteReq(self, pAddr, indexGroup, indexOffset, readLength, pRead, writeLength, pWrite):
+		payload = struct.pack('<IIII', indexGroup, indexOffset, readLength, writeLength) + string_at(pWrite, writeLength)
+		errorCode, response = self._request(pAddr, ADSSRVID_READWRITE, payload)
+		if errorCode:
+			return errorCode
+		(size,) = struct.unpack_from('<I', response, 4)
+		if size > readLength:
+			return ADSERR_DEVICE_INVALIDSIZE
+		memmove(pRead, response[8:8 + size], size)
+		return 0
+
+	@_adsFunction(c_void_p, c_ulong, c_ulong, c_void_p, c_void_p, c_ulong, c_void_p)
+	def AdsSyncAddDeviceNotificationReq(self, pAddr, indexGroup, indexOffset, pAttrib, pCallback, user, pNotification):
+		attrib = SAdsNotificationAttrib.from_address(pAttrib)
+		payload = struct.pack('<IIIIII16x', indexGroup, indexOffset,
+			attrib.cbLength, attrib.nTransMode, attrib.nMaxDelay, attrib.nCycleTime)
+		target = self._target(pAddr)
+		with self._notificationLock:
+			self._adding[target] = self._adding.get(target, 0) + 1
+		try:
+			errorCode, response = self._request(pAddr, ADSSRVID_ADDDEVICENOTE, payload)
+			if errorCode:
+				return errorCode
+			(hNotification,) = struct.unpack_from('<I', response, 4)
+			key = target + (hNotification,)
+			with self._notificationLock:
+				self._notifications[key] = (pCallback, user)
+				# the server sends the first sample right away, it may have been received already
+				for timestamp, data in self._early.pop(key, []):
+					self._invoke(key, pCallback, user, timestamp, data)
+			c_ulong.from_address(pNotification).value = hNotification
+			return 0
+		finally:
+			with self._notificationLock:
+				self._adding[target] -= 1
+				if not self._adding[target]:
+					# no add request pending: samples of unknown handles are stale
+					del self._adding[target]
+					for key in [key for key in self._early if key[:2] == target]:
+						del self._early[key]
+
+	@_adsFunction(c_void_p, c_ulong)
+	def AdsSyncDelDeviceNotificationReq(self, pAddr, hNotification):
+		netId, port = self._target(pAddr)
+		with self._notificationLock:
+			self._notifications.pop((netId, port, hNotification), None)
+			self._early.pop((netId, port, hNotification), None)
+		return self._request(pAddr, ADSSRVID_DELDEVICENOTE, struct.pack('<I', hNotification))[0]
+
+	def _onNotification(self, netId, port, timestamp, hNotification, data):
+		key = (netId, port, hNotification)
+		with self._notificationLock:
+			entry = self._notifications.get(key)
+			if entry is None:
+				if self._adding.get((netId, port)):
+					early = self._early.setdefault(key, [])
+					early.append((timestamp, data))
+					del early[:-self.EARLY_SAMPLES]
+				return
+			self._invoke(key, entry[0], entry[1], timestamp, data)
+
+	@staticmethod
+	def _invoke(key, pCallback, user, timestamp, data):
+		netId, port, hNotification = key
+		buffer = create_string_buffer(sizeof(SAdsNotificationHeader) + len(data))
+		header = SAdsNotificationHeader.from_buffer(buffer)
+		header.hNotification = hNotification
+		header.nTimeStamp = timestamp
+		header.cbSampleSize = len(data)
+		memmove(addressof(buffer) + sizeof(SAdsNotificationHeader), data, len(data))
+		addr = SAmsAddr()
+		memmove(addressof(addr.netId), netId, 6)
+		addr.port = port
+		PLCfunctions.AdsNotificationCallback(pCallback)(pointer(addr), cast(buffer, POINTER(SAdsNotificationHeader)), user)
@@ -1409,11 +1409,13 @@ class Evaluate( Utils.GenericLogClass ):
 				# only set value
 				gom.script.sys.set_project_keywords (
 					keywords = {key: val} )
+				Utils.invalidate_project_overrides()
 			else:
 				# create new keyword including the description
 				gom.script.sys.set_project_keywords (
 					keywords = {key: val},
 					keywords_description = {key: desc} )
+				Utils.invalidate_project_overrides()
 
 		# set additional project keywords
 		for (key, desc, _, _, *_) in Globals.ADDITIONAL_PROJECTKEYWORDS:
@@ -1424,11 +1426,13 @@ class Evaluate( Utils.GenericLogClass ):
 				# only set value
 				gom.script.sys.set_project_keywords (
 					keywords = {key: val} )
+				Utils.invalidate_project_overrides()
 			else:
 				# create new keyword including the description
 				gom.script.sys.set_project_keywords (
 					keywords = {key: val},
 					keywords_description = {key: desc} )
+				Utils.invalidate_project_overrides()
 
 		if '__parts__' in start_dialog_input:
 			# mapping info - user/fixture/date are never per part (I hope)
@@ -1474,6 +1478,7 @@ class Evaluate( Utils.GenericLogClass ):
 		gom.script.sys.set_project_keywords (
 			keywords = {'GOM_KIOSK_TimeStamp': currtime},
 			keywords_description = {'GOM_KIOSK_TimeStamp': 'internal'} )
+		Utils.invalidate_project_overrides()
 
 		if Globals.FEATURE_SET.ONESHOT_MODE and not(
 				Globals.DRC_EXTENSION is not None and Globals.DRC_EXTENSION.SecondarySideActive() ):
@@ -1496,6 +1501,7 @@ class Evaluate( Utils.GenericLogClass ):
 
 		project_file = os.path.normpath( gom.app.project.get ('project_file') )
 		gom.script.sys.close_project()
+		Utils.invalidate_project_overrides()
 		if os.path.normpath( Globals.SETTINGS.SavePath ) == os.path.dirname(project_file):
 			new_file = os.path.join(measured_dir, os.path.basename(project_file))
 			os.rename(project_file, new_file)
@@ -1534,6 +1540,7 @@ class Evaluate( Utils.GenericLogClass ):
 			gom.script.sys.set_project_keywords (
 				keywords = {'GOM_KIOSK_TimeStamp': timestamp},
 				keywords_description = {'GOM_KIOSK_TimeStamp': 'internal'} )
+			Utils.invalidate_project_overrides()
 		# try to get serial no
 		# if part has no nominal, this is the overall project serial no
 		try:
@@ -2274,6 +2281,7 @@ class Evaluate( Utils.GenericLogClass ):
 					projectfile = None
 				if projectfile is not None:
 					gom.script.sys.close_project()
+					Utils.invalidate_project_overrides()
 					if not projectfile.endswith( '.project_template' ):
 						if ( os.path.exists( projectfile ) ):
 							os.unlink( projectfile )
@@ -3409,11 +3417,13 @@ class EvaluationAnalysis( Utils.GenericLogClass ):
 				shadow_kws[nkw] = gom.app.project.get( 'user_' + nkw )
 				gom.script.sys.set_project_keywords (
 					keywords = {nkw: part.get( 'user_' + nkw )} )
+				Utils.invalidate_project_overrides()
 			else:
 				shadow_kws[nkw] = None
 				gom.script.sys.set_project_keywords (
 					keywords = {nkw: part.get( 'user_' + nkw )},
 					keywords_description = {nkw: part.get( 'description(user_' + nkw + ')' )} )
+				Utils.invalidate_project_overrides()
 
 		return shadow_kws
 	
@@ -3440,6 +3450,7 @@ class EvaluationAnalysis( Utils.GenericLogClass ):
 		gom.script.sys.set_project_keywords (
 			keywords_definition=[(kw, item[1], item[0]) for (kw, item) in kwdescs.items()],
 			keywords={kw: item[0] for (kw, item) in kwdescs.items()} )
+		Utils.invalidate_project_overrides()
 
 	@staticmethod
 	def find_alignments( name_pattern, aligns ):
@@ -40,7 +40,7 @@ class BarCode( Utils.GenericLogClass ):
 		if self._record_suffix is not None and not len( self._record_suffix ):
 			self._record_suffix = None
 		self._serial = None
-		Globals.TIMER.registerHandler( self._loop )
+		Globals.TIMER.registerHandler( self._loop, interval = 200, priority = 5 )
 		if self._comport is not None:
 			self._connect()
 
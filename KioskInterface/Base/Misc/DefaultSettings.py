@@ -203,6 +203,15 @@ class DefaultSettings( object ):
 	
 	# should an additional log file be created to log evaluation statistics
 	LogStatistics = True
+	# log records are written by a background thread, queue capacity (records) and
+	# behavior if the queue is full ('block', 'drop_debug' or 'sample')
+	LoggingQueueSize = 10000
+	LoggingOverflow = 'drop_debug'
+	# log files are json lines segments, closed at the given size (MB) or age (hours),
+	# compressed afterwards and removed after the given number of days
+	LoggingSegmentSize = 50
+	LoggingSegmentHours = 24
+	LoggingRetentionDays = 28
 
 	#######################################################################################################################################
 	############################################################ DialogSettings ###########################################################
@@ -330,6 +339,7 @@ class DefaultSettings( object ):
 	IoTConnection = False
 	IoTConnection_IP = '127.0.0.1'
 	IoTConnection_Port = 10005
+	IoTConnection_Batched = False
 
 	# binary blocks of the images, which should be used in the info/status dialogs during the script( non cfg )
 	LogoImageBinary = None
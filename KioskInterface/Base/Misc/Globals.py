@@ -22,6 +22,8 @@
 import logging
 import gom
 
+from . import LogClass
+
 # definition of Exit Exceptions
 EXIT_EXCEPTIONS = ( SystemExit )
 # global definition for async communication
@@ -31,6 +33,7 @@ CONTROL_INSTANCE = None
 DRC_EXTENSION = None
 # global definition for persistant settings
 PERSISTENTSETTINGS = None
+SETTINGS_RELOAD = None
 
 # additional project keywords
 # specify keywords as tuples of (currently) six values
@@ -79,4 +82,4 @@ def registerGlobalLogger( baselog ):
 	register a logging adapter globally thus eg static methods/global functions have access to the logging instance
 	'''
 	global LOGGER
-	LOGGER = logging.LoggerAdapter( baselog.log, {'class':'GLOBAL'} )
\ No newline at end of file
+	LOGGER = LogClass.LogAdapter( baselog.log, {'class':'GLOBAL'} )
\ No newline at end of file
@@ -18,9 +18,16 @@
 
 
 import logging
+import logging.handlers
+import copy
 import io
 import os, sys
+import queue
+import threading
+import time
 import traceback, linecache
+from collections import deque
+from itertools import islice
 
 class SrcFile( object ):
 	'''
@@ -85,6 +92,328 @@ def formatException( self, ei ):
 	return s
 
 
+class QueuedHandler( logging.handlers.QueueHandler ):
+	'''
+	Passes the records through a bounded queue to a background thread,
+	which writes them with the target handler. Logging calls do not wait for file I/O.
+	If the queue is full (overflow):
+	  'block'      - wait for free space
+	  'drop_debug' - drop DEBUG records, wait for the others
+	  'sample'     - keep every sample_rate-th record below WARNING, wait for the others
+	'''
+	POLICIES = ( 'block', 'drop_debug', 'sample' )
+	_exception_formatter = logging.Formatter()
+
+	def __init__( self, target, capacity = 10000, overflow = 'drop_debug', sample_rate = 10 ):
+		if overflow not in self.POLICIES:
+			raise ValueError( 'unknown log overflow policy "{}"'.format( overflow ) )
+		logging.handlers.QueueHandler.__init__( self, queue.Queue( capacity ) )
+		self.target = target
+		self.overflow = overflow
+		self.sample_rate = sample_rate
+		self.enqueued = 0
+		self.dropped = 0
+		self.blocked = 0
+		self.max_depth = 0
+		self._sampled = 0
+		self.listener = logging.handlers.QueueListener( self.queue, target, respect_handler_level = True )
+		self.listener.start()
+
+	def prepare( self, record ):
+		'''
+		message and exception text are formatted in the calling thread,
+		the exception text is kept separate for the target formatter
+		'''
+		record = copy.copy( record )
+		record.msg = record.getMessage()
+		record.args = None
+		if record.exc_info:
+			if not record.exc_text:
+				record.exc_text = self._exception_formatter.formatException( record.exc_info )
+			record.exc_info = None
+		return record
+
+	def enqueue( self, record ):
+		try:
+			self.queue.put_nowait( record )
+		except queue.Full:
+			if self._drop( record ) or threading.current_thread() is self.listener._thread:
+				self.dropped += 1
+				return
+			self.blocked += 1
+			self.queue.put( record )
+		self.enqueued += 1
+		depth = self.queue.qsize()
+		if depth > self.max_depth:
+			self.max_depth = depth
+
+	def _drop( self, record ):
+		if self.overflow == 'drop_debug':
+			return record.levelno <= logging.DEBUG
+		if self.overflow == 'sample':
+			if record.levelno >= logging.WARNING:
+				return False
+			self._sampled += 1
+			return self._sampled % self.sample_rate != 0
+		return False
+
+	def flush( self, timeout = 5.0 ):
+		'''
+		wait until the queued records are written
+		'''
+		end = time.time() + timeout
+		while self.queue.unfinished_tasks and time.time() < end:
+			time.sleep( 0.01 )
+		self.target.flush()
+
+	def close( self, timeout = 30.0 ):
+		'''
+		write the queued records, stop the thread and close the target
+		timeout - seconds to wait for the queued records to be written,
+		if the thread is still writing afterwards the target is left open
+		'''
+		listener = self.listener
+		try:
+			if listener._thread is not None:
+				# QueueListener.stop puts the sentinel with put_nowait, which fails on a full queue
+				self.queue.put( listener._sentinel, timeout = timeout )
+				listener._thread.join( timeout )
+				if not listener._thread.is_alive():
+					listener._thread = None
+		except queue.Full:
+			pass
+		finally:
+			if listener._thread is None:
+				self.target.close()
+			else:
+				# not via logging, this handler may be the one the record would be queued to
+				sys.stderr.write( 'QueuedHandler: writer thread still running after {}s, {} records not written, {} left open\n'.format(
+					timeout, self.queue.qsize(), self.target ) )
+			logging.handlers.QueueHandler.close( self )
+
+	def stats( self ):
+		return {'depth': self.queue.qsize(), 'max_depth': self.max_depth, 'capacity': self.queue.maxsize,
+			'enqueued': self.enqueued, 'dropped': self.dropped, 'blocked': self.blocked}
+
+
+class RingBufferHandler( logging.Handler ):
+	'''
+	Keeps the formatted text of the last records in memory.
+	The oldest records are removed when more than capacity records or
+	max_bytes characters are stored (None: no limit), appending is O(1).
+	Every record gets a sequence number, readers can fetch the records since
+	the last sequence number they have seen.
+	'''
+	def __init__( self, capacity = 1000, max_bytes = None ):
+		logging.Handler.__init__( self )
+		self.capacity = capacity
+		self.max_bytes = max_bytes
+		self.size = 0
+		self.sequence = 0
+		self.evicted = 0
+		self._records = deque() # (sequence, levelno, text)
+
+	def emit( self, record ):
+		try:
+			text = self.format( record )
+		except Exception:
+			self.handleError( record )
+			return
+		with self.lock:
+			self.sequence += 1
+			self._records.append( ( self.sequence, record.levelno, text ) )
+			self.size += len( text ) + 1
+			while self._records and ( ( self.capacity is not None and len( self._records ) > self.capacity )
+					or ( self.max_bytes is not None and self.size > self.max_bytes and len( self._records ) > 1 ) ):
+				self.size -= len( self._records.popleft()[2] ) + 1
+				self.evicted += 1
+
+	def __len__( self ):
+		return len( self._records )
+
+	def last( self, count = None, level = logging.NOTSET ):
+		'''
+		list of (sequence, levelno, text) of the last count records (all if None), oldest first
+		'''
+		with self.lock:
+			records = reversed( self._records )
+			if level > logging.NOTSET:
+				records = ( r for r in records if r[1] >= level )
+			result = list( islice( records, count ) )
+		result.reverse()
+		return result
+
+	def since( self, sequence ):
+		'''
+		list of (sequence, levelno, text) of the records after the given sequence number, oldest first
+		'''
+		result = []
+		with self.lock:
+			for record in reversed( self._records ):
+				if record[0] <= sequence:
+					break
+				result.append( record )
+		result.reverse()
+		return result
+
+	def text( self, count = None ):
+		'''
+		formatted text of the last count records
+		'''
+		return ''.join( r[2] + '\n' for r in self.last( count ) )
+
+	def clear( self ):
+		with self.lock:
+			self._records.clear()
+			self.size = 0
+
+
+class Lazy( object ):
+	'''
+	Log argument evaluated only when the record is formatted:
+	self.log.debug( 'state %s', Lazy( plc.dump ) ) calls plc.dump() only if DEBUG is enabled.
+	The message is formatted in the calling thread (see QueuedHandler.prepare).
+	'''
+	__slots__ = ( 'func', 'args' )
+
+	def __init__( self, func, *args ):
+		self.func = func
+		self.args = args
+
+	def value( self ):
+		return self.func( *self.args )
+
+	def __str__( self ):
+		try:
+			return str( self.value() )
+		except Exception as e:
+			return '<{} failed: {}>'.format( getattr( self.func, '__qualname__', self.func ), e )
+
+	def __repr__( self ):
+		try:
+			return repr( self.value() )
+		except Exception as e:
+			return '<{} failed: {}>'.format( getattr( self.func, '__qualname__', self.func ), e )
+
+
+class LazyToken( Lazy ):
+	'''
+	gom token value as lazy log argument: LazyToken( gom.app, 'software_revision' )
+	'''
+	__slots__ = ()
+
+	def __init__( self, obj, token ):
+		Lazy.__init__( self, obj.get, token )
+
+
+class _SampledMessage( object ):
+	'''
+	message of a sampled record, the sampling info is appended after formatting
+	'''
+	__slots__ = ( 'msg', 'rate', 'skipped' )
+
+	def __init__( self, msg, rate, skipped ):
+		self.msg = msg
+		self.rate = rate
+		self.skipped = skipped
+
+	def __str__( self ):
+		return '{} [sampled 1/{}, {} skipped]'.format( self.msg, self.rate, self.skipped )
+
+
+class LogAdapter( logging.LoggerAdapter ):
+	'''
+	LoggerAdapter deferring all message work until a record is emitted.
+	Arguments are passed logging style ( msg, *args ) and only formatted for enabled levels,
+	use Lazy/LazyToken for expensive values. The level check only uses logging.disable
+	and the effective level of the logger.
+	debug_sampled logs every rate-th call of a message, for very hot loops.
+	'''
+	def __init__( self, logger, extra = None ):
+		logging.LoggerAdapter.__init__( self, logger, extra )
+		self._samples = {}
+
+	def isEnabledFor( self, level ):
+		logger = self.logger
+		if logger.disabled or logger.manager.disable >= level:
+			return False
+		return level >= logger.getEffectiveLevel()
+
+	def _log( self, level, msg, args, kwargs ):
+		msg, kwargs = self.process( msg, kwargs )
+		self.logger._log( level, msg, args, **kwargs )
+
+	def log( self, level, msg, *args, **kwargs ):
+		if self.isEnabledFor( level ):
+			self._log( level, msg, args, kwargs )
+
+	def debug( self, msg, *args, **kwargs ):
+		if self.isEnabledFor( logging.DEBUG ):
+			self._log( logging.DEBUG, msg, args, kwargs )
+
+	def info( self, msg, *args, **kwargs ):
+		if self.isEnabledFor( logging.INFO ):
+			self._log( logging.INFO, msg, args, kwargs )
+
+	def debug_sampled( self, msg, *args, rate = 100, **kwargs ):
+		'''
+		log the first and then every rate-th call with this msg, the record tells the number of skipped calls
+		'''
+		if not self.isEnabledFor( logging.DEBUG ):
+			return
+		calls = self._samples.get( msg, 0 )
+		self._samples[msg] = calls + 1
+		if calls % rate:
+			return
+		self._log( logging.DEBUG, _SampledMessage( msg, rate, rate - 1 if calls else 0 ), args, kwargs )
+
+
+def benchmark( count = 100000, signal = None ):
+	'''
+	ns per call of the signal debug log ('got Signal ...') with the logger at INFO and at DEBUG,
+	eager str.format against lazy arguments. signal defaults to a stand-in with the cost of
+	Communicate.Signal.__repr__ (linear description lookup, value decode).
+	'''
+	if signal is None:
+		class _Signal( object ):
+			ALL = list( range( 140 ) )
+			def __init__( self, key, value ):
+				self.key = key
+				self.value = value
+			def __repr__( self ):
+				desc = ''
+				for key in _Signal.ALL:
+					if key == self.key:
+						desc = str( key )
+						break
+				return "{}: {} -> {}".format( desc, self.key, bytes.decode( self.value ) )
+		signal = _Signal( 103, b'PASS;serial=0815;template=part_a' )
+
+	logger = logging.getLogger( 'KioskInterface.benchmark' )
+	logger.propagate = False
+	handler = logging.StreamHandler( io.StringIO() )
+	logger.addHandler( handler )
+	plain = logging.LoggerAdapter( logger, {'class':'Benchmark'} )
+	lazy = LogAdapter( logger, {'class':'Benchmark'} )
+	cases = [
+		( 'eager format', lambda: plain.debug( 'got Signal {}'.format( signal ) ) ),
+		( 'LoggerAdapter args', lambda: plain.debug( 'got Signal %s', signal ) ),
+		( 'LogAdapter args', lambda: lazy.debug( 'got Signal %s', signal ) ),
+		( 'LogAdapter sampled', lambda: lazy.debug_sampled( 'got Signal %s', signal ) ) ]
+	result = {}
+	try:
+		for level in ( logging.INFO, logging.DEBUG ):
+			logger.setLevel( level )
+			for name, call in cases:
+				start = time.perf_counter()
+				for _ in range( count ):
+					call()
+				result[( logging.getLevelName( level ), name )] = ( time.perf_counter() - start ) / count * 1e9
+	finally:
+		logger.removeHandler( handler )
+	return result
+
+
 class Logger( object ):
 	'''
 	Wrapper class for the logging module
@@ -112,12 +441,12 @@ class Logger( object ):
 		self.log.addHandler( handler )
 		return handler
 
-	def create_streamhandler( self, strformat = None, dateformat = None ):
+	def create_streamhandler( self, strformat = None, dateformat = None, capacity = 1000, max_bytes = 1024 * 1024 ):
 		'''
-		create a string stream handler
+		create an in-memory handler keeping the last records (see RingBufferHandler)
 		'''
-		self.buffer = io.StringIO()
-		handler = logging.StreamHandler( self.buffer )
+		handler = RingBufferHandler( capacity, max_bytes )
+		self.buffer = handler
 		if strformat is None:
 			strformat = '%(asctime)s %(levelname)-8s Module(%(module)s) Func(%(funcName)s) Line(%(lineno)d) %(message)s'
 		if dateformat is None:
@@ -126,18 +455,20 @@ class Logger( object ):
 		handler.setFormatter( formatter )
 		self.log.addHandler( handler )
 		return handler
-	def getbuffer( self ):
+	def getbuffer( self, count = None ):
 		'''
-		return current string stream buffer
+		return the text of the last count buffered records (all if None)
 		'''
 		if ( self.buffer is not None ):
-			return self.buffer.getvalue()
+			return self.buffer.text( count )
 		else:
 			return ''
 
-	def create_filehandler( self, filename, mode = 'a', encoding = 'utf-8', strformat = None, dateformat = None ):
+	def create_filehandler( self, filename, mode = 'a', encoding = 'utf-8', strformat = None, dateformat = None,
+			capacity = 10000, overflow = 'drop_debug' ):
 		'''
 		This function creates a file handler for writing logging information.
+		The file is written by a background thread (see QueuedHandler).
 
 		Arguments:
 		filename - The name of the file which should be used for logging.
@@ -146,6 +477,8 @@ class Logger( object ):
 		strformat - The format of the string, which will be logged. See
 		http://docs.python.org/py3k/library/logging.html#logrecord-attributes
 		dateformat - Format for time encoding, e.g. '%Y-%m-%d %H:%M:%S'
+		capacity - Number of records which can be queued
+		overflow - Behavior if the queue is full, see QueuedHandler
 
 		Returns:
 		A logging handler
@@ -157,12 +490,23 @@ class Logger( object ):
 			dateformat = '%Y-%m-%d %H:%M:%S'
 		formatter = logging.Formatter( fmt = strformat, datefmt = None )
 		handler.setFormatter( formatter )
-		self.log.addHandler( handler )
-		return handler
+		return self.create_queuedhandler( handler, capacity, overflow )
+
+	def create_queuedhandler( self, target, capacity = 10000, overflow = 'drop_debug' ):
+		'''
+		add a handler which passes the records to target in a background thread (see QueuedHandler)
+		'''
+		queued = QueuedHandler( target, capacity, overflow )
+		self.log.addHandler( queued )
+		return queued
 	def close_filehandle( self, handle ):
 		'''
 		This function closes and removes the file handler.
 		handle - The file handle which should be closed
 		'''
 		handle.close()
-		self.log.removeHandler( handle )
\ No newline at end of file
+		self.log.removeHandler( handle )
+
+if __name__ == '__main__':
+	for ( level, name ), ns in benchmark().items():
+		print( '{:<6} {:<20} {:>8.0f} ns/call'.format( level, name, ns ) )
@@ -0,0 +1,681 @@
+# -*- coding: utf-8 -*-
+# Script: Offline query of KioskInterface log directories
+#
+# PLEASE NOTE that this file is part of the GOM Software.
+# You are not allowed to distribute this file to a third party without written notice.
+#
+# Please, do not copy and/or modify this script.
+# All modifications of KioskInterface should happen in the CustomPatches script.
+# Ignoring this advice will make KioskInterface fail after Software update.
+#
+# Copyright (c) 2021 Carl Zeiss GOM Metrology GmbH
+# All rights reserved.
+
+# Plain python, no gom module needed.
+# Searches the json lines segments of the LogStore (plain and compressed) and the text logs
+# of previous versions. Segments are skipped by their index entry, plain files are bisected
+# to the start time, files are scanned in parallel processes.
+#   python -m KioskInterface.Base.Misc.LogQuery search <logdir> --since -2h --level WARNING
+#   python -m KioskInterface.Base.Misc.LogQuery search <logdir> --serial 4711 --timeline
+#   python -m KioskInterface.Base.Misc.LogQuery search <logdir> --fts logs.db --text "timeout AND sensor"
+#   python -m KioskInterface.Base.Misc.LogQuery benchmark --size-mb 5120
+
+import argparse
+import concurrent.futures
+import glob
+import gzip
+import heapq
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import time
+
+from . import LogStore
+
+# records of one file are written in time order by one thread, allow this much disorder
+SLACK = 5.0
+# bisection stops when the range is smaller, the rest is read
+BISECT_LIMIT = 64 * 1024
+
+_TEXT_RECORD = re.compile( r'^(?P<time>\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)(?:,(?P<ms>\d{3}))? (?P<level>[A-Z]+)\s+'
+	r'(?:Class\((?P<class>[^)]*)\) )?(?:Func\((?P<func>[^)]*)\) )?(?:Line\((?P<line>\d+)\) )?(?P<msg>.*)$' )
+_RELATIVE = re.compile( r'^-(\d+(?:\.\d+)?)([smhd])$' )
+_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+_seconds = {}
+
+
+def parse_time( text ):
+	'''
+	epoch seconds of "2021-05-31", "2021-05-31 12:00[:00]", an epoch value
+	or a time relative to now ("-30m", "-2h", "-1d")
+	'''
+	text = text.strip()
+	match = _RELATIVE.match( text )
+	if match:
+		return time.time() - float( match.group( 1 ) ) * _UNITS[match.group( 2 )]
+	try:
+		return float( text )
+	except ValueError:
+		pass
+	text = text.replace( 'T', ' ' )
+	for format in ( '%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d' ):
+		try:
+			return time.mktime( time.strptime( text, format ) )
+		except ValueError:
+			pass
+	raise ValueError( 'invalid time "{}"'.format( text ) )
+
+def parse_level( text ):
+	if text is None:
+		return None
+	if text.isdigit():
+		return int( text )
+	level = logging.getLevelName( text.upper() )
+	if not isinstance( level, int ):
+		raise ValueError( 'invalid level "{}"'.format( text ) )
+	return level
+
+def _text_seconds( stamp ):
+	seconds = _seconds.get( stamp )
+	if seconds is None:
+		if len( _seconds ) > 100000:
+			_seconds.clear()
+		seconds = _seconds[stamp] = time.mktime( time.strptime( stamp, '%Y-%m-%d %H:%M:%S' ) )
+	return seconds
+
+def parse_text_line( line ):
+	'''
+	record of a line of the text log format, None for continuation lines
+	'''
+	match = _TEXT_RECORD.match( line )
+	if match is None:
+		return None
+	ms = match.group( 'ms' )
+	entry = {'t': _text_seconds( match.group( 'time' ) ) + ( int( ms ) / 1000.0 if ms else 0 ),
+		'time': match.group( 'time' ) + ( ',' + ms if ms else '' ),
+		'level': match.group( 'level' ), 'class': match.group( 'class' ), 'func': match.group( 'func' ),
+		'line': int( match.group( 'line' ) ) if match.group( 'line' ) else None, 'msg': match.group( 'msg' )}
+	return entry
+
+def _json_time( line ):
+	# "t" is the first field of LogStore lines
+	if line.startswith( b'{"t":' ):
+		end = line.find( b',', 5 )
+		try:
+			return float( line[5:end] )
+		except ValueError:
+			return None
+	return None
+
+def _text_time( line ):
+	if len( line ) < 19 or not line[:4].isdigit():
+		return None
+	try:
+		return _text_seconds( line[:19].decode( 'ascii' ) )
+	except ( ValueError, UnicodeError ):
+		return None
+
+
+class Query( object ):
+	'''
+	record filter, None ignores a criterion
+	'''
+	def __init__( self, start = None, end = None, level = None, logger = None, cycle = None,
+			serial = None, regex = None, ignore_case = False ):
+		self.start = start
+		self.end = end
+		self.level = level
+		self.logger = logger
+		self.cycle = cycle
+		self.serial = serial
+		self.regex = re.compile( regex, re.IGNORECASE if ignore_case else 0 ) if regex else None
+		# byte patterns to reject json lines without decoding them
+		self._required = [b'"' + field.encode( 'utf-8' ) + b'":' + json.dumps( value, ensure_ascii = False ).encode( 'utf-8' )
+			for ( field, value ) in ( ( 'cycle', cycle ), ( 'serial', serial ) ) if value is not None]
+		self._excluded = [b'"level":"' + name.encode( 'ascii' ) + b'"'
+			for ( name, value ) in logging._nameToLevel.items() if level is not None and value < level]
+
+	def accept( self, line, t ):
+		'''
+		False if the raw json line (time t) cannot match
+		'''
+		if t is not None:
+			if self.start is not None and t < self.start:
+				return False
+			if self.end is not None and t > self.end:
+				return False
+		for pattern in self._required:
+			if pattern not in line:
+				return False
+		for pattern in self._excluded:
+			if pattern in line:
+				return False
+		return True
+
+	def match( self, entry ):
+		t = entry.get( 't' )
+		if self.start is not None and ( t is None or t < self.start ):
+			return False
+		if self.end is not None and ( t is None or t > self.end ):
+			return False
+		if self.level is not None and logging._nameToLevel.get( entry.get( 'level' ), 0 ) < self.level:
+			return False
+		if self.logger is not None and self.logger not in ( entry.get( 'class' ), entry.get( 'logger' ) ):
+			return False
+		if self.cycle is not None and entry.get( 'cycle' ) != self.cycle:
+			return False
+		if self.serial is not None and entry.get( 'serial' ) != self.serial:
+			return False
+		if self.regex is not None and not ( self.regex.search( entry.get( 'msg' ) or '' )
+				or self.regex.search( entry.get( 'exc' ) or '' ) ):
+			return False
+		return True
+
+
+def _is_json( path ):
+	return path.endswith( LogStore.SEGMENT_SUFFIX ) or path.endswith( LogStore.COMPRESSED_SUFFIX )
+
+def _open( path ):
+	if path.endswith( '.gz' ):
+		return gzip.open( path, 'rb' )
+	return open( path, 'rb' )
+
+def _bisect( f, size, start, line_time ):
+	'''
+	position the plain file f before the first line at or after start
+	'''
+	lo, hi = 0, size
+	while hi - lo > BISECT_LIMIT:
+		mid = ( lo + hi ) // 2
+		f.seek( mid )
+		f.readline()
+		t = None
+		for _ in range( 1000 ):
+			line = f.readline()
+			if not line:
+				break
+			t = line_time( line )
+			if t is not None:
+				break
+		if t is None or t >= start - SLACK:
+			hi = mid
+		else:
+			lo = mid
+	f.seek( lo )
+	if lo:
+		f.readline()
+
+def _read_entries( f, json_lines ):
+	if json_lines:
+		for line in f:
+			try:
+				yield json.loads( line )
+			except ValueError:
+				pass
+		return
+	entry = None
+	for line in f:
+		text = line.decode( 'utf-8', 'replace' ).rstrip( '\r\n' )
+		parsed = parse_text_line( text )
+		if parsed is not None:
+			if entry is not None:
+				yield entry
+			entry = parsed
+		elif entry is not None:
+			entry['exc'] = ( entry['exc'] + '\n' + text ) if 'exc' in entry else text
+	if entry is not None:
+		yield entry
+
+def scan_file( path, query, bisect = True ):
+	'''
+	matching records of one file and {'bytes', 'records'} read
+	'''
+	json_lines = _is_json( path )
+	line_time = _json_time if json_lines else _text_time
+	result = []
+	records = 0
+	read = 0
+	try:
+		with _open( path ) as f:
+			if bisect and query.start is not None and not path.endswith( '.gz' ):
+				_bisect( f, os.path.getsize( path ), query.start, line_time )
+			first = f.tell() if not path.endswith( '.gz' ) else 0
+			if json_lines:
+				for line in f:
+					records += 1
+					t = _json_time( line )
+					if query.end is not None and t is not None and t > query.end + SLACK:
+						break
+					if not query.accept( line, t ):
+						continue
+					try:
+						entry = json.loads( line )
+					except ValueError:
+						continue
+					if query.match( entry ):
+						entry['file'] = os.path.basename( path )
+						result.append( entry )
+			else:
+				for entry in _read_entries( f, False ):
+					records += 1
+					t = entry.get( 't' )
+					if query.end is not None and t is not None and t > query.end + SLACK:
+						break
+					if query.match( entry ):
+						entry['file'] = os.path.basename( path )
+						result.append( entry )
+			read = f.tell() - first if not path.endswith( '.gz' ) else f.tell()
+	except ( OSError, EOFError ):
+		pass
+	return result, {'bytes': read, 'records': records}
+
+def _scan_job( args ):
+	return scan_file( *args )
+
+
+def log_files( directory, basename = None ):
+	'''
+	all log files of the directory: store segments (plain, compressed) and text logs
+	'''
+	files = []
+	for pattern in ( '*' + LogStore.SEGMENT_SUFFIX, '*' + LogStore.COMPRESSED_SUFFIX, '*.log', '*.log.gz' ):
+		files.extend( glob.glob( os.path.join( directory, ( basename or '' ) + pattern ) ) )
+	return sorted( set( files ) )
+
+def select_files( directory, query, basename = None, use_index = True ):
+	'''
+	files which can contain matching records (oldest first) and the number of skipped files
+	'''
+	files = log_files( directory, basename )
+	if not use_index:
+		return files, 0
+	segments = {}
+	for index in glob.glob( os.path.join( directory, ( basename or '' ) + '*.index.json' ) ):
+		for segment in LogStore.read_index( index ):
+			segments[os.path.join( directory, segment.file )] = segment
+	selected = []
+	for path in files:
+		segment = segments.get( path )
+		if segment is not None:
+			if segment.matches( query.start, query.end, query.level, query.cycle, query.serial ):
+				selected.append( ( segment.start, path ) )
+			continue
+		try:
+			mtime = os.path.getmtime( path )
+		except OSError:
+			continue
+		# not indexed (current segment, text logs): no record after the last modification
+		if query.start is not None and mtime < query.start - SLACK:
+			continue
+		if ( query.cycle is not None or query.serial is not None ) and not _is_json( path ):
+			continue
+		selected.append( ( mtime, path ) )
+	selected.sort()
+	return [path for ( _, path ) in selected], len( files ) - len( selected )
+
+def search( directory, query, jobs = None, basename = None, use_index = True, bisect = True ):
+	'''
+	matching records of all files in time order and scan statistics
+	'''
+	started = time.perf_counter()
+	files, skipped = select_files( directory, query, basename, use_index )
+	jobs = jobs or os.cpu_count() or 1
+	if jobs > 1 and len( files ) > 1:
+		with concurrent.futures.ProcessPoolExecutor( max_workers = min( jobs, len( files ) ) ) as pool:
+			results = list( pool.map( _scan_job, [( path, query, bisect ) for path in files] ) )
+	else:
+		results = [scan_file( path, query, bisect ) for path in files]
+	records = list( heapq.merge( *[r[0] for r in results], key = lambda e: e.get( 't' ) or 0 ) )
+	stats = {'files': len( files ), 'skipped': skipped, 'matches': len( records ),
+		'records_read': sum( r[1]['records'] for r in results ),
+		'bytes_read': sum( r[1]['bytes'] for r in results ), 'seconds': time.perf_counter() - started}
+	return records, stats
+
+
+class FtsIndex( object ):
+	'''
+	SQLite FTS5 full text index of the log files, update() only adds the new records
+	(appended lines of plain files, new files), records of removed files are deleted.
+	A compressed segment is the same file as its plain predecessor, the indexed
+	part is skipped.
+	'''
+	def __init__( self, filename ):
+		self.filename = filename
+		self.db = sqlite3.connect( filename )
+		try:
+			self.db.execute( 'CREATE VIRTUAL TABLE IF NOT EXISTS records USING fts5(msg, exc, '
+				't UNINDEXED, level UNINDEXED, class UNINDEXED, func UNINDEXED, line UNINDEXED, '
+				'cycle UNINDEXED, serial UNINDEXED, file UNINDEXED)' )
+		except sqlite3.OperationalError as e:
+			raise RuntimeError( 'SQLite without FTS5 support: {}'.format( e ) )
+		self.db.execute( 'CREATE TABLE IF NOT EXISTS files(key TEXT PRIMARY KEY, offset INTEGER, complete INTEGER)' )
+		self.db.commit()
+
+	def close( self ):
+		self.db.close()
+
+	def update( self, directory, basename = None ):
+		'''
+		index the new records, returns the number of added records
+		'''
+		added = 0
+		present = set()
+		known = dict( ( key, ( offset, complete ) ) for ( key, offset, complete ) in
+			self.db.execute( 'SELECT key, offset, complete FROM files' ) )
+		for path in log_files( directory, basename ):
+			compressed = path.endswith( '.gz' )
+			key = path[:-3] if compressed else path
+			present.add( key )
+			offset, complete = known.get( key, ( 0, 0 ) )
+			if complete:
+				continue
+			if not compressed:
+				size = os.path.getsize( path )
+				if size == offset:
+					continue
+				if size < offset: # replaced
+					self.db.execute( 'DELETE FROM records WHERE file = ?', ( key, ) )
+					offset = 0
+			try:
+				with _open( path ) as f:
+					if offset:
+						if compressed:
+							_skip( f, offset )
+						else:
+							f.seek( offset )
+					rows = []
+					for entry in _read_entries( _complete_lines( f ), _is_json( path ) ):
+						rows.append( ( entry.get( 'msg' ), entry.get( 'exc' ), entry.get( 't' ), entry.get( 'level' ),
+							entry.get( 'class' ), entry.get( 'func' ), entry.get( 'line' ),
+							entry.get( 'cycle' ), entry.get( 'serial' ), key ) )
+						if len( rows ) >= 10000:
+							self._insert( rows )
+							added += len( rows )
+							rows = []
+					self._insert( rows )
+					added += len( rows )
+					offset = f.tell()
+			except ( OSError, EOFError ):
+				continue
+			self.db.execute( 'INSERT OR REPLACE INTO files VALUES (?, ?, ?)', ( key, offset, 1 if compressed else 0 ) )
+			self.db.commit()
+			# plain file and .gz of a segment being compressed share the key
+			known[key] = ( offset, 1 if compressed else 0 )
+		for key in set( known ) - present:
+			self.db.execute( 'DELETE FROM records WHERE file = ?', ( key, ) )
+			self.db.execute( 'DELETE FROM files WHERE key = ?', ( key, ) )
+		self.db.commit()
+		return added
+
+	def _insert( self, rows ):
+		self.db.executemany( 'INSERT INTO records VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows )
+
+	def search( self, text, query ):
+		'''
+		records matching the FTS5 expression and the query, in time order
+		'''
+		sql = 'SELECT msg, exc, t, level, class, func, line, cycle, serial, file FROM records WHERE records MATCH ?'
+		args = [text]
+		for condition, value in ( ( 't >= ?', query.start ), ( 't <= ?', query.end ),
+				( 'cycle = ?', query.cycle ), ( 'serial = ?', query.serial ) ):
+			if value is not None:
+				sql += ' AND ' + condition
+				args.append( value )
+		records = []
+		for row in self.db.execute( sql + ' ORDER BY t', args ):
+			entry = dict( zip( ( 'msg', 'exc', 't', 'level', 'class', 'func', 'line', 'cycle', 'serial', 'file' ), row ) )
+			entry['file'] = os.path.basename( entry['file'] )
+			entry['time'] = _format_time( entry['t'] )
+			if query.match( entry ):
+				records.append( entry )
+		return records
+
+def _skip( f, count ):
+	while count > 0:
+		data = f.read( min( count, 1024 * 1024 ) )
+		if not data:
+			break
+		count -= len( data )
+
+def _complete_lines( f ):
+	# a partially written last line of a plain file is read by the next update
+	while True:
+		position = f.tell()
+		line = f.readline()
+		if not line:
+			return
+		if not line.endswith( b'\n' ):
+			f.seek( position )
+			return
+		yield line
+
+
+def _format_time( t ):
+	if t is None:
+		return ''
+	return '{},{:03d}'.format( time.strftime( '%Y-%m-%d %H:%M:%S', time.localtime( t ) ), int( ( t % 1 ) * 1000 ) )
+
+def format_entry( entry ):
+	where = '.'.join( str( p ) for p in ( entry.get( 'class' ), entry.get( 'func' ) ) if p )
+	if entry.get( 'line' ) is not None:
+		where += ':{}'.format( entry['line'] )
+	text = '{} {:<8} {} {}'.format( entry.get( 'time' ) or _format_time( entry.get( 't' ) ),
+		entry.get( 'level', '' ), where, entry.get( 'msg', '' ) )
+	if entry.get( 'cycle' ) or entry.get( 'serial' ):
+		text += ' [{} {}]'.format( entry.get( 'cycle' ) or '-', entry.get( 'serial' ) or '-' )
+	if entry.get( 'exc' ):
+		text += '\n' + '\n'.join( '    ' + line for line in entry['exc'].splitlines() )
+	return text
+
+def timeline( records ):
+	'''
+	records grouped by cycle, in order of the first record of the cycle
+	'''
+	cycles = {}
+	for entry in records:
+		cycle = entry.get( 'cycle' )
+		if cycle is None:
+			continue
+		group = cycles.get( cycle )
+		if group is None:
+			group = cycles[cycle] = {'cycle': cycle, 'serial': entry.get( 'serial' ), 'start': entry['t'],
+				'end': entry['t'], 'records': [], 'warnings': 0, 'errors': 0, 'first_error': None}
+		group['end'] = max( group['end'], entry['t'] )
+		group['records'].append( entry )
+		level = logging._nameToLevel.get( entry.get( 'level' ), 0 )
+		if level >= logging.ERROR:
+			group['errors'] += 1
+			if group['first_error'] is None:
+				group['first_error'] = entry.get( 'msg' )
+		elif level >= logging.WARNING:
+			group['warnings'] += 1
+	return list( cycles.values() )
+
+def format_timeline( groups, summary = False ):
+	lines = []
+	for group in groups:
+		lines.append( 'cycle {} serial {}  {} .. {} ({:.1f}s)  {} records, {} warnings, {} errors{}'.format(
+			group['cycle'], group['serial'] or '-', _format_time( group['start'] ), _format_time( group['end'] )[11:],
+			group['end'] - group['start'], len( group['records'] ), group['warnings'], group['errors'],
+			'  first error: ' + group['first_error'] if group['first_error'] else '' ) )
+		if summary:
+			continue
+		for entry in group['records']:
+			lines.append( '  +{:9.3f} {:<8} {}.{} {}'.format( entry['t'] - group['start'], entry.get( 'level', '' ),
+				entry.get( 'class' ) or '', entry.get( 'func' ) or '', entry.get( 'msg', '' ) ) )
+	return lines
+
+
+def generate( directory, size_mb, segment_mb = 50, basename = 'kiosklog' ):
+	'''
+	synthetic LogStore directory of about size_mb MB (uncompressed), the last segment stays plain
+	'''
+	os.makedirs( directory, exist_ok = True )
+	messages = ['starting new Evaluation', 'User Input: user->operator serial->{serial}',
+		'measurement series {n} started', 'sensor temperature {n}.5', 'evaluation step {n} finished',
+		'inspection element {n} computed', 'waiting for robot position {n}']
+	formatter = LogStore.JsonFormatter()
+	record = logging.LogRecord( 'root', logging.INFO, __file__, 1, '', None, None, 'generate' )
+	record.__dict__['class'] = 'Evaluate'
+	total = size_mb * 1024 * 1024
+	t = time.time() - total // 200 * 0.02
+	segments = []
+	cycles = []
+	written = 0
+	n = 0
+	while written < total:
+		name = '{}_{}.jsonl'.format( basename, time.strftime( '%Y_%m_%d_%H_%M_%S', time.localtime( t ) ) )
+		segment = LogStore.Segment( name )
+		lines = []
+		size = 0
+		while size < segment_mb * 1024 * 1024 and written + size < total:
+			if n % 2000 == 0:
+				cycles.append( '{}-{}'.format( time.strftime( '%Y%m%dT%H%M%S', time.localtime( t ) ), n // 2000 ) )
+			serial = 'SN{:06d}'.format( n // 2000 )
+			level = logging.ERROR if n % 2000 == 1999 else ( logging.WARNING if n % 500 == 7 else logging.INFO )
+			record.created, record.msecs = t, ( t % 1 ) * 1000
+			record.levelno, record.levelname = level, logging.getLevelName( level )
+			record.msg = messages[n % len( messages )].format( serial = serial, n = n % 97 )
+			record.cycle = cycles[-1]
+			record.serial = serial
+			line = formatter.format( record )
+			lines.append( line )
+			segment.add( t, record.levelname, level, len( line ) + 1, record.cycle, serial )
+			size += len( line ) + 1
+			t += 0.02
+			n += 1
+		data = ( '\n'.join( lines ) + '\n' ).encode( 'utf-8' )
+		written += size
+		if written < total:
+			segment.file = name + '.gz'
+			segment.compressed = True
+			with gzip.open( os.path.join( directory, segment.file ), 'wb', compresslevel = 1 ) as f:
+				f.write( data )
+			segments.append( segment )
+		else:
+			with open( os.path.join( directory, name ), 'wb' ) as f:
+				f.write( data )
+		os.utime( os.path.join( directory, segment.file ), ( segment.end, segment.end ) )
+	with open( os.path.join( directory, basename + '.index.json' ), 'w' ) as f:
+		json.dump( {'version': LogStore.INDEX_VERSION, 'basename': basename,
+			'segments': [s.as_dict() for s in segments]}, f )
+	return {'records': n, 'segments': len( segments ) + 1, 'start': t - n * 0.02, 'end': t, 'cycles': cycles}
+
+def benchmark( size_mb = 256, directory = None, jobs = None ):
+	'''
+	seconds of typical queries with and without index/bisection/parallel scan on a synthetic log set
+	'''
+	results = {}
+	with tempfile.TemporaryDirectory( dir = directory ) as temp:
+		started = time.perf_counter()
+		info = generate( temp, size_mb )
+		results['generate'] = {'seconds': time.perf_counter() - started, 'records': info['records'], 'segments': info['segments']}
+		middle = ( info['start'] + info['end'] ) / 2
+		if not info['cycles']:
+			raise RuntimeError( 'no cycle in the generated log set' )
+		cycle = info['cycles'][len( info['cycles'] ) // 2]
+		queries = {
+			'last_10_minutes': Query( start = info['end'] - 600 ),
+			'errors_in_hour': Query( start = middle, end = middle + 3600, level = logging.ERROR ),
+			'cycle': Query( cycle = cycle ),
+			'regex_all': Query( regex = r'robot position 4[0-2]$' ) }
+		for name, query in queries.items():
+			_records, naive = search( temp, query, jobs = 1, use_index = False, bisect = False )
+			_records, fast = search( temp, query, jobs = jobs )
+			results[name] = {'matches': fast['matches'], 'naive_s': naive['seconds'], 'indexed_parallel_s': fast['seconds'],
+				'files': '{}/{}'.format( fast['files'], fast['files'] + fast['skipped'] ), 'bytes_read': fast['bytes_read']}
+		try:
+			started = time.perf_counter()
+			index = FtsIndex( os.path.join( temp, 'fts.db' ) )
+			added = index.update( temp )
+			build = time.perf_counter() - started
+			started = time.perf_counter()
+			index.update( temp )
+			incremental = time.perf_counter() - started
+			started = time.perf_counter()
+			matches = len( index.search( 'robot AND position', Query( start = middle, end = middle + 3600 ) ) )
+			results['fts'] = {'records': added, 'build_s': build, 'incremental_update_s': incremental,
+				'query_s': time.perf_counter() - started, 'matches': matches}
+			index.close()
+		except RuntimeError as e:
+			results['fts'] = str( e )
+	return results
+
+
+def main( argv = None ):
+	parser = argparse.ArgumentParser( description = 'KioskInterface log query' )
+	commands = parser.add_subparsers( dest = 'command' )
+	find = commands.add_parser( 'search', help = 'matching records of a log directory' )
+	find.add_argument( 'directory' )
+	find.add_argument( '--basename', help = 'only files starting with the name, e.g. kiosklog' )
+	find.add_argument( '--since', help = 'start time, "2021-05-31 12:00", epoch or relative "-2h"' )
+	find.add_argument( '--until', help = 'end time' )
+	find.add_argument( '--level', help = 'minimum level, e.g. WARNING' )
+	find.add_argument( '--logger', help = 'class or logger name' )
+	find.add_argument( '--cycle' )
+	find.add_argument( '--serial' )
+	find.add_argument( '--regex', help = 'regular expression for message and exception' )
+	find.add_argument( '-i', '--ignore-case', action = 'store_true' )
+	find.add_argument( '--fts', help = 'SQLite full text index file (updated before the search)' )
+	find.add_argument( '--text', help = 'FTS5 expression, needs --fts' )
+	find.add_argument( '--jobs', type = int, default = None )
+	find.add_argument( '--limit', type = int, default = None, help = 'only the last LIMIT records' )
+	find.add_argument( '--json', action = 'store_true', help = 'output json lines' )
+	find.add_argument( '--timeline', action = 'store_true', help = 'group the records by cycle' )
+	find.add_argument( '--summary', action = 'store_true', help = 'timeline without records' )
+	find.add_argument( '--stats', action = 'store_true', help = 'print scan statistics to stderr' )
+	update = commands.add_parser( 'index', help = 'create/update the full text index' )
+	update.add_argument( 'directory' )
+	update.add_argument( '--fts', required = True )
+	update.add_argument( '--basename' )
+	bench = commands.add_parser( 'benchmark', help = 'query times on a synthetic log set' )
+	bench.add_argument( '--size-mb', type = int, default = 256 )
+	bench.add_argument( '--directory', help = 'where the temporary log set is created' )
+	bench.add_argument( '--jobs', type = int, default = None )
+	args = parser.parse_args( argv )
+
+	if args.command == 'search':
+		try:
+			query = Query( parse_time( args.since ) if args.since else None, parse_time( args.until ) if args.until else None,
+				parse_level( args.level ), args.logger, args.cycle, args.serial, args.regex, args.ignore_case )
+		except ( ValueError, re.error ) as e:
+			print( e, file = sys.stderr )
+			return 2
+		if args.text and not args.fts:
+			print( '--text needs --fts', file = sys.stderr )
+			return 2
+		if args.text:
+			index = FtsIndex( args.fts )
+			index.update( args.directory, args.basename )
+			records = index.search( args.text, query )
+			index.close()
+			stats = {'matches': len( records )}
+		else:
+			records, stats = search( args.directory, query, args.jobs, args.basename )
+		if args.limit:
+			records = records[-args.limit:]
+		if args.timeline or args.summary:
+			for line in format_timeline( timeline( records ), args.summary ):
+				print( line )
+		else:
+			for entry in records:
+				print( json.dumps( entry, ensure_ascii = False ) if args.json else format_entry( entry ) )
+		if args.stats:
+			print( stats, file = sys.stderr )
+	elif args.command == 'index':
+		index = FtsIndex( args.fts )
+		print( '{} records added'.format( index.update( args.directory, args.basename ) ) )
+		index.close()
+	elif args.command == 'benchmark':
+		print( json.dumps( benchmark( args.size_mb, args.directory, args.jobs ), indent = 2 ) )
+	else:
+		parser.print_help()
+		return 1
+	return 0
+
+if __name__ == '__main__':
+	sys.exit( main() )
@@ -0,0 +1,465 @@
+# -*- coding: utf-8 -*-
+# Script: Rotating, compressed, structured log store
+#
+# PLEASE NOTE that this file is part of the GOM Software.
+# You are not allowed to distribute this file to a third party without written notice.
+#
+# Please, do not copy and/or modify this script.
+# All modifications of KioskInterface should happen in the CustomPatches script.
+# Ignoring this advice will make KioskInterface fail after Software update.
+#
+# Copyright (c) 2021 Carl Zeiss GOM Metrology GmbH
+# All rights reserved.
+
+# Plain python, no gom module needed.
+# Records are written as json lines into segments <basename>_<start time>.jsonl,
+# closed segments are compressed to .jsonl.gz by a background thread.
+# <basename>.index.json lists the closed segments with time range, level counts,
+# cycle ids and serials, so readers can skip segments without opening them.
+
+import gzip
+import json
+import logging
+import os
+import queue
+import shutil
+import threading
+import time
+
+INDEX_VERSION = 1
+SEGMENT_SUFFIX = '.jsonl'
+COMPRESSED_SUFFIX = '.jsonl.gz'
+
+_context = {}
+_cycles = 0
+
+def set_context( **values ):
+	'''
+	values (e.g. cycle, serial) added to all following records, None removes a value
+	'''
+	global _context
+	context = dict( _context )
+	for key, value in values.items():
+		if value is None:
+			context.pop( key, None )
+		else:
+			context[key] = value
+	_context = context
+
+def new_cycle( serial = None ):
+	'''
+	start a new part cycle, returns the cycle id added to the following records
+	'''
+	global _cycles
+	_cycles += 1
+	cycle = '{}-{}'.format( time.strftime( '%Y%m%dT%H%M%S' ), _cycles )
+	set_context( cycle = cycle, serial = serial or None )
+	return cycle
+
+def end_cycle():
+	set_context( cycle = None, serial = None )
+
+
+class ContextFilter( logging.Filter ):
+	'''
+	Adds the current context to the records, runs in the logging thread
+	(before the record is queued), so the values belong to the time of the call.
+	'''
+	def filter( self, record ):
+		for key, value in _context.items():
+			if not hasattr( record, key ):
+				setattr( record, key, value )
+		return True
+
+
+class JsonFormatter( logging.Formatter ):
+	'''
+	One record as compact json line
+	'''
+	FIELDS = ( 'cycle', 'serial' )
+
+	def format( self, record ):
+		entry = {
+			't': round( record.created, 3 ),
+			'time': '{},{:03d}'.format( time.strftime( '%Y-%m-%d %H:%M:%S', time.localtime( record.created ) ), int( record.msecs ) ),
+			'level': record.levelname,
+			'logger': record.name,
+			'class': getattr( record, 'class', None ),
+			'func': record.funcName,
+			'line': record.lineno,
+			'msg': record.getMessage() }
+		for field in self.FIELDS:
+			value = getattr( record, field, None )
+			if value is not None:
+				entry[field] = value
+		if record.exc_info and not record.exc_text:
+			record.exc_text = self.formatException( record.exc_info )
+		if record.exc_text:
+			entry['exc'] = record.exc_text
+		return json.dumps( entry, ensure_ascii = False, separators = ( ',', ':' ), default = str )
+
+
+class Segment( object ):
+	'''
+	Index entry of one segment
+	'''
+	def __init__( self, file, start = None, end = None, records = 0, size = 0, levels = None,
+			errors = 0, cycles = None, serials = None, compressed = False ):
+		self.file = file
+		self.start = start
+		self.end = end
+		self.records = records
+		self.size = size
+		self.levels = levels if levels is not None else {}
+		self.errors = errors
+		self.cycles = cycles if cycles is not None else []
+		self.serials = serials if serials is not None else []
+		self.compressed = compressed
+		self._seen = set( self.cycles ) | set( self.serials )
+
+	@staticmethod
+	def from_dict( values ):
+		return Segment( **values )
+
+	def as_dict( self ):
+		return {'file': self.file, 'start': self.start, 'end': self.end, 'records': self.records,
+			'size': self.size, 'levels': self.levels, 'errors': self.errors,
+			'cycles': self.cycles, 'serials': self.serials, 'compressed': self.compressed}
+
+	def add( self, created, levelname, levelno, size, cycle = None, serial = None ):
+		if self.start is None or created < self.start:
+			self.start = created
+		if self.end is None or created > self.end:
+			self.end = created
+		self.records += 1
+		self.size += size
+		self.levels[levelname] = self.levels.get( levelname, 0 ) + 1
+		if levelno >= logging.ERROR:
+			self.errors += 1
+		if cycle is not None and cycle not in self._seen:
+			self._seen.add( cycle )
+			self.cycles.append( cycle )
+		if serial is not None and serial not in self._seen:
+			self._seen.add( serial )
+			self.serials.append( serial )
+
+	def add_line( self, line ):
+		'''
+		update the entry from a written json line (recovery)
+		'''
+		try:
+			entry = json.loads( line )
+			levelname = entry.get( 'level', 'NOTSET' )
+			self.add( entry['t'], levelname, logging.getLevelName( levelname ) if levelname in logging._nameToLevel else 0,
+				len( line ), entry.get( 'cycle' ), entry.get( 'serial' ) )
+		except ( ValueError, KeyError, TypeError ):
+			pass
+
+	def matches( self, start = None, end = None, level = None, cycle = None, serial = None ):
+		'''
+		False if the segment cannot contain matching records
+		'''
+		if self.start is None:
+			return False
+		if start is not None and self.end < start:
+			return False
+		if end is not None and self.start > end:
+			return False
+		if level is not None and not any( logging._nameToLevel.get( name, 0 ) >= level
+				for name, count in self.levels.items() if count ):
+			return False
+		if cycle is not None and cycle not in self.cycles:
+			return False
+		if serial is not None and serial not in self.serials:
+			return False
+		return True
+
+
+class LogStore( object ):
+	'''
+	Writes records into segments of the log directory.
+	A segment is closed when it reaches max_bytes or is older than max_age seconds,
+	closed segments are compressed in the background and removed after retention seconds.
+	Segments of a previous run which are missing in the index (crash) are indexed and compressed on open.
+	'''
+	def __init__( self, directory, basename, max_bytes = 50 * 1024 * 1024, max_age = 24 * 3600,
+			retention = 28 * 24 * 3600, compress = True, timeformat = '_%Y_%m_%d_%H_%M_%S' ):
+		self.directory = directory
+		self.basename = basename
+		self.max_bytes = max_bytes
+		self.max_age = max_age
+		self.retention = retention
+		self.compress = compress
+		self.timeformat = timeformat
+		self.rotations = 0
+		self.compressions = 0
+		self.segments = []
+		self.current = None
+		self._file = None
+		self._opened = 0
+		self._lock = threading.RLock()
+		self._compress_queue = queue.Queue()
+		self._compressor = None
+		os.makedirs( directory, exist_ok = True )
+		self._load_index()
+		self._recover()
+		self.prune()
+
+	@property
+	def index_filename( self ):
+		return os.path.join( self.directory, self.basename + '.index.json' )
+
+	def _path( self, file ):
+		return os.path.join( self.directory, file )
+
+	def _load_index( self ):
+		self.segments = read_index( self.index_filename )
+		self.segments = [s for s in self.segments if os.path.exists( self._path( s.file ) )]
+
+	def _save_index( self ):
+		# writer and compressor thread save the index, the lock covers snapshot, write and replace
+		# (rotate calls it with the lock held)
+		with self._lock:
+			data = {'version': INDEX_VERSION, 'basename': self.basename,
+				'segments': [s.as_dict() for s in self.segments]}
+			temp = self.index_filename + '.tmp'
+			try:
+				with open( temp, 'w', encoding = 'utf-8' ) as f:
+					json.dump( data, f, separators = ( ',', ':' ) )
+				os.replace( temp, self.index_filename )
+			except OSError:
+				pass
+
+	def _recover( self ):
+		known = set( s.file for s in self.segments )
+		changed = False
+		for segment in self.segments:
+			if not segment.compressed:
+				self._queue_compression( segment )
+		for file in sorted( os.listdir( self.directory ) ):
+			if file in known or not self.is_segment( file ):
+				continue
+			if file[:-len( SEGMENT_SUFFIX )] + COMPRESSED_SUFFIX in known:
+				# compressed, but not removed
+				try:
+					os.remove( self._path( file ) )
+				except OSError:
+					pass
+			else:
+				segment = Segment( file )
+				try:
+					with open( self._path( file ), 'r', encoding = 'utf-8', errors = 'replace' ) as f:
+						for line in f:
+							segment.add_line( line )
+				except OSError:
+					continue
+				self.segments.append( segment )
+				changed = True
+				self._queue_compression( segment )
+		if changed:
+			self.segments.sort( key = lambda s: s.start or 0 )
+			self._save_index()
+
+	def is_segment( self, file ):
+		'''
+		True for (uncompressed) segment files of this store,
+		"<basename><timeformat>[_n].jsonl"
+		'''
+		if not file.startswith( self.basename ) or not file.endswith( SEGMENT_SUFFIX ):
+			return False
+		stamp = file[len( self.basename ):-len( SEGMENT_SUFFIX )]
+		for candidate in ( stamp, stamp.rsplit( '_', 1 )[0] ):
+			try:
+				time.strptime( candidate, self.timeformat )
+				return True
+			except ValueError:
+				pass
+		return False
+
+	def _open_segment( self, created ):
+		name = self.basename + time.strftime( self.timeformat, time.localtime( created ) )
+		stem = name
+		n = 1
+		while os.path.exists( self._path( stem + SEGMENT_SUFFIX ) ) or os.path.exists( self._path( stem + COMPRESSED_SUFFIX ) ):
+			n += 1
+			stem = '{}_{}'.format( name, n )
+		file = stem + SEGMENT_SUFFIX
+		self._file = open( self._path( file ), 'a', encoding = 'utf-8' )
+		self.current = Segment( file )
+		self._opened = time.time()
+
+	def write( self, line, record ):
+		'''
+		append one formatted line of the record
+		'''
+		with self._lock:
+			if self._file is None:
+				self._open_segment( record.created )
+			elif self._due():
+				self.rotate()
+				self._open_segment( record.created )
+			self._file.write( line + '\n' )
+			self._file.flush()
+			self.current.add( record.created, record.levelname, record.levelno, len( line ) + 1,
+				getattr( record, 'cycle', None ), getattr( record, 'serial', None ) )
+
+	def _due( self ):
+		return ( self.current is not None and self.current.records > 0
+			and ( self.current.size >= self.max_bytes or time.time() - self._opened >= self.max_age ) )
+
+	def rotate_if_due( self ):
+		'''
+		close the current segment if it is too large or too old, returns True if closed
+		'''
+		with self._lock:
+			if not self._due():
+				return False
+			self.rotate()
+			return True
+
+	def rotate( self ):
+		'''
+		close the current segment, the next write opens a new one
+		'''
+		with self._lock:
+			if self._file is None:
+				return
+			self._file.close()
+			self._file = None
+			segment = self.current
+			self.current = None
+			if not segment.records:
+				try:
+					os.remove( self._path( segment.file ) )
+				except OSError:
+					pass
+				return
+			self.segments.append( segment )
+			self.rotations += 1
+		self._save_index()
+		self._queue_compression( segment )
+		self.prune()
+
+	def _queue_compression( self, segment ):
+		if not self.compress:
+			return
+		self._compress_queue.put( segment )
+		if self._compressor is None or not self._compressor.is_alive():
+			self._compressor = threading.Thread( target = self._compress_loop, name = 'LogStoreCompressor', daemon = True )
+			self._compressor.start()
+
+	def _compress_loop( self ):
+		while True:
+			try:
+				segment = self._compress_queue.get( timeout = 1.0 )
+			except queue.Empty:
+				return
+			try:
+				self._compress( segment )
+			except Exception:
+				pass
+			finally:
+				self._compress_queue.task_done()
+
+	def _compress( self, segment ):
+		source = self._path( segment.file )
+		file = segment.file[:-len( SEGMENT_SUFFIX )] + COMPRESSED_SUFFIX
+		temp = self._path( file + '.tmp' )
+		with open( source, 'rb' ) as f_in, gzip.open( temp, 'wb', compresslevel = 6 ) as f_out:
+			shutil.copyfileobj( f_in, f_out, 1024 * 1024 )
+		os.replace( temp, self._path( file ) )
+		with self._lock:
+			segment.file = file
+			segment.compressed = True
+			self.compressions += 1
+		self._save_index()
+		os.remove( source )
+
+	def wait_compressed( self, timeout = 30.0 ):
+		'''
+		wait until the queued segments are compressed
+		'''
+		end = time.time() + timeout
+		while self._compress_queue.unfinished_tasks and time.time() < end:
+			time.sleep( 0.01 )
+
+	def prune( self ):
+		'''
+		remove the segments which ended more than retention seconds ago
+		'''
+		if not self.retention:
+			return
+		limit = time.time() - self.retention
+		with self._lock:
+			old = [s for s in self.segments if s.end is not None and s.end < limit]
+			if not old:
+				return
+			self.segments = [s for s in self.segments if s not in old]
+		for segment in old:
+			try:
+				os.remove( self._path( segment.file ) )
+			except OSError:
+				pass
+		self._save_index()
+
+	def select( self, start = None, end = None, level = None, cycle = None, serial = None ):
+		'''
+		segments (oldest first, including the current one) which can contain matching records
+		'''
+		with self._lock:
+			segments = list( self.segments )
+			if self.current is not None:
+				segments.append( self.current )
+		return [s for s in segments if s.matches( start, end, level, cycle, serial )]
+
+	def flush( self ):
+		with self._lock:
+			if self._file is not None:
+				self._file.flush()
+
+	def close( self, wait = 10.0 ):
+		self.rotate()
+		self.wait_compressed( wait )
+
+	def stats( self ):
+		with self._lock:
+			return {'segments': len( self.segments ), 'rotations': self.rotations,
+				'compressions': self.compressions, 'pending_compressions': self._compress_queue.unfinished_tasks,
+				'current_size': self.current.size if self.current is not None else 0}
+
+
+class StoreHandler( logging.Handler ):
+	'''
+	logging handler writing json lines into a LogStore
+	'''
+	def __init__( self, store ):
+		logging.Handler.__init__( self )
+		self.store = store
+		self.setFormatter( JsonFormatter() )
+
+	def emit( self, record ):
+		try:
+			self.store.write( self.format( record ), record )
+		except Exception:
+			self.handleError( record )
+
+	def flush( self ):
+		self.store.flush()
+
+	def close( self ):
+		self.store.close()
+		logging.Handler.close( self )
+
+
+def read_index( filename ):
+	'''
+	segments of an index file, empty list if missing or unreadable
+	'''
+	try:
+		with open( filename, 'r', encoding = 'utf-8' ) as f:
+			data = json.load( f )
+		if data.get( 'version' ) != INDEX_VERSION:
+			return []
+		return [Segment.from_dict( s ) for s in data.get( 'segments', [] )]
+	except ( OSError, ValueError, TypeError, AttributeError ):
+		return []
@@ -153,6 +153,7 @@ class Localization:
 	msg_settings_repetition_value = '"MaxDigitizeRepetition" minimum value is 1 (1 measurement and no repetition).'
 	msg_settings_failmargin_value = '"MeasurementFailureMargin" requires a value between 0.0 and 1.0.'
 	msg_settings_inline_ioextension = '"Inline" and "IOExtension" cannot be activated at the same time.'
+	msg_settings_invalid_value = 'Setting ignored, default value is used: {}'
 
 	msg_platform_not_supported = 'Only the Windows platform is supported!'
 
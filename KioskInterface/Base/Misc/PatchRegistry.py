@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+# Script: Registry and deferred analysis of the applied patches
+#
+# PLEASE NOTE that this file is part of the GOM Software.
+# You are not allowed to distribute this file to a third party without written notice.
+#
+# Please, do not copy and/or modify this script.
+# All modifications of KioskInterface should happen in the CustomPatches script.
+# Ignoring this advice will make KioskInterface fail after Software update.
+#
+# Copyright (c) 2021 Carl Zeiss GOM Metrology GmbH
+# All rights reserved.
+
+# Plain python, no gom module needed.
+# Utils.MetaClassPatch and Utils.patches only register the patches (register()),
+# the signature checks for KioskInterfacePatches.log run later (write_log/write_log_async).
+# <log>.cache.json keeps mtime, size and hash of the patch files and the patched modules,
+# the log is only written again if one of them (or the set of patches) changed.
+
+import hashlib
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+
+CACHE_VERSION = 1
+
+_IGNORED = ( '__metaclass__', '__doc__', '__module__', '__qualname__' )
+_MISSING = object()
+
+_registrations = []
+_lock = threading.Lock()
+
+
+class Registration( object ):
+	'''
+	One applied patch, recorded with the attribute values of the base class before patching
+	'''
+	def __init__( self, filename, lineno, base, module_name, patchedname, namespace,
+			ignore_first = False, external_decorator = None ):
+		self.filename = filename
+		self.lineno = lineno
+		self.base = base
+		self.module_name = module_name
+		self.patchedname = patchedname
+		self.namespace = dict( namespace )
+		self.ignore_first = ignore_first
+		self.external_decorator = external_decorator
+		# attribute -> (value, value in the class dict) of the patched attributes
+		self.originals = {}
+		for name in self.namespace:
+			if name in _IGNORED:
+				continue
+			value = getattr( base, name, _MISSING )
+			if value is not _MISSING:
+				self.originals[name] = ( value, base.__dict__.get( name, _MISSING ) )
+
+	def key( self ):
+		return '{} {} {}->{} ({})'.format( self.filename, self.lineno, self.module_name, self.base.__name__, self.patchedname )
+
+	def loglines( self ):
+		'''
+		log lines comparing the patch with the original attributes
+		'''
+		loglines = ['{} line {}\n'.format( self.filename, self.lineno ),
+			'  {}->{} ({})\n'.format( self.module_name, self.base.__name__, self.patchedname )]
+		for attr_name, attr_value in sorted( self.namespace.items() ):
+			if attr_name in _IGNORED:
+				continue
+			try:
+				loglines += self._attribute_lines( attr_name, attr_value )
+			except Exception:
+				pass
+		return loglines
+
+	def _attribute_lines( self, attr_name, attr_value ):
+		is_patched = attr_name in self.originals
+		patched_spec = _getargs( attr_name, attr_value, self.ignore_first )
+		orig_spec = _getargs( attr_name, self.originals[attr_name][0] ) if is_patched else None
+		spec = ''
+		if orig_spec is not None and patched_spec is not None:
+			error = ''
+			if orig_spec[0] != patched_spec[0]:
+				error = 'DIFFERENT COUNT OF PARAMETERS'
+			elif orig_spec[1] != patched_spec[1]:
+				error = 'DIFFERENT DEFAULTS'
+			elif orig_spec[2] != patched_spec[2]:
+				error = 'DIFFERENT NAMES'
+			spec = '{}!={} {}'.format( patched_spec[2], orig_spec[2], error ) if len( error ) else patched_spec[2]
+		elif patched_spec is not None:
+			spec = '{}'.format( patched_spec[2] )
+		equal_type = ''
+		if is_patched:
+			_orig_val = self.originals[attr_name][1]
+			if _orig_val is _MISSING:
+				raise KeyError( attr_name )
+			type_cmp_value = attr_value
+			if self.external_decorator is not None:
+				type_cmp_value = self.external_decorator( attr_value )
+			if type( type_cmp_value ) != type( _orig_val ):
+				equal_type = 'UNEQUAL TYPE {} <-> {}'.format( type( type_cmp_value ), type( _orig_val ) )
+			elif isinstance( attr_value, str ):
+				if attr_value.count( '{' ) != _orig_val.count( '{' ):
+					equal_type = 'DIFFERENT FORMAT COUNT'
+		lines = ['    {}{} [{}] {}\n'.format( attr_name, spec, 'patched' if is_patched else 'new', equal_type )]
+		if ( self.module_name == 'Base.Evaluate' and self.base.__name__ == 'EvaluationAnalysis'
+				and attr_name == 'update_all_reports' and is_patched ):
+			lines.append( '    DEPRECATED\n' )
+		return lines
+
+
+def _getargs( _name, _value, _ignore_first = False ):
+	def _inspect_args( _value, _ignore_first ):
+		if not _ignore_first:
+			_args = inspect.getfullargspec( _value )
+			return len( _args[0] ), _args[3], inspect.formatargspec( *_args )
+		else:
+			args, varargs, varkw, defaults, kwonlyargs, kwonlydefaults, annotations = inspect.getfullargspec( _value )
+			if len( args ) >= 1:
+				args = args[1:]
+			return len( args ), defaults, inspect.formatargspec( args, varargs, varkw, defaults, kwonlyargs, kwonlydefaults, annotations )
+	spec_tuple = None
+	try:
+		spec_tuple = _inspect_args( _value, _ignore_first )
+	except:
+		try:
+			class _tmpobject: pass
+			setattr( _tmpobject, _name, _value )
+			spec_tuple = _inspect_args( getattr( _tmpobject, _name ), _ignore_first )
+		except:
+			pass
+	return spec_tuple
+
+
+def register( filename, lineno, base, module_name, patchedname, namespace, ignore_first = False, external_decorator = None ):
+	'''
+	record a patch, called before the base class is patched
+	'''
+	registration = Registration( filename, lineno, base, module_name, patchedname, namespace,
+		ignore_first, external_decorator )
+	with _lock:
+		_registrations.append( registration )
+	return registration
+
+def registrations():
+	with _lock:
+		return list( _registrations )
+
+def report():
+	'''
+	text of the patch log (on demand analysis of all registered patches)
+	'''
+	lines = ['Applied patches {}\n'.format( time.strftime( '%Y.%m.%d %H:%M:%S' ) )]
+	for registration in registrations():
+		lines += registration.loglines()
+	return ''.join( lines )
+
+
+def cache_filename( logfile ):
+	return os.path.splitext( logfile )[0] + '.cache.json'
+
+def _sources( patches ):
+	'''
+	files the analysis depends on: patch files and modules of the patched classes
+	'''
+	files = set()
+	for registration in patches:
+		files.add( registration.filename )
+		module = sys.modules.get( registration.module_name )
+		if getattr( module, '__file__', None ):
+			files.add( module.__file__ )
+	return sorted( f for f in files if os.path.isfile( f ) )
+
+def _file_state( filename, cached ):
+	'''
+	[mtime_ns, size, sha256] of the file, the cached hash is reused if mtime and size are unchanged
+	'''
+	stat = os.stat( filename )
+	if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+		return cached
+	with open( filename, 'rb' ) as f:
+		digest = hashlib.sha256( f.read() ).hexdigest()
+	return [stat.st_mtime_ns, stat.st_size, digest]
+
+def _read_cache( filename ):
+	try:
+		with open( filename, 'r', encoding = 'utf-8' ) as f:
+			cache = json.load( f )
+		if cache.get( 'version' ) == CACHE_VERSION:
+			return cache
+	except ( OSError, ValueError ):
+		pass
+	return None
+
+def _write_atomic( filename, text ):
+	temp = '{}.{}.tmp'.format( filename, os.getpid() )
+	with open( temp, 'w', encoding = 'utf-8' ) as f:
+		f.write( text )
+	os.replace( temp, filename )
+
+def write_log( logfile ):
+	'''
+	write the patch log if the patch set changed since the last run,
+	returns True if the log was written, False if it was up to date
+	'''
+	patches = registrations()
+	signature = hashlib.sha256( '\n'.join( r.key() for r in patches ).encode( 'utf-8' ) ).hexdigest()
+	cachefile = cache_filename( logfile )
+	cache = _read_cache( cachefile )
+	cached_files = cache['files'] if cache is not None else {}
+	files = dict( [( f, _file_state( f, cached_files.get( f ) ) ) for f in _sources( patches )] )
+	if ( cache is not None and cache.get( 'patches' ) == signature and os.path.isfile( logfile )
+			and set( files ) == set( cached_files )
+			and all( files[f][2] == cached_files[f][2] for f in files ) ):
+		if files != cached_files: # touched, but same content
+			_write_atomic( cachefile, json.dumps( {'version': CACHE_VERSION, 'patches': signature, 'files': files} ) )
+		return False
+	_write_atomic( logfile, report() )
+	_write_atomic( cachefile, json.dumps( {'version': CACHE_VERSION, 'patches': signature, 'files': files} ) )
+	return True
+
+def write_log_async( logfile ):
+	'''
+	write_log in a background thread, returns the thread
+	'''
+	def run():
+		try:
+			write_log( logfile )
+		except Exception:
+			pass
+	thread = threading.Thread( target = run, name = 'PatchLog', daemon = True )
+	thread.start()
+	return thread
@@ -16,10 +16,18 @@
 #ChangeLog:
 # 2012-06-12: Initial Creation
 
-import configparser, os, time, datetime
+import configparser, os, time, datetime, json, threading
 
 class PersistentSettings( object ):
+	'''
+	Values are kept in memory, the file is only read on creation.
+	Updates (update()) are appended to a journal file first and written
+	to the settings file after debounce seconds, so several updates share one write.
+	The settings file is replaced atomically (temp file, fsync, replace),
+	after a crash the journal is replayed on the next start.
+	'''
 	CFG_NAME = None
+	JOURNAL_NAME = None
 
 	_LastCalibration = 0
 	_LastCalibrationFormat = '%Y/%m/%d %H:%M:%S'
@@ -29,11 +37,16 @@ class PersistentSettings( object ):
 		return self._LastCalibration
 	@LastCalibration.setter
 	def LastCalibration( self, value ):
-		self._LastCalibration = value
-		self.write_settings()
+		self.update( '_LastCalibration', value )
 
-	def __init__( self, savepath ):
+	def __init__( self, savepath, debounce = 2.0 ):
 		self.CFG_NAME = os.path.join( savepath, 'KioskInterface_persistantsettings.cfg' )
+		self.JOURNAL_NAME = self.CFG_NAME + '.journal'
+		self.debounce = debounce
+		self.writes = 0
+		self.updates = 0
+		self._lock = threading.RLock()
+		self._timer = None
 		self.read_settings()
 
 	def read_settings( self ):
@@ -49,24 +62,88 @@ class PersistentSettings( object ):
 			except:
 				pass
 		self.read_additional_settings( config_parser_object )
+		if self._replay_journal():
+			self.write_settings()
 
 	def read_additional_settings( self, config_parser_object ):
 		pass
 
+	def _replay_journal( self ):
+		'''
+		apply the updates of the journal which were not written, returns True if any
+		'''
+		try:
+			with open( self.JOURNAL_NAME, 'r', encoding='utf-8' ) as journal:
+				lines = journal.readlines()
+		except OSError:
+			return False
+		replayed = False
+		for line in lines:
+			try:
+				entry = json.loads( line )
+			except ValueError: # incomplete last line of a crash
+				continue
+			setattr( self, entry['attr'], entry['value'] )
+			replayed = True
+		return replayed
+
+	def update( self, attr, value ):
+		'''
+		set attribute to the (json serializable) value and schedule the write of the settings file
+		'''
+		with self._lock:
+			setattr( self, attr, value )
+			self.updates += 1
+			with open( self.JOURNAL_NAME, 'a', encoding='utf-8' ) as journal:
+				journal.write( json.dumps( {'attr': attr, 'value': value} ) + '\n' )
+				journal.flush()
+				os.fsync( journal.fileno() )
+			if self.debounce is None or self.debounce <= 0:
+				self.write_settings()
+			elif self._timer is None:
+				self._timer = threading.Timer( self.debounce, self.flush )
+				self._timer.daemon = True
+				self._timer.start()
+
+	def flush( self ):
+		'''
+		write pending updates now
+		'''
+		with self._lock:
+			if self._timer is not None:
+				self._timer.cancel()
+				self._timer = None
+				self.write_settings()
+
+	def close( self ):
+		self.flush()
+
 	_header = staticmethod( lambda cfgfile, head:       cfgfile.write( '[{0}]\n'.format( str( head ) ) ) )
 	_writeln = staticmethod( lambda cfgfile, key, value:cfgfile.write( '{0} = {1}\n'.format( key, str( value ).replace( '\n', '\n\t' ) ) ) )
 	_newline = staticmethod( lambda cfgfile :           cfgfile.write( '\n' ) )
 
 	def write_settings( self ):
-		with open( self.CFG_NAME, 'w', encoding='utf-8' ) as cfgfile:
-			self._header( cfgfile, 'Calibration' )
-			if self._LastCalibration != 0:
-				date = datetime.datetime.fromtimestamp( self._LastCalibration )
-			else:
-				date = datetime.datetime (1970, 1, 1)
-			self._writeln( cfgfile, 'LastCalibration', date.strftime( self._LastCalibrationFormat ) )
+		'''
+		write all values to a temp file and replace the settings file with it,
+		the journal is cleared afterwards
+		'''
+		with self._lock:
+			temp = self.CFG_NAME + '.tmp'
+			with open( temp, 'w', encoding='utf-8' ) as cfgfile:
+				self._header( cfgfile, 'Calibration' )
+				if self._LastCalibration != 0:
+					date = datetime.datetime.fromtimestamp( self._LastCalibration )
+				else:
+					date = datetime.datetime (1970, 1, 1)
+				self._writeln( cfgfile, 'LastCalibration', date.strftime( self._LastCalibrationFormat ) )
 
-			self.write_additional_settings( cfgfile )
+				self.write_additional_settings( cfgfile )
+				cfgfile.flush()
+				os.fsync( cfgfile.fileno() )
+			os.replace( temp, self.CFG_NAME )
+			self.writes += 1
+			if os.path.exists( self.JOURNAL_NAME ):
+				os.remove( self.JOURNAL_NAME )
 
 	def write_additional_settings( self, cfgfile ):
 		pass
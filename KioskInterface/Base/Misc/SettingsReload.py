@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+# Script: Reload of the settings file while the kiosk is running
+#
+# PLEASE NOTE that this file is part of the GOM Software.
+# You are not allowed to distribute this file to a third party without written notice.
+#
+# Please, do not copy and/or modify this script.
+# All modifications of KioskInterface should happen in the CustomPatches script.
+# Ignoring this advice will make KioskInterface fail after Software update.
+#
+# Copyright (c) 2021 Carl Zeiss GOM Metrology GmbH
+# All rights reserved.
+
+import configparser
+import json
+import os
+import time
+
+from . import Globals, SettingsSchema, Utils
+
+
+class Snapshot( object ):
+	'''
+	Read-only view of the setting values of one parse of the settings file.
+	Lists are stored as tuples, a changed file results in a new snapshot.
+	'''
+	__slots__ = ( '_values', 'errors', 'created' )
+
+	def __init__( self, values, errors = None ):
+		frozen = {}
+		for attr, value in values.items():
+			frozen[attr] = tuple( value ) if isinstance( value, list ) else value
+		object.__setattr__( self, '_values', frozen )
+		object.__setattr__( self, 'errors', tuple( errors or [] ) )
+		object.__setattr__( self, 'created', time.time() )
+
+	@staticmethod
+	def from_loaded( loaded ):
+		return Snapshot( dict( [( option.attr, value ) for option, value in loaded.values] ), loaded.errors )
+
+	def __getattr__( self, name ):
+		try:
+			return self._values[name]
+		except KeyError:
+			raise AttributeError( name )
+
+	def __setattr__( self, name, value ):
+		raise AttributeError( 'settings snapshot is read-only' )
+
+	def __contains__( self, name ):
+		return name in self._values
+
+	def get( self, name, default = None ):
+		return self._values.get( name, default )
+
+	def replace( self, values ):
+		'''
+		new snapshot with the given values changed
+		'''
+		merged = dict( self._values )
+		merged.update( values )
+		return Snapshot( merged, self.errors )
+
+	def diff( self, other ):
+		'''
+		attribute -> (old value, new value) of all values changed in other,
+		values missing in other (removed or invalid) are not reported
+		'''
+		changes = {}
+		for attr, value in other._values.items():
+			old = self._values.get( attr )
+			if attr not in self._values or old != value:
+				changes[attr] = ( old, value )
+		return changes
+
+
+def encode_changes( changes ):
+	'''
+	changes (attribute -> (old, new)) as signal value, values in cfg file format
+	'''
+	texts = {}
+	for attr, ( _old, new ) in changes.items():
+		option = SettingsSchema.SCHEMA.option( attr )
+		texts[attr] = str( option.type.format( list( new ) if isinstance( new, tuple ) else new ) )
+	return json.dumps( texts )
+
+
+class SettingsReloader( Utils.GenericLogClass ):
+	'''
+	Watches the settings file and reloads it when it changed.
+	check() is registered as GlobalTimer handler, the file is reloaded when a changed
+	modification time/size was stable for one check (no half written files).
+	Changed hot options (see SettingsSchema.Option) are set on the settings object and passed
+	to the subscribers, changed options which need a restart are only logged.
+	Eval clients get the changes from the kiosk by SIGNAL_SETTINGS_CHANGED (apply_texts).
+	'''
+	def __init__( self, logger, settings, interval = 2.0 ):
+		Utils.GenericLogClass.__init__( self, logger )
+		self.settings = settings
+		self.filename = settings.CFG_NAME
+		self.interval = interval
+		self.reloads = 0
+		self.restart_required = {}
+		self._subscribers = []
+		self._last_check = 0
+		self._pending = None
+		self._signature = self._stat()
+		loaded = SettingsSchema.SCHEMA.load( self.filename )
+		self.snapshot = Snapshot.from_loaded( loaded ) if loaded is not None else Snapshot( {} )
+
+	def _stat( self ):
+		try:
+			stat = os.stat( self.filename )
+			return ( stat.st_mtime_ns, stat.st_size )
+		except OSError:
+			return None
+
+	def subscribe( self, callback, attrs = None ):
+		'''
+		callback( changes ) is called with attribute -> (old, new) of the applied changes,
+		only for changes of the given attributes (or all)
+		'''
+		self._subscribers.append( ( callback, set( attrs ) if attrs is not None else None ) )
+
+	def unsubscribe( self, callback ):
+		self._subscribers = [s for s in self._subscribers if s[0] != callback]
+
+	def check( self, value = None ):
+		'''
+		timer handler, returns True if changes were applied
+		'''
+		now = time.time()
+		if now - self._last_check < self.interval:
+			return False
+		self._last_check = now
+		signature = self._stat()
+		if signature is None or signature == self._signature:
+			self._pending = None
+			return False
+		if signature != self._pending:
+			# wait for one more check, the file may still be written
+			self._pending = signature
+			return False
+		self._pending = None
+		self._signature = signature
+		return self.reload()
+
+	def reload( self ):
+		'''
+		parse the settings file into a new snapshot and apply it
+		'''
+		try:
+			loaded = SettingsSchema.SCHEMA.load( self.filename )
+		except ( OSError, UnicodeError, configparser.Error ) as e:
+			self.log.error( 'settings reload failed, keeping current settings: {}'.format( e ) )
+			return False
+		if loaded is None:
+			return False
+		snapshot = Snapshot.from_loaded( loaded )
+		for error in snapshot.errors:
+			if error not in self.snapshot.errors:
+				self.log.warning( Globals.LOCALIZATION.msg_settings_invalid_value.format( error ) )
+		self.reloads += 1
+		return self.apply( snapshot )
+
+	def apply_texts( self, texts ):
+		'''
+		apply attribute -> cfg text changes (received from the kiosk), returns True if changes were applied
+		'''
+		values = {}
+		for attr, text in texts.items():
+			option = SettingsSchema.SCHEMA.option( attr )
+			if option is None:
+				self.log.warning( 'unknown setting received: {}'.format( attr ) )
+				continue
+			value, error = option.parse( text )
+			if error is not None:
+				self.log.warning( Globals.LOCALIZATION.msg_settings_invalid_value.format( '{}: {}'.format( attr, error ) ) )
+				continue
+			values[attr] = value
+		return self.apply( self.snapshot.replace( values ) )
+
+	def apply( self, snapshot ):
+		'''
+		switch to the snapshot, set the hot changes and notify the subscribers
+		'''
+		changes = self.snapshot.diff( snapshot )
+		self.snapshot = snapshot
+		patched = self.settings._patched_attributes()
+		applied = {}
+		for attr, ( old, new ) in changes.items():
+			option = SettingsSchema.SCHEMA.option( attr )
+			if option is None or ( option.patched is not None and option.patched in patched ):
+				continue
+			if not option.hot:
+				if self.restart_required.get( attr ) != new:
+					self.log.warning( 'setting {} changed to {}, restart required'.format( option.key, new ) )
+				self.restart_required[attr] = new
+				continue
+			self.restart_required.pop( attr, None )
+			for name in option.attrs:
+				setattr( self.settings, name, list( new ) if isinstance( new, tuple ) else new )
+			applied[attr] = ( old, new )
+			self.log.info( 'setting {} changed from {} to {}'.format( option.key, old, new ) )
+		if not applied:
+			return False
+		for callback, attrs in self._subscribers:
+			selected = dict( [( attr, change ) for attr, change in applied.items() if attrs is None or attr in attrs] )
+			if not selected:
+				continue
+			try:
+				callback( selected )
+			except Globals.EXIT_EXCEPTIONS:
+				raise
+			except Exception as e:
+				self.log.exception( 'settings subscriber {} failed: {}'.format( callback, e ) )
+		return True
+
+
+def logging_level_subscriber( logger ):
+	'''
+	subscriber setting the level of the logger to the new LoggingLevel
+	'''
+	def update( changes ):
+		logger.setLevel( changes['LoggingLevel'][1] )
+	return update
@@ -0,0 +1,979 @@
+# -*- coding: utf-8 -*-
+# Script: Declarative schema of the KioskInterface settings file
+#
+# PLEASE NOTE that this file is part of the GOM Software.
+# You are not allowed to distribute this file to a third party without written notice.
+#
+# Please, do not copy and/or modify this script.
+# All modifications of KioskInterface should happen in the CustomPatches script.
+# Ignoring this advice will make KioskInterface fail after Software update.
+#
+# Copyright (c) 2021 Carl Zeiss GOM Metrology GmbH
+# All rights reserved.
+
+# Plain python, no gom module needed.
+# The default values are the class attributes of DefaultSettings, the schema describes
+# where and how each of them is stored in the cfg file.
+#   python -m KioskInterface.Base.Misc.SettingsSchema benchmark --count 200 kiosk.cfg
+
+import argparse
+import codecs
+import configparser
+import logging
+import os
+import sys
+import time
+
+
+class Type( object ):
+	'''
+	conversion of one setting between cfg text and value,
+	parse raises ValueError for invalid text
+	'''
+	def __init__( self, name, parse, format = str ):
+		self.name = name
+		self.parse = parse
+		self.format = format
+
+
+def _boolean( text ):
+	try:
+		return configparser.RawConfigParser.BOOLEAN_STATES[text.lower()]
+	except KeyError:
+		raise ValueError( text )
+
+def _logging_level( text ):
+	level = logging.getLevelName( text )
+	if not isinstance( level, int ):
+		raise ValueError( text )
+	return level
+
+def StrList( separator ):
+	'''
+	list of strings, written joined by separator, read split at ","
+	'''
+	return Type( 'list', lambda text: [item.strip() for item in text.split( ',' )],
+		lambda items: separator.join( items ) )
+
+def IntList( separator ):
+	'''
+	list of integers, written joined by separator, read split at ","
+	'''
+	return Type( 'integer list', lambda text: [int( item.strip() ) for item in text.split( ',' )],
+		lambda items: separator.join( [str( item ) for item in items] ) )
+
+STR = Type( 'string', str )
+BOOL = Type( 'boolean', _boolean )
+INT = Type( 'integer', int )
+FLOAT = Type( 'float', float )
+# stored as level name
+LOGLEVEL = Type( 'logging level', _logging_level, logging.getLevelName )
+# stored 1-based (COM1), used 0-based
+COMPORT = Type( 'COM port', lambda text: int( text ) - 1, lambda port: port + 1 )
+# control characters stored escaped ("\r\n")
+ESCAPED = Type( 'escaped string', lambda text: bytes( text, 'utf-8' ).decode( 'unicode_escape' ),
+	lambda value: value.encode( 'unicode_escape' ).decode() )
+
+
+def at_least( minimum ):
+	def check( value ):
+		if value < minimum:
+			return 'has to be at least {0}'.format( minimum )
+	return check
+
+def in_range( minimum, maximum ):
+	def check( value ):
+		if not minimum <= value <= maximum:
+			return 'has to be between {0} and {1}'.format( minimum, maximum )
+	return check
+
+def choices( *values ):
+	def check( value ):
+		if value not in values:
+			return 'has to be one of {0}'.format( ', '.join( values ) )
+	return check
+
+PORT = in_range( 1, 65535 )
+
+
+class Option( object ):
+	'''
+	one setting of the cfg file
+	attr      - Settings attribute (None for special options)
+	key       - key in the cfg file, default attr
+	patched   - attribute name checked by Settings._is_patched_attribute, default attr,
+	            None for options which are read unconditionally
+	also      - further attributes set to the same value (compatibility names)
+	convert   - applied to the parsed value after validation
+	special   - handled by Settings itself ('users', 'image', 'version')
+	write     - False for options which are only read (migration of old keys)
+	hot       - True if a changed value can be applied while running (see SettingsReload),
+	            all other options need a restart of the kiosk
+	blank     - empty lines written after the option
+	'''
+	def __init__( self, attr, key = None, type = STR, comments = None, validators = None,
+			patched = '', also = None, convert = None, special = None, image = None, write = True, hot = False, blank = 1 ):
+		self.attr = attr
+		self.key = key if key is not None else attr
+		self.type = type
+		self.comments = comments or []
+		self.validators = validators or []
+		self.patched = attr if patched == '' else patched
+		self.attrs = [attr] + ( also or [] )
+		self.convert = convert
+		self.special = special
+		self.image = image
+		self.write = write
+		self.hot = hot
+		self.blank = blank
+
+	def parse( self, text ):
+		'''
+		returns (value, error message)
+		'''
+		try:
+			value = self.type.parse( text )
+		except ( ValueError, TypeError ):
+			return None, 'invalid {0} "{1}"'.format( self.type.name, text )
+		for validator in self.validators:
+			message = validator( value )
+			if message is not None:
+				return None, '"{0}" {1}'.format( text, message )
+		if self.convert is not None:
+			value = self.convert( value )
+		return value, None
+
+
+class Section( object ):
+	'''
+	one section of the cfg file
+	comments  - written after the section header
+	gap       - additional empty lines after the section
+	condition - Settings attribute, the section is only written if it is True
+	'''
+	def __init__( self, name, options, comments = None, gap = 1, condition = None ):
+		self.name = name
+		self.options = options
+		self.comments = comments or []
+		self.gap = gap
+		self.condition = condition
+
+
+class Loaded( object ):
+	'''
+	result of one parse of a cfg file
+	values   - list of (option, value) in schema order
+	specials - special option key -> text
+	errors   - list of all error messages
+	'''
+	def __init__( self, parser, values, specials, errors ):
+		self.parser = parser
+		self.values = values
+		self.specials = specials
+		self.errors = errors
+
+SECTIONS = [
+	Section( 'General Settings/Data Storage', [
+		Option( 'SavePath', comments=[
+				'SavePath specifies the directory where all files',
+				'created by the Kiosk Interface should be stored',
+			] ),
+		Option( 'OfflineMode', key='DemoMode', type=BOOL, comments=[
+				'DemoMode is meant for development, testing and demonstration.',
+				'In this case the script will skip everything related to real hardware.',
+			] ),
+		Option( 'FailedPostfix', hot=True, comments=[
+				'FailedPostfix is the postfix of result files which were not successfully processed by the Kiosk.',
+				'Default: failed',
+			] ),
+		Option( 'BatchScan', type=BOOL, also=['MultiPart'], comments=[
+				'Defines if multiple templates should be executed at once.',
+				'Note: The setting has been renamed from "MultiPart" to avoid confusion with multipart scanning templates.',
+				'Default: False',
+			] ),
+		Option( 'Migrate_MultiPart', key='MultiPart', type=BOOL, patched=None, write=False ),
+		Option( 'BatchScanPauseNeeded', type=BOOL, also=['MultiPartPauseNeeded'], comments=[
+				'Defines if between multiple templates a pause dialog is needed',
+				'Note: The setting has been renamed from "MultiPartPauseNeeded" to avoid confusion with multipart scanning templates.',
+				'Default: False',
+			] ),
+		Option( 'Migrate_MultiPartPauseNeeded', key='MultiPartPauseNeeded', type=BOOL, patched=None, write=False ),
+		Option( 'AllowAbort', type=BOOL, comments=[
+				'Allow abort during processing (in the progress bar)',
+				'Default: True',
+			] ),
+		Option( 'MSeriesSelection', type=BOOL, comments=[
+				'If activated the measurement series selection dialog is shown.',
+				'Measurement series can be selected for execution.',
+				'Otherwise, all measurement series are executed.',
+				'Without measurement series selection "AlignmentIteration" cannot be used.',
+				'Default: False',
+			] ),
+		Option( 'AlignmentIteration', type=BOOL, comments=[
+				'If activated allows validate and rescan the project after a defined measurement series.',
+				'Default: False',
+			] ),
+		Option( 'DiscFullWarningLimitSavePath', type=INT, validators=[at_least( 0 )], hot=True, comments=[
+				'Defines the warning limit for free disc space at the SavePath in MB',
+				'Set to 0 to disable the check',
+				'Default: 10000',
+			] ),
+		Option( 'DiscFullErrorLimitSavePath', type=INT, validators=[at_least( 0 )], hot=True, comments=[
+				'Defines the error limit for free disc space at the SavePath in MB',
+				'Set to 0 to disable the check',
+				'Default: 3000',
+			] ),
+		Option( 'DiscFullWarningLimitLogPath', type=INT, validators=[at_least( 0 )], hot=True, comments=[
+				'Defines the warning limit for free disc space at the log path in MB',
+				'Set to 0 to disable the check',
+				'Default: 300',
+			] ),
+		Option( 'DiscFullErrorLimitLogPath', type=INT, validators=[at_least( 0 )], hot=True, comments=[
+				'Defines the error limit for free disc space at the log path in MB',
+				'Set to 0 to disable the check',
+				'Default: 100',
+			] ),
+	] ),
+	Section( 'Project Template Selection', [
+		Option( 'ShowTemplateDialog', type=BOOL, comments=[
+				'ShowTemplateDialog specifies if the template has to be selected by the user or if a template',
+				'is selected by the script automatically. True means manual user selection, False means automatic',
+				'selection. Disable is not supported in combination with BatchScanning.',
+				'Default: True',
+			] ),
+		Option( 'TemplateConfigLevel', comments=[
+				'Defines which project templates should be displayed, valid values are "shared", "user" or "both".',
+				'"shared": project templates from the public folder. This setting is recommended.',
+				'"user": project templates from the current user.',
+				'"both": project templates from both locations are shown.',
+				'Default: shared',
+			] ),
+		Option( 'TemplateName', comments=[
+				'TemplateName specifies the project template which will be used if the project template',
+				'is not requested from the user by the start dialog. See "ShowTemplateDialog".',
+				'Default: GOM-Training-Object.project_template',
+			] ),
+		Option( 'TemplateCategory', validators=[choices( 'connected_project', 'project_template', 'both' )], comments=[
+				'Defines which templates should be displayed, valied values are connected_project, project_template or both',
+				'Default: project_template',
+			] ),
+		Option( 'ConnectedProjectSources', type=StrList( ', ' ), comments=[
+				'Defines the servers for connected projects',
+				'Default: ""',
+			] ),
+	] ),
+	Section( 'Project Naming', [
+		Option( 'AutoNameProject', type=BOOL, comments=[
+				'Autonaming will use the serial number and "TimeFormatProject" to name projects.',
+				'Otherwise the fixed "ProjectName" and "TimeFormatProject" will be used.',
+				'Default: True',
+			] ),
+		Option( 'ProjectName', comments=[
+				'If "AutoNameProject" is off, this project name will be used as a base name for the result projects.',
+				'Default: GOM-Training-Object',
+			] ),
+		Option( 'TimeFormatProject', comments=[
+				'This setting specifies how date and time will be formatted for the project name.',
+				'Any order of the directives (i.e. everything beginning with %) is possible.',
+				'Default: %Y_%m_%d_%H_%M_%S (%Year_%Month_%Day_%Hour_%Minute_%Second) ',
+			] ),
+	] ),
+	Section( 'Keywords', [
+		Option( 'UseLoginName', type=BOOL, comments=[
+				'If activated the current windows login name will be used and the entries in "Users" will be ignored.',
+				'Default: False',
+			] ),
+		Option( 'TimeFormatProjectKeyword', comments=[
+				'This setting specifies how date and time will be formatted for the project keyword "Date".',
+				'Any order of the directives (i.e. everything beginning with %) is possible.',
+				'Default: %d/%m/%Y (%Day/%Month/%Year)',
+			] ),
+		Option( 'MultiPartBatchSerial', type=BOOL, comments=[
+				'This setting controls how serial number input works for multi scanning part templates.',
+				'By standard one serial number per part is requested from the user and stored at the CAD part.',
+				'If you set this setting to True, only one overall batch serial number is used for all parts.',
+				'You can override this setting in a template with a project keyword "GOM_KIOSK_MultiPartBatchSerial".',
+				'Default: False',
+			] ),
+	] ),
+	Section( 'Digitizing Settings', [
+		Option( 'WaitForSensorWarmUp', type=BOOL, comments=[
+				'If this is False, then the measurements are executed',
+				'with a cold sensor which may result in insufficient measurement data',
+				'Default: True',
+			] ),
+		Option( 'MaxDigitizeRepetition', type=INT, comments=[
+				'Maximum number of scan repetions. This means complete execution of a measurement series.',
+				'If none of the cycles are successful, then the measurement process is aborted with a warning dialog.',
+				'Default: 2',
+			] ),
+		Option( 'MeasurementFailureMargin', type=FLOAT, comments=[
+				'Percent of measurements which are allowed to fail due to transformation or projector residual failures.',
+				'Default: 0.1',
+			] ),
+		Option( 'HigherFaultTolerance', type=BOOL, comments=[
+				'Allow for higher fault-tolerance',
+				'Intersection online errors only lead to a calibration if three in a row fail, otherwise no scan data will be created',
+				'Movement/Light and Intersection errors get ignored for polygonization as long as the failure margin is not reached.',
+				'Default: False',
+			] ),
+		Option( 'CheckFixturePosition', type=BOOL, comments=[
+				'Check Fixture Position',
+				'If associated measurement series and nominal point components are available a position check can be executed',
+				'Default: False',
+			] ),
+		Option( 'CheckFixturePositionOnlyOnTemplateSwitch', type=BOOL, comments=[
+				'Position check is only performed after template switch.',
+				'Default: False',
+			] ),
+		Option( 'KeepCheckFixturePositionElements', type=BOOL, comments=[
+				'Measurement series and nominal point components will remain in evaluated projects.',
+				'Default: False',
+			] ),
+		Option( 'CheckFixtureRepeat', type=BOOL, comments=[
+				'With this setting you can activate a check of the fixture when measurements',
+				'are repeated for alignment iteration.',
+				'Default: False',
+			] ),
+		Option( 'FreePathAlwaysAllowed', type=BOOL, comments=[
+				'Direct Move is always allowed',
+				'Independent of the current setting if collision free paths are uncritical a direct move will be performed.',
+				'This results in confirmation dialog blocking the workflow.',
+				'Default: False',
+			] ),
+		Option( 'MoveAllDevicesToHome', type=BOOL, comments=[
+				'Move all devices to global home at the end of the measurement process, e.g. closing gates.',
+				'Default: True',
+			] ),
+	] ),
+	Section( 'Calibration Settings', [
+		Option( 'CalibrationMaxTimedelta', type=INT, hot=True, comments=[
+				'If a new calibration becomes necessary less than',
+				'"CalibrationMaxTimedelta" minutes after the last calibration,',
+				'the measurement process is aborted with a warning dialog.',
+				'Default: 10',
+			] ),
+		Option( 'CalibrationForcedTimedelta', type=INT, hot=True, comments=[
+				'If the time to the last calibration exceeds "CalibrationForcedTimedelta" minutes,',
+				'a new calibration is executed before starting atos measurements.',
+				'A value of 0 means no timeout.',
+				'Default: 0',
+			] ),
+		Option( 'CalibrationEachCycle', type=BOOL, comments=[
+				'If the flag CalibrationEachCycle is set, a new calibration is executed',
+				'in each Kiosk cycle before starting atos measurements.',
+				'Default: False',
+			] ),
+	] ),
+	Section( 'Photogrammetry Settings', [
+		Option( 'PhotogrammetryOnlyIfRequired', type=BOOL, comments=[
+				'If PhotogrammetryOnlyIfRequired is False, the photogrammetry measurement series',
+				'will always be executed. Otherwise the Kiosk will check if there are',
+				'valid photogrammetry measurement data for the template from a previous execution',
+				'of the Kiosk.',
+				'Default: False',
+			] ),
+		Option( 'PhotogrammetryMaxTimedeltaImport', type=INT, hot=True, comments=[
+				'If the stored photogrammetry measurement data is older than',
+				'"PhotogrammetryMaxTimedeltaImport" minutes',
+				'a new photogrammetry measurement is executed.',
+				'Default: 1440',
+			] ),
+		Option( 'PhotogrammetryMaxImportCount', type=INT, hot=True, comments=[
+				'PhotogrammetryMaxImportCount specifies the number of times stored Photogrammetry',
+				'data should be re-used. If set to 0 stored photogrammetry data will always be re-used.',
+				'Default: 0',
+			] ),
+		Option( 'PhotogrammetryMaxTemperatureLimit', type=FLOAT, hot=True, comments=[
+				'If the stored photogrammetry data deviates more than "PhotogrammetryMaxTemperatureLimit"',
+				'degrees celsius from the current temperature, a new photogrammetry will be performed.',
+				'Default: 5',
+			] ),
+		Option( 'PhotogrammetryForceOnTemplateSwitch', type=BOOL, comments=[
+				'A new photogrammetry measurement will be done if the project template',
+				'is switched even if a valid photogrammetry data file is found.',
+				'The recommended setting is "True".',
+				'Default: True',
+			] ),
+		Option( 'PhotogrammetryExportAdapters', type=BOOL, comments=[
+				'If adapters are needed for an analysis, an alignment or similar,',
+				'"PhotogrammetryExportAdapters" allows to export those elements along with photogrammetry data.',
+				'The adapters will be stored in the corresponding ReferencePoint.refxml file.',
+				'Default: True',
+			] ),
+		Option( 'PhotogrammetrySavePath', comments=[
+				'PhotogrammetrySavePath is the name of the subfolder inside SavePath where',
+				'the photogrammetry data are stored.',
+				'Default: photogrammetry',
+			] ),
+		Option( 'PhotogrammetryVerification', type=BOOL, comments=[
+				'If set to "False" no photogrammetry verification checks are performed.',
+				'Default: True',
+			] ),
+		Option( 'PhotogrammetryComprehensive', type=BOOL, comments=[
+				'If set to "True" project comprehensive photogrammetry will be used.',
+				'Default: False',
+			] ),
+		Option( 'PhotogrammetryNumberOfScaleBars', type=INT, comments=[
+				'Defines the number of scalebars which needs to be computed.',
+				'Otherwise photogrammetry verification will fail.',
+				'Default: 2',
+			] ),
+		Option( 'PhotogrammetryCodedPointIDRange', comments=[
+				'Defines the ID range of coded reference points to be used for transformation',
+				'by common reference points in templates with more than one measuring setup',
+				'with photogrammetry measurement series. The format is a comma-seperated list',
+				'of individual ID numbers or ID ranges (<start ID> - <end ID>).',
+				'Examples: "30-39" or "5,6,12-14,20,35-38".',
+				'Default: empty',
+			] ),
+		Option( 'PhotogrammetryIndependent', type=BOOL, comments=[
+				'Defines if the photogrammetry is independent of the choosen template',
+				'Default: False',
+			] ),
+		Option( 'AsyncAlignmentResidualCheck', type=BOOL, comments=[
+				'Defines if the alignment residual check reference points against mesh will be calculated in the async evaluation instance',
+				'Note: A failure will not force a photogrammetry for the current template',
+				'Default: False',
+			] ),
+	], gap=0 ),
+	Section( 'Polygonization Settings', [
+		Option( 'PerformPolygonization', type=BOOL, comments=[
+				'Defines if the polygonization should be performed',
+				'In part-based workflow "False" means to perform only a preview polygonization.',
+				'Default: True',
+			] ),
+		Option( 'PolygonizeFillReferencePoints', type=BOOL, comments=[
+				'Defines if polygonize should fill the reference points',
+				'Default: False',
+			] ),
+		Option( 'PolygonizeProcess', comments=[
+				'Defines the postprocessing method used for polygonize, valid values are:',
+				'"no_postprocessing", "detailed", "standard", "removes_surface_roughness", "rough_inspection"',
+				'Default: removes_surface_roughness',
+			] ),
+		Option( 'PolygonizeLargeDataVolumes', type=BOOL, comments=[
+				'If set to "True" memory consumption during polygonization is reduced at the cost of speed.',
+				'Default: False',
+			] ),
+	], comments=[
+			'This section represents all settings which can influence polygonization.',
+			'They will be applied globally, meaning that every project will be treated with',
+			'these same settings.',
+			'IMPORTANT: Except for the "PerformPolygonization" switch, these settings',
+			'are not used in part-based projects!',
+			'In part-based projects always the mode defined in the template will be used.',
+		] ),
+	Section( 'Evaluation Result', [
+		Option( 'ResultAlignment', comments=[
+				'This setting is only used for custom exports in CustomPatches and the CustomPatchGenerator.',
+				'You can specify the name of an alignment here which will be usable for custom exports.',
+				'If it is empty or the named alignment does not exist, the last alignment in the hierarchy is used.',
+				'If there is no unique last alignment, it is unspecified which one of the last alignments is used.',
+				'You can override this setting in a template with a project keyword "GOM_KIOSK_ResultAlignment".',
+				'Default: empty',
+			] ),
+		Option( 'MPResultAlignmentPattern', comments=[
+				'This setting is the same as "ResultAlignment" but for multipart scanning templates.',
+				'In multipart templates it is used as a name pattern for finding the alignment for a part.',
+				'For overriding use a project keyword "GOM_KIOSK_MPResultAlignmentPattern".',
+				'Default: empty',
+			] ),
+		Option( 'ExportPDF', type=BOOL, comments=[
+				'Defines, if the Kiosk exports the PDF report.',
+				'Default: True',
+			] ),
+	] ),
+	Section( 'Dialog Settings', [
+		Option( None, key='Users', special='users', patched='users', comments=[
+				'Defines the selectable user names in the start dialog. Seperate the names with ";".',
+				'If "UseLoginName" is activated this setting is ignored.',
+			] ),
+		Option( 'LogoImage', special='image', image=('LogoImageBinary', 'image_logo'), patched='LogoImageBinary', blank=0, comments=[
+				'Paths to custom images, or empty for the default images',
+			] ),
+		Option( 'InitializeImage', special='image', image=('InitializeImageBinary', 'image_init'), patched='InitializeImageBinary', blank=0 ),
+		Option( 'PhotogrammetryImage', special='image', image=('PhotogrammetryImageBinary', 'image_photogrammetry'), patched='PhotogrammetryImageBinary', blank=0 ),
+		Option( 'DigitizeImage', special='image', image=('DigitizeImageBinary', 'image_digitize'), patched='DigitizeImageBinary', blank=0 ),
+		Option( 'CalibrationImage', special='image', image=('CalibrationImageBinary', 'image_calibration'), patched='CalibrationImageBinary', blank=0 ),
+		Option( 'ReportImage', special='image', image=('ReportImageBinary', 'image_report'), patched='ReportImageBinary', blank=0 ),
+		Option( 'TurnaroundFirstImage', special='image', image=('TurnaroundFirstImageBinary', 'image_turnaround_first'), patched='TurnaroundFirstBinary', blank=0 ),
+		Option( 'TurnaroundImage', special='image', image=('TurnaroundImageBinary', 'image_turnaround'), patched='TurnaroundImageBinary', blank=0 ),
+		Option( 'TurnaroundCalibrationImage', special='image', image=('TurnaroundCalibrationImageBinary', 'image_turnaround_calib'), patched='TurnaroundCalibrationImageBinary', blank=0 ),
+		Option( 'MultiPartWaitImage', special='image', image=('MultiPartWaitImageBinary', 'image_transparent'), patched='MultiPartWaitImageBinary' ),
+		Option( 'Language', comments=[
+				'Localization',
+				'No setting is equivalent to "en"',
+			] ),
+	] ),
+	Section( 'Logging Settings', [
+		Option( 'LoggingLevel', type=LOGLEVEL, hot=True, comments=[
+				'LoggingLevel specifies the amount of logging information.',
+				'For logging the standard python functions are used. The options can be found here:',
+				'See http://docs.python.org/py3k/library/logging.html#logrecord-attributes for more information.',
+			] ),
+		Option( 'LoggingFormat', comments=[
+				'Used logging format.',
+				'Default: %(asctime)s %(levelname)-8s Class(%(class)s) Func(%(funcName)s) Line(%(lineno)d) %(message)s',
+			] ),
+		Option( 'VerboseTraceback', type=BOOL, comments=[
+				'Detailed Traceback output.',
+				'Default: True',
+			] ),
+		Option( 'TimeFormatLogging', comments=[
+				'Format specifying how date and time will be represented.',
+				'Any order of the directives (i.e. everything beginning with %) is possible.',
+				'Default: _%Y_%m_%d_%H_%M_%S (_%Year_%Month_%Day_%Hour_%Minute_%Second)',
+			] ),
+		Option( 'LogStatistics', type=BOOL, hot=True, comments=[
+				'This setting activates an additional log file in csv format to log evaluation statistics.',
+				'The logfile will be stored inside of the gom log folder as "KioskInterfaceStatistics.log".',
+				'Default: True',
+			] ),
+		Option( 'LoggingQueueSize', type=INT, validators=[at_least( 100 )], comments=[
+				'Log files are written by a background thread, number of log messages which can be queued.',
+				'Default: 10000',
+			] ),
+		Option( 'LoggingOverflow', validators=[choices( 'block', 'drop_debug', 'sample' )], comments=[
+				'Behavior if the log queue is full: block (wait), drop_debug (drop debug messages)',
+				'or sample (keep every 10th debug/info message). Warnings and errors are never dropped.',
+				'Default: drop_debug',
+			] ),
+		Option( 'LoggingSegmentSize', type=INT, validators=[at_least( 1 )], comments=[
+				'Log files are written as json lines into segments, which are compressed when closed.',
+				'Size in MB when a segment is closed.',
+				'Default: 50',
+			] ),
+		Option( 'LoggingSegmentHours', type=FLOAT, validators=[at_least( 0.1 )], comments=[
+				'Age in hours when a segment is closed.',
+				'Default: 24',
+			] ),
+		Option( 'LoggingRetentionDays', type=INT, validators=[at_least( 1 )], comments=[
+				'Log segments older than the given number of days are removed.',
+				'Default: 28',
+			] ),
+	] ),
+	Section( 'BarCodeScanner Settings', [
+		Option( 'BarCodeScanner', type=BOOL, comments=[
+				'Activate a connected barcode scanner.',
+				'Default: False',
+			] ),
+		Option( 'BarCodeCOMPort', type=COMPORT, comments=[
+				'COM Port of the barcode scanner.',
+				'Default: 5',
+			] ),
+		Option( 'BarCodeDelimiter', type=ESCAPED, comments=[
+				'Delimiter sent after a complete barcode.',
+				'Default: \\r\\n',
+			] ),
+		Option( 'SeparatedFixtureRegEx', comments=[
+				'If not empty defines the regular expression used to distinguish between fixture barcodes and part barcodes.',
+				'Default: empty',
+			] ),
+	] ),
+	Section( 'Asynchronous Evaluation', [
+		Option( 'Async', type=BOOL, comments=[
+				'If Async is "True", then "NumberOfClients" additional software instances are started for evaluation.',
+				'Default: False',
+			] ),
+		Option( 'NumberOfClients', type=INT, validators=[at_least( 0 )], convert=lambda count: min( 2, count ), hot=True, comments=[
+				'Number of software instances started for evaluation.',
+				'Default: 1',
+			] ),
+		Option( 'HostAddress', comments=[
+				'Specifies the address of the server, where the additional instance is started.',
+				'Currently, only the value "localhost" is supported.',
+				'Default: localhost',
+			] ),
+		Option( 'HostPort', type=INT, validators=[PORT], comments=[
+				'Specify the Port for the communication.',
+				'Default: 8081',
+			] ),
+		Option( 'MeasureSavePath', comments=[
+				'MeasureSavePath is the name of the subfolder inside SavePath where',
+				'the successfully measured projects are stored temporarily before evaluation.',
+				'Default: measured',
+			] ),
+		Option( 'AutomaticResultEvaluation', type=BOOL, comments=[
+				'If set an automatic evaluation of all elements is performed.',
+				'On failure the project gets marked as failed.',
+				'Default: True',
+			] ),
+	], comments=[
+			'The Kiosk Interface supports a measuring software instance and additional software instances',
+			'that evaluate in the background.',
+		] ),
+	Section( 'Background Trend Creation', [
+		Option( 'BackgroundTrend', type=BOOL, blank=0, comments=[
+				'If enabled an additional software instance is started which creates',
+				'trend projects for all projects found within SavePath.',
+				'Default: False',
+			] ),
+		Option( 'TrendMaxStageSize', type=INT, blank=0, comments=[
+				'Defines the maximum number of stages for the trend projects.',
+				'Default: 10',
+			] ),
+		Option( 'TrendShowOnSecondMonitor', key='ShowOnSecondMonitor', type=BOOL, patched='ShowOnSecondMonitor', comments=[
+				'If enabled show the trend instance fullscreen on a second monitor',
+				'Default: False',
+			] ),
+	] ),
+	Section( 'Inline', [
+		Option( 'Inline', type=BOOL, comments=[
+				'If enabled the KioskInterface only works via an external control instance',
+				'Default: False',
+			] ),
+		Option( 'InlinePLC_NetID', comments=[
+				'Inline PLC NetID',
+				'Default: 172.17.61.55.1.1',
+			] ),
+		Option( 'InlinePLC_Port', type=INT, validators=[PORT], comments=[
+				'Inline PLC Port',
+				'Default: 851',
+			] ),
+		Option( 'EnableRecommendedSignals', type=BOOL, comments=[
+				'This setting enables signals to the line plc that photogrammetry / calibration are recommended.',
+				'Activating it will change the meaning of the following settings to only signal a recommendation',
+				'instead of actually performing an action:',
+				'"PhotogrammetryMaxTimedeltaImport" defines the time delta for a photogrammetry recommendation.',
+				'"CalibrationForcedTimedelta" defines the time delta for a calibration recommendation.',
+				'Default: False',
+			] ),
+		Option( 'TemperatureWarningLimit', type=FLOAT, hot=True, comments=[
+				'Temperature Warning Limit. Triggers recommendation signals for photogrammetry and calibration.',
+				'Default: 3.0°C',
+			] ),
+	], condition='Inline' ),
+	Section( 'DRC', [
+		Option( 'DoubleRobotCell_Mode', type=BOOL, comments=[
+				'Activates the DoubleRobotCell Mode',
+				'Default: False',
+			] ),
+		Option( 'DoubleRobot_SecondaryHostAddress', key='SecondaryHostAddress', comments=[
+				'Defines the IP Address of the Secondary PC',
+				'Default: 192.168.10.2',
+			] ),
+		Option( 'DoubleRobot_SecondaryHostPort', key='SecondaryHostPort', type=INT, validators=[PORT], comments=[
+				'Defines the TCP/IP port used for communication',
+				'Default: 40234',
+			] ),
+		Option( 'DoubleRobot_MainExtension', key='MainExtension', comments=[
+				'This setting defines the name part for measurement series on the Main side.',
+				'This name part is used to filter the measurement series on the Main.',
+				'Note: In demo mode this setting can also be used to load different templates',
+				'on Main/Secondary software instances.',
+				'Default: right',
+			] ),
+		Option( 'Migrate_PrimaryExtension', key='PrimaryExtension', type=STR, patched=None, write=False ),
+		Option( 'DoubleRobot_SecondaryExtension', key='SecondaryExtension', comments=[
+				'This setting defines the name part for measurement series on the Secondary side.',
+				'On the Secondary instance "MainExtension" is replaced by "SecondaryExtension" in the selected measurement series name.',
+				'Note: In demo mode this setting can also be used to load different templates',
+				'on Main/Secondary software instances.',
+				'Default: left',
+			] ),
+		Option( 'Migrate_DR_AlignmentIteration', key='AlignmentIteration', type=BOOL, patched=None, write=False ),
+		Option( 'Migrate_DR_NoMListSelection', key='NoMlistSelection', type=BOOL, patched=None, write=False ),
+		Option( 'DoubleRobot_RefCubeCheck', key='RefCubeCheck', type=BOOL, comments=[
+				'This setting controls if the reference cube positions after photogrammetry',
+				'should be checked. If there are any errors,',
+				'a dialog allows to correct the reference cubes and then retry photogrammetry',
+				'or continue operation without correction.',
+				'Default: False',
+			] ),
+		Option( 'DoubleRobot_RefCubeCheckOnce', key='RefCubeCheckOnce', type=BOOL, comments=[
+				'This setting controls whether the reference cube check controlled',
+				'by the "RefCubeCheck" option is done only once',
+				'or if the reference cube correction can be repeated endlessly.',
+				'Default: False',
+			] ),
+		Option( 'DoubleRobot_TransferPath', key='TransferPath', comments=[
+				'This setting defines a folder for data exchange between Main and Secondary PCs.',
+				'This is the name of the folder on the Main PC.',
+				'Recommended setting is a folder in a network share on the Main PC',
+				'Default: D:/Share/Transfer',
+			] ),
+		Option( 'DoubleRobot_ClientSavePath', key='ClientSavePath', comments=[
+				'This setting defines a temporary save folder for the Secondary PC',
+				'which is used for temporary projects and exports.',
+				'Recommended setting is a local folder on the Secondary PC.',
+				'Default: E:/DRCTemp',
+			] ),
+		Option( 'DoubleRobot_ClientTransferPath', key='ClientTransferPath', comments=[
+				'This setting defines a folder for data exchange between Main and Secondary PCs.',
+				'This is the name of the folder on the Secondary PC.',
+				'Recommended setting is a folder in a network share on the Main PC',
+				'Default: E:/Share/Transfer',
+			] ),
+		Option( 'DoubleRobot_KioskExecution', key='KioskExecution', comments=[
+				'This setting is only used by the Setup to define if the DRC should run in the protected Kiosk mode.',
+				'Default: False',
+			] ),
+	], gap=0 ),
+	Section( 'MultiRobot', [
+		Option( 'MultiRobot_Mode', type=BOOL, comments=[
+				'Activates the MultiRobot Mode',
+				'Default: False',
+			] ),
+		Option( 'MultiRobot_HostAddresses', key='HostAddresses', type=StrList( ',' ), comments=[
+				'Defines the IP Addresses of the Measurement PCs comma separated',
+				'Default: 192.168.10.2',
+			] ),
+		Option( 'MultiRobot_HostPorts', key='HostPorts', type=IntList( ',' ), comments=[
+				'Defines the TCP/IP port used for communication comma separated if different ports should be used.',
+				'Default: 40234',
+			] ),
+		Option( 'MultiRobot_ClientSavePath', key='ClientSavePath', type=StrList( ',' ), comments=[
+				'Defines the client side save path separated if different pathes should be used.',
+				'Default: d:/Temp',
+			] ),
+		Option( 'MultiRobot_ClientTransferPath', key='ClientTransferPath', type=StrList( ',' ), comments=[
+				'Defines the client side transfer path used for communication comma separated if different pathes should be used.',
+				'Default: d:/Temp',
+			] ),
+		Option( 'MultiRobot_TransferPath', key='TransferPath', type=StrList( ',' ), comments=[
+				'Defines the server side transfer path used for communication comma separated if different pathes should be used.',
+				'Default: d:/Temp',
+			] ),
+	], gap=0, condition='MultiRobot_Mode' ),
+	Section( 'IOExtension', [
+		Option( 'IOExtension', key='IOExtensionEnabled', type=BOOL, comments=[
+				'If enabled signals the ScanBox IO Extension signals',
+				'Default: False',
+			] ),
+		Option( 'IOExtension_NetID', comments=[
+				'PLC NetID',
+				'Default: 172.17.61.55.1.1',
+			] ),
+		Option( 'IOExtension_Port', type=INT, validators=[PORT], comments=[
+				'PLC Port',
+				'Default: 851',
+			] ),
+	], gap=0 ),
+	Section( 'IoTConnection', [
+		Option( 'IoTConnection', key='IoTConnectionEnabled', type=BOOL, comments=[
+				'If enabled communicates to IoT Solution',
+				'Default: False',
+			] ),
+		Option( 'IoTConnection_IP', comments=[
+				'IoTConnection IP',
+				'Default: 127.0.0.1',
+			] ),
+		Option( 'IoTConnection_Port', type=INT, validators=[PORT], comments=[
+				'IoTConnection Port',
+				'Default: 10005',
+			] ),
+		Option( 'IoTConnection_Batched', type=BOOL, comments=[
+				'If enabled events are buffered and sent as json lines in batches',
+				'Default: False',
+			] ),
+	], gap=0 ),
+	Section( 'Compatibility', [
+		Option( 'Compat_MeasuringSetup', type=BOOL, comments=[
+				'if enabled the old measuring setup dialog will be used,',
+				'e.g. for Tilt&Swivel Unit without measuring setups.',
+				'Default: False',
+			] ),
+	] ),
+]
+
+FOOTER = [
+	Section( 'Version Number', [
+		Option( 'VERSION', special='version', comments=[
+				'Do not modify',
+				'Modifying will create a new configuration file.',
+			] ),
+	], gap=0 ),
+]
+
+
+class Schema( object ):
+	'''
+	Compiled form of the sections:
+	the lookup (section, lower case key) -> option for the loader and
+	the constant text of the writer (header, comments, key prefix, line breaks).
+	Loaded files are cached by path, modification time and size,
+	so further Settings instances do not parse the file again.
+	'''
+	def __init__( self, sections, footer ):
+		self.sections = sections
+		self.footer = footer
+		self._index = {}
+		self._attributes = {}
+		self._order = {}
+		self._templates = {}
+		for section in sections + footer:
+			for option in section.options:
+				self._index[( section.name, option.key.lower() )] = option
+				if option.attr is not None and option.special is None:
+					self._attributes[option.attr] = option
+				self._order[option] = len( self._order )
+			self._templates[section.name] = self._compile( section )
+		self._cache = {}
+		self.parses = 0
+		self.hits = 0
+
+	@staticmethod
+	def _compile( section ):
+		head = '[{0}]\r\n'.format( section.name ) + ''.join(
+			'# {0}\r\n'.format( comment ) for comment in section.comments )
+		if section.comments:
+			head += '\r\n'
+		lines = []
+		for option in section.options:
+			if not option.write:
+				continue
+			prefix = ''.join( '# {0}\r\n'.format( comment ) for comment in option.comments )
+			lines.append( ( option, prefix + option.key + ' = ', '\r\n' * ( 1 + option.blank ) ) )
+		return head, lines, '\r\n' * section.gap
+
+	def option( self, attr ):
+		'''
+		option of a Settings attribute or None
+		'''
+		return self._attributes.get( attr )
+
+	def options( self, special = None ):
+		return [option for section in self.sections + self.footer for option in section.options
+			if option.special == special]
+
+	def render( self, settings, value = None, footer = False ):
+		'''
+		text of the cfg file (without footer or footer only),
+		value( option ) returns the value to write, default is the Settings attribute
+		'''
+		if value is None:
+			value = lambda option: getattr( settings, option.attr )
+		text = []
+		for section in ( self.footer if footer else self.sections ):
+			if section.condition is not None and not getattr( settings, section.condition ):
+				continue
+			head, lines, gap = self._templates[section.name]
+			text.append( head )
+			for option, prefix, suffix in lines:
+				text.append( prefix )
+				text.append( str( option.type.format( value( option ) ) ).replace( '\n', '\n\t' ) )
+				text.append( suffix )
+			text.append( gap )
+		return ''.join( text )
+
+	def parse( self, parser ):
+		'''
+		converts all known keys of a RawConfigParser in one pass
+		'''
+		self.parses += 1
+		values = []
+		specials = {}
+		errors = []
+		for section in parser.sections():
+			for key, text in parser.items( section ):
+				option = self._index.get( ( section, key ) )
+				if option is None:
+					continue
+				if option.special is not None:
+					specials[option.key] = text
+					continue
+				value, error = option.parse( text )
+				if error is not None:
+					errors.append( '[{0}] {1}: {2}'.format( section, option.key, error ) )
+				else:
+					values.append( ( option, value ) )
+		values.sort( key = lambda item: self._order[item[0]] )
+		return Loaded( parser, values, specials, errors )
+
+	def load( self, filename ):
+		'''
+		returns the Loaded cfg file or None if it does not exist
+		'''
+		try:
+			stat = os.stat( filename )
+		except OSError:
+			return None
+		path = os.path.abspath( filename )
+		signature = ( stat.st_mtime_ns, stat.st_size )
+		cached = self._cache.get( path )
+		if cached is not None and cached[0] == signature:
+			self.hits += 1
+			return cached[1]
+		parser = configparser.RawConfigParser()
+		with codecs.open( filename, 'r', encoding = 'utf-8-sig' ) as cfgfile:
+			parser.read_file( cfgfile )
+		loaded = self.parse( parser )
+		self._cache[path] = ( signature, loaded )
+		return loaded
+
+	def invalidate( self, filename = None ):
+		if filename is None:
+			self._cache.clear()
+		else:
+			self._cache.pop( os.path.abspath( filename ), None )
+
+
+SCHEMA = Schema( SECTIONS, FOOTER )
+
+
+def _legacy_load( filename ):
+	# reading as done before the schema: one getter with try/except per option
+	parser = configparser.RawConfigParser()
+	with codecs.open( filename, 'r', encoding = 'utf-8-sig' ) as cfgfile:
+		parser.read_file( cfgfile )
+	getters = {BOOL: parser.getboolean, INT: parser.getint, FLOAT: parser.getfloat}
+	values = {}
+	for section in SECTIONS + FOOTER:
+		for option in section.options:
+			try:
+				values[option.key] = getters.get( option.type, parser.get )( section.name, option.key )
+			except:
+				pass
+	return values
+
+def benchmark( filename, count = 200 ):
+	'''
+	milliseconds per load of filename: per option getters, compiled cold and cached
+	'''
+	results = {}
+	start = time.perf_counter()
+	for _ in range( count ):
+		_legacy_load( filename )
+	results['legacy_ms'] = ( time.perf_counter() - start ) * 1000 / count
+	start = time.perf_counter()
+	for _ in range( count ):
+		SCHEMA.invalidate( filename )
+		SCHEMA.load( filename )
+	results['compiled_cold_ms'] = ( time.perf_counter() - start ) * 1000 / count
+	start = time.perf_counter()
+	for _ in range( count ):
+		SCHEMA.load( filename )
+	results['compiled_cached_ms'] = ( time.perf_counter() - start ) * 1000 / count
+	results['errors'] = SCHEMA.load( filename ).errors
+	return results
+
+
+def main( argv = None ):
+	parser = argparse.ArgumentParser( description = 'KioskInterface settings schema' )
+	commands = parser.add_subparsers( dest = 'command' )
+	check = commands.add_parser( 'check', help = 'list all errors of a cfg file' )
+	check.add_argument( 'filename' )
+	bench = commands.add_parser( 'benchmark', help = 'load time of a cfg file' )
+	bench.add_argument( '--count', type = int, default = 200 )
+	bench.add_argument( 'filename' )
+	args = parser.parse_args( argv )
+
+	if args.command == 'check':
+		loaded = SCHEMA.load( args.filename )
+		if loaded is None:
+			print( 'file not found: {0}'.format( args.filename ) )
+			return 1
+		for error in loaded.errors:
+			print( error )
+		return 1 if loaded.errors else 0
+	elif args.command == 'benchmark':
+		for key, value in benchmark( args.filename, args.count ).items():
+			print( '{0}: {1}'.format( key, value ) )
+	else:
+		parser.print_help()
+		return 1
+	return 0
+
+if __name__ == '__main__':
+	sys.exit( main() )
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+# Script: Hierarchical timer wheel for the global timer
+#
+# PLEASE NOTE that this file is part of the GOM Software.
+# You are not allowed to distribute this file to a third party without written notice.
+#
+# Please, do not copy and/or modify this script.
+# All modifications of KioskInterface should happen in the CustomPatches script.
+# Ignoring this advice will make KioskInterface fail after Software update.
+#
+# Copyright (c) 2021 Carl Zeiss GOM Metrology GmbH
+# All rights reserved.
+
+# Plain python, no gom module needed.
+
+import time
+
+
+class TimerTask( object ):
+	'''
+	One scheduled callback, periodic (interval in seconds) or one-shot (interval None).
+	Tasks due in the same tick run by descending priority.
+	deadline is the allowed lateness in seconds (default: interval or one tick),
+	later runs are counted as missed deadlines.
+	'''
+	def __init__( self, callback, interval = None, priority = 0, deadline = None, name = None,
+			backoff = False, disable_after = 0 ):
+		self.callback = callback
+		self.interval = interval
+		self.priority = priority
+		self.deadline = deadline
+		self.name = name if name is not None else getattr( callback, '__qualname__', str( callback ) )
+		self.default_interval = False # interval follows GlobalTimer.setTimeInterval
+		self.due = 0.0 # scheduled time (wheel clock)
+		self.due_tick = 0
+		self.generation = 0 # wheel entries of older generations are stale
+		self.scheduled = False
+		self.cancelled = False
+		# failure handling (GlobalTimer)
+		self.backoff = backoff
+		self.disable_after = disable_after
+		self.failures = 0 # consecutive
+		self.skip_until = 0
+		self.fingerprints = set()
+		# statistics
+		self.runs = 0
+		self.runtime = 0.0
+		self.max_runtime = 0.0
+		self.lateness = 0.0
+		self.max_lateness = 0.0
+		self.missed_deadlines = 0
+		self.skipped = 0 # periods dropped because the task was late
+
+	def record( self, lateness, runtime ):
+		self.runs += 1
+		self.runtime += runtime
+		self.max_runtime = max( self.max_runtime, runtime )
+		self.lateness += lateness
+		self.max_lateness = max( self.max_lateness, lateness )
+
+	def statistics( self ):
+		return {'name': self.name, 'interval': self.interval, 'priority': self.priority, 'runs': self.runs,
+			'mean_runtime_ms': self.runtime / self.runs * 1000 if self.runs else 0.0,
+			'max_runtime_ms': self.max_runtime * 1000,
+			'mean_lateness_ms': self.lateness / self.runs * 1000 if self.runs else 0.0,
+			'max_lateness_ms': self.max_lateness * 1000,
+			'missed_deadlines': self.missed_deadlines, 'skipped': self.skipped, 'failures': self.failures}
+
+
+class TimerWheel( object ):
+	'''
+	Hierarchical timer wheel: levels of slots, slot i of level n covers slots**n ticks.
+	Inserting and expiring a task is O(1), tasks of higher levels are moved down (cascaded)
+	when the lower level wrapped around. Cancelled tasks are dropped lazily.
+	advance() returns the due tasks, periodic tasks have to be rescheduled by the caller (reschedule()).
+	Slots hold (generation, task) entries, cancelling or rescheduling a task makes its entry stale.
+	'''
+	def __init__( self, tick = 0.05, slots = 64, levels = 4, clock = time.monotonic ):
+		self.tick = tick
+		self.slots = slots
+		self.levels = levels
+		self.clock = clock
+		self.origin = clock()
+		self.current = 0 # last processed tick
+		self._wheels = [[[] for _ in range( slots )] for _ in range( levels )]
+		self._overflow = []
+		self._count = 0
+
+	def __len__( self ):
+		return self._count
+
+	def now( self ):
+		return self.clock() - self.origin
+
+	def _tick_of( self, when ):
+		# round up: a task never expires before its time
+		tick = int( when / self.tick )
+		return tick if tick * self.tick >= when - 1e-9 else tick + 1
+
+	def schedule( self, task, delay ):
+		'''
+		insert the task due in delay seconds
+		'''
+		if task.scheduled:
+			self.cancel( task )
+		task.cancelled = False
+		# aligned to the tick grid, periodic tasks stay aligned (interval multiple of tick)
+		task.due = self._tick_of( self.now() + max( 0.0, delay ) ) * self.tick
+		self._insert( task )
+		self._count += 1
+		return task
+
+	def _insert( self, task ):
+		task.generation += 1
+		task.due_tick = max( self._tick_of( task.due ), self.current + 1 )
+		task.scheduled = True
+		self._place( ( task.generation, task ) )
+
+	def _place( self, entry ):
+		due_tick = entry[1].due_tick
+		span = 1
+		for level in range( self.levels ):
+			# the slot must not have been passed in the current round of the level
+			if due_tick // span - self.current // span < self.slots:
+				self._wheels[level][( due_tick // span ) % self.slots].append( entry )
+				return
+			span *= self.slots
+		self._overflow.append( entry )
+
+	def cancel( self, task ):
+		task.cancelled = True
+		task.generation += 1
+		if task.scheduled:
+			task.scheduled = False
+			self._count -= 1
+
+	def reschedule( self, task, now ):
+		'''
+		next period of a periodic task, missed periods are skipped (counted in task.skipped)
+		'''
+		if task.cancelled or task.scheduled: # cancelled or scheduled again by the callback
+			return
+		due = task.due + task.interval
+		if due <= now:
+			missed = int( ( now - due ) / task.interval ) + 1
+			task.skipped += missed
+			due += missed * task.interval
+		task.due = due
+		self._insert( task )
+		self._count += 1
+
+	def advance( self ):
+		'''
+		process all ticks up to now, returns the due tasks (by descending priority) and now
+		'''
+		now = self.now()
+		target = int( now / self.tick + 1e-9 )
+		due = []
+		while self.current < target:
+			self.current += 1
+			slot = self.current % self.slots
+			if slot == 0:
+				self._cascade()
+			entries = self._wheels[0][slot]
+			if entries:
+				self._wheels[0][slot] = []
+				for entry in entries:
+					generation, task = entry
+					if generation != task.generation:
+						continue
+					if task.due_tick > self.current: # placed for a later round
+						self._place( entry )
+					else:
+						due.append( task )
+			if not self._count:
+				self.current = target
+		for task in due:
+			task.scheduled = False
+			self._count -= 1
+		due.sort( key = lambda task: ( -task.priority, task.due ) )
+		return due, now
+
+	def _cascade( self ):
+		span = 1
+		for level in range( 1, self.levels ):
+			span *= self.slots
+			slot = ( self.current // span ) % self.slots
+			entries = self._wheels[level][slot]
+			self._wheels[level][slot] = []
+			for entry in entries:
+				if entry[0] == entry[1].generation:
+					self._place( entry )
+			if slot != 0:
+				return
+		entries = self._overflow
+		self._overflow = []
+		for entry in entries:
+			if entry[0] == entry[1].generation:
+				self._place( entry )
+
+	def next_due( self ):
+		'''
+		seconds until the earliest task is due (None if empty), O(n)
+		'''
+		entries = [e for wheel in self._wheels for slot in wheel for e in slot] + self._overflow
+		tasks = [task for ( generation, task ) in entries if generation == task.generation]
+		if not tasks:
+			return None
+		return max( 0.0, min( t.due for t in tasks ) - self.now() )
@@ -28,7 +28,7 @@
 
 import gom
 
-from . import DefaultSettings, LogClass, PersistentSettings, Globals
+from . import DefaultSettings, LogClass, LogStore, PatchRegistry, PersistentSettings, Globals, SettingsSchema, TimerWheel
 
 import codecs
 import configparser
@@ -46,6 +46,74 @@ import sys
 import time
 
 
+class ProjectOverrides( object ):
+	'''
+	Snapshot of the project keywords "GOM_KIOSK_<setting name>" of the open project.
+	The keywords are read once on the first settings access after invalidate(),
+	which has to be called after opening/closing a project or setting project keywords.
+	'''
+	PREFIX = 'user_GOM_KIOSK_'
+
+	def __init__( self ):
+		self._values = None
+		self.lookups = 0
+		self.snapshots = 0
+		self.gom_calls = 0
+
+	def invalidate( self ):
+		self._values = None
+
+	def get( self, key ):
+		'''
+		returns (True, keyword value) if the project overrides the setting, else (False, None)
+		'''
+		self.lookups += 1
+		values = self._values
+		if values is None:
+			values = self._snapshot()
+		if key in values:
+			return True, values[key]
+		return False, None
+
+	def _snapshot( self ):
+		values = {}
+		self.snapshots += 1
+		try:
+			self.gom_calls += 1
+			names = gom.app.project.project_keywords
+		except:
+			names = [] # no project open
+		for name in names:
+			key = name[len( self.PREFIX ):]
+			if name.startswith( self.PREFIX ) and key in DefaultSettings.DefaultSettings.__dict__:
+				try:
+					self.gom_calls += 1
+					values[key] = gom.app.project.get( name )
+				except:
+					pass
+		self._values = values
+		return values
+
+	@property
+	def saved_calls( self ):
+		'''
+		gom calls saved compared to one project.get per settings access
+		'''
+		return self.lookups - self.gom_calls
+
+	def stats( self ):
+		return {'lookups': self.lookups, 'snapshots': self.snapshots,
+			'gom_calls': self.gom_calls, 'saved_calls': self.saved_calls}
+
+PROJECT_OVERRIDES = ProjectOverrides()
+
+def invalidate_project_overrides():
+	'''
+	the open project or its keywords changed, read the settings overrides again on next access
+	'''
+	PROJECT_OVERRIDES.invalidate()
+
+
 class Settings( DefaultSettings.DefaultSettings ):
 	'''
 	Settings class holds all settings
@@ -98,6 +166,9 @@ class Settings( DefaultSettings.DefaultSettings ):
 	Migrate_DR_AlignmentIteration = False
 	Migrate_MultiPart = False
 	Migrate_MultiPartPauseNeeded = False
+
+	# errors of the last read settings file (invalid values are ignored)
+	settings_errors = []
 	
 	SoftwareDRCMode = None
 
@@ -127,21 +198,34 @@ class Settings( DefaultSettings.DefaultSettings ):
 	def initialize( self, should_create = True, cfg_path = None ):
 		'''
 		parse cfg file and stores a cfg file if needed
+		the parsed file is cached by SettingsSchema until the file changes
 		'''
-		config_parser_object = configparser.RawConfigParser()
 		if cfg_path is not None:
 			self.CFG_NAME = cfg_path
 
-		if not self.read_file( config_parser_object ):
+		loaded = self._load()
+		if loaded is None:
 			self.settings_file_existed = False
 			if not should_create:
 				return
 			self._storedefaultsettings()
-			self.read_file( config_parser_object )
+			loaded = self._load()
 		else:
 			self.settings_file_existed = True
 
-		self._readsettings( config_parser_object, should_create )
+		self._readsettings( loaded.parser, should_create, loaded )
+
+	def _load( self ):
+		'''
+		returns the SettingsSchema result of the cfg file or None if it does not exist
+		a patched read_file is used to read the file (not cached)
+		'''
+		if not self._is_patched_attribute( 'read_file' ):
+			return SettingsSchema.SCHEMA.load( self.CFG_NAME )
+		config_parser_object = configparser.RawConfigParser()
+		if not self.read_file( config_parser_object ):
+			return None
+		return SettingsSchema.SCHEMA.parse( config_parser_object )
 
 	def settings_file_found( self ):
 		return self.settings_file_existed
@@ -165,608 +249,24 @@ class Settings( DefaultSettings.DefaultSettings ):
 
 	def _storedefaultsettings( self ):
 		'''
-		writes the settings into a file
+		writes the settings into a file, sections and comments are defined in SettingsSchema
 		'''
 		with codecs.open( self.CFG_NAME, 'w', encoding = "utf-8-sig" ) as cfgfile:
-			self._header( cfgfile, 'General Settings/Data Storage' )
-			self._comment( cfgfile, 'SavePath specifies the directory where all files' )
-			self._comment( cfgfile, 'created by the Kiosk Interface should be stored' )
-			self._writeln( cfgfile, 'SavePath', self.SavePath )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'DemoMode is meant for development, testing and demonstration.' )
-			self._comment( cfgfile, 'In this case the script will skip everything related to real hardware.' )
-			self._writeln( cfgfile, 'DemoMode', self.OfflineMode )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'FailedPostfix is the postfix of result files which were not successfully processed by the Kiosk.' )
-			self._comment( cfgfile, 'Default: failed' )
-			self._writeln( cfgfile, 'FailedPostfix', self.FailedPostfix )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Defines if multiple templates should be executed at once.' )
-			self._comment( cfgfile, 'Note: The setting has been renamed from "MultiPart" to avoid confusion with multipart scanning templates.' )
-			self._comment( cfgfile, 'Default: False' )
-			self._writeln( cfgfile, 'BatchScan', self.BatchScan )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Defines if between multiple templates a pause dialog is needed' )
-			self._comment( cfgfile, 'Note: The setting has been renamed from "MultiPartPauseNeeded" to avoid confusion with multipart scanning templates.' )
-			self._comment( cfgfile, 'Default: False' )
-			self._writeln( cfgfile, 'BatchScanPauseNeeded', self.BatchScanPauseNeeded )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Allow abort during processing (in the progress bar)' )
-			self._comment( cfgfile, 'Default: True' )
-			self._writeln( cfgfile, 'AllowAbort', self.AllowAbort )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'If activated the measurement series selection dialog is shown.' )
-			self._comment( cfgfile, 'Measurement series can be selected for execution.' )
-			self._comment( cfgfile, 'Otherwise, all measurement series are executed.' )
-			self._comment( cfgfile, 'Without measurement series selection "AlignmentIteration" cannot be used.' )
-			self._comment( cfgfile, 'Default: False' )
-			self._writeln( cfgfile, 'MSeriesSelection', self.MSeriesSelection )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'If activated allows validate and rescan the project after a defined measurement series.' )
-			self._comment( cfgfile, 'Default: False' )
-			self._writeln( cfgfile, 'AlignmentIteration', self.AlignmentIteration )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Defines the warning limit for free disc space at the SavePath in MB' )
-			self._comment( cfgfile, 'Set to 0 to disable the check' )
-			self._comment( cfgfile, 'Default: 10000' )
-			self._writeln( cfgfile, 'DiscFullWarningLimitSavePath', self.DiscFullWarningLimitSavePath )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Defines the error limit for free disc space at the SavePath in MB' )
-			self._comment( cfgfile, 'Set to 0 to disable the check' )
-			self._comment( cfgfile, 'Default: 3000' )
-			self._writeln( cfgfile, 'DiscFullErrorLimitSavePath', self.DiscFullErrorLimitSavePath )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Defines the warning limit for free disc space at the log path in MB' )
-			self._comment( cfgfile, 'Set to 0 to disable the check' )
-			self._comment( cfgfile, 'Default: 300' )
-			self._writeln( cfgfile, 'DiscFullWarningLimitLogPath', self.DiscFullWarningLimitLogPath )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Defines the error limit for free disc space at the log path in MB' )
-			self._comment( cfgfile, 'Set to 0 to disable the check' )
-			self._comment( cfgfile, 'Default: 100' )
-			self._writeln( cfgfile, 'DiscFullErrorLimitLogPath', self.DiscFullErrorLimitLogPath )
-			self._newline( cfgfile )
-			self._newline( cfgfile )
-
-			self._header( cfgfile, 'Project Template Selection' )
-			self._comment( cfgfile, 'ShowTemplateDialog specifies if the template has to be selected by the user or if a template' )
-			self._comment( cfgfile, 'is selected by the script automatically. True means manual user selection, False means automatic' )
-			self._comment( cfgfile, 'selection. Disable is not supported in combination with BatchScanning.' )
-			self._comment( cfgfile, 'Default: True' )
-			self._writeln( cfgfile, 'ShowTemplateDialog', self.ShowTemplateDialog )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Defines which project templates should be displayed, valid values are "shared", "user" or "both".' )
-			self._comment( cfgfile, '"shared": project templates from the public folder. This setting is recommended.' )
-			self._comment( cfgfile, '"user": project templates from the current user.' )
-			self._comment( cfgfile, '"both": project templates from both locations are shown.' )
-			self._comment( cfgfile, 'Default: shared' )
-			self._writeln( cfgfile, 'TemplateConfigLevel', self.TemplateConfigLevel )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'TemplateName specifies the project template which will be used if the project template' )
-			self._comment( cfgfile, 'is not requested from the user by the start dialog. See "ShowTemplateDialog".' )
-			self._comment( cfgfile, 'Default: GOM-Training-Object.project_template' )
-			self._writeln( cfgfile, 'TemplateName', self.TemplateName )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Defines which templates should be displayed, valied values are connected_project, project_template or both' )
-			self._comment( cfgfile, 'Default: project_template' )
-			self._writeln( cfgfile, 'TemplateCategory', self.TemplateCategory )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Defines the servers for connected projects' )
-			self._comment( cfgfile, 'Default: ""' )
-			self._writeln( cfgfile, 'ConnectedProjectSources', ', '.join(self.ConnectedProjectSources) )
-			self._newline( cfgfile )
-			self._newline( cfgfile )
-
-			self._header( cfgfile, 'Project Naming' )
-			self._comment( cfgfile, 'Autonaming will use the serial number and "TimeFormatProject" to name projects.' )
-			self._comment( cfgfile, 'Otherwise the fixed "ProjectName" and "TimeFormatProject" will be used.' )
-			self._comment( cfgfile, 'Default: True' )
-			self._writeln( cfgfile, 'AutoNameProject', self.AutoNameProject )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'If "AutoNameProject" is off, this project name will be used as a base name for the result projects.' )
-			self._comment( cfgfile, 'Default: GOM-Training-Object' )
-			self._writeln( cfgfile, 'ProjectName', self.ProjectName )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'This setting specifies how date and time will be formatted for the project name.' )
-			self._comment( cfgfile, 'Any order of the directives (i.e. everything beginning with %) is possible.' )
-			self._comment( cfgfile, 'Default: %Y_%m_%d_%H_%M_%S (%Year_%Month_%Day_%Hour_%Minute_%Second) ' )
-			self._writeln( cfgfile, 'TimeFormatProject', self.TimeFormatProject )
-			self._newline( cfgfile )
-			self._newline( cfgfile )
-
-			self._header( cfgfile, 'Keywords' )
-			self._comment( cfgfile, 'If activated the current windows login name will be used and the entries in "Users" will be ignored.' )
-			self._comment( cfgfile, 'Default: False' )
-			self._writeln( cfgfile, 'UseLoginName', self.UseLoginName )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'This setting specifies how date and time will be formatted for the project keyword "Date".' )
-			self._comment( cfgfile, 'Any order of the directives (i.e. everything beginning with %) is possible.' )
-			self._comment( cfgfile, 'Default: %d/%m/%Y (%Day/%Month/%Year)' )
-			self._writeln( cfgfile, 'TimeFormatProjectKeyword', self.TimeFormatProjectKeyword )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'This setting controls how serial number input works for multi scanning part templates.' )
-			self._comment( cfgfile, 'By standard one serial number per part is requested from the user and stored at the CAD part.' )
-			self._comment( cfgfile, 'If you set this setting to True, only one overall batch serial number is used for all parts.' )
-			self._comment( cfgfile, 'You can override this setting in a template with a project keyword "GOM_KIOSK_MultiPartBatchSerial".' )
-			self._comment( cfgfile, 'Default: False' )
-			self._writeln( cfgfile, 'MultiPartBatchSerial', self.MultiPartBatchSerial )
-			self._newline( cfgfile )
-			self._newline( cfgfile )
-
-			self._header( cfgfile, 'Digitizing Settings' )
-			self._comment( cfgfile, 'If this is False, then the measurements are executed' )
-			self._comment( cfgfile, 'with a cold sensor which may result in insufficient measurement data' )
-			self._comment( cfgfile, 'Default: True' )
-			self._writeln( cfgfile, 'WaitForSensorWarmUp', self.WaitForSensorWarmUp )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Maximum number of scan repetions. This means complete execution of a measurement series.' )
-			self._comment( cfgfile, 'If none of the cycles are successful, then the measurement process is aborted with a warning dialog.' )
-			self._comment( cfgfile, 'Default: 2' )
-			self._writeln( cfgfile, 'MaxDigitizeRepetition', self.MaxDigitizeRepetition )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Percent of measurements which are allowed to fail due to transformation or projector residual failures.' )
-			self._comment( cfgfile, 'Default: 0.1' )
-			self._writeln( cfgfile, 'MeasurementFailureMargin', self.MeasurementFailureMargin )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Allow for higher fault-tolerance' )
-			self._comment( cfgfile, 'Intersection online errors only lead to a calibration if three in a row fail, otherwise no scan data will be created')
-			self._comment( cfgfile, 'Movement/Light and Intersection errors get ignored for polygonization as long as the failure margin is not reached.')
-			self._comment( cfgfile, 'Default: False' )
-			self._writeln( cfgfile, 'HigherFaultTolerance', self.HigherFaultTolerance )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Check Fixture Position' )
-			self._comment( cfgfile, 'If associated measurement series and nominal point components are available a position check can be executed')
-			self._comment( cfgfile, 'Default: False' )
-			self._writeln( cfgfile, 'CheckFixturePosition', self.CheckFixturePosition )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Position check is only performed after template switch.')
-			self._comment( cfgfile, 'Default: False' )
-			self._writeln( cfgfile, 'CheckFixturePositionOnlyOnTemplateSwitch', self.CheckFixturePositionOnlyOnTemplateSwitch )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Measurement series and nominal point components will remain in evaluated projects.')
-			self._comment( cfgfile, 'Default: False' )
-			self._writeln( cfgfile, 'KeepCheckFixturePositionElements', self.KeepCheckFixturePositionElements )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'With this setting you can activate a check of the fixture when measurements' )
-			self._comment( cfgfile, 'are repeated for alignment iteration.')
-			self._comment( cfgfile, 'Default: False' )
-			self._writeln( cfgfile, 'CheckFixtureRepeat', self.CheckFixtureRepeat )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Direct Move is always allowed' )
-			self._comment( cfgfile, 'Independent of the current setting if collision free paths are uncritical a direct move will be performed.')
-			self._comment( cfgfile, 'This results in confirmation dialog blocking the workflow.')
-			self._comment( cfgfile, 'Default: False' )
-			self._writeln( cfgfile, 'FreePathAlwaysAllowed', self.FreePathAlwaysAllowed )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Move all devices to global home at the end of the measurement process, e.g. closing gates.')
-			self._comment( cfgfile, 'Default: True' )
-			self._writeln( cfgfile, 'MoveAllDevicesToHome', self.MoveAllDevicesToHome )
-			self._newline( cfgfile )
-			self._newline( cfgfile )
-
-			self._header( cfgfile, 'Calibration Settings' )
-			self._comment( cfgfile, 'If a new calibration becomes necessary less than' )
-			self._comment( cfgfile, '"CalibrationMaxTimedelta" minutes after the last calibration,' )
-			self._comment( cfgfile, 'the measurement process is aborted with a warning dialog.' )
-			self._comment( cfgfile, 'Default: 10' )
-			self._writeln( cfgfile, 'CalibrationMaxTimedelta', self.CalibrationMaxTimedelta )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'If the time to the last calibration exceeds "CalibrationForcedTimedelta" minutes,' )
-			self._comment( cfgfile, 'a new calibration is executed before starting atos measurements.' )
-			self._comment( cfgfile, 'A value of 0 means no timeout.' )
-			self._comment( cfgfile, 'Default: 0' )
-			self._writeln( cfgfile, 'CalibrationForcedTimedelta', self.CalibrationForcedTimedelta )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'If the flag CalibrationEachCycle is set, a new calibration is executed' )
-			self._comment( cfgfile, 'in each Kiosk cycle before starting atos measurements.' )
-			self._comment( cfgfile, 'Default: False' )
-			self._writeln( cfgfile, 'CalibrationEachCycle', self.CalibrationEachCycle )
-			self._newline( cfgfile )
-			self._newline( cfgfile )
-
-			self._header( cfgfile, 'Photogrammetry Settings' )
-			self._comment( cfgfile, 'If PhotogrammetryOnlyIfRequired is False, the photogrammetry measurement series' )
-			self._comment( cfgfile, 'will always be executed. Otherwise the Kiosk will check if there are' )
-			self._comment( cfgfile, 'valid photogrammetry measurement data for the template from a previous execution' )
-			self._comment( cfgfile, 'of the Kiosk.' )
-			self._comment( cfgfile, 'Default: False' )
-			self._writeln( cfgfile, 'PhotogrammetryOnlyIfRequired', self.PhotogrammetryOnlyIfRequired )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'If the stored photogrammetry measurement data is older than' )
-			self._comment( cfgfile, '"PhotogrammetryMaxTimedeltaImport" minutes' )
-			self._comment( cfgfile, 'a new photogrammetry measurement is executed.' )
-			self._comment( cfgfile, 'Default: 1440' )
-			self._writeln( cfgfile, 'PhotogrammetryMaxTimedeltaImport', self.PhotogrammetryMaxTimedeltaImport )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'PhotogrammetryMaxImportCount specifies the number of times stored Photogrammetry' )
-			self._comment( cfgfile, 'data should be re-used. If set to 0 stored photogrammetry data will always be re-used.' )
-			self._comment( cfgfile, 'Default: 0' )
-			self._writeln( cfgfile, 'PhotogrammetryMaxImportCount', self.PhotogrammetryMaxImportCount )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'If the stored photogrammetry data deviates more than "PhotogrammetryMaxTemperatureLimit"' )
-			self._comment( cfgfile, 'degrees celsius from the current temperature, a new photogrammetry will be performed.' )
-			self._comment( cfgfile, 'Default: 5' )
-			self._writeln( cfgfile, 'PhotogrammetryMaxTemperatureLimit', self.PhotogrammetryMaxTemperatureLimit )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'A new photogrammetry measurement will be done if the project template' )
-			self._comment( cfgfile, 'is switched even if a valid photogrammetry data file is found.' )
-			self._comment( cfgfile, 'The recommended setting is "True".' )
-			self._comment( cfgfile, 'Default: True' )
-			self._writeln( cfgfile, 'PhotogrammetryForceOnTemplateSwitch', self.PhotogrammetryForceOnTemplateSwitch )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'If adapters are needed for an analysis, an alignment or similar,' )
-			self._comment( cfgfile, '"PhotogrammetryExportAdapters" allows to export those elements along with photogrammetry data.' )
-			self._comment( cfgfile, 'The adapters will be stored in the corresponding ReferencePoint.refxml file.' )
-			self._comment( cfgfile, 'Default: True' )
-			self._writeln( cfgfile, 'PhotogrammetryExportAdapters', self.PhotogrammetryExportAdapters )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'PhotogrammetrySavePath is the name of the subfolder inside SavePath where' )
-			self._comment( cfgfile, 'the photogrammetry data are stored.' )
-			self._comment( cfgfile, 'Default: photogrammetry' )
-			self._writeln( cfgfile, 'PhotogrammetrySavePath', self.PhotogrammetrySavePath )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'If set to "False" no photogrammetry verification checks are performed.' )
-			self._comment( cfgfile, 'Default: True' )
-			self._writeln( cfgfile, 'PhotogrammetryVerification', self.PhotogrammetryVerification )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'If set to "True" project comprehensive photogrammetry will be used.' )
-			self._comment( cfgfile, 'Default: False' )
-			self._writeln( cfgfile, 'PhotogrammetryComprehensive', self.PhotogrammetryComprehensive )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Defines the number of scalebars which needs to be computed.' )
-			self._comment( cfgfile, 'Otherwise photogrammetry verification will fail.' )
-			self._comment( cfgfile, 'Default: 2' )
-			self._writeln( cfgfile, 'PhotogrammetryNumberOfScaleBars', self.PhotogrammetryNumberOfScaleBars )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Defines the ID range of coded reference points to be used for transformation' )
-			self._comment( cfgfile, 'by common reference points in templates with more than one measuring setup' )
-			self._comment( cfgfile, 'with photogrammetry measurement series. The format is a comma-seperated list' )
-			self._comment( cfgfile, 'of individual ID numbers or ID ranges (<start ID> - <end ID>).' )
-			self._comment( cfgfile, 'Examples: "30-39" or "5,6,12-14,20,35-38".' )
-			self._comment( cfgfile, 'Default: empty' )
-			self._writeln( cfgfile, 'PhotogrammetryCodedPointIDRange', self.PhotogrammetryCodedPointIDRange )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Defines if the photogrammetry is independent of the choosen template' )
-			self._comment( cfgfile, 'Default: False' )
-			self._writeln( cfgfile, 'PhotogrammetryIndependent', self.PhotogrammetryIndependent )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Defines if the alignment residual check reference points against mesh will be calculated in the async evaluation instance' )
-			self._comment( cfgfile, 'Note: A failure will not force a photogrammetry for the current template')
-			self._comment( cfgfile, 'Default: False' )
-			self._writeln( cfgfile, 'AsyncAlignmentResidualCheck', self.AsyncAlignmentResidualCheck )
-			self._newline( cfgfile )
-
-			self._header( cfgfile, 'Polygonization Settings' )
-			self._comment( cfgfile, 'This section represents all settings which can influence polygonization.' )
-			self._comment( cfgfile, 'They will be applied globally, meaning that every project will be treated with' )
-			self._comment( cfgfile, 'these same settings.' )
-			self._comment( cfgfile, 'IMPORTANT: Except for the "PerformPolygonization" switch, these settings' )
-			self._comment( cfgfile, 'are not used in part-based projects!')
-			self._comment( cfgfile, 'In part-based projects always the mode defined in the template will be used.')
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Defines if the polygonization should be performed' )
-			self._comment( cfgfile, 'In part-based workflow "False" means to perform only a preview polygonization.' )
-			self._comment( cfgfile, 'Default: True' )
-			self._writeln( cfgfile, 'PerformPolygonization', self.PerformPolygonization )
-			self._newline( cfgfile )
-
-			self._comment( cfgfile, 'Defines if polygonize should fill the reference points' )
-			self._comment( cfgfile, 'Default: False' )
-			self._writeln( cfgfile, 'PolygonizeFillReferencePoints', self.PolygonizeFillReferencePoints )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Defines the postprocessing method used for polygonize, valid values are:' )
-			self._comment( cfgfile, '"no_postprocessing", "detailed", "standard", "removes_surface_roughness", "rough_inspection"' )
-			self._comment( cfgfile, 'Default: removes_surface_roughness' )
-			self._writeln( cfgfile, 'PolygonizeProcess', self.PolygonizeProcess )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'If set to "True" memory consumption during polygonization is reduced at the cost of speed.' )
-			self._comment( cfgfile, 'Default: False' )
-			self._writeln( cfgfile, 'PolygonizeLargeDataVolumes', self.PolygonizeLargeDataVolumes )
-			self._newline( cfgfile )
-			self._newline( cfgfile )
-
-			self._header( cfgfile, 'Evaluation Result' )
-			self._comment( cfgfile, 'This setting is only used for custom exports in CustomPatches and the CustomPatchGenerator.')
-			self._comment( cfgfile, 'You can specify the name of an alignment here which will be usable for custom exports.' )
-			self._comment( cfgfile, 'If it is empty or the named alignment does not exist, the last alignment in the hierarchy is used.' )
-			self._comment( cfgfile, 'If there is no unique last alignment, it is unspecified which one of the last alignments is used.' )
-			self._comment( cfgfile, 'You can override this setting in a template with a project keyword "GOM_KIOSK_ResultAlignment".' )
-			self._comment( cfgfile, 'Default: empty' )
-			self._writeln( cfgfile, 'ResultAlignment', self.ResultAlignment )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'This setting is the same as "ResultAlignment" but for multipart scanning templates.')
-			self._comment( cfgfile, 'In multipart templates it is used as a name pattern for finding the alignment for a part.' )
-			self._comment( cfgfile, 'For overriding use a project keyword "GOM_KIOSK_MPResultAlignmentPattern".' )
-			self._comment( cfgfile, 'Default: empty' )
-			self._writeln( cfgfile, 'MPResultAlignmentPattern', self.MPResultAlignmentPattern )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Defines, if the Kiosk exports the PDF report.' )
-			self._comment( cfgfile, 'Default: True' )
-			self._writeln( cfgfile, 'ExportPDF', self.ExportPDF )
-			self._newline( cfgfile )
-			self._newline( cfgfile )
-
-			self._header( cfgfile, 'Dialog Settings' )
-			self._comment( cfgfile, 'Defines the selectable user names in the start dialog. Seperate the names with ";".' )
-			self._comment( cfgfile, 'If "UseLoginName" is activated this setting is ignored.' )
-			try:
-				self._writeln( cfgfile, 'Users', ';'.join( Globals.DIALOGS.STARTDIALOG.userlist.items ) )
-			except:
-				self._writeln( cfgfile, 'Users', '' )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Paths to custom images, or empty for the default images' )
-			self._writeln( cfgfile, 'LogoImage', self.LogoImage )
-			self._writeln( cfgfile, 'InitializeImage', self.InitializeImage )
-			self._writeln( cfgfile, 'PhotogrammetryImage', self.PhotogrammetryImage )
-			self._writeln( cfgfile, 'DigitizeImage', self.DigitizeImage )
-			self._writeln( cfgfile, 'CalibrationImage', self.CalibrationImage )
-			self._writeln( cfgfile, 'ReportImage', self.ReportImage )
-			self._writeln( cfgfile, 'TurnaroundFirstImage', self.TurnaroundFirstImage )
-			self._writeln( cfgfile, 'TurnaroundImage', self.TurnaroundImage )
-			self._writeln( cfgfile, 'TurnaroundCalibrationImage', self.TurnaroundCalibrationImage )
-			self._writeln( cfgfile, 'MultiPartWaitImage', self.MultiPartWaitImage )
-
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Localization' )
-			self._comment( cfgfile, 'No setting is equivalent to "en"' )
-			self._writeln( cfgfile, 'Language', self.Language )
-
-			self._newline( cfgfile )
-			self._newline( cfgfile )
-
-			self._header( cfgfile, 'Logging Settings' )
-			self._comment( cfgfile, 'LoggingLevel specifies the amount of logging information.' )
-			self._comment( cfgfile, 'For logging the standard python functions are used. The options can be found here:' )
-			self._comment( cfgfile, 'See http://docs.python.org/py3k/library/logging.html#logrecord-attributes for more information.' )
-			self._writeln( cfgfile, 'LoggingLevel', logging.getLevelName( self.LoggingLevel ) )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Used logging format.' )
-			self._comment( cfgfile, 'Default: %(asctime)s %(levelname)-8s Class(%(class)s) Func(%(funcName)s) Line(%(lineno)d) %(message)s' )
-			self._writeln( cfgfile, 'LoggingFormat', self.LoggingFormat )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Detailed Traceback output.' )
-			self._comment( cfgfile, 'Default: True' )
-			self._writeln( cfgfile, 'VerboseTraceback', self.VerboseTraceback )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Format specifying how date and time will be represented.' )
-			self._comment( cfgfile, 'Any order of the directives (i.e. everything beginning with %) is possible.' )
-			self._comment( cfgfile, 'Default: _%Y_%m_%d_%H_%M_%S (_%Year_%Month_%Day_%Hour_%Minute_%Second)' )
-			self._writeln( cfgfile, 'TimeFormatLogging', self.TimeFormatLogging )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'This setting activates an additional log file in csv format to log evaluation statistics.' )
-			self._comment( cfgfile, 'The logfile will be stored inside of the gom log folder as "KioskInterfaceStatistics.log".' )
-			self._comment( cfgfile, 'Default: True' )
-			self._writeln( cfgfile, 'LogStatistics', self.LogStatistics )
-			self._newline( cfgfile )
-			self._newline( cfgfile )
-
-			self._header( cfgfile, 'BarCodeScanner Settings' )
-			self._comment( cfgfile, 'Activate a connected barcode scanner.' )
-			self._comment( cfgfile, 'Default: False' )
-			self._writeln( cfgfile, 'BarCodeScanner', self.BarCodeScanner )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'COM Port of the barcode scanner.' )
-			self._comment( cfgfile, 'Default: 5' )
-			self._writeln( cfgfile, 'BarCodeCOMPort', self.BarCodeCOMPort + 1 )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Delimiter sent after a complete barcode.' )
-			self._comment( cfgfile, 'Default: \\r\\n' )
-			self._writeln( cfgfile, 'BarCodeDelimiter', self.BarCodeDelimiter.encode( "unicode_escape" ).decode() )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'If not empty defines the regular expression used to distinguish between fixture barcodes and part barcodes.' )
-			self._comment( cfgfile, 'Default: empty' )
-			self._writeln( cfgfile, 'SeparatedFixtureRegEx', self.SeparatedFixtureRegEx )
-			self._newline( cfgfile )
-			self._newline( cfgfile )
-
-			self._header( cfgfile, 'Asynchronous Evaluation' )
-			self._comment( cfgfile, 'The Kiosk Interface supports a measuring software instance and additional software instances' )
-			self._comment( cfgfile, 'that evaluate in the background.' )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'If Async is "True", then "NumberOfClients" additional software instances are started for evaluation.' )
-			self._comment( cfgfile, 'Default: False' )
-			self._writeln( cfgfile, 'Async', self.Async )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Number of software instances started for evaluation.' )
-			self._comment( cfgfile, 'Default: 1' )
-			self._writeln( cfgfile, 'NumberOfClients', self.NumberOfClients )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Specifies the address of the server, where the additional instance is started.' )
-			self._comment( cfgfile, 'Currently, only the value "localhost" is supported.' )
-			self._comment( cfgfile, 'Default: localhost' )
-			self._writeln( cfgfile, 'HostAddress', self.HostAddress )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Specify the Port for the communication.' )
-			self._comment( cfgfile, 'Default: 8081' )
-			self._writeln( cfgfile, 'HostPort', self.HostPort )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'MeasureSavePath is the name of the subfolder inside SavePath where' )
-			self._comment( cfgfile, 'the successfully measured projects are stored temporarily before evaluation.' )
-			self._comment( cfgfile, 'Default: measured' )
-			self._writeln( cfgfile, 'MeasureSavePath', self.MeasureSavePath )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'If set an automatic evaluation of all elements is performed.' )
-			self._comment( cfgfile, 'On failure the project gets marked as failed.' )
-			self._comment( cfgfile, 'Default: True' )
-			self._writeln( cfgfile, 'AutomaticResultEvaluation', self.AutomaticResultEvaluation )
-			self._newline( cfgfile )
-			self._newline( cfgfile )
-
-			self._header( cfgfile, 'Background Trend Creation' )
-			self._comment( cfgfile, 'If enabled an additional software instance is started which creates' )
-			self._comment( cfgfile, 'trend projects for all projects found within SavePath.' )
-			self._comment( cfgfile, 'Default: False' )
-			self._writeln( cfgfile, 'BackgroundTrend', self.BackgroundTrend )
-			self._comment( cfgfile, 'Defines the maximum number of stages for the trend projects.' )
-			self._comment( cfgfile, 'Default: 10' )
-			self._writeln( cfgfile, 'TrendMaxStageSize', self.TrendMaxStageSize )
-			self._comment( cfgfile, 'If enabled show the trend instance fullscreen on a second monitor' )
-			self._comment( cfgfile, 'Default: False' )
-			self._writeln( cfgfile, 'ShowOnSecondMonitor', self.TrendShowOnSecondMonitor )
-			self._newline( cfgfile )
-			self._newline( cfgfile )
-
-			if self.Inline:
-				self._header( cfgfile, 'Inline' )
-				self._comment( cfgfile, 'If enabled the KioskInterface only works via an external control instance' )
-				self._comment( cfgfile, 'Default: False' )
-				self._writeln( cfgfile, 'Inline', self.Inline )
-				self._newline( cfgfile )
-				self._comment( cfgfile, 'Inline PLC NetID' )
-				self._comment( cfgfile, 'Default: 172.17.61.55.1.1' )
-				self._writeln( cfgfile, 'InlinePLC_NetID', self.InlinePLC_NetID )
-				self._newline( cfgfile )
-				self._comment( cfgfile, 'Inline PLC Port' )
-				self._comment( cfgfile, 'Default: 851' )
-				self._writeln( cfgfile, 'InlinePLC_Port', self.InlinePLC_Port )
-				self._newline( cfgfile )
-				self._comment( cfgfile, 'This setting enables signals to the line plc that photogrammetry / calibration are recommended.' )
-				self._comment( cfgfile, 'Activating it will change the meaning of the following settings to only signal a recommendation' )
-				self._comment( cfgfile, 'instead of actually performing an action:' )
-				self._comment( cfgfile, '"PhotogrammetryMaxTimedeltaImport" defines the time delta for a photogrammetry recommendation.' )
-				self._comment( cfgfile, '"CalibrationForcedTimedelta" defines the time delta for a calibration recommendation.' )
-				self._comment( cfgfile, 'Default: False' )
-				self._writeln( cfgfile, 'EnableRecommendedSignals', self.EnableRecommendedSignals )
-				self._newline( cfgfile )
-				self._comment( cfgfile, 'Temperature Warning Limit. Triggers recommendation signals for photogrammetry and calibration.' )
-				self._comment( cfgfile, 'Default: 3.0°C' )
-				self._writeln( cfgfile, 'TemperatureWarningLimit', self.TemperatureWarningLimit )
-				self._newline( cfgfile )
-				self._newline( cfgfile )
-
-			self._header( cfgfile, 'DRC' )
-			self._comment( cfgfile, 'Activates the DoubleRobotCell Mode' )
-			self._comment( cfgfile, 'Default: False' )
-			self._writeln( cfgfile, 'DoubleRobotCell_Mode', self.DoubleRobotCell_Mode )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Defines the IP Address of the Secondary PC' )
-			self._comment( cfgfile, 'Default: 192.168.10.2' )
-			self._writeln( cfgfile, 'SecondaryHostAddress', self.DoubleRobot_SecondaryHostAddress )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'Defines the TCP/IP port used for communication' )
-			self._comment( cfgfile, 'Default: 40234' )
-			self._writeln( cfgfile, 'SecondaryHostPort', self.DoubleRobot_SecondaryHostPort )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'This setting defines the name part for measurement series on the Main side.' )
-			self._comment( cfgfile, 'This name part is used to filter the measurement series on the Main.' )
-			self._comment( cfgfile, 'Note: In demo mode this setting can also be used to load different templates' )
-			self._comment( cfgfile, 'on Main/Secondary software instances.' )
-			self._comment( cfgfile, 'Default: right' )
-			self._writeln( cfgfile, 'MainExtension', self.DoubleRobot_MainExtension )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'This setting defines the name part for measurement series on the Secondary side.' )
-			self._comment( cfgfile, 'On the Secondary instance "MainExtension" is replaced by "SecondaryExtension" in the selected measurement series name.' )
-			self._comment( cfgfile, 'Note: In demo mode this setting can also be used to load different templates' )
-			self._comment( cfgfile, 'on Main/Secondary software instances.' )
-			self._comment( cfgfile, 'Default: left' )
-			self._writeln( cfgfile, 'SecondaryExtension', self.DoubleRobot_SecondaryExtension )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'This setting controls if the reference cube positions after photogrammetry' )
-			self._comment( cfgfile, 'should be checked. If there are any errors,' )
-			self._comment( cfgfile, 'a dialog allows to correct the reference cubes and then retry photogrammetry' )
-			self._comment( cfgfile, 'or continue operation without correction.' )
-			self._comment( cfgfile, 'Default: False' )
-			self._writeln( cfgfile, 'RefCubeCheck', self.DoubleRobot_RefCubeCheck )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'This setting controls whether the reference cube check controlled' )
-			self._comment( cfgfile, 'by the "RefCubeCheck" option is done only once' )
-			self._comment( cfgfile, 'or if the reference cube correction can be repeated endlessly.' )
-			self._comment( cfgfile, 'Default: False' )
-			self._writeln( cfgfile, 'RefCubeCheckOnce', self.DoubleRobot_RefCubeCheckOnce )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'This setting defines a folder for data exchange between Main and Secondary PCs.' )
-			self._comment( cfgfile, 'This is the name of the folder on the Main PC.' )
-			self._comment( cfgfile, 'Recommended setting is a folder in a network share on the Main PC' )
-			self._comment( cfgfile, 'Default: D:/Share/Transfer' )
-			self._writeln( cfgfile, 'TransferPath', self.DoubleRobot_TransferPath )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'This setting defines a temporary save folder for the Secondary PC' )
-			self._comment( cfgfile, 'which is used for temporary projects and exports.' )
-			self._comment( cfgfile, 'Recommended setting is a local folder on the Secondary PC.' )
-			self._comment( cfgfile, 'Default: E:/DRCTemp' )
-			self._writeln( cfgfile, 'ClientSavePath', self.DoubleRobot_ClientSavePath )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'This setting defines a folder for data exchange between Main and Secondary PCs.' )
-			self._comment( cfgfile, 'This is the name of the folder on the Secondary PC.' )
-			self._comment( cfgfile, 'Recommended setting is a folder in a network share on the Main PC' )
-			self._comment( cfgfile, 'Default: E:/Share/Transfer' )
-			self._writeln( cfgfile, 'ClientTransferPath', self.DoubleRobot_ClientTransferPath )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'This setting is only used by the Setup to define if the DRC should run in the protected Kiosk mode.' )
-			self._comment( cfgfile, 'Default: False' )
-			self._writeln( cfgfile, 'KioskExecution', self.DoubleRobot_KioskExecution )
-			self._newline( cfgfile )
-
-			if self.MultiRobot_Mode: # to not confuse the users
-				self._header( cfgfile, 'MultiRobot' )
-				self._comment( cfgfile, 'Activates the MultiRobot Mode' )
-				self._comment( cfgfile, 'Default: False' )
-				self._writeln( cfgfile, 'MultiRobot_Mode', self.MultiRobot_Mode )
-				self._newline( cfgfile )
-				self._comment( cfgfile, 'Defines the IP Addresses of the Measurement PCs comma separated' )
-				self._comment( cfgfile, 'Default: 192.168.10.2' )
-				self._writeln( cfgfile, 'HostAddresses', ','.join(self.MultiRobot_HostAddresses) )
-				self._newline( cfgfile )
-				self._comment( cfgfile, 'Defines the TCP/IP port used for communication comma separated if different ports should be used.' )
-				self._comment( cfgfile, 'Default: 40234' )
-				self._writeln( cfgfile, 'HostPorts', ','.join([str(p) for p in self.MultiRobot_HostPorts]) )
-				self._newline( cfgfile )
-				self._comment( cfgfile, 'Defines the client side save path separated if different pathes should be used.' )
-				self._comment( cfgfile, 'Default: d:/Temp' )
-				self._writeln( cfgfile, 'ClientSavePath', ','.join(self.MultiRobot_ClientSavePath) )
-				self._newline( cfgfile )
-				self._comment( cfgfile, 'Defines the client side transfer path used for communication comma separated if different pathes should be used.' )
-				self._comment( cfgfile, 'Default: d:/Temp' )
-				self._writeln( cfgfile, 'ClientTransferPath', ','.join(self.MultiRobot_ClientTransferPath) )
-				self._newline( cfgfile )
-				self._comment( cfgfile, 'Defines the server side transfer path used for communication comma separated if different pathes should be used.' )
-				self._comment( cfgfile, 'Default: d:/Temp' )
-				self._writeln( cfgfile, 'TransferPath', ','.join(self.MultiRobot_TransferPath) )
-				self._newline( cfgfile )
-				
-			self._header( cfgfile, 'IOExtension' )
-			self._comment( cfgfile, 'If enabled signals the ScanBox IO Extension signals')
-			self._comment( cfgfile, 'Default: False' )
-			self._writeln( cfgfile, 'IOExtensionEnabled', self.IOExtension )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'PLC NetID' )
-			self._comment( cfgfile, 'Default: 172.17.61.55.1.1' )
-			self._writeln( cfgfile, 'IOExtension_NetID', self.IOExtension_NetID )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'PLC Port' )
-			self._comment( cfgfile, 'Default: 851' )
-			self._writeln( cfgfile, 'IOExtension_Port', self.IOExtension_Port )
-			self._newline( cfgfile )
-			
-			self._header( cfgfile, 'IoTConnection' )
-			self._comment( cfgfile, 'If enabled communicates to IoT Solution')
-			self._comment( cfgfile, 'Default: False' )
-			self._writeln( cfgfile, 'IoTConnectionEnabled', self.IoTConnection )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'IoTConnection IP' )
-			self._comment( cfgfile, 'Default: 127.0.0.1' )
-			self._writeln( cfgfile, 'IoTConnection_IP', self.IoTConnection_IP )
-			self._newline( cfgfile )
-			self._comment( cfgfile, 'IoTConnection Port' )
-			self._comment( cfgfile, 'Default: 10005' )
-			self._writeln( cfgfile, 'IoTConnection_Port', self.IoTConnection_Port )
-			self._newline( cfgfile )
-				
-			self._header( cfgfile, 'Compatibility' )
-			self._comment( cfgfile, 'if enabled the old measuring setup dialog will be used,' )
-			self._comment( cfgfile, 'e.g. for Tilt&Swivel Unit without measuring setups.' )
-			self._comment( cfgfile, 'Default: False' )
-			self._writeln( cfgfile, 'Compat_MeasuringSetup', self.Compat_MeasuringSetup )
-			self._newline( cfgfile )
-			self._newline( cfgfile )
-
+			cfgfile.write( SettingsSchema.SCHEMA.render( self, self._schema_value ) )
 			self.write_additional_settings( cfgfile )
+			cfgfile.write( SettingsSchema.SCHEMA.render( self, self._schema_value, footer = True ) )
+		SettingsSchema.SCHEMA.invalidate( self.CFG_NAME )
 
-			self._header( cfgfile, 'Version Number' )
-			self._comment( cfgfile, 'Do not modify' )
-			self._comment( cfgfile, 'Modifying will create a new configuration file.' )
-			self._writeln( cfgfile, 'VERSION', self.VERSION )
-			self._newline( cfgfile )
+	def _schema_value( self, option ):
+		'''
+		value of a schema option for writing
+		'''
+		if option.special == 'users':
+			try:
+				return ';'.join( Globals.DIALOGS.STARTDIALOG.userlist.items )
+			except:
+				return ''
+		return getattr( self, option.attr )
 
 	def write_additional_settings( self, cfgfile ):
 		'''
@@ -774,520 +274,67 @@ class Settings( DefaultSettings.DefaultSettings ):
 		'''
 		pass
 
-	def _readsettings( self, config_parser_object, show_errors = True ):
+	def _readsettings( self, config_parser_object, show_errors = True, loaded = None ):
 		'''
 		read settings from file
+		loaded is the SettingsSchema result of config_parser_object, parsed if not given
 		'''
 		if Globals.DIALOGS is None:  # initialize dialogs
 			from .. import Dialogs
-		res = self._safeget( config_parser_object, 'General Settings/Data Storage', 'SavePath' )
-		if res is not None and not self._is_patched_attribute( 'SavePath' ):
-			self.SavePath = res
-		self.SavePath = os.path.normpath( self.SavePath )
+		if loaded is None:
+			loaded = SettingsSchema.SCHEMA.parse( config_parser_object )
+		self.settings_errors = loaded.errors
+		patched = self._patched_attributes()
+		for option, value in loaded.values:
+			if option.patched is not None and option.patched in patched:
+				continue
+			if isinstance( value, list ): # the parse result is shared by all instances
+				value = list( value )
+			for attr in option.attrs:
+				setattr( self, attr, value )
 
-		res = self._safeget( config_parser_object, 'General Settings/Data Storage', 'DemoMode', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'OfflineMode' ):
-			self.OfflineMode = res
-		res = self._safeget( config_parser_object, 'General Settings/Data Storage', 'FailedPostfix' )
-		if res is not None and not self._is_patched_attribute( 'FailedPostfix' ):
-			self.FailedPostfix = res
-		res = self._safeget( config_parser_object, 'General Settings/Data Storage', 'BatchScan', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'BatchScan' ):
-			self.BatchScan = res
-			self.MultiPart = res # compatibility
-		# read MultiPart for migration
-		res = self._safeget( config_parser_object, 'General Settings/Data Storage', 'MultiPart', boolean = True )
-		if res is not None:
-			self.Migrate_MultiPart = res
-		res = self._safeget( config_parser_object, 'General Settings/Data Storage', 'BatchScanPauseNeeded', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'BatchScanPauseNeeded' ):
-			self.BatchScanPauseNeeded = res
-			self.MultiPartPauseNeeded = res # compatibility
-		# read MultiPartPauseNeeded for migration
-		res = self._safeget( config_parser_object, 'General Settings/Data Storage', 'MultiPartPauseNeeded', boolean = True )
-		if res is not None:
-			self.Migrate_MultiPartPauseNeeded = res
-		res = self._safeget( config_parser_object, 'General Settings/Data Storage', 'AllowAbort', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'AllowAbort' ):
-			self.AllowAbort = res
+		self.SavePath = os.path.normpath( self.SavePath )
 		gom.script.sys.set_kiosk_status_bar(enable_abort=self.AllowAbort)
-
-		res = self._safeget( config_parser_object, 'General Settings/Data Storage', 'MSeriesSelection', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'MSeriesSelection' ):
-			self.MSeriesSelection = res
-		res = self._safeget( config_parser_object, 'General Settings/Data Storage', 'AlignmentIteration', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'AlignmentIteration' ):
-			self.AlignmentIteration = res
-
-		res = self._safeget( config_parser_object, 'General Settings/Data Storage', 'DiscFullWarningLimitSavePath', integer = True )
-		if res is not None and not self._is_patched_attribute( 'DiscFullWarningLimitSavePath' ):
-			self.DiscFullWarningLimitSavePath = res
-		res = self._safeget( config_parser_object, 'General Settings/Data Storage', 'DiscFullErrorLimitSavePath', integer = True )
-		if res is not None and not self._is_patched_attribute( 'DiscFullErrorLimitSavePath' ):
-			self.DiscFullErrorLimitSavePath = res
-		res = self._safeget( config_parser_object, 'General Settings/Data Storage', 'DiscFullWarningLimitLogPath', integer = True )
-		if res is not None and not self._is_patched_attribute( 'DiscFullWarningLimitLogPath' ):
-			self.DiscFullWarningLimitLogPath = res
-		res = self._safeget( config_parser_object, 'General Settings/Data Storage', 'DiscFullErrorLimitLogPath', integer = True )
-		if res is not None and not self._is_patched_attribute( 'DiscFullErrorLimitLogPath' ):
-			self.DiscFullErrorLimitLogPath = res
-
-		res = self._safeget( config_parser_object, 'Project Template Selection', 'ShowTemplateDialog', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'ShowTemplateDialog' ):
-			self.ShowTemplateDialog = res
-		res = self._safeget( config_parser_object, 'Project Template Selection', 'TemplateConfigLevel' )
-		if res is not None and not self._is_patched_attribute( 'TemplateConfigLevel' ):
-			self.TemplateConfigLevel = res
-		res = self._safeget( config_parser_object, 'Project Template Selection', 'TemplateName' )
-		if res is not None and not self._is_patched_attribute( 'TemplateName' ):
-			self.TemplateName = res
-		res = self._safeget( config_parser_object, 'Project Template Selection', 'TemplateCategory' )
-		if res is not None and not self._is_patched_attribute( 'TemplateCategory' ):
-			self.TemplateCategory = res
-		res = self._safeget( config_parser_object, 'Project Template Selection', 'ConnectedProjectSources' )
-		if res is not None and not self._is_patched_attribute( 'ConnectedProjectSources' ):
-			self.ConnectedProjectSources = [p.strip() for p in res.split(',')]
-
-		res = self._safeget( config_parser_object, 'Project Naming', 'AutoNameProject', boolean = True )
-		if res is not None  and not self._is_patched_attribute( 'AutoNameProject' ):
-			self.AutoNameProject = res
-		res = self._safeget( config_parser_object, 'Project Naming', 'ProjectName' )
-		if res is not None  and not self._is_patched_attribute( 'ProjectName' ):
-			self.ProjectName = res
-		res = self._safeget( config_parser_object, 'Project Naming', 'TimeFormatProject' )
-		if res is not None and not self._is_patched_attribute( 'TimeFormatProject' ):
-			self.TimeFormatProject = res
-
-		res = self._safeget( config_parser_object, 'Keywords', 'UseLoginName', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'UseLoginName' ):
-			self.UseLoginName = res
-		res = self._safeget( config_parser_object, 'Keywords', 'TimeFormatProjectKeyword' )
-		if res is not None and not self._is_patched_attribute( 'TimeFormatProjectKeyword' ):
-			self.TimeFormatProjectKeyword = res
-		res = self._safeget( config_parser_object, 'Keywords', 'MultiPartBatchSerial', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'MultiPartBatchSerial' ):
-			self.MultiPartBatchSerial = res
-
-		res = self._safeget( config_parser_object, 'Digitizing Settings', 'WaitForSensorWarmUp', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'WaitForSensorWarmUp' ):
-			self.WaitForSensorWarmUp = res
-		res = self._safeget( config_parser_object, 'Digitizing Settings', 'MaxDigitizeRepetition', integer = True )
-		if res is not None and not self._is_patched_attribute( 'MaxDigitizeRepetition' ):
-			self.MaxDigitizeRepetition = res
-		res = self._safeget( config_parser_object, 'Digitizing Settings', 'MeasurementFailureMargin', float = True )
-		if res is not None and not self._is_patched_attribute( 'MeasurementFailureMargin' ):
-			self.MeasurementFailureMargin = res
-		res = self._safeget( config_parser_object, 'Digitizing Settings', 'HigherFaultTolerance', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'HigherFaultTolerance' ):
-			self.HigherFaultTolerance = res
-		res = self._safeget( config_parser_object, 'Digitizing Settings', 'CheckFixturePosition', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'CheckFixturePosition' ):
-			self.CheckFixturePosition = res
-		res = self._safeget( config_parser_object, 'Digitizing Settings', 'CheckFixturePositionOnlyOnTemplateSwitch', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'CheckFixturePositionOnlyOnTemplateSwitch' ):
-			self.CheckFixturePositionOnlyOnTemplateSwitch = res
-		res = self._safeget( config_parser_object, 'Digitizing Settings', 'KeepCheckFixturePositionElements', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'KeepCheckFixturePositionElements' ):
-			self.KeepCheckFixturePositionElements = res
-		res = self._safeget( config_parser_object, 'Digitizing Settings', 'CheckFixtureRepeat', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'CheckFixtureRepeat' ):
-			self.CheckFixtureRepeat = res
-		res = self._safeget( config_parser_object, 'Digitizing Settings', 'FreePathAlwaysAllowed', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'FreePathAlwaysAllowed' ):
-			self.FreePathAlwaysAllowed = res
-		res = self._safeget( config_parser_object, 'Digitizing Settings', 'MoveAllDevicesToHome', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'MoveAllDevicesToHome' ):
-			self.MoveAllDevicesToHome = res
-
-		res = self._safeget( config_parser_object, 'Calibration Settings', 'CalibrationMaxTimedelta', integer = True )
-		if res is not None and not self._is_patched_attribute( 'CalibrationMaxTimedelta' ):
-			self.CalibrationMaxTimedelta = res
-		res = self._safeget( config_parser_object, 'Calibration Settings', 'CalibrationForcedTimedelta', integer = True )
-		if res is not None and not self._is_patched_attribute( 'CalibrationForcedTimedelta' ):
-			self.CalibrationForcedTimedelta = res
-		res = self._safeget( config_parser_object, 'Calibration Settings', 'CalibrationEachCycle', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'CalibrationEachCycle' ):
-			self.CalibrationEachCycle = res
-
-		res = self._safeget( config_parser_object, 'Photogrammetry Settings', 'PhotogrammetryOnlyIfRequired', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'PhotogrammetryOnlyIfRequired' ):
-			self.PhotogrammetryOnlyIfRequired = res
-		res = self._safeget( config_parser_object, 'Photogrammetry Settings', 'PhotogrammetryMaxTimedeltaImport', integer = True )
-		if res is not None and not self._is_patched_attribute( 'PhotogrammetryMaxTimedeltaImport' ):
-			self.PhotogrammetryMaxTimedeltaImport = res
-		res = self._safeget( config_parser_object, 'Photogrammetry Settings', 'PhotogrammetryMaxImportCount', integer = True )
-		if res is not None and not self._is_patched_attribute( 'PhotogrammetryMaxImportCount' ):
-			self.PhotogrammetryMaxImportCount = res
-		res = self._safeget( config_parser_object, 'Photogrammetry Settings', 'PhotogrammetryMaxTemperatureLimit', float = True )
-		if res is not None and not self._is_patched_attribute( 'PhotogrammetryMaxTemperatureLimit' ):
-			self.PhotogrammetryMaxTemperatureLimit = res
-		res = self._safeget( config_parser_object, 'Photogrammetry Settings', 'PhotogrammetryForceOnTemplateSwitch', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'PhotogrammetryForceOnTemplateSwitch' ):
-			self.PhotogrammetryForceOnTemplateSwitch = res
-		res = self._safeget( config_parser_object, 'Photogrammetry Settings', 'PhotogrammetryExportAdapters', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'PhotogrammetryExportAdapters' ):
-			self.PhotogrammetryExportAdapters = res
-		res = self._safeget( config_parser_object, 'Photogrammetry Settings', 'PhotogrammetrySavePath' )
-		if res is not None and not self._is_patched_attribute( 'PhotogrammetrySavePath' ):
-			self.PhotogrammetrySavePath = res
-		res = self._safeget( config_parser_object, 'Photogrammetry Settings', 'PhotogrammetryVerification', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'PhotogrammetryVerification' ):
-			self.PhotogrammetryVerification = res
-		res = self._safeget( config_parser_object, 'Photogrammetry Settings', 'PhotogrammetryComprehensive', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'PhotogrammetryComprehensive' ):
-			self.PhotogrammetryComprehensive = res
-		res = self._safeget( config_parser_object, 'Photogrammetry Settings', 'PhotogrammetryNumberOfScaleBars', integer = True )
-		if res is not None and not self._is_patched_attribute( 'PhotogrammetryNumberOfScaleBars' ):
-			self.PhotogrammetryNumberOfScaleBars = res
-		res = self._safeget( config_parser_object, 'Photogrammetry Settings', 'PhotogrammetryCodedPointIDRange' )
-		if res is not None and not self._is_patched_attribute( 'PhotogrammetryCodedPointIDRange' ):
-			self.PhotogrammetryCodedPointIDRange = res
 		# conversion to TrafoCodedPointIDs happens in "check()"
 		self.TrafoCodedPointIDs = []
+		if self.VerboseTraceback:
+			logging.Formatter.formatException = LogClass.formatException
 
-		res = self._safeget( config_parser_object, 'Photogrammetry Settings', 'PhotogrammetryIndependent', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'PhotogrammetryIndependent' ):
-			self.PhotogrammetryIndependent = res
-		res = self._safeget( config_parser_object, 'Photogrammetry Settings', 'AsyncAlignmentResidualCheck', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'AsyncAlignmentResidualCheck' ):
-			self.AsyncAlignmentResidualCheck = res
-
-		res = self._safeget( config_parser_object, 'Polygonization Settings', 'PerformPolygonization', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'PerformPolygonization' ):
-			self.PerformPolygonization = res
-		res = self._safeget( config_parser_object, 'Polygonization Settings', 'PolygonizeFillReferencePoints', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'PolygonizeFillReferencePoints' ):
-			self.PolygonizeFillReferencePoints = res
-		res = self._safeget( config_parser_object, 'Polygonization Settings', 'PolygonizeProcess' )
-		if res is not None and not self._is_patched_attribute( 'PolygonizeProcess' ):
-			self.PolygonizeProcess = res
-		res = self._safeget( config_parser_object, 'Polygonization Settings', 'PolygonizeLargeDataVolumes', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'PolygonizeLargeDataVolumes' ):
-			self.PolygonizeLargeDataVolumes = res
-
-		res = self._safeget( config_parser_object, 'Evaluation Result', 'ResultAlignment' )
-		if res is not None and not self._is_patched_attribute( 'ResultAlignment' ):
-			self.ResultAlignment = res
-		res = self._safeget( config_parser_object, 'Evaluation Result', 'MPResultAlignmentPattern' )
-		if res is not None and not self._is_patched_attribute( 'MPResultAlignmentPattern' ):
-			self.MPResultAlignmentPattern = res
-		res = self._safeget( config_parser_object, 'Evaluation Result', 'ExportPDF', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'ExportPDF' ):
-			self.ExportPDF = res
-
-		users = self._safeget( config_parser_object, 'Dialog Settings', 'users' )
-		if users is not None and not self._is_patched_attribute( 'users' ):
+		users = loaded.specials.get( 'Users' )
+		if users is not None and 'users' not in patched:
 			# TODO keep as setting and move the split to Workflow.Startup**
 			for dialog in [Globals.DIALOGS.STARTDIALOG, Globals.DIALOGS.STARTDIALOG_FIXTURE]:
 				try:
 					dialog.userlist.items = users.split( ';' )
 				except:
 					pass
-		res = self._safeget( config_parser_object, 'Dialog Settings', 'LogoImage' )
-		if not self._is_patched_attribute( 'LogoImageBinary' ):
-			if res is None or len( res ) == 0:
-				self.LogoImageBinary = Globals.DIALOGS.IMAGE_CONTAINER_DIALOG.image_logo.data
-				self.LogoImage = ''
-			else:
-				try:
-					self.LogoImage = res
-					self.LogoImageBinary = self._load_image( self.LogoImage )
-				except:
-					self.LogoImageBinary = Globals.DIALOGS.IMAGE_CONTAINER_DIALOG.image_logo.data
-					self.LogoImage = ''
-
-		res = self._safeget( config_parser_object, 'Dialog Settings', 'PhotogrammetryImage' )
-		if not self._is_patched_attribute( 'PhotogrammetryImageBinary' ):
-			if res is None or len( res ) == 0:
-				self.PhotogrammetryImageBinary = Globals.DIALOGS.IMAGE_CONTAINER_DIALOG.image_photogrammetry.data
-				self.PhotogrammetryImage = ''
-			else:
-				try:
-					self.PhotogrammetryImage = res
-					self.PhotogrammetryImageBinary = self._load_image( self.PhotogrammetryImage )
-				except:
-					self.PhotogrammetryImageBinary = Globals.DIALOGS.IMAGE_CONTAINER_DIALOG.image_photogrammetry.data
-					self.PhotogrammetryImage = ''
-		res = self._safeget( config_parser_object, 'Dialog Settings', 'DigitizeImage' )
-		if not self._is_patched_attribute( 'DigitizeImageBinary' ):
-			if res is None or len( res ) == 0:
-				self.DigitizeImageBinary = Globals.DIALOGS.IMAGE_CONTAINER_DIALOG.image_digitize.data
-				self.DigitizeImage = ''
-			else:
-				try:
-					self.DigitizeImage = res
-					self.DigitizeImageBinary = self._load_image( self.DigitizeImage )
-				except:
-					self.DigitizeImageBinary = Globals.DIALOGS.IMAGE_CONTAINER_DIALOG.image_digitize.data
-					self.DigitizeImage = ''
-		res = self._safeget( config_parser_object, 'Dialog Settings', 'ReportImage' )
-		if not self._is_patched_attribute( 'ReportImageBinary' ):
-			if res is None or len( res ) == 0:
-				self.ReportImageBinary = Globals.DIALOGS.IMAGE_CONTAINER_DIALOG.image_report.data
-				self.ReportImage = ''
-			else:
-				try:
-					self.ReportImage = res
-					self.ReportImageBinary = self._load_image( self.ReportImage )
-				except:
-					self.ReportImageBinary = Globals.DIALOGS.IMAGE_CONTAINER_DIALOG.image_report.data
-					self.ReportImage = ''
-		res = self._safeget( config_parser_object, 'Dialog Settings', 'CalibrationImage' )
-		if not self._is_patched_attribute( 'CalibrationImageBinary' ):
-			if res is None or len( res ) == 0:
-				self.CalibrationImageBinary = Globals.DIALOGS.IMAGE_CONTAINER_DIALOG.image_calibration.data
-				self.CalibrationImage = ''
-			else:
-				try:
-					self.CalibrationImage = res
-					self.CalibrationImageBinary = self._load_image( self.CalibrationImage )
-				except:
-					self.CalibrationImageBinary = Globals.DIALOGS.IMAGE_CONTAINER_DIALOG.image_calibration.data
-					self.CalibrationImage = ''
-		res = self._safeget( config_parser_object, 'Dialog Settings', 'InitializeImage' )
-		if not self._is_patched_attribute( 'InitializeImageBinary' ):
-			if res is None or len( res ) == 0:
-				self.InitializeImageBinary = Globals.DIALOGS.IMAGE_CONTAINER_DIALOG.image_init.data
-				self.InitializeImage = ''
-			else:
-				try:
-					self.InitializeImage = res
-					self.InitializeImageBinary = self._load_image( self.InitializeImage )
-				except:
-					self.InitializeImageBinary = Globals.DIALOGS.IMAGE_CONTAINER_DIALOG.image_init.data
-					self.InitializeImage = ''
-
-		res = self._safeget( config_parser_object, 'Dialog Settings', 'TurnaroundFirstImage' )
-		if not self._is_patched_attribute( 'TurnaroundFirstBinary' ):
-			if res is None or len( res ) == 0:
-				self.TurnaroundFirstImageBinary = Globals.DIALOGS.IMAGE_CONTAINER_DIALOG.image_turnaround_first.data
-				self.TurnaroundFirstImage = ''
-			else:
-				try:
-					self.TurnaroundFirstImage = res
-					self.TurnaroundFirstImageBinary = self._load_image( self.TurnaroundFirstImage )
-				except:
-					self.TurnaroundFirstImageBinary = Globals.DIALOGS.IMAGE_CONTAINER_DIALOG.image_turnaround_first.data
-					self.TurnaroundFirstImage = ''
-		res = self._safeget( config_parser_object, 'Dialog Settings', 'TurnaroundImage' )
-		if not self._is_patched_attribute( 'TurnaroundImageBinary' ):
-			if res is None or len( res ) == 0:
-				self.TurnaroundImageBinary = Globals.DIALOGS.IMAGE_CONTAINER_DIALOG.image_turnaround.data
-				self.TurnaroundImage = ''
-			else:
-				try:
-					self.TurnaroundImage = res
-					self.TurnaroundImageBinary = self._load_image( self.TurnaroundImage )
-				except:
-					self.TurnaroundImageBinary = Globals.DIALOGS.IMAGE_CONTAINER_DIALOG.image_turnaround.data
-					self.TurnaroundImage = ''
-		res = self._safeget( config_parser_object, 'Dialog Settings', 'TurnaroundCalibrationImage' )
-		if not self._is_patched_attribute( 'TurnaroundCalibrationImageBinary' ):
-			if res is None or len( res ) == 0:
-				self.TurnaroundCalibrationImageBinary = Globals.DIALOGS.IMAGE_CONTAINER_DIALOG.image_turnaround_calib.data
-				self.TurnaroundCalibrationImage = ''
-			else:
-				try:
-					self.TurnaroundCalibrationImage = res
-					self.TurnaroundCalibrationImageBinary = self._load_image( self.TurnaroundCalibrationImage )
-				except:
-					self.TurnaroundCalibrationImageBinary = Globals.DIALOGS.IMAGE_CONTAINER_DIALOG.image_turnaround_calib.data
-					self.TurnaroundCalibrationImage = ''
-
-		res = self._safeget( config_parser_object, 'Dialog Settings', 'MultiPartWaitImage' )
-		if not self._is_patched_attribute( 'MultiPartWaitImageBinary' ):
-			if res is None or len( res ) == 0:
-				self.MultiPartWaitImageBinary = Globals.DIALOGS.IMAGE_CONTAINER_DIALOG.image_transparent.data  # no default image
-				self.MultiPartWaitImage = ''
-			else:
-				try:
-					self.MultiPartWaitImage = res
-					self.MultiPartWaitImageBinary = self._load_image( self.MultiPartWaitImage )
-				except:
-					self.MultiPartWaitImageBinary = Globals.DIALOGS.IMAGE_CONTAINER_DIALOG.image_transparent.data  # no default image
-					self.MultiPartWaitImage = ''
-
-		res = self._safeget( config_parser_object, 'Dialog Settings', 'Language' )
-		if res is not None and not self._is_patched_attribute( 'Language' ):
-			self.Language = res
-
-		res = self._safeget( config_parser_object, 'Logging Settings', 'LoggingLevel' )
-		if res is not None and not self._is_patched_attribute( 'LoggingLevel' ):
-			self.LoggingLevel = logging.getLevelName( res )
-		res = self._safeget( config_parser_object, 'Logging Settings', 'LoggingFormat' )
-		if res is not None and not self._is_patched_attribute( 'LoggingFormat' ):
-			self.LoggingFormat = res
-		res = self._safeget( config_parser_object, 'Logging Settings', 'VerboseTraceback', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'VerboseTraceback' ):
-			self.VerboseTraceback = res
-		if self.VerboseTraceback:
-			logging.Formatter.formatException = LogClass.formatException
-		res = self._safeget( config_parser_object, 'Logging Settings', 'TimeFormatLogging' )
-		if res is not None and not self._is_patched_attribute( 'TimeFormatLogging' ):
-			self.TimeFormatLogging = res
-		res = self._safeget( config_parser_object, 'Logging Settings', 'LogStatistics', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'LogStatistics' ):
-			self.LogStatistics = res
-
-		res = self._safeget( config_parser_object, 'BarCodeScanner Settings', 'BarCodeScanner', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'BarCodeScanner' ):
-			self.BarCodeScanner = res
-		res = self._safeget( config_parser_object, 'BarCodeScanner Settings', 'BarCodeCOMPort', integer = True )
-		if res is not None and not self._is_patched_attribute( 'BarCodeCOMPort' ):
-			self.BarCodeCOMPort = res - 1
-		res = self._safeget( config_parser_object, 'BarCodeScanner Settings', 'BarCodeDelimiter' )
-		if res is not None and not self._is_patched_attribute( 'BarCodeDelimiter' ):
-			self.BarCodeDelimiter = bytes( res, "utf-8" ).decode( "unicode_escape" )
-		res = self._safeget( config_parser_object, 'BarCodeScanner Settings', 'SeparatedFixtureRegEx' )
-		if res is not None and not self._is_patched_attribute( 'SeparatedFixtureRegEx' ):
-			self.SeparatedFixtureRegEx = res
-
-		res = self._safeget( config_parser_object, 'Asynchronous Evaluation', 'Async', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'Async' ):
-			self.Async = res
-		res = self._safeget( config_parser_object, 'Asynchronous Evaluation', 'NumberOfClients', integer = True )
-		if res is not None and not self._is_patched_attribute( 'NumberOfClients' ):
-			res = min( 2, res )
-			self.NumberOfClients = res
-		res = self._safeget( config_parser_object, 'Asynchronous Evaluation', 'HostAddress' )
-		if res is not None and not self._is_patched_attribute( 'HostAddress' ):
-			self.HostAddress = res
-		res = self._safeget( config_parser_object, 'Asynchronous Evaluation', 'HostPort', integer = True )
-		if res is not None and not self._is_patched_attribute( 'HostPort' ):
-			self.HostPort = res
-		res = self._safeget( config_parser_object, 'Asynchronous Evaluation', 'MeasureSavePath' )
-		if res is not None and not self._is_patched_attribute( 'MeasureSavePath' ):
-			self.MeasureSavePath = res
-		res = self._safeget( config_parser_object, 'Asynchronous Evaluation', 'AutomaticResultEvaluation', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'AutomaticResultEvaluation' ):
-			self.AutomaticResultEvaluation = res
-
-		res = self._safeget( config_parser_object, 'Background Trend Creation', 'BackgroundTrend', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'BackgroundTrend' ):
-			self.BackgroundTrend = res
-		res = self._safeget( config_parser_object, 'Background Trend Creation', 'TrendMaxStageSize', integer = True )
-		if res is not None and not self._is_patched_attribute( 'TrendMaxStageSize' ):
-			self.TrendMaxStageSize = res
-		res = self._safeget( config_parser_object, 'Background Trend Creation', 'ShowOnSecondMonitor', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'ShowOnSecondMonitor' ):
-			self.TrendShowOnSecondMonitor = res
-
-		res = self._safeget( config_parser_object, 'Inline', 'Inline', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'Inline' ):
-			self.Inline = res
-		res = self._safeget( config_parser_object, 'Inline', 'InlinePLC_NetID' )
-		if res is not None and not self._is_patched_attribute( 'InlinePLC_NetID' ):
-			self.InlinePLC_NetID = res
-		res = self._safeget( config_parser_object, 'Inline', 'InlinePLC_Port', integer = True )
-		if res is not None and not self._is_patched_attribute( 'InlinePLC_Port' ):
-			self.InlinePLC_Port = res
-		res = self._safeget( config_parser_object, 'Inline', 'EnableRecommendedSignals', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'EnableRecommendedSignals' ):
-			self.EnableRecommendedSignals = res
-			
-		res = self._safeget( config_parser_object, 'Inline', 'TemperatureWarningLimit', float = True )
-		if res is not None and not self._is_patched_attribute( 'TemperatureWarningLimit' ):
-			self.TemperatureWarningLimit = res
-
-		res = self._safeget( config_parser_object, 'DRC', 'DoubleRobotCell_Mode', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'DoubleRobotCell_Mode' ):
-			self.DoubleRobotCell_Mode = res
-		res = self._safeget( config_parser_object, 'DRC', 'SecondaryHostAddress' )
-		if res is not None and not self._is_patched_attribute( 'DoubleRobot_SecondaryHostAddress' ):
-			self.DoubleRobot_SecondaryHostAddress = res
-		res = self._safeget( config_parser_object, 'DRC', 'SecondaryHostPort', integer = True )
-		if res is not None and not self._is_patched_attribute( 'DoubleRobot_SecondaryHostPort' ):
-			self.DoubleRobot_SecondaryHostPort = res
-		res = self._safeget( config_parser_object, 'DRC', 'MainExtension' )
-		if res is not None and not self._is_patched_attribute( 'DoubleRobot_MainExtension' ):
-			self.DoubleRobot_MainExtension = res
-		# read PrimaryExtension for migration
-		res = self._safeget( config_parser_object, 'DRC', 'PrimaryExtension' )
-		if res is not None:
-			self.Migrate_PrimaryExtension = res
-		res = self._safeget( config_parser_object, 'DRC', 'SecondaryExtension' )
-		if res is not None and not self._is_patched_attribute( 'DoubleRobot_SecondaryExtension' ):
-			self.DoubleRobot_SecondaryExtension = res
-		# read AlignmentIteration and NoMlistSelection for migration
-		res = self._safeget( config_parser_object, 'DRC', 'AlignmentIteration', boolean = True )
-		if res is not None:
-			self.Migrate_DR_AlignmentIteration = res
-		res = self._safeget( config_parser_object, 'DRC', 'NoMlistSelection', boolean = True )
-		if res is not None:
-			self.Migrate_DR_NoMListSelection = res
-		res = self._safeget( config_parser_object, 'DRC', 'RefCubeCheck', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'DoubleRobot_RefCubeCheck' ):
-			self.DoubleRobot_RefCubeCheck = res
-		res = self._safeget( config_parser_object, 'DRC', 'RefCubeCheckOnce', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'DoubleRobot_RefCubeCheckOnce' ):
-			self.DoubleRobot_RefCubeCheckOnce = res
-		res = self._safeget( config_parser_object, 'DRC', 'TransferPath' )
-		if res is not None and not self._is_patched_attribute( 'DoubleRobot_TransferPath' ):
-			self.DoubleRobot_TransferPath = res
-		res = self._safeget( config_parser_object, 'DRC', 'ClientSavePath' )
-		if res is not None and not self._is_patched_attribute( 'DoubleRobot_ClientSavePath' ):
-			self.DoubleRobot_ClientSavePath = res
-		res = self._safeget( config_parser_object, 'DRC', 'ClientTransferPath' )
-		if res is not None and not self._is_patched_attribute( 'DoubleRobot_ClientTransferPath' ):
-			self.DoubleRobot_ClientTransferPath = res
-		res = self._safeget( config_parser_object, 'DRC', 'KioskExecution' )
-		if res is not None and not self._is_patched_attribute( 'DoubleRobot_KioskExecution' ):
-			self.DoubleRobot_KioskExecution = res
-			
-			
-		res = self._safeget( config_parser_object, 'MultiRobot', 'MultiRobot_Mode', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'MultiRobot_Mode' ):
-			self.MultiRobot_Mode = res
-		res = self._safeget( config_parser_object, 'MultiRobot', 'HostAddresses' )
-		if res is not None and not self._is_patched_attribute( 'MultiRobot_HostAddresses' ):
-			self.MultiRobot_HostAddresses = [ip.strip() for ip in res.split(',')]
-		res = self._safeget( config_parser_object, 'MultiRobot', 'HostPorts' )
-		if res is not None and not self._is_patched_attribute( 'MultiRobot_HostPorts' ):
-			self.MultiRobot_HostPorts = [int(port.strip()) for port in res.split(',')]
-		res = self._safeget( config_parser_object, 'MultiRobot', 'ClientSavePath' )
-		if res is not None and not self._is_patched_attribute( 'MultiRobot_ClientSavePath' ):
-			self.MultiRobot_ClientSavePath = [path.strip() for path in res.split(',')]
-		res = self._safeget( config_parser_object, 'MultiRobot', 'ClientTransferPath' )
-		if res is not None and not self._is_patched_attribute( 'MultiRobot_ClientTransferPath' ):
-			self.MultiRobot_ClientTransferPath = [path.strip() for path in res.split(',')]
-		res = self._safeget( config_parser_object, 'MultiRobot', 'TransferPath' )
-		if res is not None and not self._is_patched_attribute( 'MultiRobot_TransferPath' ):
-			self.MultiRobot_TransferPath = [path.strip() for path in res.split(',')]
-
-		
-		res = self._safeget( config_parser_object, 'IOExtension', 'IOExtensionEnabled', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'IOExtension' ):
-			self.IOExtension = res
-		res = self._safeget( config_parser_object, 'IOExtension', 'IOExtension_NetID' )
-		if res is not None and not self._is_patched_attribute( 'IOExtension_NetID' ):
-			self.IOExtension_NetID = res
-		res = self._safeget( config_parser_object, 'IOExtension', 'IOExtension_Port', integer = True )
-		if res is not None and not self._is_patched_attribute( 'IOExtension_Port' ):
-			self.IOExtension_Port = res
-			
-		res = self._safeget( config_parser_object, 'IoTConnection', 'IoTConnectionEnabled', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'IoTConnection' ):
-			self.IoTConnection = res
-		res = self._safeget( config_parser_object, 'IoTConnection', 'IoTConnection_IP' )
-		if res is not None and not self._is_patched_attribute( 'IoTConnection_IP' ):
-			self.IoTConnection_IP = res
-		res = self._safeget( config_parser_object, 'IoTConnection', 'IoTConnection_Port', integer = True )
-		if res is not None and not self._is_patched_attribute( 'IoTConnection_Port' ):
-			self.IoTConnection_Port = res
-
-
-		res = self._safeget( config_parser_object, 'Compatibility', 'Compat_MeasuringSetup', boolean = True )
-		if res is not None and not self._is_patched_attribute( 'Compat_MeasuringSetup' ):
-			self.Compat_MeasuringSetup = res
+		for option in SettingsSchema.SCHEMA.options( special = 'image' ):
+			if option.patched not in patched:
+				self._readimage( option, loaded.specials.get( option.key ) )
 
 		self.read_additional_settings( config_parser_object )
 
-		res = self._safeget( config_parser_object, 'Version Number', 'VERSION' )
+		res = loaded.specials.get( 'VERSION' )
 		if res != self.VERSION:
 			# settings auto migration hook
 			self.migrate_settings( res, self.VERSION )
 			self._storedefaultsettings()
 
+	def _readimage( self, option, res ):
+		'''
+		sets path and binary of an image setting, the default image for an empty or invalid path
+		'''
+		binary, default = option.image
+		if res is not None and len( res ) > 0:
+			try:
+				setattr( self, option.attr, res )
+				setattr( self, binary, self._load_image( res ) )
+				return
+			except:
+				pass
+		setattr( self, binary, getattr( Globals.DIALOGS.IMAGE_CONTAINER_DIALOG, default ).data )
+		setattr( self, option.attr, '' )
+
 	def read_additional_settings( self, config_parser_object ):
 		'''
 		placeholder function for patching additional settings into the config
@@ -1374,6 +421,9 @@ class Settings( DefaultSettings.DefaultSettings ):
 		if self.AlignmentIteration and not self.MSeriesSelection:
 			warn_list.append( Globals.LOCALIZATION.msg_settings_aligniter_nomlist )
 
+		for error in self.settings_errors:
+			warn_list.append( Globals.LOCALIZATION.msg_settings_invalid_value.format( error ) )
+
 		if len(warn_list) > 0:
 			for w in warn_list:
 				logger.warn( w )
@@ -1411,6 +461,12 @@ class Settings( DefaultSettings.DefaultSettings ):
 				self.BatchScanPauseNeeded = self.Migrate_MultiPartPauseNeeded
 				self.MultiPartPauseNeeded = self.Migrate_MultiPartPauseNeeded # compatibility
 
+	def _patched_attributes( self ):
+		'''
+		returns the names of all user patched attributes, see _is_patched_attribute
+		'''
+		return set( [name[len( 'original__' ):] for name in dir( self ) if name.startswith( 'original__' )] )
+
 	def _is_patched_attribute( self, name ):
 		'''
 		returns True if the attribute is user patched, else False
@@ -1426,10 +482,13 @@ class Settings( DefaultSettings.DefaultSettings ):
 		checks if a projectkeyword with the given name exists and returns the value of it
 		instead of the cfg value
 		format of the projectkeyword has to be GOM_KIOSK_[name of the settingname]
+		the keywords are read once per project, see ProjectOverrides
 		'''
 		if key in DefaultSettings.DefaultSettings.__dict__:
 			try:
-				override = gom.app.project.get( 'user_GOM_KIOSK_{}'.format( key ) )
+				found, override = PROJECT_OVERRIDES.get( key )
+				if not found:
+					return object.__getattribute__( self, key )
 				original = object.__getattribute__( self, key )
 				if type( original ) == int:
 					return int( override )
@@ -1515,11 +574,10 @@ class GenericLogClass( object ):
 		self.baselog = logger
 		if name is None:
 			name = self.__class__.__name__
-		self.log = logging.LoggerAdapter( logger.log, {'class':name} )
+		self.log = LogClass.LogAdapter( logger.log, {'class':name} )
 		self._logfile_filename = None
 		self._logfile_dateformat = None
 		self._logformat = None
-		self._logfileDay = None
 		self._fileloghandler = None
 
 	def set_logging_filename(self, filename, dateformat='_%Y_%m_%d_%H_%M_%S'):
@@ -1531,20 +589,31 @@ class GenericLogClass( object ):
 
 	def create_fileloghandler( self ):
 		'''
-		This function creates a new log file
+		This function opens the log store (see LogStore)
 		'''
 		if self._logfile_filename is None:
 			raise Exception('create filelog called without filename set!')
 		logdir = os.path.normpath( os.path.join( gom.app.get ( 'local_all_directory' ), '..', 'log' ) )
-		filepath = os.path.join( logdir, self._logfile_filename + time.strftime( self._logfile_dateformat ) + '.log' )
-		self._fileloghandler = self.baselog.create_filehandler( filename = filepath, strformat = self._logformat )
+		capacity, overflow = 10000, 'drop_debug'
+		size, hours, days = 50, 24, 28
+		if Globals.SETTINGS is not None:
+			capacity, overflow = Globals.SETTINGS.LoggingQueueSize, Globals.SETTINGS.LoggingOverflow
+			size, hours, days = ( Globals.SETTINGS.LoggingSegmentSize, Globals.SETTINGS.LoggingSegmentHours,
+				Globals.SETTINGS.LoggingRetentionDays )
+		store = LogStore.LogStore( logdir, self._logfile_filename, max_bytes = size * 1024 * 1024,
+			max_age = hours * 3600, retention = days * 24 * 3600, timeformat = self._logfile_dateformat )
+		self._fileloghandler = self.baselog.create_queuedhandler( LogStore.StoreHandler( store ), capacity, overflow )
+		self._fileloghandler.addFilter( LogStore.ContextFilter() )
+		# text log files of previous versions
 		self.remove_old_logs( os.path.join( logdir, self._logfile_filename+'*.log' ) )
-		self._logfileDay = datetime.datetime.now().day
 
 	def close_fileloghandler(self):
 		if self._fileloghandler is None:
 			return
+		self.log.debug( 'log queue: {} store: {}'.format(
+			self._fileloghandler.stats(), self._fileloghandler.target.store.stats() ) )
 		self.baselog.close_filehandle( self._fileloghandler )
+		self._fileloghandler = None
 
 	def remove_old_logs( self, log_files ):
 		'''
@@ -1561,15 +630,12 @@ class GenericLogClass( object ):
 				pass
 
 	def test_rolling_log_file(self):
-		if self._logfileDay is None:
+		'''
+		close the current log segment if it is too large or too old (the store also checks on write)
+		'''
+		if self._fileloghandler is None:
 			return False
-		if datetime.datetime.now().day != self._logfileDay:
-			self.close_fileloghandler()
-			self.create_fileloghandler()
-			logdir = os.path.normpath( os.path.join( gom.app.get ( 'local_all_directory' ), '..', 'log' ) )
-			self.remove_old_logs( os.path.join( logdir, self._logfile_filename+'*.log' ) )
-			return True
-		return False
+		return self._fileloghandler.target.store.rotate_if_due()
 
 # patching Functions
 # CAREFULL if both patch methods are used for one class
@@ -1625,99 +691,34 @@ def MetaClassPatch( name, bases, namespace ):
 	return base
 
 def analyze_patch( base, patchedname, namespace, ignore_first = False, external_decorator = None ):
-	def _getargs( _name, _value, _ignore_first = False ):
-		def _inspect_args( _value, _ignore_first ):
-			if not _ignore_first:
-				_args = inspect.getfullargspec( _value )
-				return len( _args[0] ), _args[3], inspect.formatargspec( *_args )
-			else:
-				args, varargs, varkw, defaults, kwonlyargs, kwonlydefaults, annotations = inspect.getfullargspec( _value )
-				if len( args ) >= 1:
-					args = args[1:]
-				return len( args ), defaults, inspect.formatargspec( args, varargs, varkw, defaults, kwonlyargs, kwonlydefaults, annotations )
-		spec_tuple = None
-		try:
-			spec_tuple = _inspect_args( _value, _ignore_first )
-		except:
-			try:
-				class _tmpobject: pass
-				setattr( _tmpobject, _name, _value )
-				spec_tuple = _inspect_args( getattr( _tmpobject, _name ), _ignore_first )
-			except:
-				pass
-		return spec_tuple
+	'''
+	register the patch for KioskInterfacePatches.log, the analysis runs later (see write_patch_log)
+	'''
 	try:
-		global __logfile
-		if __logfile is None:
-			__logfile = os.path.join( gom.app.get ( 'local_all_directory' ), '..', 'log', 'KioskInterfacePatches.log' )
-			with open( __logfile, 'w', encoding='utf-8' ) as f:
-				f.write( 'Applied patches {}\n'.format( time.strftime( '%Y.%m.%d %H:%M:%S' ) ) )
-
-		frameinfo = None
-		patch_location = 'unknown'
-		try:
-			frameinfo = inspect.getouterframes( inspect.currentframe() )[2]
-			patch_location = '{} line {}\n'.format( frameinfo[1], frameinfo[2] )
-		except:
-			pass
-		finally:
-			if frameinfo is not None:
-				del frameinfo
-		loglines = [patch_location]
-		module_name = 'unknown'
-		try:
-			module_name = base.original____module__ if hasattr( base, 'original____module__' ) else base.__module__
-		except:
-			pass
-		if module_name.find( 'Workflow' ) >= 0 and base.__name__ == 'StartUp':
-			Globals.FEATURE_SET.V8StartDialogs = False
-
-		loglines += ['  {}->{} ({})\n'.format( module_name, base.__name__, patchedname )]
-		for attr_name, attr_value in sorted( namespace.items() ):
-			try:
-				if attr_name not in ['__metaclass__', '__doc__', '__module__', '__qualname__']:
-					is_patched = hasattr( base, attr_name )
-					patched_spec = _getargs( attr_name, attr_value, ignore_first )
-					try:
-						orig_spec = _getargs( attr_name, getattr( base, attr_name ) )
-					except:
-						orig_spec = None
-					spec = ''
-					if orig_spec is not None and patched_spec is not None:
-						error = ''
-						if orig_spec[0] != patched_spec[0]:
-							error = 'DIFFERENT COUNT OF PARAMETERS'
-						elif orig_spec[1] != patched_spec[1]:
-							error = 'DIFFERENT DEFAULTS'
-						elif orig_spec[2] != patched_spec[2]:
-							error = 'DIFFERENT NAMES'
-						spec = '{}!={} {}'.format( patched_spec[2], orig_spec[2], error ) if len( error ) else patched_spec[2]
-					elif patched_spec is not None:
-						spec = '{}'.format( patched_spec[2] )
-					equal_type = ''
-					if is_patched:
-						_orig_val = base.__dict__[attr_name]
-						type_cmp_value = attr_value
-						if external_decorator is not None:
-							type_cmp_value = external_decorator( attr_value )
-						if type( type_cmp_value ) != type( _orig_val ):
-
-							equal_type = 'UNEQUAL TYPE {} <-> {}'.format( type( type_cmp_value ), type( _orig_val ) )
-						elif isinstance( attr_value, str ):
-							if attr_value.count( '{' ) != _orig_val.count( '{' ):
-								equal_type = 'DIFFERENT FORMAT COUNT'
-					loglines += [ '    {}{} [{}] {}\n'.format( attr_name, spec,
-																'patched' if is_patched else 'new',
-																equal_type ) ]
-					if module_name == 'Base.Evaluate' and base.__name__ == 'EvaluationAnalysis' and attr_name == 'update_all_reports' and is_patched:
-						loglines += '    DEPRECATED\n'
-			except:
-				pass
-		with open( __logfile, 'a', encoding='utf-8' ) as f:
-			f.writelines( loglines )
+		frame = sys._getframe( 2 )
+		filename, lineno = frame.f_code.co_filename, frame.f_lineno
+		del frame
+	except ValueError:
+		filename, lineno = 'unknown', 0
+	module_name = 'unknown'
+	try:
+		module_name = base.original____module__ if hasattr( base, 'original____module__' ) else base.__module__
+	except:
+		pass
+	if module_name.find( 'Workflow' ) >= 0 and base.__name__ == 'StartUp':
+		Globals.FEATURE_SET.V8StartDialogs = False
+	try:
+		PatchRegistry.register( filename, lineno, base, module_name, patchedname, namespace, ignore_first, external_decorator )
 	except:
 		pass
-__logfile = None
+
+def write_patch_log():
+	'''
+	write KioskInterfacePatches.log in a background thread, nothing is done if
+	the patch files and the patched modules did not change since the last run
+	'''
+	logfile = os.path.join( gom.app.get ( 'local_all_directory' ), '..', 'log', 'KioskInterfacePatches.log' )
+	return PatchRegistry.write_log_async( logfile )
 
 
 def sanitize_filename( name ):
@@ -1920,14 +921,35 @@ class GlobalTimer( GenericLogClass ):
 	'''
 	central timer class
 	registers itself as gom timer handler and calls any registered functor
+
+	Each handler is a task of a timer wheel (see TimerWheel) with its own interval (ms) and priority,
+	handlers without interval follow the default interval (setTimeInterval).
+	The gom timer runs at the greatest common divisor of the intervals (at least TICK ms).
+	A task which is late by more than one interval skips the missed runs, runtime, lateness and
+	missed deadlines are recorded per task (statistics()).
+
+	Exceptions of a handler are identified by handler, type and traceback (file, line, function),
+	the first one is logged with traceback, repetitions only as summary every SUMMARY_INTERVAL seconds.
+	With backoff (registerHandler) a handler is called less often after BACKOFF_AFTER consecutive
+	failures (doubled delay up to MAX_BACKOFF seconds), after disable_after failures it is removed.
 	'''
+	TICK = 50
+	SUMMARY_INTERVAL = 60.0
+	BACKOFF_AFTER = 5
+	MAX_BACKOFF = 60.0
+
 	def __init__( self, logger, time_interval ):
 		'''
 		initialize
 		'''
 		GenericLogClass.__init__( self, logger )
 		self._handlers = []
+		self._tasks = {} # handler -> list of TimerTask
+		self._active = set()
+		self._exceptions = {} # fingerprint -> [count, not reported count, last report time, handler, description]
 		self._interval = time_interval
+		self._timer_interval = None
+		self._wheel = TimerWheel.TimerWheel( self.TICK / 1000.0 )
 
 	def __del__( self ):
 		'''
@@ -1955,37 +977,197 @@ class GlobalTimer( GenericLogClass ):
 
 	def _global_loop( self, value ):
 		'''
-		central loop for calling all registered handers
+		central loop for calling all due handers
 		'''
 		if value != 'timer': # only listen to timer events, otherwise this would slowdown the complete software
 			return
-		for h in self._handlers:
+		due, now = self._wheel.advance()
+		finished = False
+		for task in due:
+			if task.cancelled:
+				continue
+			if task.skip_until <= now:
+				lateness = now - task.due
+				deadline = task.deadline if task.deadline is not None else max(
+					task.interval or 0, ( self._timer_interval or self.TICK ) / 1000.0 )
+				if lateness > deadline:
+					task.missed_deadlines += 1
+				started = time.perf_counter()
+				try:
+					task.callback( value )
+				except Exception as e:
+					self._handler_failed( task, e, now )
+				else:
+					if task.failures:
+						self._handler_recovered( task )
+				task.record( lateness, time.perf_counter() - started )
+			if task.interval is not None:
+				self._wheel.reschedule( task, self._wheel.now() )
+			else:
+				self._active.discard( task )
+				finished = True
+		if finished:
+			self._update_timer()
+
+	def _update_timer( self ):
+		'''
+		gom timer interval: greatest common divisor of the task intervals and one-shot delays
+		'''
+		if not self._active:
+			self._timer_interval = None
 			try:
-				h( value )
-			except Exception as e:
-				self.log.exception( 'Exception during global handler call "{}" {}'.format( h, e ) )
+				gom.app.timer_enabled = False
+			except:
+				pass
+			return
+		interval = 0
+		now = self._wheel.now()
+		for task in self._active:
+			ms = task.interval * 1000 if task.interval is not None else ( task.due - now ) * 1000
+			interval = math.gcd( interval, max( 1, int( round( ms / self.TICK ) ) ) * self.TICK )
+		interval = max( self.TICK, interval )
+		if interval != self._timer_interval:
+			if self._timer_interval is None:
+				gom.app.handler = self._global_loop
+			gom.app.timer_interval = interval
+			gom.app.timer_enabled = True
+			self._timer_interval = interval
+
+	def schedule( self, callback, interval, priority = 0, deadline = None, name = None, backoff = False, disable_after = 0 ):
+		'''
+		call callback( 'timer' ) every interval ms, returns the TimerTask (see cancel)
+		priority - tasks due at the same time run by descending priority
+		deadline - allowed lateness in ms (default: interval), later runs are counted as missed deadlines
+		'''
+		task = TimerWheel.TimerTask( callback, interval / 1000.0, priority,
+			deadline / 1000.0 if deadline is not None else None, name, backoff, disable_after )
+		self._wheel.schedule( task, task.interval )
+		self._active.add( task )
+		self._update_timer()
+		return task
+
+	def call_later( self, delay, callback, priority = 0, name = None ):
+		'''
+		call callback( 'timer' ) once after delay ms, returns the TimerTask (see cancel)
+		'''
+		task = TimerWheel.TimerTask( callback, None, priority, None, name )
+		self._wheel.schedule( task, delay / 1000.0 )
+		self._active.add( task )
+		self._update_timer()
+		return task
+
+	def cancel( self, task ):
+		self._wheel.cancel( task )
+		self._active.discard( task )
+		now = time.time()
+		for fingerprint, entry in list( self._exceptions.items() ):
+			if fingerprint in task.fingerprints:
+				self._report( entry, now )
+				del self._exceptions[fingerprint]
+		self._update_timer()
+
+	@staticmethod
+	def _fingerprint( handler, exception ):
+		frames = []
+		tb = exception.__traceback__
+		while tb is not None:
+			code = tb.tb_frame.f_code
+			frames.append( ( code.co_filename, tb.tb_lineno, code.co_name ) )
+			tb = tb.tb_next
+		return ( handler, type( exception ).__qualname__, tuple( frames ) )
+
+	def _handler_failed( self, task, exception, now ):
+		'''
+		log the exception (traceback only on first occurrence) and back off/disable the handler
+		'''
+		handler = task.callback
+		task.failures += 1
+		fingerprint = self._fingerprint( handler, exception )
+		task.fingerprints.add( fingerprint )
+		entry = self._exceptions.get( fingerprint )
+		wall = time.time()
+		if entry is None:
+			self._exceptions[fingerprint] = [1, 0, wall, handler, '{}: {}'.format( type( exception ).__name__, exception )]
+			self.log.exception( 'Exception during global handler call "{}" {}'.format( handler, exception ) )
+		else:
+			entry[0] += 1
+			entry[1] += 1
+			entry[4] = '{}: {}'.format( type( exception ).__name__, exception )
+			if wall - entry[2] >= self.SUMMARY_INTERVAL:
+				self._report( entry, wall )
+
+		if task.disable_after and task.failures >= task.disable_after:
+			self.log.error( 'global handler "{}" disabled after {} consecutive failures'.format( handler, task.failures ) )
+			if task in self._tasks.get( handler, [] ):
+				self.unregisterHandler( handler )
+			else:
+				self.cancel( task )
+		elif task.backoff and task.failures >= self.BACKOFF_AFTER:
+			base = task.interval if task.interval is not None else self._interval / 1000.0
+			task.skip_until = now + min( self.MAX_BACKOFF, base * 2 ** ( task.failures - self.BACKOFF_AFTER + 1 ) )
+
+	def _report( self, entry, now ):
+		if entry[1]:
+			self.log.error( 'global handler "{}" failed {} more times in {:.0f}s ({} total): {}'.format(
+				entry[3], entry[1], now - entry[2], entry[0], entry[4] ) )
+		entry[1] = 0
+		entry[2] = now
+
+	def _handler_recovered( self, task ):
+		now = time.time()
+		for fingerprint in task.fingerprints:
+			entry = self._exceptions.get( fingerprint )
+			if entry is not None:
+				self._report( entry, now )
+		self.log.info( 'global handler "{}" working again after {} failures'.format( task.callback, task.failures ) )
+		task.failures = 0
+		task.skip_until = 0
+		task.fingerprints = set()
+
+	def exception_summary( self ):
+		'''
+		list of (handler, count, last exception) of all failed handlers
+		'''
+		return [( entry[3], entry[0], entry[4] ) for entry in self._exceptions.values()]
+
+	def statistics( self ):
+		'''
+		runtime/lateness statistics of all active tasks
+		'''
+		return [task.statistics() for task in sorted( self._active, key = lambda task: -task.priority )]
+
+	def log_statistics( self ):
+		for values in self.statistics():
+			self.log.debug( 'timer task {}'.format( values ) )
 
 	def setTimeInterval( self, ms ):
 		'''
-		set time interval (default 1s)
+		set the default interval (default 1s) of the handlers registered without interval
 		'''
 		self._interval = ms
-		try:
-			if gom.app.timer_enabled:
-				gom.app.timer_interval = self._interval
-		except:
-			pass
-
-	def registerHandler( self, handler ):
+		for tasks in self._tasks.values():
+			for task in tasks:
+				if task.default_interval:
+					task.interval = ms / 1000.0
+					self._wheel.schedule( task, task.interval )
+		self._update_timer()
+
+	def registerHandler( self, handler, backoff = False, disable_after = 0, interval = None, priority = 0, deadline = None ):
 		'''
 		register handler function
 		on first handler start the timer
+		backoff - call a repeatedly failing handler less often (not for latency critical handlers,
+		          a backed off handler runs again only after its delay even if the fault is gone)
+		disable_after - unregister the handler after this number of consecutive failures (0: never)
+		interval - call interval in ms (default: the default interval, see setTimeInterval)
+		priority - handlers due at the same time run by descending priority
+		deadline - allowed lateness in ms (default: interval)
 		'''
+		task = self.schedule( handler, interval if interval is not None else self._interval, priority, deadline,
+			None, backoff, disable_after )
+		task.default_interval = interval is None
 		self._handlers.append( handler )
-		if ( len( self._handlers ) == 1 ):
-			gom.app.handler = self._global_loop
-			gom.app.timer_interval = self._interval
-			gom.app.timer_enabled = True
+		self._tasks.setdefault( handler, [] ).append( task )
 
 	def unregisterHandler( self, handler ):
 		'''
@@ -1996,11 +1178,11 @@ class GlobalTimer( GenericLogClass ):
 			self._handlers.remove( handler )
 		except:
 			pass
-		try:
-			if not len( self._handlers ):
-				gom.app.timer_enabled = False
-		except:
-			pass
+		tasks = self._tasks.get( handler )
+		if tasks:
+			self.cancel( tasks.pop( 0 ) )
+			if not tasks:
+				del self._tasks[handler]
 
 
 def import_localization ( lang, logger ):
@@ -16,4 +16,4 @@
 # ChangeLog:
 # 2012-05-31: Initial Creation
 
-__all__ = ["Utils", "LogClass", "DefaultSettings", "Messages", "PersistentSettings", "Globals", "BarCode"]
+__all__ = ["Utils", "LogClass", "DefaultSettings", "Messages", "PersistentSettings", "Globals", "BarCode", "SettingsSchema", "SettingsReload", "LogStore", "LogQuery", "TimerWheel", "PatchRegistry"]
@@ -23,7 +23,7 @@
 #             Import language file at start-up.
 
 
-from .Misc import LogClass, Utils, Globals, Messages, PersistentSettings, BarCode
+from .Misc import LogClass, Utils, Globals, Messages, LogStore, PersistentSettings, BarCode, SettingsReload
 from .Communication import (AsyncServer, Communicate, AsyncClient,
 							DRCExtensionPrimary, DRCExtensionSecondary, MultiEvalServer)
 from .Communication.Inline import InlineConstants
@@ -82,6 +82,11 @@ class WorkFlow( Utils.GenericLogClass ):
 		Globals.DIALOGS.localize_temperature_dialog()
 
 		Utils.GlobalTimer.registerInstance( self.baselog )
+		Utils.write_patch_log()
+		# apply changes of the settings file while running
+		Globals.SETTINGS_RELOAD = SettingsReload.SettingsReloader( self.baselog, Globals.SETTINGS, interval = 0 )
+		Globals.SETTINGS_RELOAD.subscribe( SettingsReload.logging_level_subscriber( self.baselog.log ), ['LoggingLevel'] )
+		Globals.TIMER.registerHandler( Globals.SETTINGS_RELOAD.check, backoff = True, interval = 2000, priority = -10 )
 		if Globals.SETTINGS.MultiRobot_Mode:
 			Globals.SETTINGS.Async = False
 			Globals.SETTINGS.BackgroundTrend = False
@@ -146,6 +151,7 @@ class WorkFlow( Utils.GenericLogClass ):
 			Globals.SETTINGS.CurrentTemplateCfg = 'oneshot_project'
 		else:
 			gom.script.sys.close_project()
+			Utils.invalidate_project_overrides()
 		if Globals.FEATURE_SET.ONESHOT_MSERIES:
 			self.log.info( 'Kiosk started in one-shot mode for measurement series {}'.format(
 				', '.join( Globals.FEATURE_SET.ONESHOT_MSERIES ) ) )
@@ -179,6 +185,7 @@ class WorkFlow( Utils.GenericLogClass ):
 				for client in Globals.ASYNC_CLIENTS.client_list:
 					Globals.CONTROL_INSTANCE.send_signal( Communicate.Signal( Communicate.SIGNAL_CONTROL_ASYNC_PID, str(client.pid) ) )
 			Globals.ASYNC_SERVER.wait_for_first_connection()
+			Globals.SETTINGS_RELOAD.subscribe( self._settings_changed_clients )
 			self.check_for_old_projects()
 			Globals.DIALOGS.toggleshow_wait_dialog( show = False )
 
@@ -194,10 +201,20 @@ class WorkFlow( Utils.GenericLogClass ):
 			self.eval.eval.analysis.start_automatic_trend_creator()
 			
 		if Globals.SETTINGS.IoTConnection:
-			Globals.IOT_CONNECTION = Communicate.IoTConnection(Globals.SETTINGS.IoTConnection_IP, Globals.SETTINGS.IoTConnection_Port)
+			Globals.IOT_CONNECTION = Communicate.IoTConnection(Globals.SETTINGS.IoTConnection_IP, Globals.SETTINGS.IoTConnection_Port,
+				Globals.SETTINGS.IoTConnection_Batched)
 			if not Globals.SETTINGS.Inline:
-				Globals.TIMER.setTimeInterval(30000)
-				Globals.TIMER.registerHandler( self._iot_position_update )
+				Globals.TIMER.registerHandler( self._iot_position_update, backoff = True, interval = 30000, priority = -10 )
+
+	def _settings_changed_clients( self, changes ):
+		'''
+		pass reloaded settings to the eval clients, start additional clients
+		'''
+		if 'NumberOfClients' in changes:
+			if not Globals.ASYNC_CLIENTS.resize( Globals.SETTINGS.NumberOfClients ):
+				self.log.warning( 'NumberOfClients reduced, surplus clients are stopped on restart' )
+		Globals.ASYNC_SERVER.send_signal( Communicate.Signal(
+			Communicate.SIGNAL_SETTINGS_CHANGED, SettingsReload.encode_changes( changes ) ) )
 
 	def _iot_position_update(self, value):
 		try:
@@ -235,6 +252,7 @@ class WorkFlow( Utils.GenericLogClass ):
 					break
 			resultchoosen = self.startup.Result
 			Globals.SETTINGS.LastStartedTemplate = Globals.SETTINGS.CurrentTemplate
+			LogStore.new_cycle( resultchoosen.get( 'serial' ) )
 			self.log.info( 'User Input: {}'.format( ' '.join(
 				'{}->{}'.format( key, value ) for key, value in resultchoosen.items()
 				if key != '__parts__' ) ) )
@@ -271,12 +289,13 @@ class WorkFlow( Utils.GenericLogClass ):
 				
 				if not Globals.FEATURE_SET.MULTIROBOT_MEASUREMENT:
 					gom.script.sys.close_project()
+					Utils.invalidate_project_overrides()
 				if Globals.DRC_EXTENSION is not None and Globals.FEATURE_SET.DRC_SECONDARY_INST and Globals.FEATURE_SET.DRC_SINGLE_SIDE:
 					Globals.DRC_EXTENSION.sendSingleSideDone()
 
-			# part finished create a new logfile
-			self.close_fileloghandler()
-			self.create_fileloghandler()
+			# part finished, the log store closes the segment by size/age
+			LogStore.end_cycle()
+			self.test_rolling_log_file()
 
 	def evaluate( self, resultchoosen ):
 		'''
@@ -385,6 +404,7 @@ class WorkFlow( Utils.GenericLogClass ):
 						self.log.debug( 'Skipping multipart scanning template {}'.format(
 							Globals.SETTINGS.CurrentTemplate.split( chr( 0x7 ) )[-1][:-len( '.project_template' )] ) )
 						gom.script.sys.close_project()
+						Utils.invalidate_project_overrides()
 						Globals.SETTINGS.CurrentTemplate = None
 						Globals.SETTINGS.CurrentTemplateCfg = None
 						continue
@@ -444,6 +464,7 @@ class WorkFlow( Utils.GenericLogClass ):
 			break
 
 		gom.script.sys.close_project()
+		Utils.invalidate_project_overrides()
 
 	def check_for_old_projects( self ):
 		'''
@@ -489,8 +510,17 @@ class WorkFlow( Utils.GenericLogClass ):
 		if hasattr( self.startup, 'barcode_instance' ) and self.startup.barcode_instance is not None:
 			self.startup.barcode_instance.close()
 			del self.startup.barcode_instance
+		if Globals.SETTINGS_RELOAD is not None and Globals.TIMER is not None:
+			Globals.TIMER.unregisterHandler( Globals.SETTINGS_RELOAD.check )
+		if Globals.TIMER is not None:
+			Globals.TIMER.log_statistics()
 		if Utils.GlobalTimer is not None:
 			Utils.GlobalTimer.unregisterInstance()
+		if Globals.IOT_CONNECTION is not None:
+			Globals.IOT_CONNECTION.close()
+		if Globals.PERSISTENTSETTINGS is not None:
+			Globals.PERSISTENTSETTINGS.close()
+		self.log.debug( 'settings project overrides: {}'.format( Utils.PROJECT_OVERRIDES.stats() ) )
 
 		self.close_fileloghandler()
 		
@@ -542,6 +572,7 @@ class StartUp( Utils.GenericLogClass ):
 			if Globals.DIALOGS.has_widget( Globals.DIALOGS.STARTDIALOG, 'buttonTemplateChoose' ):
 				Globals.DIALOGS.STARTDIALOG.buttonTemplateChoose.text = Globals.LOCALIZATION.startdialog_button_template
 			gom.script.sys.close_project ()
+			Utils.invalidate_project_overrides()
 
 		# create and show startup dialog
 		result = self.show_dialog()
@@ -595,12 +626,14 @@ class StartUp( Utils.GenericLogClass ):
 		if startup is given directly opens last used template
 		'''
 		gom.script.sys.close_project ()
+		Utils.invalidate_project_overrides()
 		try:
 			# called directly after dialog show
 			if startup:
 				template = gom.script.sys.create_project_from_template ( 
 					config_level = Globals.SETTINGS.TemplateConfigLevel,
 					template_name = Globals.SETTINGS.CurrentTemplate )
+				Utils.invalidate_project_overrides()
 				Globals.SETTINGS.IsPhotogrammetryNeeded = False
 			# show the template dialog
 			elif Globals.SETTINGS.ShowTemplateDialog:
@@ -608,6 +641,7 @@ class StartUp( Utils.GenericLogClass ):
 					config_levels = [Globals.SETTINGS.TemplateConfigLevel],
 					template_name = Globals.SETTINGS.TemplateName,
 					filters = self.Template_filter )
+				Utils.invalidate_project_overrides()
 				if Globals.SETTINGS.PhotogrammetryOnlyIfRequired:
 					if Globals.SETTINGS.CurrentTemplate != template['template_name']:
 						Globals.SETTINGS.IsPhotogrammetryNeeded = True
@@ -619,6 +653,7 @@ class StartUp( Utils.GenericLogClass ):
 				template = gom.script.sys.create_project_from_template ( 
 					config_level = Globals.SETTINGS.TemplateConfigLevel,
 					template_name = Globals.SETTINGS.TemplateName )
+				Utils.invalidate_project_overrides()
 				if Globals.SETTINGS.PhotogrammetryOnlyIfRequired:
 					if Globals.SETTINGS.CurrentTemplate != Globals.SETTINGS.TemplateName:
 						Globals.SETTINGS.IsPhotogrammetryNeeded = True
@@ -891,7 +926,7 @@ class StartUpV8( Utils.GenericLogClass ):
 			self.dialog.timer.enabled = True
 			self.partdialog.timer.interval = 500
 			self.partdialog.timer.enabled = True
-			Globals.TIMER.registerHandler( Globals.DRC_EXTENSION.globalTimerCheck )
+			Globals.TIMER.registerHandler( Globals.DRC_EXTENSION.globalTimerCheck, interval = 200, priority = 10 )
 		if Globals.FEATURE_SET.DRC_SECONDARY_INST:
 			if Globals.DIALOGS.has_widget( self.dialog, 'buttonTemplateChoose' ):
 				self.dialog.buttonTemplateChoose.enabled = False
@@ -996,6 +1031,7 @@ class StartUpV8( Utils.GenericLogClass ):
 			Globals.DRC_EXTENSION.send_software_drc_failure( repr(e) )
 		finally:
 			gom.script.sys.close_project()
+			Utils.invalidate_project_overrides()
 			Globals.SETTINGS.SoftwareDRCMode = None
 			Globals.DIALOGS.toggleshow_wait_dialog(show=False)
 
@@ -1146,6 +1182,7 @@ class StartUpV8( Utils.GenericLogClass ):
 				return
 			elif unique_template is not None:
 				gom.script.sys.close_project ()
+				Utils.invalidate_project_overrides()
 				if Globals.DRC_EXTENSION is not None and Globals.DRC_EXTENSION.PrimarySideActive():
 					template = dict()
 					template['template_name'] = unique_template
@@ -1155,6 +1192,7 @@ class StartUpV8( Utils.GenericLogClass ):
 					template = gom.script.sys.create_project_from_template ( 
 						config_level = unique_cfg,
 						template_name = unique_template )
+					Utils.invalidate_project_overrides()
 					self.log.debug( 'opened automatically {}'.format( unique_template ) )
 					template['template_name'] = unique_template
 					template['config_level'] = unique_cfg
@@ -1166,6 +1204,7 @@ class StartUpV8( Utils.GenericLogClass ):
 				return
 
 		gom.script.sys.close_project ()
+		Utils.invalidate_project_overrides()
 		opened_template = { 'template_name': None, 'config_level': None }
 		try:
 			template_categories = [Globals.SETTINGS.TemplateCategory]
@@ -1184,10 +1223,12 @@ class StartUpV8( Utils.GenericLogClass ):
 						project_id_draft=Globals.SETTINGS.CurrentTemplateConnectedProjectId, 
 						url_draft=Globals.SETTINGS.CurrentTemplateConnectedUrl
 					)
+					Utils.invalidate_project_overrides()
 				else:
 					template = gom.script.sys.create_project_from_template ( 
 						config_level = Globals.SETTINGS.CurrentTemplateCfg,
 						template_name = Globals.SETTINGS.CurrentTemplate )
+					Utils.invalidate_project_overrides()
 				opened_template['is_connected_project'] = Globals.SETTINGS.CurrentTemplateIsConnected
 				opened_template['connected_project_id'] = Globals.SETTINGS.CurrentTemplateConnectedProjectId
 				opened_template['connected_url'] = Globals.SETTINGS.CurrentTemplateConnectedUrl
@@ -1215,11 +1256,13 @@ class StartUpV8( Utils.GenericLogClass ):
 						config_levels = cfg_level,
 						template_name = Globals.SETTINGS.TemplateName,
 						regex_filters = filter )
+					Utils.invalidate_project_overrides()
 			# dont show the template dialog
 			else:
 				template = gom.script.sys.create_project_from_template ( 
 					config_level = Globals.SETTINGS.TemplateConfigLevel,
 					template_name = Globals.SETTINGS.TemplateName )
+				Utils.invalidate_project_overrides()
 				opened_template['is_connected_project'] = False
 				opened_template['template_name'] = Globals.SETTINGS.TemplateName
 				opened_template['config_level'] = Globals.SETTINGS.TemplateConfigLevel
@@ -2056,13 +2099,12 @@ class InlineStartUp( StartUpV8 ):
 			Globals.CONTROL_INSTANCE = AsyncClient.InlineClient( self.baselog, '127.0.0.1', 6543, {} )
 		if not Globals.FEATURE_SET.DRC_SECONDARY_INST:
 			Globals.CONTROL_INSTANCE.wait_till_connected()
-		Globals.TIMER.setTimeInterval(200)
-		Globals.TIMER.registerHandler( self._clientProcessCheck )
+		Globals.TIMER.registerHandler( self._clientProcessCheck, interval = 200, priority = 10 )
 		self._delayed_pkts=[]
 		self._currentSpecialPosition = []
 		self._userdata={}
 		if Globals.FEATURE_SET.DRC_PRIMARY_INST or Globals.FEATURE_SET.DRC_SECONDARY_INST:
-			Globals.TIMER.registerHandler( Globals.DRC_EXTENSION.globalTimerCheck )
+			Globals.TIMER.registerHandler( Globals.DRC_EXTENSION.globalTimerCheck, interval = 200, priority = 10 )
 		
 			
 	def execute (self):
@@ -2205,10 +2247,12 @@ class InlineStartUp( StartUpV8 ):
 			gom.script.sys.set_project_keywords ( 
 				keywords = {'KioskInline_PLC_RESULT_NOT_NEEDED': ''},
 				keywords_description = {'KioskInline_PLC_RESULT_NOT_NEEDED': 'KioskInterface PLC Result Not Needed'} )
+			Utils.invalidate_project_overrides()
 		if 'KioskInline_PLC_INFORMATION' in existing_kws:
 			gom.script.sys.set_project_keywords ( 
 				keywords = {'KioskInline_PLC_INFORMATION': ''},
 				keywords_description = {'KioskInline_PLC_INFORMATION': 'KioskInterface PLC Information'} )
+			Utils.invalidate_project_overrides()
 		self.sendAvailableSpecialPositions()
 
 	def onSignalSerial2(self, value):
@@ -2230,6 +2274,7 @@ class InlineStartUp( StartUpV8 ):
 						gom.script.sys.create_project_from_template ( 
 							config_level = cfg,
 							template_name = template )
+						Utils.invalidate_project_overrides()
 						with Measure.TemporaryWarmupDisable(self.parent.eval.eval.Sensor) as warmup:
 							self.parent.eval.eval.Sensor.check_for_reinitialize()
 				Globals.DRC_EXTENSION.onInlineStartSingleSlave()
@@ -2245,6 +2290,7 @@ class InlineStartUp( StartUpV8 ):
 			gom.script.sys.set_project_keywords (
 				keywords = {'KioskInline_PLC_RESULT_NOT_NEEDED': value.get_value_as_string()},
 				keywords_description = {'KioskInline_PLC_RESULT_NOT_NEEDED': 'KioskInterface PLC Result Not Needed'} )
+			Utils.invalidate_project_overrides()
 		except:
 			pass
 		if Globals.DRC_EXTENSION is not None and Globals.DRC_EXTENSION.single_side_secondary:
@@ -2263,6 +2309,7 @@ class InlineStartUp( StartUpV8 ):
 		gom.script.sys.set_project_keywords (
 			keywords = {'KioskInline_PLC_INFORMATION': value.get_value_as_string()},
 			keywords_description = {'KioskInline_PLC_INFORMATION': 'KioskInterface PLC Information'} )
+		Utils.invalidate_project_overrides()
 
 		self.parent.eval.eval.save_project()
 		if not self.parent.eval.eval.Sensor.check_for_reinitialize():
@@ -2290,6 +2337,7 @@ class InlineStartUp( StartUpV8 ):
 								'KioskInline_PLC_INFORMATION_RAW2': 'KioskInterface PLC Information Raw2',
 								'KioskInline_PLC_INFORMATION_RAW3': 'KioskInterface PLC Information Raw3',
 								'KioskInline_PLC_INFORMATION': 'KioskInterface PLC Information'} )
+		Utils.invalidate_project_overrides()
 		self._userdata = self.buildAdditionalResultInformation(''.join(value))
 		
 
@@ -2301,6 +2349,7 @@ class InlineStartUp( StartUpV8 ):
 		if Globals.DRC_EXTENSION is not None and Globals.FEATURE_SET.DRC_PRIMARY_INST:
 			Globals.DRC_EXTENSION.onInlineCloseTemplate(self)
 		gom.script.sys.close_project()
+		Utils.invalidate_project_overrides()
 		if Globals.DRC_EXTENSION is not None:
 			Globals.DRC_EXTENSION.single_side_secondary = False
 			Globals.DRC_EXTENSION.single_side_primary = False
@@ -2778,6 +2827,7 @@ class Confirm( Utils.GenericLogClass ):
 								'result_all_out_of_qstop_tolerance': 'Count of all out of Q-Stop tolerance elements',
 								'result':'Result',
 								'result_additional':'Additional Result Information'} )
+			Utils.invalidate_project_overrides()
 
 			if Utils.multi_part_evaluation_status():
 				reports_per_part = Evaluate.EvaluationAnalysis.scan_report_for_parts( Evaluate.EvaluationAnalysis.scan_parts )
@@ -2913,6 +2963,7 @@ class Confirm( Utils.GenericLogClass ):
 		'''
 		file_name = os.path.basename( project_file )
 		gom.script.sys.close_project()
+		Utils.invalidate_project_overrides()
 		if ( os.path.exists( os.path.join( Globals.SETTINGS.SavePath, file_name ) ) ):
 			os.unlink( os.path.join( Globals.SETTINGS.SavePath, file_name ) )
 
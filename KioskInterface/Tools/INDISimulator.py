@@ -0,0 +1,467 @@
+# -*- coding: utf-8 -*-
+# Script: Local INDI line controller simulator
+#
+# PLEASE NOTE that this file is part of the GOM Software.
+# You are not allowed to distribute this file to a third party without written notice.
+#
+# Please, do not copy and/or modify this script.
+# All modifications of KioskInterface should happen in the CustomPatches script.
+# Ignoring this advice will make KioskInterface fail after Software update.
+#
+# Copyright (c) 2020, 2021 Carl Zeiss GOM Metrology GmbH
+# All rights reserved.
+
+# Standalone tool (plain python, no gom module needed).
+# Acts as INDI server for Base/Communication/Inline/INDICommunication.py:
+#   python INDISimulator.py --scenario scenario.json
+#   python INDISimulator.py --replay session.jsonl
+#   python INDISimulator.py --load --jobs-per-hour 3600 --duration 600 --latency 0.05 --disconnect-rate 0.01
+#
+# Scenario files (json, yaml if PyYAML is installed):
+#   {"keepalive": 10, "steps": [
+#     {"action": "wait_ident"},
+#     {"action": "ready", "expect": "ReadyForMeasureTrue"},
+#     {"action": "start", "prod": "P1", "fields": {"MEASPLAN": "T1", "RBTPRG": "1"}},
+#     {"action": "expect", "prefix": "Q", "timeout": 30},
+#     {"action": "expect", "prefix": "S", "timeout": 600},
+#     {"action": "result"},
+#     {"action": "expect", "prefix": "D"},
+#     {"action": "abort"}, {"action": "send", "line": "..."},
+#     {"action": "delay", "seconds": 1}, {"action": "disconnect"}]}
+
+import argparse
+import json
+import math
+import queue
+import random
+import socket
+import sys
+import threading
+import time
+
+try:
+	import yaml
+except ImportError:
+	yaml = None
+
+
+# telegram prefixes, see SIGNALS / OUTGOING in INDICommunication
+IN_PREFIXES = ['Identification', 'ReadyForMeasureTrue', 'ReadyForMeasureFalse', 'WaitStart',
+	'FunctionNotAvailable', 'Error', 'Warnung', 'Q', 'S', 'D']
+
+
+class SimulatorError( Exception ):
+	pass
+
+
+def percentile( values, p ):
+	'''
+	nearest-rank percentile of a list of values (None for an empty list)
+	'''
+	if not values:
+		return None
+	values = sorted( values )
+	rank = max( 1, int( math.ceil( p / 100.0 * len( values ) ) ) )
+	return values[rank - 1]
+
+
+def parse_line( line ):
+	'''
+	split a line sent by the kiosk into (prefix, prodnumber, fields, xml)
+	'''
+	for prefix in IN_PREFIXES:
+		if line.startswith( prefix ):
+			break
+	else:
+		return None, None, {}, None
+	rest = line[len( prefix ):]
+	if prefix not in ['Q', 'S', 'D']:
+		return prefix, None, {}, rest
+	xml = None
+	if prefix == 'D':
+		pos = rest.find( '<' )
+		if pos >= 9:
+			length = int( rest[pos-9:pos] )
+			xml = rest[pos:]
+			if len( xml.encode( 'utf-8' ) ) != length:
+				raise SimulatorError( 'XML length mismatch {} != {}'.format( length, len( xml.encode( 'utf-8' ) ) ) )
+			rest = rest[:pos-9]
+	pairs = rest.split( ';' )
+	prod = pairs.pop( 0 )
+	fields = {p.split( ':' )[0]: p.split( ':' )[1] for p in pairs if ':' in p}
+	return prefix, prod, fields, xml
+
+
+class Connection:
+	'''
+	one accepted kiosk connection: reader thread for incoming lines,
+	sender thread applying the injected latency to outgoing lines
+	'''
+	def __init__( self, sock, latency=0.0, jitter=0.0, recorder=None ):
+		self.sock = sock
+		self.latency = latency
+		self.jitter = jitter
+		self.recorder = recorder
+		self.incoming = queue.Queue()
+		self._outgoing = queue.Queue()
+		self.closed = False
+		self._reader = threading.Thread( target=self._read_loop, daemon=True )
+		self._sender = threading.Thread( target=self._send_loop, daemon=True )
+		self._reader.start()
+		self._sender.start()
+
+	def _read_loop( self ):
+		buffer = b''
+		try:
+			while not self.closed:
+				data = self.sock.recv( 65536 )
+				if not data:
+					break
+				buffer += data
+				while b'\n' in buffer:
+					line, buffer = buffer.split( b'\n', 1 )
+					line = line.decode( 'utf-8', 'replace' )
+					if self.recorder is not None:
+						self.recorder.record( 'in', line )
+					self.incoming.put( ( time.time(), line ) )
+		except OSError:
+			pass
+		self.closed = True
+		self.incoming.put( ( time.time(), None ) )
+
+	def _send_loop( self ):
+		while True:
+			item = self._outgoing.get()
+			if item is None:
+				return
+			due, line = item
+			delay = due - time.time()
+			if delay > 0:
+				time.sleep( delay )
+			try:
+				self.sock.sendall( line.encode( 'utf-8' ) + b'\n' )
+			except OSError:
+				self.closed = True
+
+	def send( self, line ):
+		if self.recorder is not None:
+			self.recorder.record( 'out', line )
+		delay = self.latency + ( random.uniform( 0, self.jitter ) if self.jitter else 0.0 )
+		self._outgoing.put( ( time.time() + delay, line ) )
+
+	def close( self ):
+		self.closed = True
+		self._outgoing.put( None )
+		try:
+			self.sock.shutdown( socket.SHUT_RDWR )
+		except OSError:
+			pass
+		self.sock.close()
+
+
+class Recorder:
+	'''
+	records the session as json lines {"t": seconds since start, "dir": "in"/"out", "line": ...}
+	'''
+	def __init__( self, filename ):
+		self.file = open( filename, 'w', encoding='utf-8' )
+		self.start = time.time()
+		self.lock = threading.Lock()
+
+	def record( self, direction, line ):
+		with self.lock:
+			self.file.write( json.dumps( {'t': round( time.time() - self.start, 4 ), 'dir': direction, 'line': line} ) + '\n' )
+			self.file.flush()
+
+	def close( self ):
+		self.file.close()
+
+
+class INDISimulator:
+	def __init__( self, host='localhost', port=2049, keepalive=10.0, latency=0.0, jitter=0.0, record=None, verbose=False ):
+		self.host = host
+		self.port = port
+		self.keepalive = keepalive
+		self.latency = latency
+		self.jitter = jitter
+		self.verbose = verbose
+		self.recorder = Recorder( record ) if record else None
+		self.server = socket.socket( socket.AF_INET, socket.SOCK_STREAM )
+		self.server.setsockopt( socket.SOL_SOCKET, socket.SO_REUSEADDR, 1 )
+		self.server.bind( ( host, port ) )
+		self.server.listen( 1 )
+		self.conn = None
+		self.sync_counter = 0
+		self.last_sync = None
+		self.last_prod = None
+		self._alive_counter = 0
+		self._keepalive_stop = threading.Event()
+
+	def info( self, msg ):
+		if self.verbose:
+			print( '{:.3f} {}'.format( time.time(), msg ) )
+
+	# connection handling
+	def accept( self, timeout=None ):
+		self.server.settimeout( timeout )
+		try:
+			sock, addr = self.server.accept()
+		except socket.timeout:
+			raise SimulatorError( 'no kiosk connection within {}s'.format( timeout ) )
+		self.info( 'kiosk connected from {}'.format( addr ) )
+		self.conn = Connection( sock, self.latency, self.jitter, self.recorder )
+		self._start_keepalive()
+		return self.conn
+
+	def disconnect( self ):
+		self._keepalive_stop.set()
+		if self.conn is not None:
+			self.info( 'disconnect kiosk' )
+			self.conn.close()
+			self.conn = None
+
+	def _start_keepalive( self ):
+		self._keepalive_stop = threading.Event()
+		stop = self._keepalive_stop
+		conn = self.conn
+		def loop():
+			while not stop.wait( self.keepalive ) and not conn.closed:
+				self._alive_counter = ( self._alive_counter + 1 ) % 10000000
+				conn.send( '*{:07d}'.format( self._alive_counter ) )
+		if self.keepalive:
+			threading.Thread( target=loop, daemon=True ).start()
+
+	def handshake( self, timeout=30 ):
+		self.conn.send( 'Identification' )
+		return self.expect( 'Identification', timeout )
+
+	# telegrams
+	def next_sync( self ):
+		self.sync_counter += 1
+		return '{}{:06d}'.format( time.strftime( '%Y%m%d%H%M%S' ), self.sync_counter )
+
+	def telegram( self, start, prod, sync, fields=None ):
+		data = {'SYNC': sync}
+		data.update( fields or {} )
+		return '{}{};{}'.format( start, prod, ';'.join( '{}:{}'.format( k, v ) for k, v in data.items() ) )
+
+	def start_job( self, prod, sync=None, fields=None ):
+		sync = sync or self.next_sync()
+		self.last_sync = sync
+		self.last_prod = prod
+		self.conn.send( self.telegram( 'M', prod, sync, fields ) )
+		return sync
+
+	def request_result( self, prod, sync ):
+		self.conn.send( self.telegram( 'T', prod, sync ) )
+
+	def expect( self, prefix, timeout=30, sync=None ):
+		'''
+		wait for a line with the given prefix (and SYNC), ignoring others
+		returns (timestamp, prefix, prod, fields, xml)
+		'''
+		end = time.time() + timeout
+		while True:
+			remaining = end - time.time()
+			if remaining <= 0:
+				raise SimulatorError( 'timeout waiting for "{}"'.format( prefix ) )
+			try:
+				ts, line = self.conn.incoming.get( timeout=remaining )
+			except queue.Empty:
+				continue
+			if line is None:
+				raise SimulatorError( 'connection closed waiting for "{}"'.format( prefix ) )
+			parsed = parse_line( line )
+			self.info( '<- {}'.format( line[:120] ) )
+			if parsed[0] == prefix and ( sync is None or parsed[2].get( 'SYNC' ) == sync ):
+				return ( ts, ) + parsed
+
+	# scenario execution
+	def run_scenario( self, scenario ):
+		self.keepalive = scenario.get( 'keepalive', self.keepalive )
+		if self.conn is None:
+			self.accept( scenario.get( 'accept_timeout' ) )
+		for no, step in enumerate( scenario.get( 'steps', [] ) ):
+			action = step['action']
+			self.info( 'step {}: {}'.format( no, step ) )
+			if action == 'wait_ident':
+				self.handshake( step.get( 'timeout', 30 ) )
+			elif action == 'ready':
+				self.conn.send( 'ReadyForMeasure' )
+				self.expect( step.get( 'expect', 'ReadyForMeasureTrue' ), step.get( 'timeout', 30 ) )
+			elif action == 'start':
+				self.start_job( step.get( 'prod', 'P{}'.format( self.sync_counter + 1 ) ), step.get( 'sync' ), step.get( 'fields' ) )
+			elif action == 'result':
+				self.request_result( step.get( 'prod', self.last_prod ), step.get( 'sync', self.last_sync ) )
+			elif action == 'abort':
+				# INDICommunication has no abort telegram yet, it answers FunctionNotAvailable
+				self.conn.send( step.get( 'line', self.telegram( 'A', self.last_prod, self.last_sync ) ) )
+			elif action == 'expect':
+				sync = self.last_sync if step.get( 'same_sync', True ) and step['prefix'] in ['Q', 'S', 'D'] else None
+				self.expect( step['prefix'], step.get( 'timeout', 30 ), sync )
+			elif action == 'send':
+				self.conn.send( step['line'] )
+			elif action == 'delay':
+				time.sleep( step.get( 'seconds', 1 ) )
+			elif action == 'disconnect':
+				self.disconnect()
+				if step.get( 'reconnect', True ):
+					self.accept( step.get( 'timeout', 120 ) )
+			else:
+				raise SimulatorError( 'unknown scenario action "{}"'.format( action ) )
+
+	def replay( self, filename, speed=1.0, timeout=600 ):
+		'''
+		replay a recorded session: outgoing lines are sent with recorded timing,
+		incoming lines are expected by prefix
+		'''
+		with open( filename, 'r', encoding='utf-8' ) as f:
+			events = [json.loads( line ) for line in f if line.strip()]
+		if self.conn is None:
+			self.accept()
+		start = time.time()
+		for event in events:
+			if event['dir'] == 'out':
+				if event['line'].startswith( '*' ):
+					continue  # keepalives are generated by the simulator
+				delay = start + event['t'] / speed - time.time()
+				if delay > 0:
+					time.sleep( delay )
+				self.conn.send( event['line'] )
+			else:
+				prefix = parse_line( event['line'] )[0]
+				if prefix is not None:
+					self.expect( prefix, timeout )
+
+	# load mode
+	def run_load( self, jobs_per_hour=3600, duration=600, disconnect_rate=0.0, fields=None, job_timeout=600 ):
+		'''
+		drive jobs at the given rate, request the result after each S telegram
+		returns report dict with latency percentiles in seconds
+		'''
+		if self.conn is None:
+			self.accept()
+			self.handshake()
+		interval = 3600.0 / jobs_per_hour
+		jobs = {}
+		latencies = {'answer': [], 'finish': [], 'result': [], 'total': []}
+		counters = {'started': 0, 'completed': 0, 'timeouts': 0, 'disconnects': 0, 'errors': 0}
+		end = time.time() + duration
+		next_start = time.time()
+		while time.time() < end or jobs:
+			now = time.time()
+			if now >= next_start and now < end and self.conn is not None:
+				prod = 'LOAD{:06d}'.format( counters['started'] )
+				sync = self.start_job( prod, fields=fields or {'MEASPLAN': 'LOAD', 'RBTPRG': '1'} )
+				jobs[sync] = {'prod': prod, 'start': now}
+				counters['started'] += 1
+				next_start += interval
+				if disconnect_rate and random.random() < disconnect_rate:
+					counters['disconnects'] += 1
+					self.disconnect()
+					jobs.clear()
+					self.accept()
+					self.handshake()
+					next_start = time.time()
+					continue
+
+			for sync, job in list( jobs.items() ):
+				if now - job['start'] > job_timeout:
+					counters['timeouts'] += 1
+					del jobs[sync]
+			if time.time() >= end and not jobs:
+				break
+			try:
+				ts, line = self.conn.incoming.get( timeout=max( 0.001, min( next_start, end ) - time.time() ) )
+			except queue.Empty:
+				continue
+			if line is None:
+				counters['disconnects'] += 1
+				jobs.clear()
+				self.disconnect()
+				if time.time() >= end:
+					break
+				self.accept()
+				self.handshake()
+				continue
+			try:
+				prefix, prod, tele, xml = parse_line( line )
+			except SimulatorError:
+				counters['errors'] += 1
+				continue
+			if prefix in ['Error', 'Warnung']:
+				counters['errors'] += prefix == 'Error'
+				continue
+			job = jobs.get( tele.get( 'SYNC' ) )
+			if job is None:
+				continue
+			if prefix == 'Q':
+				job['answer'] = ts
+				latencies['answer'].append( ts - job['start'] )
+			elif prefix == 'S':
+				job['finish'] = ts
+				latencies['finish'].append( ts - job['start'] )
+				job['result_request'] = time.time()
+				self.request_result( job['prod'], tele['SYNC'] )
+			elif prefix == 'D':
+				latencies['result'].append( ts - job.get( 'result_request', ts ) )
+				latencies['total'].append( ts - job['start'] )
+				counters['completed'] += 1
+				del jobs[tele['SYNC']]
+
+		report = dict( counters )
+		for name, values in latencies.items():
+			report[name] = {p: percentile( values, p ) for p in ( 50, 90, 99, 100 )}
+		return report
+
+
+def load_scenario( filename ):
+	with open( filename, 'r', encoding='utf-8' ) as f:
+		if filename.lower().endswith( ( '.yaml', '.yml' ) ):
+			if yaml is None:
+				raise SimulatorError( 'PyYAML not installed, use a json scenario' )
+			return yaml.safe_load( f )
+		return json.load( f )
+
+
+def main( argv=None ):
+	parser = argparse.ArgumentParser( description='Local INDI line controller simulator' )
+	parser.add_argument( '--host', default='localhost' )
+	parser.add_argument( '--port', type=int, default=2049 )
+	parser.add_argument( '--keepalive', type=float, default=10.0, help='seconds between alive telegrams' )
+	parser.add_argument( '--latency', type=float, default=0.0, help='injected latency for sent telegrams (s)' )
+	parser.add_argument( '--jitter', type=float, default=0.0, help='additional random latency (s)' )
+	parser.add_argument( '--record', help='record session to json lines file' )
+	parser.add_argument( '--verbose', '-v', action='store_true' )
+	mode = parser.add_mutually_exclusive_group( required=True )
+	mode.add_argument( '--scenario', help='json/yaml scenario file' )
+	mode.add_argument( '--replay', help='recorded session to replay' )
+	mode.add_argument( '--load', action='store_true', help='load mode' )
+	parser.add_argument( '--speed', type=float, default=1.0, help='replay speed factor' )
+	parser.add_argument( '--jobs-per-hour', type=float, default=3600 )
+	parser.add_argument( '--duration', type=float, default=600, help='load duration (s)' )
+	parser.add_argument( '--disconnect-rate', type=float, default=0.0, help='probability of a disconnect per job' )
+	args = parser.parse_args( argv )
+
+	sim = INDISimulator( args.host, args.port, args.keepalive, args.latency, args.jitter, args.record, args.verbose )
+	try:
+		if args.scenario:
+			sim.run_scenario( load_scenario( args.scenario ) )
+			print( 'scenario finished' )
+		elif args.replay:
+			sim.replay( args.replay, args.speed )
+			print( 'replay finished' )
+		else:
+			print( json.dumps( sim.run_load( args.jobs_per_hour, args.duration, args.disconnect_rate ), indent=2 ) )
+	except SimulatorError as e:
+		print( 'FAILED: {}'.format( e ) )
+		return 1
+	finally:
+		sim.disconnect()
+		if sim.recorder is not None:
+			sim.recorder.close()
+	return 0
+
+
+if __name__ == '__main__':
+	sys.exit( main() )
@@ -2619,6 +2619,7 @@ class newStartUpV8(Workflow.StartUpV8, metaclass = Utils.MetaClassPatch):
 					self.dialog.buttonNext.enabled = False
 					self.dialog.buttonTemplateChoose.text = Globals.LOCALIZATION.startdialog_button_template
 					gom.script.sys.close_project ()
+					Utils.invalidate_project_overrides()
 					return
 
 		self.original__start_dialog_handler(widget)
@@ -2637,6 +2638,7 @@ class newStartUpV8(Workflow.StartUpV8, metaclass = Utils.MetaClassPatch):
 				self.dialog.buttonNext.enabled = False
 				self.dialog.buttonTemplateChoose.text = Globals.LOCALIZATION.startdialog_button_template
 				gom.script.sys.close_project ()
+				Utils.invalidate_project_overrides()
 	
 	def _enable_start_button( self ):
 		'''